@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark for phoneme-to-word alignment.
+
+Compares the reference pure-Python DP against the vectorized banded engine
+(core.banded_alignment) on synthetic 5 / 20 / 60 word sentences and checks
+that both produce the same alignment.
+
+Usage (from backend/):
+    python -m benchmarks.alignment_benchmark [--runs 5] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.process_audio import align_phonemes_to_words_with_confidence
+
+IPA_INVENTORY = [
+    "p", "b", "t", "d", "k", "g", "f", "v", "θ", "ð", "s", "z", "ʃ", "h",
+    "m", "n", "ŋ", "l", "ɹ", "w", "j", "i", "ɪ", "ɛ", "æ", "ɑ", "ɔ", "ʊ",
+    "u", "ə", "e", "o", "a",
+]
+
+
+def generate_sentence(num_words: int, rng: random.Random,
+                      error_rate: float = 0.15) -> tuple[list, list]:
+    """
+    Generate ground truth words and a noisy predicted phoneme sequence.
+
+    Returns:
+        Tuple of (pred_phonemes, gt_words_phonemes)
+    """
+    gt_words_phonemes = []
+    for i in range(num_words):
+        length = rng.randint(2, 7)
+        gt_words_phonemes.append((f"word{i}", [rng.choice(IPA_INVENTORY) for _ in range(length)]))
+
+    pred_phonemes = []
+    for _, phonemes in gt_words_phonemes:
+        for phoneme in phonemes:
+            roll = rng.random()
+            if roll < error_rate / 3:
+                continue  # deletion
+            if roll < 2 * error_rate / 3:
+                pred_phonemes.append(rng.choice(IPA_INVENTORY))  # substitution
+                continue
+            pred_phonemes.append(phoneme)
+            if roll > 1 - error_rate / 3:
+                pred_phonemes.append(rng.choice(IPA_INVENTORY))  # insertion
+    return pred_phonemes, gt_words_phonemes
+
+
+def time_alignment(pred_phonemes, gt_words_phonemes, use_vectorized: bool, runs: int):
+    """Run the alignment `runs` times and return (median_seconds, alignment, confidences)."""
+    timings = []
+    result = None
+    for _ in range(runs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = align_phonemes_to_words_with_confidence(
+                pred_phonemes, gt_words_phonemes, use_vectorized=use_vectorized
+            )
+            timings.append(time.perf_counter() - start)
+    return float(np.median(timings)), result[0], result[1]
+
+
+def run_benchmark(sizes=(5, 20, 60), runs: int = 5, seed: int = 0) -> list[dict]:
+    """Benchmark both alignment engines for each sentence size."""
+    rng = random.Random(seed)
+    results = []
+
+    print("Phoneme-to-Word Alignment Benchmark")
+    print("=" * 70)
+    print(f"{'Words':<8} {'Phonemes':<10} {'Reference':<14} {'Vectorized':<14} {'Speedup':<10} {'Same'}")
+    print("-" * 70)
+
+    for num_words in sizes:
+        pred_phonemes, gt_words_phonemes = generate_sentence(num_words, rng)
+
+        ref_time, ref_alignment, ref_conf = time_alignment(
+            pred_phonemes, gt_words_phonemes, use_vectorized=False, runs=runs
+        )
+        vec_time, vec_alignment, vec_conf = time_alignment(
+            pred_phonemes, gt_words_phonemes, use_vectorized=True, runs=runs
+        )
+
+        same = (
+            [(w, list(s), round(float(p), 6)) for w, s, p in ref_alignment] ==
+            [(w, list(s), round(float(p), 6)) for w, s, p in vec_alignment]
+            and np.allclose(ref_conf, vec_conf, atol=1e-6)
+        )
+        speedup = ref_time / vec_time if vec_time > 0 else float("inf")
+
+        print(f"{num_words:<8} {len(pred_phonemes):<10} {ref_time * 1000:>9.2f} ms   "
+              f"{vec_time * 1000:>9.2f} ms   {speedup:>6.1f}x    {'yes' if same else 'NO'}")
+
+        results.append({
+            "num_words": num_words,
+            "num_phonemes": len(pred_phonemes),
+            "reference_ms": ref_time * 1000,
+            "vectorized_ms": vec_time * 1000,
+            "speedup": speedup,
+            "identical": same,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per engine and size")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic sentences")
+    args = parser.parse_args()
+
+    run_benchmark(runs=args.runs, seed=args.seed)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for analyze_results and what the request handler does with it.
+
+Compares the pandas version (DataFrame built to pick the highest-PER word,
+then to_dict() for the SSE payload and to_dict("records") for the feedback
+formatter and the mode's get_next_sentence) against PronunciationTable, on
+word results from _process_word_alignment for synthetic 5 / 15 / 30 word
+sentences, and checks that every output is identical.
+
+Usage (from backend/):
+    python -m benchmarks.analysis_benchmark [--sentences 50] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import timeit
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.phoneme_feedback_formatter import build_phoneme_to_error_words, generate_feedback
+from core.process_audio import _process_word_alignment, analyze_results
+from core.speech_problem_classifier import SpeechProblemClassifier
+from core.word_alignment import word_alignment_records
+from schemas.feedback_entry import AudioAnalysis
+
+IPA_INVENTORY = [
+    "p", "b", "t", "d", "k", "g", "f", "v", "θ", "ð", "s", "z", "ʃ", "h",
+    "m", "n", "ŋ", "l", "ɹ", "w", "j", "i", "ɪ", "ɛ", "æ", "ɑ", "ɔ", "ʊ",
+    "u", "ə", "e", "o", "a",
+]
+
+
+def legacy_analyze_results(pronunciation_data):
+    """Original analyze_results from core/process_audio.py (pandas DataFrame)."""
+    import pandas as pd
+
+    pronunciation_data = word_alignment_records(pronunciation_data)
+    df = pd.DataFrame(pronunciation_data)
+    highest_per = df.sort_values("per", ascending=False).iloc[0].to_dict()
+    problem_summary = SpeechProblemClassifier.classify_problems(pronunciation_data)
+    total_phonemes = sum(word["total_phonemes"] for word in pronunciation_data)
+    total_errors = sum(word["total_errors"] for word in pronunciation_data)
+    per_summary = {
+        "total_phonemes": total_phonemes,
+        "total_errors": total_errors,
+        "sentence_per": total_errors / total_phonemes if total_phonemes > 0 else 0.0,
+    }
+    return df, highest_per, problem_summary, per_summary
+
+
+def sanitize(obj):
+    """audio_processing_handler.sanitize (that module needs the database layer)."""
+    if isinstance(obj, float):
+        return None if math.isnan(obj) or math.isinf(obj) else obj
+    if isinstance(obj, dict):
+        return {k: sanitize(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [sanitize(v) for v in obj]
+    return obj
+
+
+def legacy_request(results) -> tuple:
+    """What the handler did per request with the DataFrame."""
+    df, highest, problem_summary, per_summary = legacy_analyze_results(results)
+    payload = json.dumps({"pronunciation_dataframe": sanitize(df.to_dict()), "highest_per_word": sanitize(highest)})
+    feedback = generate_feedback(problem_summary, per_summary, pronunciation_data=df.to_dict("records"))
+    error_words = build_phoneme_to_error_words(df.to_dict("records"))
+    return payload, feedback.text, error_words
+
+
+def table_request(results) -> tuple:
+    """The same with analyze_results' PronunciationTable."""
+    table, highest, problem_summary, per_summary = analyze_results(results)
+    analysis = AudioAnalysis(pronunciation_dataframe=table, problem_summary=problem_summary,
+                             per_summary=per_summary, highest_per_word=highest)
+    payload = json.dumps({"pronunciation_dataframe": sanitize(table.to_dict()), "highest_per_word": sanitize(highest)})
+    feedback = generate_feedback(problem_summary, per_summary, pronunciation_data=analysis.pronunciation_records)
+    error_words = build_phoneme_to_error_words(analysis.pronunciation_records)
+    return payload, feedback.text, error_words
+
+
+def generate_results(num_words: int, rng: random.Random, error_rate: float = 0.2) -> list:
+    """Word results for a sentence with phoneme errors, a dropped word and an extra word."""
+    ground_truth = [(f"word{i}", [rng.choice(IPA_INVENTORY) for _ in range(rng.randint(2, 6))])
+                    for i in range(num_words)]
+    predicted_words, predictions = [], []
+    for word, phonemes in ground_truth:
+        if rng.random() < 0.05:
+            continue
+        predicted = [rng.choice(IPA_INVENTORY) if rng.random() < error_rate else phoneme for phoneme in phonemes]
+        predicted_words.append(word)
+        predictions.append(predicted)
+    if rng.random() < 0.3:
+        predicted_words.append("extra")
+        predictions.append([rng.choice(IPA_INVENTORY) for _ in range(3)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _process_word_alignment([word for word, _ in ground_truth], ground_truth, predicted_words, predictions)
+
+
+def run_benchmark(sizes=(5, 15, 30), sentences: int = 50, repeat: int = 5, seed: int = 0) -> list[dict]:
+    """Time both versions on the same word results."""
+    rng = random.Random(seed)
+    rows = []
+    print("Analysis Benchmark (analyze_results + handler conversions)")
+    print("=" * 60)
+    print(f"{'Words':>6} {'pandas':>14} {'table':>14} {'Speedup':>10} {'Identical':>10}")
+    print("-" * 60)
+    for size in sizes:
+        batch = [generate_results(size, rng) for _ in range(sentences)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            identical = all(legacy_request(results) == table_request(results) for results in batch)
+
+            def per_request(fn) -> float:
+                timings = timeit.repeat(lambda: [fn(results) for results in batch], number=1, repeat=repeat)
+                return min(timings) / len(batch) * 1e6
+
+            legacy_us = per_request(legacy_request)
+            table_us = per_request(table_request)
+        rows.append({"words": size, "legacy_us": legacy_us, "table_us": table_us,
+                     "speedup": legacy_us / table_us, "identical": identical})
+        print(f"{size:>6} {legacy_us:>11.1f} us {table_us:>11.1f} us {legacy_us / table_us:>9.1f}x "
+              f"{'yes' if identical else 'NO':>10}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=50, help="Sentences per size")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the sentences")
+    args = parser.parse_args()
+
+    run_benchmark(sentences=args.sentences, repeat=args.repeat, seed=args.seed)
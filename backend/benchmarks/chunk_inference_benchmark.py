@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark for chunked extraction of long (story-mode) recordings.
+
+Compares the original loop in process_audio_array (one chunk at a time,
+phoneme extraction awaited before word extraction) with
+core.process_audio.extract_chunk_predictions (all chunks concurrently,
+phoneme requests batched by the inference scheduler, word extraction
+overlapped) on synthetic 20 / 40 / 60 s recordings split with
+chunk_audio_at_silence.
+
+By default the extractors are simulated with a latency model so the
+benchmark runs without model downloads or an API key:
+  - phoneme model: fixed per-call overhead + per-second-of-audio compute,
+    paid once per batch (padded to the longest utterance)
+  - word extraction: network round trip + per-second transcription time
+Pass --real to use PhonemeExtractorONNX and WordExtractorOnline instead.
+
+Usage (from backend/):
+    python -m benchmarks.chunk_inference_benchmark [--durations 20 40 60] [--repeat 3] [--real]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.audio_chunking import chunk_audio_at_silence, merge_chunk_results
+from core.process_audio import extract_chunk_predictions
+
+
+class SimulatedPhonemeExtractor:
+    """Latency model of the ONNX phoneme extractor."""
+
+    model_name = "simulated-phoneme-extractor"
+
+    def __init__(self, call_overhead=0.04, seconds_per_audio_second=0.03):
+        self.call_overhead = call_overhead
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def extract_phoneme(self, audio, sampling_rate=16000):
+        return self.extract_phoneme_batch([audio], sampling_rate)[0]
+
+    def extract_phoneme_batch(self, audios, sampling_rate=16000, use_optimized_preprocessing=True):
+        longest = max(len(audio) for audio in audios) / sampling_rate
+        time.sleep(self.call_overhead + self.seconds_per_audio_second * longest * len(audios) ** 0.5)
+        return [[["w", "ɝ", "d"]] * max(int(len(audio) / sampling_rate * 2), 1) for audio in audios]
+
+
+class SimulatedWordExtractor:
+    """Latency model of the online (Deepgram) word extractor."""
+
+    def __init__(self, round_trip=0.25, seconds_per_audio_second=0.01):
+        self.round_trip = round_trip
+        self.seconds_per_audio_second = seconds_per_audio_second
+
+    def extract_words(self, audio, sampling_rate=16000):
+        time.sleep(self.round_trip + self.seconds_per_audio_second * len(audio) / sampling_rate)
+        return ["word"] * max(int(len(audio) / sampling_rate * 2), 1)
+
+
+def synthetic_story(duration: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    """Word-like voiced bursts separated by short gaps and sentence pauses."""
+    rng = np.random.default_rng(seed)
+    pieces = []
+    total = 0
+    while total < duration * sr:
+        word = int(rng.uniform(0.25, 0.6) * sr)
+        t = np.arange(word) / sr
+        f0 = rng.uniform(110, 220)
+        envelope = np.hanning(word)
+        burst = envelope * (0.3 * np.sin(2 * np.pi * f0 * t) + 0.1 * np.sin(2 * np.pi * 3 * f0 * t))
+        gap = int((0.6 if rng.random() < 0.15 else 0.12) * sr)
+        pieces += [burst, np.zeros(gap)]
+        total += word + gap
+    audio = np.concatenate(pieces)[:int(duration * sr)]
+    return (audio + 0.001 * rng.standard_normal(len(audio))).astype(np.float32)
+
+
+async def legacy_extract_chunks(chunks, chunk_metadata, sampling_rate, phoneme_model, word_model):
+    """Original sequential chunk loop from core/process_audio.py."""
+    all_chunk_phonemes = []
+    all_chunk_words = []
+    for i, (chunk, metadata) in enumerate(zip(chunks, chunk_metadata)):
+        try:
+            phoneme_predictions = await asyncio.to_thread(
+                phoneme_model.extract_phoneme, audio=chunk, sampling_rate=sampling_rate
+            )
+            predicted_words = await asyncio.to_thread(
+                word_model.extract_words, audio=chunk, sampling_rate=sampling_rate
+            )
+            all_chunk_phonemes.append(phoneme_predictions)
+            all_chunk_words.append(predicted_words)
+        except ValueError:
+            all_chunk_phonemes.append([])
+            all_chunk_words.append([])
+    return all_chunk_phonemes, all_chunk_words
+
+
+def _time(coroutine_factory, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = asyncio.run(coroutine_factory())
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", type=float, nargs="+", default=[20, 40, 60])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--real", action="store_true", help="Use the ONNX and online extractors")
+    args = parser.parse_args()
+
+    if args.real:
+        from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+        from core.word_extractor import WordExtractorOnline
+        phoneme_model, word_model = PhonemeExtractorONNX(), WordExtractorOnline()
+    else:
+        phoneme_model, word_model = SimulatedPhonemeExtractor(), SimulatedWordExtractor()
+
+    sr = 16000
+    rows = []
+    for duration in args.durations:
+        audio = synthetic_story(duration, sr)
+        chunks, chunk_metadata = chunk_audio_at_silence(audio, sr)
+
+        legacy_time, legacy = _time(
+            lambda: legacy_extract_chunks(chunks, chunk_metadata, sr, phoneme_model, word_model), args.repeat
+        )
+        parallel_time, parallel = _time(
+            lambda: extract_chunk_predictions(chunks, chunk_metadata, sr, phoneme_model, word_model), args.repeat
+        )
+        assert merge_chunk_results(*legacy, chunk_metadata) == merge_chunk_results(*parallel, chunk_metadata), \
+            "Chunk order must be preserved"
+        rows.append((duration, len(chunks), legacy_time, parallel_time))
+
+    print(f"\n{'audio':>7} {'chunks':>7} {'sequential':>12} {'parallel':>10} {'speedup':>8}")
+    for duration, num_chunks, legacy_time, parallel_time in rows:
+        print(f"{duration:>6.0f}s {num_chunks:>7} {legacy_time:>11.3f}s {parallel_time:>9.3f}s "
+              f"{legacy_time / parallel_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
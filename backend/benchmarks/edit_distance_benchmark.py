@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the phoneme edit-distance kernels.
+
+Compares the original per-word DP implementations of compute_per (NumPy
+table) and align_sequences (list-of-lists table) against core.edit_distance
+on 3 / 6 / 9 / 12 phoneme words with realistic substitution, deletion and
+insertion errors, and checks that both produce the same results.
+
+Usage (from backend/):
+    python -m benchmarks.edit_distance_benchmark [--pairs 500] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.edit_distance import (
+    EDITDISTANCE_AVAILABLE,
+    align_operations,
+    bit_parallel_levenshtein,
+    phoneme_error_rate,
+)
+
+IPA_INVENTORY = [
+    "p", "b", "t", "d", "k", "g", "f", "v", "θ", "ð", "s", "z", "ʃ", "h",
+    "m", "n", "ŋ", "l", "ɹ", "w", "j", "i", "ɪ", "ɛ", "æ", "ɑ", "ɔ", "ʊ",
+    "u", "ə", "e", "o", "a",
+]
+
+
+def legacy_compute_per(gt_phonemes, pred_phonemes):
+    """Original compute_per from core/process_audio.py (NumPy DP table)."""
+    if not gt_phonemes and not pred_phonemes:
+        return 0.0
+    if not gt_phonemes:
+        return 1.0
+    if not pred_phonemes:
+        return 1.0
+
+    m, n = len(gt_phonemes), len(pred_phonemes)
+    if gt_phonemes == pred_phonemes:
+        return 0.0
+
+    dp = np.zeros((m + 1, n + 1), dtype=np.uint16)
+    for i in range(m + 1):
+        dp[i, 0] = i
+    for j in range(n + 1):
+        dp[0, j] = j
+
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if gt_phonemes[i - 1] == pred_phonemes[j - 1]:
+                dp[i, j] = dp[i - 1, j - 1]
+            else:
+                dp[i, j] = 1 + min(dp[i - 1, j], dp[i, j - 1], dp[i - 1, j - 1])
+    return dp[m, n] / max(m, 1)
+
+
+def legacy_align_sequences(gt, pred):
+    """Original align_sequences from core/process_audio.py (list-of-lists DP table)."""
+    m, n = len(gt), len(pred)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        dp[i][0] = i
+    for j in range(n + 1):
+        dp[0][j] = j
+
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            cost = 0 if gt[i - 1] == pred[j - 1] else 1
+            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + cost)
+
+    operations = []
+    i, j = m, n
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dp[i][j] == dp[i - 1][j - 1] + (0 if gt[i - 1] == pred[j - 1] else 1):
+            if gt[i - 1] == pred[j - 1]:
+                operations.append(('match', gt[i - 1], pred[j - 1]))
+            else:
+                operations.append(('substitution', gt[i - 1], pred[j - 1]))
+            i -= 1
+            j -= 1
+        elif i > 0 and dp[i][j] == dp[i - 1][j] + 1:
+            operations.append(('deletion', gt[i - 1], None))
+            i -= 1
+        elif j > 0 and dp[i][j] == dp[i][j - 1] + 1:
+            operations.append(('insertion', None, pred[j - 1]))
+            j -= 1
+    operations.reverse()
+    return operations
+
+
+def generate_pairs(word_length: int, count: int, rng: random.Random,
+                   error_rate: float = 0.2) -> list[tuple[list, list]]:
+    """Generate (expected, predicted) phoneme pairs for words of a given length."""
+    pairs = []
+    for _ in range(count):
+        gt = [rng.choice(IPA_INVENTORY) for _ in range(word_length)]
+        pred = []
+        for phoneme in gt:
+            roll = rng.random()
+            if roll < error_rate / 3:
+                continue  # deletion
+            if roll < 2 * error_rate / 3:
+                pred.append(rng.choice(IPA_INVENTORY))  # substitution
+                continue
+            pred.append(phoneme)
+            if roll > 1 - error_rate / 3:
+                pred.append(rng.choice(IPA_INVENTORY))  # insertion
+        pairs.append((gt, pred))
+    return pairs
+
+
+def time_per_call(fn, pairs, repeat: int) -> float:
+    """Best-of-`repeat` time per call in microseconds."""
+    timings = timeit.repeat(lambda: [fn(gt, pred) for gt, pred in pairs], number=1, repeat=repeat)
+    return min(timings) / len(pairs) * 1e6
+
+
+def run_benchmark(lengths=(3, 6, 9, 12), pairs: int = 500, repeat: int = 5, seed: int = 0) -> list[dict]:
+    """Benchmark PER and alignment kernels for each word length."""
+    rng = random.Random(seed)
+    results = []
+
+    print("Edit Distance Micro-Benchmark")
+    print(f"C editdistance backend: {'yes' if EDITDISTANCE_AVAILABLE else 'no (pure-Python kernel)'}")
+    print("=" * 86)
+    print(f"{'Phonemes':<10} {'Kernel':<12} {'Legacy':<12} {'New':<12} {'Bit-par py':<12} {'Speedup':<10} {'Same'}")
+    print("-" * 86)
+
+    for length in lengths:
+        word_pairs = generate_pairs(length, pairs, rng)
+
+        per_same = all(
+            abs(float(legacy_compute_per(gt, pred)) - phoneme_error_rate(gt, pred)) < 1e-12
+            for gt, pred in word_pairs
+        )
+        ops_same = all(
+            legacy_align_sequences(gt, pred) == align_operations(gt, pred)
+            for gt, pred in word_pairs
+        )
+
+        legacy_per = time_per_call(legacy_compute_per, word_pairs, repeat)
+        new_per = time_per_call(phoneme_error_rate, word_pairs, repeat)
+        python_per = time_per_call(lambda gt, pred: bit_parallel_levenshtein(gt, pred) / len(gt), word_pairs, repeat)
+        legacy_ops = time_per_call(legacy_align_sequences, word_pairs, repeat)
+        new_ops = time_per_call(align_operations, word_pairs, repeat)
+
+        print(f"{length:<10} {'PER':<12} {legacy_per:>7.2f} us   {new_per:>7.2f} us   {python_per:>7.2f} us   "
+              f"{legacy_per / new_per:>6.1f}x    {'yes' if per_same else 'NO'}")
+        print(f"{'':<10} {'operations':<12} {legacy_ops:>7.2f} us   {new_ops:>7.2f} us   {'-':>10}   "
+              f"{legacy_ops / new_ops:>6.1f}x    {'yes' if ops_same else 'NO'}")
+
+        results.append({
+            "phonemes": length,
+            "legacy_per_us": legacy_per,
+            "per_us": new_per,
+            "bit_parallel_python_per_us": python_per,
+            "per_speedup": legacy_per / new_per,
+            "legacy_operations_us": legacy_ops,
+            "operations_us": new_ops,
+            "operations_speedup": legacy_ops / new_ops,
+            "identical": per_same and ops_same,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=500, help="Word pairs per length")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic words")
+    args = parser.parse_args()
+
+    run_benchmark(pairs=args.pairs, repeat=args.repeat, seed=args.seed)
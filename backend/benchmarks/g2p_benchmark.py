@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark for grapheme_to_phoneme.
+
+Compares the original implementation (eng_to_ipa.convert on the whole
+sentence every call) against the precompiled lexicon + LRU version in
+core.grapheme_to_phoneme, one sentence at a time and through
+grapheme_to_phoneme_batch, and checks that every result is identical.
+Sentences mix lexicon words with capitals, punctuation and made-up words
+that go through the out-of-vocabulary path.
+
+Usage (from backend/):
+    python -m benchmarks.g2p_benchmark [--sentences 200] [--words 8] [--repeat 3] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+import eng_to_ipa as G2p
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.grapheme_to_phoneme import grapheme_to_phoneme, grapheme_to_phoneme_batch
+from core.pronunciation_lexicon import get_pronunciation_lexicon
+
+COMMON_WORDS = [
+    "the", "cat", "sat", "on", "mat", "a", "dog", "ran", "to", "park", "she", "reads", "books",
+    "every", "morning", "we", "like", "playing", "outside", "when", "it", "is", "sunny", "my",
+    "brother", "wants", "new", "bicycle", "for", "his", "birthday", "through", "thought", "enough",
+]
+
+
+def legacy_grapheme_to_phoneme(grapheme) -> list[tuple]:
+    """Original grapheme_to_phoneme from core/grapheme_to_phoneme.py (eng_to_ipa on every call)."""
+    unfiltered_phonemes = G2p.convert(grapheme)
+    normalized = unfiltered_phonemes.split(" ")
+    output = []
+    for word, phonemes in zip(grapheme.split(" "), normalized):
+        output.append(
+            (
+                word,
+                list(
+                    phonemes.replace("ˈ", "")
+                    .replace("ˌ", "")
+                    .replace("*", "")
+                    .replace(",", "")
+                    .replace("'", "")
+                ),
+            )
+        )  # remove stress markers
+    return output
+
+
+def generate_sentences(count: int, words: int, rng: random.Random) -> list[str]:
+    """Reading-practice style sentences with some capitals, punctuation and unknown words."""
+    vocabulary = COMMON_WORDS + rng.sample(sorted(get_pronunciation_lexicon().entries), 500)
+    sentences = []
+    for _ in range(count):
+        sentence = [rng.choice(vocabulary) for _ in range(words)]
+        sentence[0] = sentence[0].capitalize()
+        if rng.random() < 0.2:
+            sentence[rng.randrange(words)] = "".join(rng.choice("bcdfgklmnprstvz") for _ in range(6))
+        if rng.random() < 0.3:
+            sentence[words // 2] += ","
+        sentences.append(" ".join(sentence) + rng.choice([".", "!", "?", ""]))
+    return sentences
+
+
+def run_benchmark(sentences: int = 200, words: int = 8, repeat: int = 3, seed: int = 0) -> dict:
+    """Time both implementations on the same sentences."""
+    start = time.perf_counter()
+    get_pronunciation_lexicon()
+    lexicon_seconds = time.perf_counter() - start
+
+    texts = generate_sentences(sentences, words, random.Random(seed))
+    identical = [legacy_grapheme_to_phoneme(text) for text in texts] == [grapheme_to_phoneme(text) for text in texts]
+    identical = identical and grapheme_to_phoneme_batch(texts) == [grapheme_to_phoneme(text) for text in texts]
+
+    def per_sentence(fn) -> float:
+        timings = timeit.repeat(lambda: [fn(text) for text in texts], number=1, repeat=repeat)
+        return min(timings) / len(texts) * 1e6
+
+    legacy_us = per_sentence(legacy_grapheme_to_phoneme)
+    cached_us = per_sentence(grapheme_to_phoneme)
+    batch_us = min(timeit.repeat(lambda: grapheme_to_phoneme_batch(texts), number=1, repeat=repeat)) / len(texts) * 1e6
+
+    print("Grapheme-to-Phoneme Benchmark")
+    print(f"Lexicon ready in {lexicon_seconds:.2f}s ({len(get_pronunciation_lexicon())} words)")
+    print("=" * 60)
+    print(f"{'Implementation':<28} {'Per sentence':>14} {'Speedup':>10}")
+    print("-" * 60)
+    print(f"{'eng_to_ipa (legacy)':<28} {legacy_us:>11.1f} us {'1.0x':>10}")
+    print(f"{'lexicon + LRU':<28} {cached_us:>11.1f} us {legacy_us / cached_us:>9.1f}x")
+    print(f"{'lexicon batch':<28} {batch_us:>11.1f} us {legacy_us / batch_us:>9.1f}x")
+    print(f"\nIdentical output: {'yes' if identical else 'NO'}")
+
+    return {
+        "lexicon_seconds": lexicon_seconds,
+        "legacy_us": legacy_us,
+        "cached_us": cached_us,
+        "batch_us": batch_us,
+        "speedup": legacy_us / cached_us,
+        "identical": identical,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=200, help="Sentences to convert")
+    parser.add_argument("--words", type=int, default=8, help="Words per sentence")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions (best is reported)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the sentences")
+    args = parser.parse_args()
+
+    run_benchmark(sentences=args.sentences, words=args.words, repeat=args.repeat, seed=args.seed)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Accuracy / latency comparison of the noise reduction backends.
+
+Runs AdaptiveNoiseReducer with every SNR band forced to each backend in
+core.noise_suppression (noisereduce and the spectral gate) over the
+ai/dataset recordings, as recorded and with white noise mixed in at
+fixed SNRs, and reports per condition:
+  - denoising time (ms per second of audio) and speedup over noisereduce
+  - SDR against the recording before noise was added (noisy conditions;
+    only where the output keeps the input length - the segment crossfades
+    of the noisereduce edge-preserving path shorten the audio)
+  - with --per: phoneme error rate of the phoneme extractor on the
+    denoised audio against the spoken (altered) sentence, and the change
+    relative to noisereduce. The run fails (exit code 1) if any backend's
+    PER regresses by more than --max-per-regression.
+
+The --per mode needs the phoneme model (downloaded on first use).
+
+Usage (from backend/):
+    python -m benchmarks.noise_reduction_benchmark [--snrs 20 10 5] [--limit 20] [--per] [--model onnx|torch]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import eng_to_ipa as ipa
+import librosa
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adaptive_noise_reduction import AdaptiveNoiseReducer
+from core.audio_quality_analyzer import AudioQualityAnalyzer
+from core.edit_distance import phoneme_error_rate
+from core.noise_suppression import NOISE_BACKENDS, SNR_BANDS, get_noise_backend
+
+DATASET_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai", "dataset")
+
+
+def load_dataset(dataset_dir: str = DATASET_DIR, limit: int = None, sr: int = 16000):
+    """(id, audio, expected phonemes) for each recording with a transcription."""
+    audio_dir = os.path.join(dataset_dir, "audio")
+    transcription_dir = os.path.join(dataset_dir, "transcriptions")
+    ids = sorted((os.path.splitext(f)[0] for f in os.listdir(audio_dir) if f.endswith(".wav")), key=int)
+    items = []
+    for audio_id in ids:
+        transcription_file = os.path.join(transcription_dir, f"{audio_id}.json")
+        if not os.path.exists(transcription_file):
+            continue
+        with open(transcription_file, encoding="utf-8") as f:
+            transcription = json.load(f)
+        audio, _ = librosa.load(os.path.join(audio_dir, f"{audio_id}.wav"), sr=sr)
+        # Same ground truth as ai/measure_accuracy.py: the sentence that was actually read
+        expected = list(ipa.convert(transcription["Altered Sentence"]).replace(" ", ""))
+        items.append((audio_id, audio, expected))
+        if limit and len(items) >= limit:
+            break
+    return items
+
+
+def add_noise(audio: np.ndarray, snr_db: float, seed: int) -> np.ndarray:
+    """Mix white noise into audio at snr_db (relative to the recording's power)."""
+    noise = np.random.default_rng(seed).standard_normal(len(audio))
+    scale = np.sqrt(np.mean(audio ** 2) / 10 ** (snr_db / 10) / np.mean(noise ** 2))
+    return (audio + scale * noise).astype(np.float32)
+
+
+def sdr(reference: np.ndarray, estimate: np.ndarray) -> float:
+    """Signal-to-distortion ratio in dB (both peak-normalized)."""
+    reference = reference / (np.max(np.abs(reference)) or 1.0)
+    estimate = estimate / (np.max(np.abs(estimate)) or 1.0)
+    return 10 * np.log10(np.sum(reference ** 2) / (np.sum((estimate - reference) ** 2) + 1e-12))
+
+
+def flatten(phonemes) -> list:
+    return [p for word in phonemes for p in word]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snrs", type=float, nargs="+", default=[20, 10, 5],
+                        help="SNRs (dB) of the noisy conditions, besides the recordings as-is")
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N recordings")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--per", action="store_true", help="Measure phoneme error rate with the phoneme model")
+    parser.add_argument("--model", choices=["onnx", "torch"], default="onnx")
+    parser.add_argument("--max-per-regression", type=float, default=0.01)
+    args = parser.parse_args()
+
+    sr = 16000
+    items = load_dataset(args.dataset, args.limit, sr)
+    print(f"📂 Loaded {len(items)} recordings from {args.dataset}")
+
+    extractor = None
+    if args.per:
+        if args.model == "onnx":
+            from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+            extractor = PhonemeExtractorONNX()
+        else:
+            from core.phoneme_extractor import PhonemeExtractor
+            extractor = PhonemeExtractor()
+
+    analyzer = AudioQualityAnalyzer(sr=sr)
+    reducers = {name: AdaptiveNoiseReducer(sr, backends={band: get_noise_backend(name) for band in SNR_BANDS})
+                for name in NOISE_BACKENDS}
+    conditions = [("as recorded", None)] + [(f"{snr:g} dB", snr) for snr in args.snrs]
+
+    rows = []
+    for label, snr in conditions:
+        totals = {name: {"seconds": 0.0, "sdr": [], "per": []} for name in reducers}
+        audio_seconds = 0.0
+        for index, (audio_id, clean, expected) in enumerate(items):
+            noisy = clean if snr is None else add_noise(clean, snr, seed=index)
+            measured_snr = analyzer.calculate_snr(noisy)
+            audio_seconds += len(noisy) / sr
+            for name, reducer in reducers.items():
+                start = time.perf_counter()
+                denoised = reducer.reduce_noise_adaptive(noisy, snr_db=measured_snr, preserve_edges=True)
+                totals[name]["seconds"] += time.perf_counter() - start
+                if snr is not None and len(denoised) == len(clean):
+                    totals[name]["sdr"].append(sdr(clean, denoised))
+                if extractor is not None:
+                    peak = np.max(np.abs(denoised))
+                    denoised = denoised / peak if peak > 0 else denoised
+                    try:
+                        predicted = flatten(extractor.extract_phoneme(np.asarray(denoised, dtype=np.float32), sr))
+                    except ValueError:
+                        predicted = []
+                    totals[name]["per"].append(phoneme_error_rate(expected, predicted))
+        for name, total in totals.items():
+            rows.append((label, name, 1000 * total["seconds"] / audio_seconds,
+                         np.mean(total["sdr"]) if total["sdr"] else None,
+                         np.mean(total["per"]) if total["per"] else None))
+
+    print(f"\n{'condition':>12} {'backend':>14} {'ms/audio s':>11} {'speedup':>8} {'SDR dB':>7} {'PER':>7} {'ΔPER':>7}")
+    baseline = {row[0]: row for row in rows if row[1] == "noisereduce"}
+    regressions = []
+    for label, name, ms, mean_sdr, per in rows:
+        base = baseline[label]
+        delta = per - base[4] if per is not None and base[4] is not None else None
+        if delta is not None and delta > args.max_per_regression:
+            regressions.append((label, name, delta))
+        print(f"{label:>12} {name:>14} {ms:>11.1f} {base[2] / ms:>7.1f}x "
+              f"{'-' if mean_sdr is None else f'{mean_sdr:.1f}':>7} "
+              f"{'-' if per is None else f'{per:.3f}':>7} {'-' if delta is None else f'{delta:+.3f}':>7}")
+
+    if regressions:
+        for label, name, delta in regressions:
+            print(f"❌ {name} PER regressed by {delta:+.3f} ({label})")
+        sys.exit(1)
+    if extractor is not None:
+        print(f"\n✅ No PER regression above {args.max_per_regression:.3f}")
+
+
+if __name__ == "__main__":
+    main()
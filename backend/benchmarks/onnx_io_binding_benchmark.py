@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Latency and allocation comparison of ONNX inference with and without IO binding.
+
+For each audio length, runs the exported phoneme model two ways:
+  - processor: Wav2Vec2Processor builds input_values, astype(np.float32),
+    session.run allocates the logits (the path before IO binding)
+  - io-binding: core.onnx_io_binding.OnnxIOBinder (in-place normalization
+    into pooled buffers, logits written into a pooled output buffer)
+and reports per call:
+  - median latency
+  - peak Python-side memory allocated during the call (tracemalloc; numpy
+    arrays are included, ONNX Runtime's own allocations are not)
+  - for io-binding, the buffer sets the binder had to allocate (after the
+    first call of each bucket this should stay at 0)
+  - the largest difference between the two paths' logits
+
+Usage (from backend/):
+    python -m benchmarks.onnx_io_binding_benchmark [--model Bobcat9/wav2vec2-timit-ipa-onnx]
+        [--durations 1 3 6 12] [--repeat 20]
+
+--model also accepts a local directory with model.onnx and the processor files.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.onnx_io_binding import OnnxIOBinder
+
+
+def load_model(model: str):
+    """(processor, session) for a HuggingFace repo or local export directory."""
+    import onnxruntime as ort
+    from transformers import Wav2Vec2Processor
+
+    onnx_path = os.path.join(model, "model.onnx")
+    if not os.path.isfile(onnx_path):
+        from huggingface_hub import hf_hub_download
+        onnx_path = hf_hub_download(repo_id=model, filename="model.onnx")
+    return Wav2Vec2Processor.from_pretrained(model), ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+
+
+def synthetic_utterance(seconds: float, sr: int = 16000, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    return 0.2 * np.sin(2 * np.pi * 180 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)) + 0.02 * rng.standard_normal(len(t))
+
+
+def measure(run, audio: np.ndarray, repeat: int):
+    """Median seconds (untraced) and mean peak traced bytes per call."""
+    run(audio)  # warm up (first-call allocations of the binder show in its own stats)
+    latencies, peaks = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(audio)
+        latencies.append(time.perf_counter() - start)
+    for _ in range(repeat):
+        tracemalloc.start()
+        run(audio)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(latencies), float(np.mean(peaks))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="Bobcat9/wav2vec2-timit-ipa-onnx")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 3, 6, 12])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    processor, session = load_model(args.model)
+    binder = OnnxIOBinder.for_session(session, processor)
+    if binder is None:
+        sys.exit("❌ The model's output width is not fixed; IO binding is not available")
+    input_name = session.get_inputs()[0].name
+
+    def processor_path(audio):
+        input_values = processor(audio, sampling_rate=16000, return_tensors="np").input_values
+        return session.run(None, {input_name: input_values.astype(np.float32)})[0]
+
+    def binding_path(audio):
+        with binder.run(audio) as logits:
+            return float(logits[0, 0, 0])  # consume inside the block, like the extractor
+
+    print(f"\n{'audio s':>8} {'path':>11} {'ms':>8} {'peak MB':>8} {'new buffers':>12} {'max |Δ|':>9}")
+    for seconds in args.durations:
+        audio = synthetic_utterance(seconds)
+        reference = processor_path(audio)
+        with binder.run(audio) as logits:
+            difference = float(np.max(np.abs(logits - reference)))
+
+        ms, peak = measure(processor_path, audio, args.repeat)
+        print(f"{seconds:>8g} {'processor':>11} {1000 * ms:>8.1f} {peak / 1024 ** 2:>8.2f} {'-':>12} {'':>9}")
+
+        allocations_before = binder.stats()["allocations"]
+        ms, peak = measure(binding_path, audio, args.repeat)
+        new_buffers = binder.stats()["allocations"] - allocations_before
+        print(f"{seconds:>8g} {'io-binding':>11} {1000 * ms:>8.1f} {peak / 1024 ** 2:>8.2f} "
+              f"{new_buffers:>12} {difference:>9.2e}")
+
+    print(f"\n📊 Binder: {binder.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Float vs INT8 comparison of the ONNX phoneme model.
+
+Loads each variant of PhonemeExtractorONNX (model.onnx / model_int8.onnx,
+see quantize_model.py at the repository root) in its own process and
+runs it over the ai/dataset recordings, reporting per variant:
+  - load time and RSS added by loading the model, plus peak RSS after
+    inference
+  - inference time (ms per second of audio, median over recordings)
+  - phoneme error rate against the spoken (altered) sentence, and the
+    change relative to the float model. The run fails (exit code 1) if
+    the int8 PER regresses by more than --max-per-regression.
+
+Usage (from backend/):
+    python -m benchmarks.onnx_quantization_benchmark [--model Bobcat9/wav2vec2-timit-ipa-onnx]
+        [--variants float int8] [--limit 20]
+
+--model also accepts a local export directory (e.g. ../wav2vec2-timit-ipa-onnx).
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add the backend directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.noise_reduction_benchmark import DATASET_DIR, flatten, load_dataset
+
+
+def evaluate_variant(model: str, variant: str, dataset: str, limit: int = None) -> dict:
+    """Load one variant in this process and measure it (runs in a fresh child process)."""
+    import numpy as np
+    import psutil
+
+    from core.edit_distance import phoneme_error_rate
+    from core.optimization_config import OptimizationConfig
+    from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+
+    items = load_dataset(dataset, limit)
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    extractor_config = OptimizationConfig()
+    extractor_config._config['fallback_on_error'] = False  # a missing int8 file must not be measured as float
+    start = time.perf_counter()
+    extractor = PhonemeExtractorONNX(model_name=model, model_variant=variant, optimization_config=extractor_config)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = process.memory_info().rss
+
+    ms_per_audio_second, pers = [], []
+    peak_rss = rss_loaded
+    for _, audio, expected in items:
+        start = time.perf_counter()
+        try:
+            predicted = flatten(extractor.extract_phoneme(np.asarray(audio, dtype=np.float32), 16000))
+        except ValueError:
+            predicted = []
+        ms_per_audio_second.append(1000 * (time.perf_counter() - start) / (len(audio) / 16000))
+        pers.append(phoneme_error_rate(expected, predicted))
+        peak_rss = max(peak_rss, process.memory_info().rss)
+
+    return {
+        "variant": variant,
+        "recordings": len(items),
+        "load_seconds": load_seconds,
+        "model_rss_mb": (rss_loaded - rss_before) / 1024 ** 2,
+        "peak_rss_mb": peak_rss / 1024 ** 2,
+        "ms_per_audio_second": statistics.median(ms_per_audio_second) if ms_per_audio_second else None,
+        "per": float(np.mean(pers)) if pers else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="Bobcat9/wav2vec2-timit-ipa-onnx")
+    parser.add_argument("--variants", nargs="+", default=["float", "int8"])
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first N recordings")
+    parser.add_argument("--max-per-regression", type=float, default=0.02)
+    args = parser.parse_args()
+
+    results = []
+    for variant in args.variants:
+        print(f"⏱️ Measuring {variant} model...")
+        # A fresh process per variant so RSS is not shared between them
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results.append(pool.submit(evaluate_variant, args.model, variant, args.dataset, args.limit).result())
+
+    print(f"\n{'variant':>8} {'load s':>7} {'model MB':>9} {'peak MB':>8} {'ms/audio s':>11} {'speedup':>8} {'PER':>7} {'ΔPER':>7}")
+    baseline = next((result for result in results if result["variant"] == "float"), results[0])
+    regressions = []
+    for result in results:
+        speedup = baseline["ms_per_audio_second"] / result["ms_per_audio_second"]
+        delta = result["per"] - baseline["per"]
+        print(f"{result['variant']:>8} {result['load_seconds']:>7.2f} {result['model_rss_mb']:>9.0f} "
+              f"{result['peak_rss_mb']:>8.0f} {result['ms_per_audio_second']:>11.1f} {speedup:>7.2f}x "
+              f"{result['per']:>7.3f} {delta:>+7.3f}")
+        if delta > args.max_per_regression:
+            regressions.append(result["variant"])
+
+    if regressions:
+        print(f"\n❌ PER regressed by more than {args.max_per_regression} for: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✅ No PER regression")
+
+
+if __name__ == "__main__":
+    main()
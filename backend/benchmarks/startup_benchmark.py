@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Cold-start time and memory of the API process, per phoneme backend.
+
+For each backend (USE_ONNX_BACKEND=true / false) a fresh interpreter
+imports the app module (main by default) and reports:
+  - import time and RSS after the import
+  - which heavy modules the import loaded (torch, onnxruntime,
+    transformers, pandas, noisereduce, matplotlib, IPython)
+  - with --load-models: time and RSS until the backend's phoneme
+    extractor is loaded and warmed up (needs the model files)
+
+The run fails (exit code 1) when a budget is exceeded:
+  - import time above --max-import-seconds or RSS above --max-rss-mb
+  - a notebook-only module (matplotlib, IPython) is loaded at all, or
+    torch / onnxruntime are loaded by the import (models load in the
+    background after startup, see core.model_loader)
+  - after loading the models, the other backend's extractor was imported
+    (onnxruntime under the PyTorch backend, core.phoneme_extractor under ONNX)
+
+Usage (from backend/):
+    python -m benchmarks.startup_benchmark [--module main] [--backends onnx pytorch]
+        [--load-models] [--max-import-seconds 5] [--max-rss-mb 500]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("torch", "onnxruntime", "transformers", "pandas", "noisereduce", "matplotlib", "IPython")
+NOTEBOOK_MODULES = ("matplotlib", "IPython")
+MODEL_RUNTIME_MODULES = ("torch", "onnxruntime")
+OTHER_BACKEND_MODULES = {"onnx": "core.phoneme_extractor", "pytorch": "onnxruntime"}
+
+# Runs in the fresh interpreter; prints one JSON line
+CHILD = r"""
+import importlib, json, sys, time
+import psutil
+
+module, load_models = sys.argv[1], sys.argv[2] == "1"
+process = psutil.Process()
+result = {"base_rss_mb": process.memory_info().rss / 1024 ** 2}
+
+start = time.perf_counter()
+importlib.import_module(module)
+result["import_seconds"] = time.perf_counter() - start
+result["import_rss_mb"] = process.memory_info().rss / 1024 ** 2
+result["import_modules"] = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+
+if load_models:
+    from core.phoneme_assistant import PhonemeAssistant
+    start = time.perf_counter()
+    PhonemeAssistant.load_phoneme_extractor()
+    result["load_seconds"] = time.perf_counter() - start
+    result["load_rss_mb"] = process.memory_info().rss / 1024 ** 2
+result["modules"] = sorted(name for name in sys.modules if "." not in name or name.startswith("core."))
+print("RESULT " + json.dumps(result))
+"""
+
+
+def measure(module: str, backend: str, load_models: bool) -> dict:
+    """Import `module` (and optionally load the models) in a fresh interpreter."""
+    env = dict(os.environ, USE_ONNX_BACKEND="true" if backend == "onnx" else "false")
+    child = f"HEAVY_MODULES = {HEAVY_MODULES!r}\n" + CHILD
+    completed = subprocess.run([sys.executable, "-c", child, module, "1" if load_models else "0"],
+                               cwd=BACKEND_DIR, env=env, capture_output=True, text=True)
+    lines = [line for line in completed.stdout.splitlines() if line.startswith("RESULT ")]
+    if completed.returncode != 0 or not lines:
+        error = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "no output"
+        return {"backend": backend, "error": error}
+    return {"backend": backend, **json.loads(lines[-1][len("RESULT "):])}
+
+
+def check_budget(result: dict, max_import_seconds: float, max_rss_mb: float) -> list:
+    """Budget violations of one measurement."""
+    if "error" in result:
+        return [f"{result['backend']}: import failed ({result['error']})"]
+    violations = []
+    if result["import_seconds"] > max_import_seconds:
+        violations.append(f"{result['backend']}: import took {result['import_seconds']:.2f}s "
+                          f"(budget {max_import_seconds}s)")
+    if result["import_rss_mb"] > max_rss_mb:
+        violations.append(f"{result['backend']}: RSS after import {result['import_rss_mb']:.0f} MB "
+                          f"(budget {max_rss_mb} MB)")
+    for name in NOTEBOOK_MODULES:
+        if name in result["modules"]:
+            violations.append(f"{result['backend']}: notebook module {name} was imported")
+    for name in MODEL_RUNTIME_MODULES:
+        if name in result["import_modules"]:
+            violations.append(f"{result['backend']}: {name} was imported before the models load")
+    if "load_seconds" in result and OTHER_BACKEND_MODULES[result["backend"]] in result["modules"]:
+        violations.append(f"{result['backend']}: {OTHER_BACKEND_MODULES[result['backend']]} was imported")
+    return violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import (default: the FastAPI app)")
+    parser.add_argument("--backends", nargs="+", choices=["onnx", "pytorch"], default=["onnx", "pytorch"])
+    parser.add_argument("--load-models", action="store_true", help="Also load the phoneme extractor")
+    parser.add_argument("--max-import-seconds", type=float, default=5.0)
+    parser.add_argument("--max-rss-mb", type=float, default=500.0)
+    args = parser.parse_args()
+
+    results = []
+    for backend in args.backends:
+        print(f"⏱️ Importing {args.module} with the {backend} backend...")
+        results.append(measure(args.module, backend, args.load_models))
+
+    print(f"\n{'backend':>8} {'import s':>9} {'import MB':>10} {'load s':>7} {'loaded MB':>10}  heavy modules at import")
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:>8}  ❌ {result['error']}")
+            continue
+        load_seconds = f"{result['load_seconds']:.2f}" if "load_seconds" in result else "-"
+        load_rss = f"{result['load_rss_mb']:.0f}" if "load_rss_mb" in result else "-"
+        print(f"{result['backend']:>8} {result['import_seconds']:>9.2f} {result['import_rss_mb']:>10.0f} "
+              f"{load_seconds:>7} {load_rss:>10}  {', '.join(result['import_modules']) or '-'}")
+
+    violations = [violation for result in results
+                  for violation in check_budget(result, args.max_import_seconds, args.max_rss_mb)]
+    if violations:
+        print("\n❌ Startup budget exceeded:")
+        for violation in violations:
+            print(f"  - {violation}")
+        sys.exit(1)
+    print("\n✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
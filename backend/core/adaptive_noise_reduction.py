@@ -5,14 +5,15 @@ This module provides intelligent noise reduction that:
 - Adapts parameters based on Signal-to-Noise Ratio (SNR)
 - Preserves phonetic features at audio edges
 - Uses crossfading to avoid artifacts
+- Runs on a pluggable backend chosen per SNR band (core.noise_suppression)
 
 Created as part of Phase 1: Adaptive Noise Reduction & Audio Quality Validation
 """
 
 import numpy as np
-import noisereduce as nr
-from typing import Optional
+from typing import Dict, Optional
 import logging
+from .noise_suppression import SNR_BANDS, configured_noise_backends, get_noise_backend
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +21,30 @@ logger = logging.getLogger(__name__)
 class AdaptiveNoiseReducer:
     """Adaptive noise reduction that preserves phonetic features."""
     
-    def __init__(self, sr: int = 16000):
+    def __init__(self, sr: int = 16000, backends: Optional[Dict[str, object]] = None):
         """
         Initialize the adaptive noise reducer.
         
         Args:
             sr: Sample rate (default 16000 Hz)
+            backends: Noise reduction backend (instance or name) per SNR band
+                      ('high', 'medium', 'low'); defaults to the configured backends
         """
         self.sr = sr
+        self.backends = configured_noise_backends()
+        for band, backend in (backends or {}).items():
+            if band not in SNR_BANDS:
+                raise ValueError(f"Unknown SNR band '{band}' (expected one of {SNR_BANDS})")
+            self.backends[band] = get_noise_backend(backend) if isinstance(backend, str) else backend
+    
+    @staticmethod
+    def snr_band(snr_db: float) -> str:
+        """SNR band used to pick parameters and backend: 'high' (>20 dB), 'medium' (>10 dB) or 'low'."""
+        if snr_db > 20:
+            return "high"
+        if snr_db > 10:
+            return "medium"
+        return "low"
         
     def reduce_noise_adaptive(self, 
                              audio: np.ndarray, 
@@ -57,12 +74,14 @@ class AdaptiveNoiseReducer:
         logger.info(f"Applying adaptive noise reduction (SNR: {snr_db:.1f} dB, length: {audio_length_seconds:.1f}s)")
         
         # Determine parameters based on SNR
-        if snr_db > 20:
+        band = self.snr_band(snr_db)
+        backend = self.backends[band]
+        if band == "high":
             # High quality audio - minimal processing
             prop_decrease = 0.3
             stationary = False
             logger.debug("High SNR detected - using minimal noise reduction")
-        elif snr_db > 10:
+        elif band == "medium":
             # Medium quality - moderate processing
             prop_decrease = 0.6
             stationary = True
@@ -81,21 +100,17 @@ class AdaptiveNoiseReducer:
         # Apply edge preservation if requested
         if preserve_edges and len(audio) > self.sr:  # At least 1 second
             return self._reduce_noise_with_edge_preservation(
-                audio, prop_decrease, stationary
+                audio, prop_decrease, stationary, backend
             )
         else:
             # Standard noise reduction for short audio
-            return nr.reduce_noise(
-                y=audio, 
-                sr=self.sr, 
-                stationary=stationary,
-                prop_decrease=prop_decrease
-            )
+            return backend.reduce_noise(audio, self.sr, stationary, prop_decrease)
     
     def _reduce_noise_with_edge_preservation(self,
                                              audio: np.ndarray,
                                              prop_decrease: float,
-                                             stationary: bool) -> np.ndarray:
+                                             stationary: bool,
+                                             backend=None) -> np.ndarray:
         """
         Apply noise reduction with gentler processing on edges.
         
@@ -106,22 +121,28 @@ class AdaptiveNoiseReducer:
             audio: Input audio signal
             prop_decrease: Base noise reduction strength (0-1)
             stationary: Whether to use stationary noise reduction
+            backend: Noise reduction backend (defaults to the medium-SNR backend)
             
         Returns:
             Noise-reduced audio with preserved edges
         """
+        backend = backend or self.backends["medium"]
         edge_duration = 0.3  # seconds
         edge_samples = int(edge_duration * self.sr)
         
         if len(audio) <= 2 * edge_samples:
             # Audio too short for edge preservation
             logger.debug("Audio too short for edge preservation - using gentler overall reduction")
-            return nr.reduce_noise(
-                y=audio,
-                sr=self.sr,
-                stationary=stationary,
-                prop_decrease=prop_decrease * 0.7  # Gentler overall
-            )
+            return backend.reduce_noise(audio, self.sr, stationary, prop_decrease * 0.7)  # Gentler overall
+        
+        # Gentler reduction on edges (50% of base strength)
+        edge_prop = prop_decrease * 0.5
+        
+        if hasattr(backend, "reduce_noise_with_edges"):
+            # Single pass with per-frame strength - no segments to crossfade
+            logger.debug(f"Applying single-pass edge-preserving noise reduction ({backend.name})")
+            return backend.reduce_noise_with_edges(audio, self.sr, stationary, prop_decrease,
+                                                   edge_samples, edge_prop)
         
         logger.debug(f"Applying edge-preserving noise reduction (edge duration: {edge_duration}s)")
         
@@ -130,27 +151,15 @@ class AdaptiveNoiseReducer:
         middle = audio[edge_samples:-edge_samples]
         end_edge = audio[-edge_samples:]
         
-        # Gentler reduction on edges (50% of base strength)
-        edge_prop = prop_decrease * 0.5
-        
         logger.debug(f"Processing start edge (prop_decrease: {edge_prop:.2f})")
-        start_processed = nr.reduce_noise(
-            y=start_edge, sr=self.sr, 
-            stationary=stationary, prop_decrease=edge_prop
-        )
+        start_processed = backend.reduce_noise(start_edge, self.sr, stationary, edge_prop)
         
         logger.debug(f"Processing end edge (prop_decrease: {edge_prop:.2f})")
-        end_processed = nr.reduce_noise(
-            y=end_edge, sr=self.sr,
-            stationary=stationary, prop_decrease=edge_prop
-        )
+        end_processed = backend.reduce_noise(end_edge, self.sr, stationary, edge_prop)
         
         # Standard reduction on middle
         logger.debug(f"Processing middle segment (prop_decrease: {prop_decrease:.2f})")
-        middle_processed = nr.reduce_noise(
-            y=middle, sr=self.sr,
-            stationary=stationary, prop_decrease=prop_decrease
-        )
+        middle_processed = backend.reduce_noise(middle, self.sr, stationary, prop_decrease)
         
         # Concatenate with crossfade to avoid clicks
         fade_samples = int(0.05 * self.sr)  # 50ms crossfade
@@ -0,0 +1,257 @@
+"""
+Admission control and per-stage concurrency limits for audio analysis.
+
+Every /ai/analyze-audio request used to start preprocessing, model
+inference, GPT and TTS the moment it arrived, so a class submitting
+recordings at once pushed everyone's latency past 10 s. Analyses now go
+through an AdmissionController:
+
+  - at most ANALYSIS_MAX_ACTIVE analyses run at once; the next
+    ANALYSIS_MAX_QUEUE wait in FIFO order and are told their queue
+    position (streamed as processing_started events)
+  - beyond that admit() raises AdmissionRejected with a Retry-After
+    estimated from recent analysis durations, and the route answers 503
+  - inside a running analysis each stage (preprocess, inference, gpt, tts)
+    holds a slot of its own limit (PREPROCESS_CONCURRENCY, ...), so e.g.
+    slow GPT calls cannot crowd out inference
+
+GET /health/admission reports get_admission_stats().
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from .optimization_config import config
+
+STAGES = ("preprocess", "inference", "gpt", "tts")
+
+
+class AdmissionRejected(Exception):
+    """Raised when the analysis queue is full."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _StageLimit:
+    """Concurrency limit of one stage, with wait-time bookkeeping."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.waiting = 0
+        self.calls = 0
+        self.total_wait_ms = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.calls += 1
+        self.total_wait_ms += (time.perf_counter() - start) * 1000.0
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "calls": self.calls,
+            "avg_wait_ms": round(self.total_wait_ms / self.calls, 2) if self.calls else 0.0,
+        }
+
+
+class AnalysisTicket:
+    """One admitted analysis: waits for its turn, then runs its stages under the stage limits."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self.controller = controller
+        self.admitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.released = False
+        self._changed = asyncio.Event()
+
+    @property
+    def started(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def position(self) -> int:
+        """1-based position in the waiting queue (0 once the analysis has started)."""
+        return self.controller._position(self)
+
+    async def wait(self) -> AsyncIterator[int]:
+        """Yield the queue position whenever it changes, until the analysis may start."""
+        last = None
+        while not self.started and not self.released:
+            position = self.position
+            if position != last:
+                last = position
+                yield position
+            self._changed.clear()
+            if self.started or self.position != last:
+                continue
+            await self._changed.wait()
+
+    def stage(self, name: str):
+        """Async context manager holding a slot of stage `name` (preprocess, inference, gpt, tts)."""
+        return self.controller._stages[name].slot()
+
+    def release(self) -> None:
+        """Leave the queue or free the running slot (idempotent)."""
+        self.controller._release(self)
+
+
+class AdmissionController:
+    """Bounded FIFO queue of analyses plus per-stage concurrency limits."""
+
+    def __init__(self, max_active: int = None, max_queue: int = None,
+                 stage_limits: Dict[str, int] = None, retry_after: int = None):
+        """
+        Initialize the controller.
+
+        Args:
+            max_active: Analyses running at once (default: ANALYSIS_MAX_ACTIVE)
+            max_queue: Analyses waiting beyond those (default: ANALYSIS_MAX_QUEUE)
+            stage_limits: Stage name -> concurrent calls (default: the *_CONCURRENCY settings)
+            retry_after: Retry-After seconds before any analysis has finished
+                (default: ANALYSIS_RETRY_AFTER)
+        """
+        self.max_active = max_active or config.get('analysis_max_active', 8)
+        self.max_queue = max_queue if max_queue is not None else config.get('analysis_max_queue', 32)
+        self.default_retry_after = retry_after or config.get('analysis_retry_after', 10)
+        limits = {stage: _default_stage_limit(stage) for stage in STAGES}
+        limits.update(stage_limits or {})
+        self._stages = {stage: _StageLimit(limit) for stage, limit in limits.items()}
+        self._waiting: Deque[AnalysisTicket] = deque()
+        self._active = set()
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self._durations: Deque[float] = deque(maxlen=50)
+        self._queue_waits: Deque[float] = deque(maxlen=50)
+
+    def admit(self) -> AnalysisTicket:
+        """
+        Admit an analysis: it starts right away or joins the waiting queue.
+
+        Raises:
+            AdmissionRejected: The waiting queue is full
+        """
+        with self._lock:
+            if len(self._active) >= self.max_active and len(self._waiting) >= self.max_queue:
+                self.rejected += 1
+                retry_after = self._retry_after()
+                print(f"🚦 Analysis queue full ({len(self._active)} running, {len(self._waiting)} waiting); "
+                      f"retry in {retry_after}s")
+                raise AdmissionRejected("Too many analyses in progress, please try again shortly", retry_after)
+            ticket = AnalysisTicket(self)
+            self._waiting.append(ticket)
+            self.admitted += 1
+            self._promote()
+        return ticket
+
+    def _promote(self) -> None:
+        # Caller holds the lock
+        while self._waiting and len(self._active) < self.max_active:
+            ticket = self._waiting.popleft()
+            ticket.started_at = time.time()
+            self._queue_waits.append(ticket.started_at - ticket.admitted_at)
+            self._active.add(ticket)
+            ticket._changed.set()
+        for ticket in self._waiting:
+            ticket._changed.set()
+
+    def _position(self, ticket: AnalysisTicket) -> int:
+        with self._lock:
+            try:
+                return self._waiting.index(ticket) + 1
+            except ValueError:
+                return 0
+
+    def _release(self, ticket: AnalysisTicket) -> None:
+        with self._lock:
+            if ticket.released:
+                return
+            ticket.released = True
+            if ticket in self._active:
+                self._active.remove(ticket)
+                self._durations.append(time.time() - ticket.started_at)
+                self.completed += 1
+            elif ticket in self._waiting:
+                self._waiting.remove(ticket)
+            self._promote()
+        ticket._changed.set()
+
+    def _retry_after(self) -> int:
+        # Caller holds the lock: time for the queue ahead to drain at the recent pace
+        if not self._durations:
+            return self.default_retry_after
+        average = sum(self._durations) / len(self._durations)
+        return max(1, min(120, math.ceil(average * (len(self._waiting) + 1) / self.max_active)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_active": self.max_active,
+                "max_queue": self.max_queue,
+                "active": len(self._active),
+                "waiting": len(self._waiting),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "avg_queue_wait_ms": round(1000.0 * sum(self._queue_waits) / len(self._queue_waits), 2)
+                if self._queue_waits else 0.0,
+                "avg_analysis_ms": round(1000.0 * sum(self._durations) / len(self._durations), 2)
+                if self._durations else 0.0,
+                "retry_after_seconds": self._retry_after(),
+                "stages": {stage: limit.stats() for stage, limit in self._stages.items()},
+            }
+
+
+def _default_stage_limit(stage: str) -> int:
+    limit = config.get(f'{stage}_concurrency', 0)
+    if limit:
+        return limit
+    if stage == "inference":
+        # Enough concurrent requests for the inference scheduler to fill a batch
+        return config.get('inference_max_batch_size', 8)
+    from .runtime_resources import get_runtime_resources
+    return max(1, int(get_runtime_resources().effective_cpus))
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """The shared controller for /ai/analyze-audio (HTTP and WebSocket)."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    """Queue length, rejections and per-stage slots in use."""
+    return get_admission_controller().stats()
@@ -0,0 +1,262 @@
+"""
+Memoized segment costs for phoneme alignment.
+
+Two levels, both keyed on phoneme tuples interned with core.phoneme_inventory:
+
+- RequestCostCache: a plain dict that lives for one alignment request. The
+  word-level DP, its fallback search and the backtracking pass evaluate the
+  same (expected phonemes, predicted segment) pairs repeatedly, and repeated
+  words ("the", "a") produce identical pairs.
+- SharedCostCache: a process-wide bounded LRU for pairs that recur across
+  requests (common words and their usual pronunciations). Only pairs that
+  end up in a final alignment are admitted, so the thousands of candidate
+  segments scored by the forward pass do not evict them.
+
+Hit/miss counters from every request are folded into the shared cache so
+the hit rate under real traffic can be checked via /health/alignment-cache.
+With the audio process pool, alignment runs in workers that each keep their
+own cache; their counters are merged into the server's after every job.
+"""
+
+import threading
+from collections import OrderedDict
+from array import array
+from typing import Any, Dict, Hashable, Optional, Sequence
+
+from .edit_distance import align_operations, levenshtein
+from .optimization_config import config
+from .phoneme_inventory import EMPTY_IDS, phoneme_inventory
+
+
+def _word_errors(operations: list) -> tuple:
+    typecode = "H" if len(phoneme_inventory) <= 0x10000 else "I"
+    missed, added, substituted = array(typecode), array(typecode), array(typecode)
+    for op, expected, realized in operations:
+        if op == 'deletion':
+            missed.append(expected)
+        elif op == 'insertion':
+            added.append(realized)
+        elif op == 'substitution':
+            substituted.append(expected)
+            substituted.append(realized)
+    empty = EMPTY_IDS[typecode]
+    return missed or empty, added or empty, substituted or empty
+
+
+class SharedCostCache:
+    """Process-wide bounded LRU of segment costs with hit-rate counters."""
+
+    def __init__(self, maxsize: int = 4096):
+        """
+        Initialize the shared cache.
+
+        Args:
+            maxsize: Maximum number of entries (0 disables the shared level)
+        """
+        self.maxsize = max(int(maxsize), 0)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._request_hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._worker_sizes: Dict[int, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key` (marking it recently used) or None."""
+        if not self.maxsize:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh `key`, evicting the least recently used entry if full."""
+        if not self.maxsize:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def record(self, request_hits: int, shared_hits: int, misses: int) -> None:
+        """Fold one request's counters into the process-wide totals."""
+        with self._lock:
+            self._requests += 1
+            self._request_hits += request_hits
+            self._shared_hits += shared_hits
+            self._misses += misses
+
+    def drain(self) -> Dict[str, int]:
+        """Counters since the last drain plus the current size; counters are reset, entries kept."""
+        with self._lock:
+            counters = {
+                "requests": self._requests,
+                "request_hits": self._request_hits,
+                "shared_hits": self._shared_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "size": len(self._entries),
+            }
+            self._requests = 0
+            self._request_hits = 0
+            self._shared_hits = 0
+            self._misses = 0
+            self._evictions = 0
+        return counters
+
+    def merge(self, counters: Dict[str, int], worker: Optional[Hashable] = None) -> None:
+        """Add counters drained from another process's cache (an audio process pool worker)."""
+        with self._lock:
+            self._requests += counters["requests"]
+            self._request_hits += counters["request_hits"]
+            self._shared_hits += counters["shared_hits"]
+            self._misses += counters["misses"]
+            self._evictions += counters["evictions"]
+            if worker is not None:
+                self._worker_sizes[worker] = counters["size"]
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self._requests = 0
+            self._request_hits = 0
+            self._shared_hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._worker_sizes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters and occupancy."""
+        with self._lock:
+            lookups = self._request_hits + self._shared_hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "requests": self._requests,
+                "lookups": lookups,
+                "request_hits": self._request_hits,
+                "shared_hits": self._shared_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": (self._request_hits + self._shared_hits) / lookups if lookups else 0.0,
+                "shared_hit_rate": self._shared_hits / lookups if lookups else 0.0,
+                # Each audio process pool worker keeps its own cache
+                "worker_sizes": dict(self._worker_sizes),
+            }
+
+
+class RequestCostCache:
+    """Per-request segment cost cache backed by the shared LRU."""
+
+    def __init__(self, shared: Optional[SharedCostCache] = None):
+        """
+        Initialize the request cache.
+
+        Args:
+            shared: Shared LRU to consult and promote into (defaults to the global one)
+        """
+        self.shared = shared if shared is not None else shared_cost_cache
+        self._entries: dict = {}
+        self.request_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def encode(phonemes: Sequence[Hashable]) -> tuple[int, ...]:
+        """Intern a phoneme sequence into a hashable id tuple."""
+        return phoneme_inventory.encode(phonemes)
+
+    def _lookup(self, key: tuple, compute, share: bool):
+        value = self._entries.get(key)
+        if value is not None:
+            self.request_hits += 1
+            return value
+
+        value = self.shared.get(key)
+        if value is not None:
+            self.shared_hits += 1
+        else:
+            self.misses += 1
+            value = compute()
+            if share:
+                self.shared.put(key, value)
+        self._entries[key] = value
+        return value
+
+    def distance(self, gt_ids: tuple, segment_ids: tuple, share: bool = False) -> int:
+        """
+        Edit distance between two interned phoneme tuples.
+
+        Args:
+            gt_ids: Interned expected phonemes
+            segment_ids: Interned predicted segment
+            share: Admit the pair into the process-wide LRU on a miss
+        """
+        return self._lookup(
+            ('distance', gt_ids, segment_ids),
+            lambda: levenshtein(gt_ids, segment_ids),
+            share,
+        )
+
+    def per(self, gt_ids: tuple, segment_ids: tuple, share: bool = False) -> float:
+        """Phoneme Error Rate with the same conventions as process_audio.compute_per."""
+        if not gt_ids:
+            return 0.0 if not segment_ids else 1.0
+        if not segment_ids:
+            return 1.0
+        return self.distance(gt_ids, segment_ids, share) / len(gt_ids)
+
+    def operations(self, gt_phonemes: Sequence[Hashable], pred_phonemes: Sequence[Hashable]) -> list[tuple]:
+        """Cached align_sequences operations for one word (always shared)."""
+        key = ('operations', self.encode(gt_phonemes), self.encode(pred_phonemes))
+        ops = self._lookup(key, lambda: tuple(align_operations(gt_phonemes, pred_phonemes)), share=True)
+        return list(ops)
+
+    def word_errors(self, gt_ids: tuple, pred_ids: tuple) -> tuple:
+        """
+        Cached (missed, added, substituted) phoneme id arrays for one word (always shared).
+
+        substituted holds (expected, realized) pairs flattened. The arrays are
+        shared between results and requests, so they must not be modified.
+        """
+        return self._lookup(('word_errors', gt_ids, pred_ids),
+                            lambda: _word_errors(align_operations(gt_ids, pred_ids)), share=True)
+
+    def publish(self) -> None:
+        """Fold this request's counters into the shared statistics and reset them."""
+        self.shared.record(self.request_hits, self.shared_hits, self.misses)
+        self.request_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for this request."""
+        return {
+            "entries": len(self._entries),
+            "request_hits": self.request_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+        }
+
+
+# Global shared cache (ALIGNMENT_CACHE_SIZE=0 disables it)
+shared_cost_cache = SharedCostCache(config.get('alignment_cache_size', 4096))
+
+
+def get_alignment_cache_stats() -> Dict[str, Any]:
+    """Process-wide alignment cost cache statistics."""
+    return shared_cost_cache.stats()
@@ -8,6 +8,8 @@ This improves model accuracy and prevents timeouts on longer recordings.
 import numpy as np
 import librosa
 
+from .frame_features import get_frame_features
+
 
 def chunk_audio_at_silence(audio, sr=16000, max_chunk_duration=7, top_db=30):
     """
@@ -21,11 +23,14 @@ def chunk_audio_at_silence(audio, sr=16000, max_chunk_duration=7, top_db=30):
         
     Returns:
         List of audio chunks (numpy arrays)
-        List of chunk metadata (start/end times, duration)
+        List of chunk metadata (start/end times, duration, and "segments":
+        (seconds into the chunk, seconds into the audio) where each joined
+        non-silent segment starts, for chunk_times_to_audio)
         
     Note:
         Splits audio at natural pauses (silence) to avoid cutting words in half.
         If no suitable silence found, will split at max_chunk_duration boundary.
+        The silence between segments is left out of the chunks.
     """
     # Find silence intervals
     intervals = librosa.effects.split(audio, top_db=top_db)
@@ -34,6 +39,7 @@ def chunk_audio_at_silence(audio, sr=16000, max_chunk_duration=7, top_db=30):
     chunk_metadata = []
     current_chunk_start = 0
     current_chunk_samples = []
+    current_chunk_segments = []
     current_chunk_duration = 0
     
     for start, end in intervals:
@@ -50,17 +56,22 @@ def chunk_audio_at_silence(audio, sr=16000, max_chunk_duration=7, top_db=30):
                     "start_time": current_chunk_start,
                     "end_time": chunk_end_time,
                     "duration": current_chunk_duration,
-                    "num_samples": len(chunk_audio)
+                    "num_samples": len(chunk_audio),
+                    "segments": current_chunk_segments
                 })
                 print(f"  Chunk {len(chunks)}: {current_chunk_start:.2f}s - {chunk_end_time:.2f}s ({current_chunk_duration:.2f}s)")
             
             # Start new chunk
             current_chunk_start = start / sr
             current_chunk_samples = [segment]
+            current_chunk_segments = [(0.0, start / sr)]
             current_chunk_duration = segment_duration
         else:
             # Add segment to current chunk
+            if not current_chunk_samples:
+                current_chunk_start = start / sr
             current_chunk_samples.append(segment)
+            current_chunk_segments.append((current_chunk_duration, start / sr))
             current_chunk_duration += segment_duration
     
     # Don't forget the last chunk
@@ -72,13 +83,33 @@ def chunk_audio_at_silence(audio, sr=16000, max_chunk_duration=7, top_db=30):
             "start_time": current_chunk_start,
             "end_time": chunk_end_time,
             "duration": current_chunk_duration,
-            "num_samples": len(chunk_audio)
+            "num_samples": len(chunk_audio),
+            "segments": current_chunk_segments
         })
         print(f"  Chunk {len(chunks)}: {current_chunk_start:.2f}s - {chunk_end_time:.2f}s ({current_chunk_duration:.2f}s)")
     
     return chunks, chunk_metadata
 
 
+def chunk_times_to_audio(metadata, times):
+    """
+    Map times within a chunk to times in the audio it was cut from.
+    
+    Args:
+        metadata: The chunk's metadata from chunk_audio_at_silence
+        times: Seconds from the start of the chunk (numpy array)
+        
+    Returns:
+        numpy array of seconds from the start of the original audio (the
+        silence left out between the chunk's segments added back)
+    """
+    segments = metadata.get("segments") or [(0.0, metadata["start_time"])]
+    chunk_starts = np.array([chunk_start for chunk_start, _ in segments])
+    audio_starts = np.array([audio_start for _, audio_start in segments])
+    index = np.maximum(np.searchsorted(chunk_starts, times, side="right") - 1, 0)
+    return audio_starts[index] + (times - chunk_starts[index])
+
+
 def merge_chunk_results(chunk_phonemes, chunk_words, chunk_metadata):
     """
     Merge phoneme and word extraction results from multiple audio chunks.
@@ -131,7 +162,7 @@ def should_use_chunking(audio, sr=16000, threshold_seconds=8):
     return audio_duration > threshold_seconds
 
 
-def estimate_speech_activity(audio, sr=16000, frame_length=2048, hop_length=512, top_db=30):
+def estimate_speech_activity(audio, sr=16000, frame_length=2048, hop_length=512, top_db=30, features=None):
     """
     Estimate the percentage of audio that contains speech (vs silence).
     
@@ -141,15 +172,15 @@ def estimate_speech_activity(audio, sr=16000, frame_length=2048, hop_length=512,
         frame_length: Length of each frame for RMS calculation
         hop_length: Number of samples between frames
         top_db: Threshold in dB for silence detection
+        features: Shared FrameFeatures of `audio` (looked up if None)
         
     Returns:
         float: Percentage of audio containing speech (0-100)
     """
-    # Compute RMS energy for each frame
-    rms = librosa.feature.rms(y=audio, frame_length=frame_length, hop_length=hop_length)[0]
-    
-    # Convert to dB
-    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+    # RMS energy for each frame, in dB (shared with quality analysis and trimming)
+    if features is None:
+        features = get_frame_features(audio, sr, frame_length, hop_length)
+    rms_db = features.rms_db
     
     # Count frames above threshold
     speech_frames = np.sum(rms_db > -top_db)
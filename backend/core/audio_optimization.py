@@ -50,6 +50,22 @@ class OptimizedAudioPreprocessor:
         Returns:
             Tuple of (processed_audio, sample_rate)
         """
+        audio, sr, _ = self.preprocess_audio_with_offset(audio, sr, normalize, trim_silence)
+        return audio, sr
+    
+    def preprocess_audio_with_offset(self,
+                                     audio: np.ndarray,
+                                     sr: Optional[int] = None,
+                                     normalize: bool = True,
+                                     trim_silence: bool = True) -> Tuple[np.ndarray, int, int]:
+        """
+        preprocess_audio, also reporting where the kept audio starts.
+        
+        Returns:
+            Tuple of (processed_audio, sample_rate, start_sample): start_sample is
+            the number of input samples trimmed from the start (0 if none), so
+            model timestamps can be mapped back to the input audio
+        """
         start_time = time.time() if self.enable_logging else None
         
         # Handle input sample rate
@@ -61,22 +77,25 @@ class OptimizedAudioPreprocessor:
             audio = np.mean(audio, axis=1)
         
         # Trim silence
+        start_sample = 0
         if trim_silence:
             if self.use_phoneme_aware_trim:
                 # NEW: Use phoneme-aware trimming with padding
-                audio = self.phoneme_trimmer.trim_with_speech_detection(
+                start_sample, end_sample = self.phoneme_trimmer.speech_bounds(
                     audio,
                     padding_ms=200,  # Extra generous padding to preserve edge phonemes (especially final consonants)
                     use_zcr=True     # Use zero-crossing rate for consonant detection
                 )
             else:
                 # LEGACY: Fast energy-based trimming (may cut phonemes)
-                audio = self._fast_trim_silence(audio)
+                start_sample, end_sample = self._fast_trim_bounds(audio)
+            audio = audio[start_sample:end_sample]
         
         # Ensure audio is not empty
         if len(audio) == 0:
             # Create minimal silence if audio is empty
             audio = np.zeros(int(self.target_sr * 0.1))  # 100ms of silence
+            start_sample = 0
         
         # Convert to float32 for model compatibility
         audio = audio.astype(np.float32)
@@ -85,7 +104,7 @@ class OptimizedAudioPreprocessor:
             process_time = time.time() - start_time
             print(f"Audio preprocessing took {process_time:.3f}s")
         
-        return audio, self.target_sr
+        return audio, self.target_sr, start_sample
     
     def _fast_normalize(self, audio: np.ndarray) -> np.ndarray:
         """Fast audio normalization."""
@@ -101,6 +120,13 @@ class OptimizedAudioPreprocessor:
         Fast silence trimming using energy-based detection.
         More efficient than librosa.effects.trim for real-time use.
         """
+        start_sample, end_sample = self._fast_trim_bounds(audio, threshold, frame_length)
+        return audio[start_sample:end_sample]
+    
+    def _fast_trim_bounds(self, audio: np.ndarray,
+                          threshold: float = 0.01,
+                          frame_length: int = 512) -> Tuple[int, int]:
+        """Sample range _fast_trim_silence keeps."""
         # Calculate frame-wise energy
         energy = np.array([
             np.sum(audio[i:i+frame_length]**2) 
@@ -111,8 +137,8 @@ class OptimizedAudioPreprocessor:
         above_threshold = energy > threshold * np.max(energy)
         
         if not np.any(above_threshold):
-            # If all frames are below threshold, return original audio
-            return audio
+            # If all frames are below threshold, keep the original audio
+            return 0, len(audio)
         
         # Find first and last non-silent frames
         start_frame = np.argmax(above_threshold)
@@ -122,7 +148,7 @@ class OptimizedAudioPreprocessor:
         start_sample = start_frame * frame_length
         end_sample = min((end_frame + 1) * frame_length, len(audio))
         
-        return audio[start_sample:end_sample]
+        return int(start_sample), int(end_sample)
     
     def batch_preprocess(self, 
                         audio_list: list, 
@@ -1,13 +1,19 @@
 # %%
 import time
+from dataclasses import replace
 import numpy as np
-import IPython.display as ipd
 import librosa
-import librosa.display
-import matplotlib.pyplot as plt
-import noisereduce as nr
 from .audio_quality_analyzer import AudioQualityAnalyzer
 from .adaptive_noise_reduction import AdaptiveNoiseReducer
+from .denoise_policy import (
+    DENOISE_FULL,
+    DENOISE_HIGHPASS,
+    DENOISE_SKIP,
+    DenoisePolicy,
+    apply_highpass,
+    record_denoise_branch,
+)
+from .prepared_audio import PreparedAudio
 
 
 def preprocess_audio(audio, sr=16000, audio_length_seconds=None, use_adaptive=True):
@@ -31,32 +37,103 @@ def preprocess_audio(audio, sr=16000, audio_length_seconds=None, use_adaptive=Tr
         
         Legacy mode uses the old length-based approach for backward compatibility.
     """
+    return prepare_audio(
+        PreparedAudio(samples=audio, sample_rate=sr),
+        audio_length_seconds=audio_length_seconds,
+        use_adaptive=use_adaptive
+    ).samples
+
+
+def prepare_audio(audio, sr=16000, audio_length_seconds=None, use_adaptive=True,
+                  quality_info=None, denoise_policy=None) -> PreparedAudio:
+    """
+    Run the noise reduction and normalization stages that have not been applied yet.
+    
+    Args:
+        audio: PreparedAudio, or a raw numpy array (treated as unprocessed)
+        sr: Sample rate of a raw array (ignored for PreparedAudio)
+        audio_length_seconds: Duration of audio in seconds. If None, calculated from audio length.
+        use_adaptive: Use SNR-based adaptive noise reduction (see preprocess_audio)
+        quality_info: AudioQualityAnalyzer report for this audio, if already computed
+        denoise_policy: DenoisePolicy choosing skip / high-pass / full reduction
+                        (adaptive mode only; defaults to the configured policy)
+        
+    Returns:
+        PreparedAudio with denoised and normalized set; stages that already ran are skipped
+    """
+    prepared = PreparedAudio.wrap(audio, sr)
+    if prepared.preprocessed:
+        print("⏭️  Audio already denoised and normalized - skipping preprocessing")
+        return prepared
+    
     preprocess_start = time.time()
+    samples = prepared.samples
+    sr = prepared.sample_rate
     
     if audio_length_seconds is None:
-        audio_length_seconds = len(audio) / sr
+        audio_length_seconds = len(samples) / sr
+    
+    if not prepared.denoised:
+        samples = _reduce_noise(prepared, samples, sr, audio_length_seconds, use_adaptive,
+                                quality_info, denoise_policy)
+        prepared.denoised = True
     
+    if not prepared.normalized:
+        with prepared.timed("normalize"):
+            norm_start = time.time()
+            # Replace slow librosa.util.normalize with fast numpy normalization
+            # librosa.util.normalize is calling scipy peak normalization which is extremely slow
+            max_val = np.max(np.abs(samples))
+            if max_val > 0:
+                samples = samples / max_val
+            print(f"⏱️  Normalization took {time.time() - norm_start:.3f}s")
+        prepared.normalized = True
+    
+    prepared.samples = samples
+    print(f"⏱️  Total preprocessing took {time.time() - preprocess_start:.3f}s")
+    return prepared
+
+
+def _reduce_noise(prepared, audio, sr, audio_length_seconds, use_adaptive,
+                  quality_info=None, denoise_policy=None):
+    """Noise reduction stage of prepare_audio (timed as snr_estimate / denoise)."""
     if use_adaptive:
-        # NEW: Adaptive noise reduction based on SNR
-        print(f"🎯 Using adaptive noise reduction for {audio_length_seconds:.1f}s audio")
-        
         # Analyze audio quality
-        analyzer = AudioQualityAnalyzer(sr=sr)
-        snr_db = analyzer.calculate_snr(audio)
+        with prepared.timed("snr_estimate"):
+            if quality_info is None:
+                analyzer = AudioQualityAnalyzer(sr=sr)
+                quality_info = {"snr_db": analyzer.calculate_snr(audio)}
+        snr_db = quality_info["snr_db"]
         print(f"📊 Measured SNR: {snr_db:.1f} dB")
         
-        # Apply adaptive noise reduction
+        policy = denoise_policy or DenoisePolicy.from_config()
+        branch = policy.decide(quality_info)
+        prepared.denoise_branch = branch
+        
         noise_start = time.time()
-        reducer = AdaptiveNoiseReducer(sr=sr)
-        audio = reducer.reduce_noise_adaptive(
-            audio,
-            snr_db=snr_db,
-            preserve_edges=True,  # Preserve initial/final phonemes
-            audio_length_seconds=audio_length_seconds
-        )
-        print(f"⏱️  Adaptive noise reduction took {time.time() - noise_start:.3f}s")
+        with prepared.timed("denoise"):
+            if branch == DENOISE_SKIP:
+                print(f"⏭️  Clean audio (SNR {snr_db:.1f} dB) - skipping noise reduction")
+            elif branch == DENOISE_HIGHPASS:
+                print(f"🎚️  High-pass filtering only (SNR {snr_db:.1f} dB)")
+                audio = apply_highpass(audio, sr, policy.highpass_cutoff_hz)
+            else:
+                # Adaptive noise reduction based on SNR
+                print(f"🎯 Using adaptive noise reduction for {audio_length_seconds:.1f}s audio")
+                reducer = AdaptiveNoiseReducer(sr=sr)
+                audio = reducer.reduce_noise_adaptive(
+                    audio,
+                    snr_db=snr_db,
+                    preserve_edges=True,  # Preserve initial/final phonemes
+                    audio_length_seconds=audio_length_seconds
+                )
+        noise_time = time.time() - noise_start
+        record_denoise_branch(branch, noise_time, audio_length_seconds)
+        print(f"⏱️  Noise reduction ({branch}) took {noise_time:.3f}s")
     else:
+        prepared.denoise_branch = DENOISE_FULL
         # LEGACY: Length-based noise reduction (for backward compatibility)
+        import noisereduce as nr  # imports torch, so only when this path runs
         print(f"⚠️  Using legacy noise reduction for {audio_length_seconds:.1f}s audio")
         
         # Lighter noise reduction for longer audio to avoid distortion
@@ -64,32 +141,147 @@ def preprocess_audio(audio, sr=16000, audio_length_seconds=None, use_adaptive=Tr
             print(f"⚠️  Long audio detected ({audio_length_seconds:.1f}s) - using lighter noise reduction")
             # Less aggressive noise reduction for long audio
             noise_start = time.time()
-            audio = nr.reduce_noise(
-                y=audio,
-                sr=sr,
-                stationary=True,
-                prop_decrease=0.5  # Reduce by 50% instead of 100%
-            )
+            with prepared.timed("denoise"):
+                audio = nr.reduce_noise(
+                    y=audio,
+                    sr=sr,
+                    stationary=True,
+                    prop_decrease=0.5  # Reduce by 50% instead of 100%
+                )
             print(f"⏱️  Noise reduction took {time.time() - noise_start:.3f}s")
         else:
             # Standard noise reduction for shorter audio
             noise_start = time.time()
-            audio = nr.reduce_noise(y=audio, sr=sr, stationary=True, prop_decrease=1.0)
+            with prepared.timed("denoise"):
+                audio = nr.reduce_noise(y=audio, sr=sr, stationary=True, prop_decrease=1.0)
             print(f"⏱️  Noise reduction took {time.time() - noise_start:.3f}s")
+    return audio
+
+
+def resample_audio(prepared: PreparedAudio, target_sr: int = 16000) -> PreparedAudio:
+    """
+    Bring audio to the models' sample rate (no-op if it is already there).
+    
+    Args:
+        prepared: Audio at its decoded sample rate
+        target_sr: Sample rate expected by the phoneme and word models
+        
+    Returns:
+        The same PreparedAudio, resampled in place
+    """
+    if prepared.sample_rate == target_sr:
+        return prepared
+    with prepared.timed("resample"):
+        prepared.samples = librosa.resample(
+            prepared.samples, orig_sr=prepared.sample_rate, target_sr=target_sr
+        ).astype(np.float32)
+    print(f"🔁 Resampled audio from {prepared.sample_rate}Hz to {target_sr}Hz")
+    prepared.sample_rate = target_sr
+    return prepared
+
+
+def quality_rejection(quality_info: dict):
+    """Message explaining why audio is unusable for analysis, or None if it can be analyzed."""
+    if quality_info['snr_db'] < 5.0:
+        return (f"Audio quality too low (SNR: {quality_info['snr_db']:.1f} dB). "
+                "Please record in a quieter environment or use a better microphone.")
     
-    norm_start = time.time()
-    # Replace slow librosa.util.normalize with fast numpy normalization
-    # librosa.util.normalize is calling scipy peak normalization which is extremely slow
-    max_val = np.max(np.abs(audio))
-    if max_val > 0:
-        audio = audio / max_val
-    print(f"⏱️  Normalization took {time.time() - norm_start:.3f}s")
+    if quality_info['clipping_percentage'] > 10.0:
+        return (f"Audio is severely clipped ({quality_info['clipping_percentage']:.1f}% of samples). "
+                "Please reduce microphone gain or speak further from the microphone.")
     
-    print(f"⏱️  Total preprocessing took {time.time() - preprocess_start:.3f}s")
-    return audio
+    if quality_info['silence_percentage'] > 85.0:
+        return (f"Audio is mostly silence ({quality_info['silence_percentage']:.1f}%). "
+                "Please ensure you are speaking into the microphone.")
+    return None
+
+
+def preprocess_for_analysis(prepared: PreparedAudio, audio_length_seconds=None):
+    """
+    The CPU-bound stage of an analysis request: resample to 16 kHz, analyze
+    quality, then denoise and normalize (core.audio_process_pool can run it
+    in a worker process).
+    
+    Args:
+        prepared: Decoded audio
+        audio_length_seconds: Duration of the upload in seconds
+        
+    Returns:
+        (PreparedAudio, quality_info). If the audio is unusable, quality_info["rejection"]
+        holds the reason and the audio is returned resampled but not preprocessed.
+    """
+    # The models expect 16 kHz; downstream stages trust prepared.sample_rate
+    prepared = resample_audio(prepared, 16000)
+    
+    # QUALITY VALIDATION: Analyze audio quality before preprocessing
+    # (frame features and SNR computed here are reused by noise reduction)
+    print("🔍 Analyzing audio quality...")
+    quality_start = time.time()
+    analyzer = AudioQualityAnalyzer(sr=prepared.sample_rate)
+    quality_info = analyzer.analyze_audio_quality(prepared.samples)
+    prepared.record("quality_analysis", time.time() - quality_start)
+    print(f"⏱️  Quality analysis took {time.time() - quality_start:.3f}s")
+    
+    # Log quality metrics
+    print(f"📊 Audio Quality Report:")
+    print(f"   - Quality Level: {quality_info['quality_level'].upper()}")
+    print(f"   - Quality Score: {quality_info['quality_score']:.1f}/100")
+    print(f"   - SNR: {quality_info['snr_db']:.1f} dB")
+    print(f"   - Clipping: {quality_info['clipping_percentage']:.2f}%")
+    print(f"   - Silence: {quality_info['silence_percentage']:.1f}%")
+    
+    quality_info['rejection'] = quality_rejection(quality_info)
+    if quality_info['rejection']:
+        return prepared, quality_info
+    
+    # Warn about quality issues but continue processing
+    if quality_info['issues']:
+        print(f"⚠️  Quality issues detected:")
+        for issue in quality_info['issues']:
+            print(f"   - {issue}")
+    
+    if quality_info['recommendations']:
+        print(f"💡 Recommendations:")
+        for rec in quality_info['recommendations']:
+            print(f"   - {rec}")
+    
+    # Apply preprocessing with audio length for adaptive noise reduction
+    print("🔊 Starting audio preprocessing...")
+    prepared = prepare_audio(prepared, audio_length_seconds=audio_length_seconds, use_adaptive=True,
+                             quality_info=quality_info)
+    return prepared, quality_info
+
+
+def trim_for_model(prepared: PreparedAudio, audio_preprocessor) -> PreparedAudio:
+    """
+    Apply the phoneme extractor's silence trimming once, ahead of the model.
+    
+    Args:
+        prepared: Denoised/normalized audio (the untrimmed version is left intact
+                  for word extraction)
+        audio_preprocessor: The extractor's OptimizedAudioPreprocessor
+        
+    Returns:
+        New PreparedAudio with trimmed set and trim_offset (seconds cut from the
+        start) added, sharing the timing breakdown; `prepared` itself if it is
+        already trimmed
+    """
+    if prepared.trimmed:
+        return prepared
+    with prepared.timed("trim"):
+        samples, sample_rate, start_sample = audio_preprocessor.preprocess_audio_with_offset(
+            prepared.samples, prepared.sample_rate
+        )
+    trim_offset = prepared.trim_offset + start_sample / prepared.sample_rate
+    return replace(prepared, samples=samples, sample_rate=sample_rate, trimmed=True, trim_offset=trim_offset)
 
 
+# Notebook helpers: matplotlib and IPython are imported on use so the API
+# server never loads them
 def display_spectrogram(audio, sr=16000):
+    import librosa.display
+    import matplotlib.pyplot as plt
+
     # Compute MFCCs
     mfccs = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
     plt.figure(figsize=(10, 4))
@@ -101,12 +293,15 @@ def display_spectrogram(audio, sr=16000):
 
 
 def display_playable_audio(audio, sr=16000):
+    import IPython.display as ipd
+
     # Display a playable audio widget
     return ipd.Audio(data=audio, rate=sr)
 
 
 # %%
 if __name__ == "__main__":
+    import IPython.display as ipd
     from audio_recording import record_and_process_pronunciation
 
     # Load the audio file
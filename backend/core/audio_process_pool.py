@@ -0,0 +1,328 @@
+"""
+Optional process pool for the CPU-bound request stages.
+
+Preprocessing (resampling, quality analysis, noise reduction) and the
+phoneme/word alignment DP ran in asyncio.to_thread (alignment even on the
+event loop itself), so their pure-Python parts held the GIL and one long
+recording slowed every other request in the worker. With
+AUDIO_PROCESS_POOL=true they run in a pool of separate processes
+(AUDIO_PROCESS_WORKERS, 0 = one per available CPU) instead.
+
+Audio is not pickled through the pool's pipe: the parent copies the
+samples into a shared memory block, the worker maps it as a NumPy array
+without copying, writes the result into a second block the parent
+allocated, and returns only the small metadata (stage flags, timings,
+quality report). The parent owns both blocks and unlinks them after every
+call. Workers use the spawn start method, so they never inherit the
+parent's model threads.
+
+run_audio_stage() / run_cpu_stage() fall back to asyncio.to_thread when the
+pool is disabled, and for a call whose pool has broken (the pool is then
+rebuilt on the next call). Each worker process keeps its own alignment
+cost cache. The denoise policy and alignment cache counters a job changes
+in its worker are returned with the result and merged into the server
+process's, so /health/denoise-policy and /health/alignment-cache cover
+the requests handled by the pool.
+"""
+
+import asyncio
+import gc
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import fields
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .optimization_config import config
+from .prepared_audio import PreparedAudio
+
+# Modules the stages need, imported once when a worker starts
+WORKER_IMPORTS = ("core.audio_preprocessing", "core.process_audio")
+
+_PREPARED_FIELDS = [f.name for f in fields(PreparedAudio) if f.name != "samples"]
+
+
+def _prepared_metadata(prepared: PreparedAudio) -> Dict[str, Any]:
+    return {name: getattr(prepared, name) for name in _PREPARED_FIELDS}
+
+
+# Worker side: blocks whose views were still referenced when the job ended,
+# closed after the next job instead
+_unclosed: List[shared_memory.SharedMemory] = []
+
+
+def _close(block: shared_memory.SharedMemory) -> None:
+    try:
+        block.close()
+    except BufferError:
+        _unclosed.append(block)
+
+
+def _init_worker() -> None:
+    import importlib
+    for module in WORKER_IMPORTS:
+        importlib.import_module(module)
+    # align_predictions converts the predicted words to phonemes
+    from .pronunciation_lexicon import get_pronunciation_lexicon
+    get_pronunciation_lexicon()
+
+
+def _ping() -> bool:
+    return True
+
+
+def _call_in_worker(fn: Callable, *args) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run one job in a worker and return its result with the process-wide
+    stats it changed there (drained, so every count is returned once).
+    """
+    from .alignment_cache import shared_cost_cache
+    from .denoise_policy import drain_denoise_policy_stats
+
+    result = fn(*args)
+    return result, {
+        "pid": os.getpid(),
+        "alignment_cache": shared_cost_cache.drain(),
+        "denoise_policy": drain_denoise_policy_stats(),
+    }
+
+
+def _merge_worker_stats(stats: Dict[str, Any]) -> None:
+    """Add a worker's stats to the server process's, so /health reports pool traffic too."""
+    from .alignment_cache import shared_cost_cache
+    from .denoise_policy import merge_denoise_policy_stats
+
+    shared_cost_cache.merge(stats["alignment_cache"], worker=stats["pid"])
+    merge_denoise_policy_stats(stats["denoise_policy"])
+
+
+def _run_audio_stage_in_worker(fn: Callable, input_name: str, length: int, dtype: str,
+                               metadata: Dict[str, Any], output_name: str, output_capacity: int,
+                               args: tuple, kwargs: dict) -> Tuple[Dict[str, Any], Any]:
+    """
+    Worker side of run_audio_stage: map the input block, run `fn`, write its samples to the output block.
+
+    Returns (result, extra). result holds the PreparedAudio metadata plus
+    either the sample count written to the output block ("length") or,
+    if the samples did not fit, the array itself ("samples").
+    """
+    from .frame_features import forget_frame_features
+
+    for block in _unclosed[:]:
+        _unclosed.remove(block)
+        _close(block)
+
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+    try:
+        samples = np.ndarray((length,), dtype=dtype, buffer=input_block.buf)
+        prepared, extra = fn(PreparedAudio(samples=samples, **metadata), *args, **kwargs)
+        result_samples = np.ascontiguousarray(prepared.samples)
+        result = _prepared_metadata(prepared)
+        result["dtype"] = result_samples.dtype.str
+        if result_samples.nbytes <= output_capacity:
+            output = np.ndarray(result_samples.shape, dtype=result_samples.dtype, buffer=output_block.buf)
+            output[:] = result_samples
+            result["length"] = len(result_samples)
+            del output
+        else:
+            result["samples"] = result_samples.copy()
+
+        # Release every view of the input block so it can be unmapped
+        forget_frame_features(samples)
+        forget_frame_features(prepared.samples)
+        del samples, prepared, result_samples
+        gc.collect()
+        return result, extra
+    finally:
+        _close(input_block)
+        _close(output_block)
+
+
+class AudioProcessPool:
+    """Runs stage functions in worker processes, passing audio through shared memory."""
+
+    def __init__(self, max_workers: int = None):
+        """
+        Initialize the pool (worker processes start on the first call or start()).
+
+        Args:
+            max_workers: Worker processes (default: AUDIO_PROCESS_WORKERS, or one per available CPU)
+        """
+        if not max_workers:
+            max_workers = config.get('audio_process_workers', 0)
+        if not max_workers:
+            from .runtime_resources import get_runtime_resources
+            max_workers = max(1, int(get_runtime_resources().effective_cpus))
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.shared_bytes = 0
+        self.fallbacks = 0
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self) -> None:
+        """Start every worker and import the stage modules in it (blocking)."""
+        executor = self._get_executor()
+        for future in [executor.submit(_ping) for _ in range(self.max_workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stats.setdefault(stage, {"calls": 0, "total_ms": 0.0})
+            entry["calls"] += 1
+            entry["total_ms"] += seconds * 1000.0
+
+    async def _submit(self, stage: str, fn: Callable, *args) -> Any:
+        executor = self._get_executor()
+        start = time.perf_counter()
+        try:
+            result, worker_stats = await asyncio.wrap_future(executor.submit(_call_in_worker, fn, *args))
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+        self._record(stage, time.perf_counter() - start)
+        _merge_worker_stats(worker_stats)
+        return result
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) in a worker (arguments and result are pickled)."""
+        return await self._submit(fn.__name__, partial(fn, **kwargs), *args)
+
+    async def run_audio(self, fn: Callable, prepared: PreparedAudio, *args,
+                        output_capacity: int = None, **kwargs) -> Tuple[PreparedAudio, Any]:
+        """
+        Run fn(prepared, *args, **kwargs) -> (PreparedAudio, extra) in a worker.
+
+        The samples travel through shared memory both ways. output_capacity
+        is the largest result (in samples) expected; it defaults to the input
+        resampled to 16 kHz, and a larger result is returned by pickling.
+        """
+        samples = np.ascontiguousarray(prepared.samples)
+        if output_capacity is None:
+            output_capacity = math.ceil(len(samples) * max(1.0, 16000 / (prepared.sample_rate or 16000))) + 1
+        output_bytes = max(output_capacity * samples.dtype.itemsize, 1)
+
+        input_block = shared_memory.SharedMemory(create=True, size=max(samples.nbytes, 1))
+        output_block = shared_memory.SharedMemory(create=True, size=output_bytes)
+        try:
+            np.ndarray(samples.shape, dtype=samples.dtype, buffer=input_block.buf)[:] = samples
+            with self._lock:
+                self.shared_bytes += input_block.size + output_block.size
+            result, extra = await self._submit(
+                fn.__name__, _run_audio_stage_in_worker, fn, input_block.name, len(samples), samples.dtype.str,
+                _prepared_metadata(prepared), output_block.name, output_bytes, args, kwargs,
+            )
+            if "samples" in result:
+                result_samples = result.pop("samples")
+            else:
+                view = np.ndarray((result.pop("length"),), dtype=result["dtype"], buffer=output_block.buf)
+                result_samples = view.copy()
+                del view
+            result.pop("dtype")
+            return PreparedAudio(samples=result_samples, **result), extra
+        finally:
+            for block in (input_block, output_block):
+                block.close()
+                block.unlink()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {"calls": entry["calls"], "avg_ms": round(entry["total_ms"] / entry["calls"], 2)}
+                for stage, entry in self._stats.items()
+            }
+            return {
+                "workers": self.max_workers,
+                "running": self._executor is not None,
+                "stages": stages,
+                "shared_memory_mb": round(self.shared_bytes / 1024 ** 2, 2),
+                "thread_fallbacks": self.fallbacks,
+                "restarts": self.restarts,
+            }
+
+
+_pool: Optional[AudioProcessPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_audio_process_pool() -> Optional[AudioProcessPool]:
+    """The shared pool, or None when AUDIO_PROCESS_POOL is off."""
+    global _pool
+    if not config.get('audio_process_pool', False):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = AudioProcessPool()
+        return _pool
+
+
+def shutdown_audio_process_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+async def run_audio_stage(fn: Callable, prepared: PreparedAudio, *args, **kwargs) -> Tuple[PreparedAudio, Any]:
+    """fn(prepared, *args, **kwargs) -> (PreparedAudio, extra), in the process pool or a thread."""
+    pool = get_audio_process_pool()
+    if pool is not None:
+        try:
+            return await pool.run_audio(fn, prepared, *args, **kwargs)
+        except BrokenProcessPool as e:
+            pool.fallbacks += 1
+            print(f"⚠️ Audio process pool broke ({e}); running {fn.__name__} in a thread")
+    return await asyncio.to_thread(fn, prepared, *args, **kwargs)
+
+
+async def run_cpu_stage(fn: Callable, *args, **kwargs) -> Any:
+    """fn(*args, **kwargs) in the process pool or a thread (for small, picklable arguments)."""
+    pool = get_audio_process_pool()
+    if pool is not None:
+        try:
+            return await pool.run(fn, *args, **kwargs)
+        except BrokenProcessPool as e:
+            pool.fallbacks += 1
+            print(f"⚠️ Audio process pool broke ({e}); running {fn.__name__} in a thread")
+    return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+def get_audio_process_pool_stats() -> Dict[str, Any]:
+    """Pool configuration and per-stage call counts / latency."""
+    pool = _pool
+    return {"enabled": bool(config.get('audio_process_pool', False)),
+            **(pool.stats() if pool is not None else {})}
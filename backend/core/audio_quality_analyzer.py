@@ -12,9 +12,11 @@ Created as part of Phase 1: Adaptive Noise Reduction & Audio Quality Validation
 
 import numpy as np
 import librosa
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
 import logging
 
+from .frame_features import FrameFeatures, get_frame_features
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +32,8 @@ class AudioQualityAnalyzer:
         """
         self.sr = sr
         
-    def calculate_snr(self, audio: np.ndarray, noise_duration: float = 0.5) -> float:
+    def calculate_snr(self, audio: np.ndarray, noise_duration: float = 0.5,
+                      features: Optional[FrameFeatures] = None) -> float:
         """
         Calculate Signal-to-Noise Ratio.
         
@@ -40,11 +43,19 @@ class AudioQualityAnalyzer:
         Args:
             audio: Input audio signal as numpy array
             noise_duration: Duration in seconds to sample for noise estimation
+            features: Shared FrameFeatures of `audio` (looked up if None); the
+                      result is memoized there so preprocessing reuses it
             
         Returns:
             SNR in dB. Returns 60.0 for essentially noise-free audio,
             10.0 for very short audio where reliable SNR cannot be calculated.
         """
+        if features is None:
+            features = get_frame_features(audio, self.sr)
+        return features.cached(('snr_db', noise_duration), lambda: self._compute_snr(audio, noise_duration))
+    
+    def _compute_snr(self, audio: np.ndarray, noise_duration: float) -> float:
+        """SNR from the RMS of the edge (noise) and middle (signal) regions."""
         noise_samples = int(noise_duration * self.sr)
         
         if len(audio) < 3 * noise_samples:
@@ -110,29 +121,23 @@ class AudioQualityAnalyzer:
         }
     
     def calculate_silence_percentage(self, audio: np.ndarray, 
-                                     threshold_db: int = -40) -> float:
+                                     threshold_db: int = -40,
+                                     features: Optional[FrameFeatures] = None) -> float:
         """
         Calculate percentage of audio that is silence.
         
         Args:
             audio: Input audio signal
             threshold_db: dB threshold below which audio is considered silence
+            features: Shared FrameFeatures of `audio` (looked up if None)
             
         Returns:
             Percentage of audio that is silence (0-100)
         """
-        # Calculate frame-wise RMS energy
-        frame_length = 2048
-        hop_length = 512
-        
-        rms = librosa.feature.rms(
-            y=audio,
-            frame_length=frame_length,
-            hop_length=hop_length
-        )[0]
-        
-        # Convert to dB
-        rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+        # Frame-wise RMS energy in dB (2048/512 frames, shared with VAD and trimming)
+        if features is None:
+            features = get_frame_features(audio, self.sr)
+        rms_db = features.rms_db
         
         # Count silent frames
         silent_frames = np.sum(rms_db < threshold_db)
@@ -205,9 +210,10 @@ class AudioQualityAnalyzer:
         logger.info("Analyzing audio quality...")
         
         # Calculate all metrics
-        snr_db = self.calculate_snr(audio)
+        features = get_frame_features(audio, self.sr)
+        snr_db = self.calculate_snr(audio, features=features)
         clipping_info = self.detect_clipping(audio)
-        silence_percentage = self.calculate_silence_percentage(audio)
+        silence_percentage = self.calculate_silence_percentage(audio, features=features)
         
         # Initialize issues and recommendations
         issues = []
@@ -0,0 +1,284 @@
+"""
+Vectorized banded alignment engine for phoneme-to-word regrouping.
+
+The reference implementation in process_audio.align_phonemes_to_words runs a
+triple Python loop (words x end position x start position) and calls the
+O(m*n) compute_per DP in the innermost loop. This module computes every
+candidate segment cost for a word in one NumPy pass instead:
+
+- For each candidate start position k, the edit-distance column between the
+  expected phonemes and pred[k:k+t] is grown one phoneme at a time, so a single
+  column is reused across all segment lengths t.
+- All start positions are advanced together (one row per start), and the
+  in-column insertion recurrence is solved with a running minimum, so each
+  segment length costs a handful of array operations.
+
+The word-level DP, pruning rules, tie-breaking, confidence scoring and fallback
+backtracking are the same as the reference implementation, so both produce the
+same (word, segment, per) alignment.
+"""
+
+import numpy as np
+
+from .phoneme_inventory import phoneme_inventory
+
+
+def _encode_symbols(pred_phonemes: list, gt_words_phonemes: list[tuple[str, list[str]]]):
+    """
+    Map phoneme symbols to small integers so comparisons can be vectorized.
+
+    Returns:
+        Tuple of (pred_ids, [gt_ids per word]) as int32 arrays
+    """
+    pred_ids = np.array(phoneme_inventory.encode(pred_phonemes), dtype=np.int32)
+    gt_ids = [
+        np.array(phoneme_inventory.encode(phonemes), dtype=np.int32)
+        for _, phonemes in gt_words_phonemes
+    ]
+    return pred_ids, gt_ids
+
+
+def segment_distance_matrix(gt_ids: np.ndarray, pred_ids: np.ndarray,
+                            start_lo: int, start_hi: int, max_length: int) -> np.ndarray:
+    """
+    Edit distances between gt_ids and every segment pred_ids[k:k+t].
+
+    Args:
+        gt_ids: Encoded expected phonemes for one word (length L)
+        pred_ids: Encoded predicted phonemes for the whole utterance
+        start_lo: First segment start position (inclusive)
+        start_hi: Last segment start position (exclusive)
+        max_length: Longest segment length to evaluate
+
+    Returns:
+        Array D of shape (start_hi - start_lo, max_length + 1) where
+        D[k - start_lo, t] is the edit distance between gt_ids and
+        pred_ids[k:k+t]. Entries where k + t runs past the end of pred_ids
+        are not meaningful and must be masked by the caller.
+    """
+    num_starts = max(start_hi - start_lo, 0)
+    gt_len = len(gt_ids)
+    distances = np.zeros((num_starts, max_length + 1), dtype=np.int32)
+    if num_starts == 0:
+        return distances
+
+    row_idx = np.arange(gt_len + 1, dtype=np.int32)
+    # column[s, i] = edit distance between gt[:i] and the current segment for start s
+    column = np.broadcast_to(row_idx, (num_starts, gt_len + 1)).copy()
+    distances[:, 0] = gt_len
+
+    # Pad so that positions past the end compare as mismatches (masked later)
+    padded_pred = np.concatenate([pred_ids, np.full(max_length, -1, dtype=np.int32)])
+    starts = np.arange(start_lo, start_hi)
+    candidate = np.empty((num_starts, gt_len + 1), dtype=np.int32)
+
+    for t in range(1, max_length + 1):
+        symbols = padded_pred[starts + t - 1]
+        mismatch = (gt_ids[None, :] != symbols[:, None]).astype(np.int32)
+
+        # Best of substitution/match (diagonal) and deletion (vertical) moves
+        candidate[:, 0] = t
+        np.minimum(column[:, :-1] + mismatch, column[:, 1:] + 1, out=candidate[:, 1:])
+
+        # Insertion moves chain down the column: new[i] = min(new[i-1] + 1, candidate[i]),
+        # which is i + running_min(candidate - i)
+        column = np.minimum.accumulate(candidate - row_idx, axis=1) + row_idx
+        distances[:, t] = column[:, gt_len]
+
+    return distances
+
+
+def _fallback_segment_search(gt_ids: np.ndarray, pred_ids: np.ndarray, end: int,
+                             forward_distances=None):
+    """
+    Find the best matching segment ending at or before `end` when the DP has
+    no valid predecessor. Mirrors the reference search order (segment length
+    ascending, then start ascending, first minimum wins).
+
+    `forward_distances` is the (start_lo, matrix) pair computed for this word
+    in the forward pass; it is reused when it covers the search window.
+
+    Returns:
+        Tuple of (start, stop, per) or None if no candidate exists
+    """
+    gt_len = len(gt_ids)
+    min_len = max(1, gt_len - 3)
+    max_len = min(end, gt_len + 8)
+    if max_len < min_len:
+        return None
+
+    start_lo = max(0, end - max_len - 5)
+    if (forward_distances is not None
+            and forward_distances[0] <= start_lo
+            and forward_distances[0] + forward_distances[1].shape[0] >= end
+            and forward_distances[1].shape[1] > max_len):
+        start_lo, distances = forward_distances
+    else:
+        distances = segment_distance_matrix(gt_ids, pred_ids, start_lo, end, max_len)
+
+    best = None
+    best_per = float('inf')
+    for seg_len in range(min_len, max_len + 1):
+        first_start = max(0, end - seg_len - 5)
+        last_start = end - seg_len
+        if last_start < first_start:
+            continue
+        if gt_len == 0:
+            per_values = np.ones(last_start - first_start + 1)
+        else:
+            per_values = distances[first_start - start_lo:last_start - start_lo + 1, seg_len] / gt_len
+        idx = int(np.argmin(per_values))
+        if per_values[idx] < best_per:
+            best_per = float(per_values[idx])
+            best = (first_start + idx, first_start + idx + seg_len)
+
+    if best is None:
+        return None
+    return best[0], best[1], best_per
+
+
+def banded_word_alignment(pred_phonemes: list,
+                          gt_words_phonemes: list[tuple[str, list[str]]],
+                          length_ratio: float):
+    """
+    Align predicted phonemes to ground truth words with vectorized segment costs.
+
+    Args:
+        pred_phonemes: Flat list of predicted phonemes (non-empty)
+        gt_words_phonemes: List of (word, [phonemes]) tuples (non-empty)
+        length_ratio: Ratio of predicted to expected phoneme counts
+
+    Returns:
+        Tuple of (alignment, word_confidences, failed_alignments, low_confidence_alignments)
+        - alignment: List of (word, aligned_pred_phonemes, per) tuples
+        - word_confidences: Confidence (0-1) for each aligned word
+        - failed_alignments: Number of words that needed fallback backtracking
+        - low_confidence_alignments: Number of words with confidence < 0.3
+    """
+    pred_ids, gt_ids = _encode_symbols(pred_phonemes, gt_words_phonemes)
+
+    n = len(pred_phonemes)
+    m = len(gt_words_phonemes)
+
+    dp = np.full((m + 1, n + 1), np.inf, dtype=np.float32)
+    backtrack = np.full((m + 1, n + 1), -1, dtype=np.int32)
+    confidence = np.zeros((m + 1, n + 1), dtype=np.float32)
+    dp[0, 0] = 0
+    confidence[0, 0] = 1.0
+
+    word_lengths = [len(phonemes) for _, phonemes in gt_words_phonemes]
+    cumulative_lengths = np.concatenate([[0], np.cumsum(word_lengths)])
+    # Per-word segment distances, kept for the backtracking pass
+    word_distances = [None] * (m + 1)
+
+    for i in range(1, m + 1):
+        word_ids = gt_ids[i - 1]
+        expected_length = len(word_ids)
+        norm = max(expected_length, 1)
+
+        flexibility = max(8, int(expected_length * abs(length_ratio - 1.0) + 5))
+        min_j = max(i, int(cumulative_lengths[i - 1]) - flexibility)
+        max_j = min(n + 1, int(cumulative_lengths[i]) + flexibility)
+        if max_j <= min_j:
+            continue
+
+        max_length = expected_length + flexibility
+        start_lo = max(0, min_j - max_length)
+        start_hi = max_j - 1
+        distances = segment_distance_matrix(word_ids, pred_ids, start_lo, start_hi, max_length)
+        word_distances[i] = (start_lo, distances)
+        if start_hi <= start_lo:
+            continue
+
+        js = np.arange(min_j, max_j)
+        # Segment lengths ordered so that start positions ascend along axis 1
+        lengths = np.arange(max_length, 0, -1)
+        starts = js[:, None] - lengths[None, :]
+
+        len_diff = np.abs(expected_length - lengths)
+        valid = (starts >= 0) & (len_diff <= max(expected_length * 1.5, 2))[None, :]
+        safe_starts = np.where(valid, starts, start_lo)
+        prev_cost = dp[i - 1, safe_starts].astype(np.float64)
+        valid &= np.isfinite(prev_cost)
+
+        if expected_length == 0:
+            distance = np.ones(starts.shape)
+        else:
+            raw = distances[safe_starts - start_lo, np.broadcast_to(lengths, starts.shape)]
+            distance = (raw / norm) * norm
+
+        # Perfect matches terminate the search at the first (lowest) start
+        zero = valid & (distance == 0.0)
+        has_zero = zero.any(axis=1)
+        cost = np.where(valid, prev_cost + distance, np.inf)
+        best_col = np.where(has_zero, np.argmax(zero, axis=1), np.argmin(cost, axis=1))
+
+        rows = np.arange(len(js))
+        best_cost = np.where(has_zero, prev_cost[rows, best_col], cost[rows, best_col])
+        found = np.isfinite(best_cost)
+        if not found.any():
+            continue
+
+        best_k = starts[rows, best_col]
+        best_len = lengths[best_col]
+        per = distance[rows, best_col] / norm
+        length_match = 1.0 - np.minimum(np.abs(expected_length - best_len) / max(expected_length, 1), 1.0)
+        prev_conf = confidence[i - 1, np.where(found, best_k, 0)].astype(np.float64)
+        segment_confidence = (
+            0.5 * (1.0 - np.minimum(per, 1.0)) +
+            0.3 * length_match +
+            0.2 * prev_conf
+        )
+
+        target = js[found]
+        dp[i, target] = best_cost[found]
+        backtrack[i, target] = best_k[found]
+        confidence[i, target] = segment_confidence[found]
+
+    # Backtracking to find the alignment
+    alignment = []
+    word_confidences = []
+    failed_alignments = 0
+    low_confidence_alignments = 0
+    i, j = m, n
+
+    while i > 0:
+        k = int(backtrack[i, j])
+        gt_word, gt_phs = gt_words_phonemes[i - 1]
+
+        if k == -1:
+            failed_alignments += 1
+            fallback = _fallback_segment_search(gt_ids[i - 1], pred_ids, j, word_distances[i]) if j > 0 else None
+            if fallback is not None:
+                start, stop, fallback_per = fallback
+                segment = pred_phonemes[start:stop]
+                alignment.append((gt_word, segment, fallback_per))
+                word_confidences.append(0.2)  # Low confidence for fallback
+                j = start
+                print(f"⚠️  Fallback alignment for '{gt_word}': {segment} (PER: {fallback_per:.2f})")
+            else:
+                alignment.append((gt_word, [], 1.0))
+                word_confidences.append(0.0)
+                print(f"❌ No phonemes found for '{gt_word}'")
+            i -= 1
+            continue
+
+        pred_segment = pred_phonemes[k:j]
+        if not gt_phs:
+            per = 1.0
+        else:
+            start_lo, distances = word_distances[i]
+            per = int(distances[k - start_lo, j - k]) / len(gt_phs)
+        word_conf = float(confidence[i, j])
+
+        alignment.append((gt_word, pred_segment, per))
+        word_confidences.append(word_conf)
+        if word_conf < 0.3:
+            low_confidence_alignments += 1
+
+        i -= 1
+        j = k
+
+    alignment.reverse()
+    word_confidences.reverse()
+    return alignment, word_confidences, failed_alignments, low_confidence_alignments
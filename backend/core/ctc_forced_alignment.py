@@ -0,0 +1,353 @@
+"""
+CTC-constrained forced alignment against the expected phoneme sequence.
+
+Free decoding (argmax -> string -> split on spaces) throws away the frame
+scores and forces process_audio_array to recover word boundaries with a
+word-extraction model, g2p on the predicted words and the word-level DP.
+Since the attempted sentence is always known, the frame-level log
+probabilities can instead be aligned directly to the expected phonemes:
+
+- States follow the usual CTC blank-interleaved target sequence
+  (blank, p1, blank, p2, ..., pL, blank) with stay / advance / skip-blank
+  transitions, but every expected phoneme has two states: an exact state
+  that emits the expected token and a substitution state that emits the
+  best non-blank token. Mispronounced phonemes still occupy their slot.
+- Every blank position also has an insertion state emitting the best
+  non-blank token; its runs become extra phonemes attached to the word.
+- Deletions: between frames the path may jump forward over any number of
+  phonemes from one blank state to a later one, paying a penalty per skipped
+  phoneme (all blank states share the same emission, so this is exact).
+- Penalties are paid on entering a substitution/insertion state, not per
+  frame, so long phonemes are not biased towards deletion + insertion.
+
+The Viterbi path gives each expected word its realized phonemes and frame
+span directly, with no word extraction or regrouping DP.
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+# Penalties are in natural-log probability units, charged once per event
+DEFAULT_SUBSTITUTION_PENALTY = 4.0
+DEFAULT_INSERTION_PENALTY = 3.0
+DEFAULT_DELETION_PENALTY = 3.5
+
+# Tokens the free decoder drops (stress marks) are treated like blank
+_IGNORED_TOKENS = ("|", "ˈ", "ˌ", " ")
+
+
+class CTCVocabulary:
+    """Token <-> id mapping for a CTC head, with blank and ignorable tokens."""
+
+    def __init__(self, token_to_id: dict, blank_id: int, ignored_ids=()):
+        """
+        Initialize the vocabulary.
+
+        Args:
+            token_to_id: Mapping of token string to logit index
+            blank_id: Index of the CTC blank (pad) token
+            ignored_ids: Tokens that carry no phoneme (word delimiter, stress, special tokens)
+        """
+        self.token_to_id = dict(token_to_id)
+        self.blank_id = int(blank_id)
+        self.ignored_ids = tuple(sorted({int(i) for i in ignored_ids} - {self.blank_id}))
+        self.id_to_token = {i: t for t, i in self.token_to_id.items()}
+        self.size = max(self.id_to_token) + 1 if self.id_to_token else 0
+
+    @classmethod
+    def from_tokenizer(cls, tokenizer) -> "CTCVocabulary":
+        """Build from a HuggingFace Wav2Vec2 CTC tokenizer."""
+        token_to_id = tokenizer.get_vocab()
+        ignored = [token_to_id[t] for t in _IGNORED_TOKENS if t in token_to_id]
+        for attr in ("unk_token_id", "bos_token_id", "eos_token_id", "word_delimiter_token_id"):
+            token_id = getattr(tokenizer, attr, None)
+            if token_id is not None:
+                ignored.append(token_id)
+        return cls(token_to_id, tokenizer.pad_token_id, ignored)
+
+    def encode(self, phonemes: list) -> list[int]:
+        """Map expected phonemes to token ids (-1 for phonemes the model cannot emit)."""
+        return [self.token_to_id.get(ph, -1) for ph in phonemes]
+
+
+@dataclass
+class WordSegment:
+    """Forced-alignment result for one expected word."""
+    word: str
+    expected_phonemes: list
+    phonemes: list                      # Realized phonemes in time order
+    start_frame: Optional[int] = None   # None when every phoneme was deleted
+    end_frame: Optional[int] = None     # Exclusive
+    start_time: Optional[float] = None
+    end_time: Optional[float] = None
+    deleted: list = field(default_factory=list)
+    inserted: list = field(default_factory=list)
+    substituted: list = field(default_factory=list)  # (expected, realized) pairs
+
+    @property
+    def is_missing(self) -> bool:
+        return bool(self.expected_phonemes) and not self.phonemes
+
+
+@dataclass
+class ForcedAlignment:
+    """Viterbi forced alignment of an utterance to its expected words."""
+    words: list
+    score: float
+    num_frames: int
+    frame_duration: float
+
+
+def log_softmax(logits: np.ndarray) -> np.ndarray:
+    """Numerically stable log-softmax over the last axis."""
+    logits = np.asarray(logits, dtype=np.float64)
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+
+def forced_align(log_probs: np.ndarray,
+                 gt_words_phonemes: list[tuple[str, list[str]]],
+                 vocabulary: CTCVocabulary,
+                 frame_duration: float = 0.02,
+                 frame_times: Optional[np.ndarray] = None,
+                 substitution_penalty: float = DEFAULT_SUBSTITUTION_PENALTY,
+                 insertion_penalty: float = DEFAULT_INSERTION_PENALTY,
+                 deletion_penalty: float = DEFAULT_DELETION_PENALTY) -> ForcedAlignment:
+    """
+    Align frame log-probabilities to the expected words.
+
+    Args:
+        log_probs: (frames, vocab) log-probabilities (see log_softmax)
+        gt_words_phonemes: List of (word, [phonemes]) tuples for the attempted sentence
+        vocabulary: CTC vocabulary of the model that produced log_probs
+        frame_duration: Seconds per output frame (for timestamps)
+        frame_times: Optional start time of every frame in seconds, used instead of
+                     frame index * frame_duration (e.g. for concatenated chunks)
+        substitution_penalty: Cost of realizing an expected phoneme as a different token
+        insertion_penalty: Cost of an extra phoneme between expected phonemes
+        deletion_penalty: Cost per skipped expected phoneme
+
+    Returns:
+        ForcedAlignment with one WordSegment per expected word
+    """
+    log_probs = np.asarray(log_probs, dtype=np.float64)
+    if log_probs.ndim == 3:
+        log_probs = log_probs[0]
+    num_frames = log_probs.shape[0]
+
+    labels = []       # expected phoneme symbols, flattened
+    label_word = []   # word index of each label
+    for w, (_, phonemes) in enumerate(gt_words_phonemes):
+        for ph in phonemes:
+            labels.append(ph)
+            label_word.append(w)
+    num_labels = len(labels)
+    target_ids = np.array(vocabulary.encode(labels), dtype=np.int64)
+
+    segments = [
+        WordSegment(word=word, expected_phonemes=list(phonemes), phonemes=[])
+        for word, phonemes in gt_words_phonemes
+    ]
+    if num_frames == 0 or num_labels == 0:
+        for segment in segments:
+            segment.deleted = list(segment.expected_phonemes)
+        return ForcedAlignment(segments, float("-inf") if num_labels else 0.0, num_frames, frame_duration)
+
+    # Emission scores
+    phoneme_mask = np.ones(log_probs.shape[1], dtype=bool)
+    phoneme_mask[vocabulary.blank_id] = False
+    phoneme_mask[list(vocabulary.ignored_ids)] = False
+    blank_ids = [vocabulary.blank_id, *vocabulary.ignored_ids]
+    blank_lp = log_probs[:, blank_ids].max(axis=1)
+    phoneme_lp = np.where(phoneme_mask, log_probs, -np.inf)
+    best_id = phoneme_lp.argmax(axis=1)
+    best_lp = phoneme_lp[np.arange(num_frames), best_id]
+
+    valid_target = target_ids >= 0
+    exact_lp = np.full((num_frames, num_labels), -np.inf)
+    exact_lp[:, valid_target] = log_probs[:, target_ids[valid_target]]
+
+    # State layout per position k: blank B=4k, insertion I=4k+1, exact E=4k+2,
+    # substitution S=4k+3; position L only has B and I
+    num_states = 4 * num_labels + 2
+    emission = np.empty((num_frames, num_states))
+    emission[:, 0::4] = blank_lp[:, None]
+    emission[:, 1::4] = best_lp[:, None]
+    emission[:, 2::4] = exact_lp
+    emission[:, 3::4] = best_lp[:, None]
+
+    predecessors, penalties = _transition_table(
+        num_labels, target_ids, substitution_penalty, insertion_penalty
+    )
+
+    blank_index = np.arange(num_labels + 1)
+    deletion_offset = blank_index * deletion_penalty
+
+    def close_over_deletions(scores):
+        """Let blank state k absorb any earlier blank k0 at (k - k0) deletions."""
+        shifted = scores[0::4] + deletion_offset
+        running = np.maximum.accumulate(shifted)
+        source = np.maximum.accumulate(np.where(shifted >= running, blank_index, 0))
+        scores[0::4] = running - deletion_offset
+        return source
+
+    # Virtual start: in blank 0 before the first frame (optionally skipping ahead)
+    prev = np.full(num_states, -np.inf)
+    prev[0] = 0.0
+    start_source = close_over_deletions(prev)
+
+    state_index = np.arange(num_states)
+    backpointer = np.zeros((num_frames, num_states), dtype=np.int8)
+    closure_source = np.zeros((num_frames, num_labels + 1), dtype=np.int32)
+    padded = np.full(num_states + 1, -np.inf)  # index -1 is "no predecessor"
+
+    for t in range(num_frames):
+        padded[:-1] = prev
+        candidates = padded[predecessors] - penalties
+        best = candidates.argmax(axis=0)
+        current = candidates[best, state_index] + emission[t]
+        backpointer[t] = best
+        closure_source[t] = close_over_deletions(current)
+        prev = current
+
+    # End after the last phoneme, or in any phoneme with the rest deleted
+    label_positions = np.arange(num_labels)
+    remaining = (num_labels - 1 - label_positions) * deletion_penalty
+    last_blank = 4 * num_labels
+    end_states = np.concatenate([
+        [last_blank, last_blank + 1],
+        4 * label_positions + 2,
+        4 * label_positions + 3,
+    ])
+    end_scores = prev[end_states] - np.concatenate([[0.0, 0.0], remaining, remaining])
+    end_choice = int(np.argmax(end_scores))
+    score = float(end_scores[end_choice])
+    if not np.isfinite(score):
+        raise ValueError("❌ Forced alignment failed - audio too short for the expected phonemes")
+
+    state = int(end_states[end_choice])
+    deleted = np.zeros(num_labels, dtype=bool)
+    if state < last_blank:
+        deleted[state // 4 + 1:] = True
+
+    # Traceback
+    path = np.empty(num_frames, dtype=np.int64)
+    for t in range(num_frames - 1, -1, -1):
+        if state % 4 == 0:
+            source = int(closure_source[t, state // 4])
+            deleted[source:state // 4] = True
+            state = 4 * source
+        path[t] = state
+        state = int(predecessors[backpointer[t, state], state])
+    # state is now a blank reached from the virtual start
+    source = int(start_source[state // 4])
+    deleted[source:state // 4] = True
+
+    if frame_times is None:
+        frame_times = np.arange(num_frames) * frame_duration
+    _collect_word_segments(
+        segments, path, deleted, labels, label_word, best_id,
+        log_probs, phoneme_mask, vocabulary, frame_times, frame_duration,
+    )
+    return ForcedAlignment(segments, score, num_frames, frame_duration)
+
+
+def _transition_table(num_labels: int, target_ids: np.ndarray,
+                      substitution_penalty: float, insertion_penalty: float):
+    """
+    Predecessor states and entry penalties for every state.
+
+    Returns:
+        (predecessors, penalties), both shaped (5, num_states); unused slots
+        point at index -1 (a padding slot holding -inf).
+    """
+    num_states = 4 * num_labels + 2
+    predecessors = np.full((5, num_states), -1, dtype=np.int64)
+    penalties = np.zeros((5, num_states))
+
+    def set_row(state, sources, penalty):
+        for slot, (source, entry_penalty) in enumerate(zip(sources, penalty)):
+            predecessors[slot, state] = source
+            penalties[slot, state] = entry_penalty
+
+    for k in range(num_labels + 1):
+        blank, insertion = 4 * k, 4 * k + 1
+        # Previous phoneme's exact / substitution states (none before the first)
+        previous = [4 * k - 2, 4 * k - 1] if k > 0 else [-1, -1]
+
+        set_row(blank, [blank, insertion, *previous], [0.0, 0.0, 0.0, 0.0])
+        set_row(insertion, [insertion, blank, *previous],
+                [0.0, insertion_penalty, insertion_penalty, insertion_penalty])
+        if k == num_labels:
+            continue
+
+        exact, substitution = 4 * k + 2, 4 * k + 3
+        # Exact -> exact without a blank would collapse repeated tokens
+        previous_exact = previous[0] if k > 0 and target_ids[k] != target_ids[k - 1] else -1
+        set_row(exact, [exact, blank, insertion, previous_exact, previous[1]],
+                [0.0, 0.0, 0.0, 0.0, 0.0])
+        set_row(substitution, [substitution, blank, insertion, *previous],
+                [0.0, substitution_penalty, substitution_penalty, substitution_penalty, substitution_penalty])
+
+    return predecessors, penalties
+
+
+def _collect_word_segments(segments, path, deleted, labels, label_word, best_id,
+                           log_probs, phoneme_mask, vocabulary, frame_times, frame_duration):
+    """Turn a Viterbi state path into per-word realized phonemes and frame spans."""
+    events = [[] for _ in segments]  # (frame, phoneme) per word, sorted later
+    num_frames = len(path)
+    kinds = path % 4
+    positions = path // 4
+
+    # Realized phoneme for every expected phoneme that was not deleted
+    frames_by_label = {}
+    for t in np.flatnonzero(kinds >= 2):
+        frames_by_label.setdefault(int(positions[t]), []).append(int(t))
+
+    for k, label in enumerate(labels):
+        word_index = label_word[k]
+        frames = frames_by_label.get(k)
+        if deleted[k] or not frames:
+            segments[word_index].deleted.append(label)
+            continue
+
+        segment = segments[word_index]
+        if segment.start_frame is None or frames[0] < segment.start_frame:
+            segment.start_frame = frames[0]
+        if segment.end_frame is None or frames[-1] + 1 > segment.end_frame:
+            segment.end_frame = frames[-1] + 1
+
+        if kinds[frames[0]] == 2:
+            realized = label
+        else:
+            scores = np.where(phoneme_mask, log_probs[frames], -np.inf).sum(axis=0)
+            realized = vocabulary.id_to_token.get(int(np.argmax(scores)), label)
+            if realized != label:
+                segment.substituted.append((label, realized))
+        events[word_index].append((frames[0], realized))
+
+    # Insertions: one phoneme per run of the same token in an insertion state
+    t = 0
+    while t < num_frames:
+        if kinds[t] != 1:
+            t += 1
+            continue
+        state, token_id, start = path[t], int(best_id[t]), t
+        while t + 1 < num_frames and path[t + 1] == state and best_id[t + 1] == token_id:
+            t += 1
+        position = int(positions[start])
+        word_index = label_word[position - 1] if position > 0 else label_word[0]
+        phoneme = vocabulary.id_to_token.get(token_id, "")
+        segments[word_index].inserted.append(phoneme)
+        events[word_index].append((start, phoneme))
+        t += 1
+
+    for segment, word_events in zip(segments, events):
+        word_events.sort(key=lambda event: event[0])
+        segment.phonemes = [phoneme for _, phoneme in word_events]
+        if segment.start_frame is not None:
+            segment.start_time = round(float(frame_times[segment.start_frame]), 3)
+            segment.end_time = round(float(frame_times[segment.end_frame - 1]) + frame_duration, 3)
@@ -0,0 +1,167 @@
+"""
+SNR-driven policy for the noise reduction stage.
+
+AdaptiveNoiseReducer used to run on every recording, even on clean audio
+well above 20 dB SNR where it only applies prop_decrease=0.3. The policy
+picks one of three branches from the measured SNR (the same value
+AudioQualityAnalyzer reports, memoized on the shared frame features):
+
+- "skip": SNR >= skip_snr_db, no denoising at all
+- "highpass": SNR >= highpass_snr_db, only a cheap high-pass filter that
+  removes rumble and DC offset below the speech band
+- "full": adaptive noise reduction as before
+
+The branch is stored on the request's PreparedAudio and counted, with the
+time spent and audio duration, in process-wide stats so the latency saved
+across traffic can be read from /health/denoise-policy (counts from audio
+process pool workers are merged into the server's after every job).
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Union
+
+import numpy as np
+from scipy.signal import butter, sosfiltfilt
+
+DENOISE_SKIP = "skip"
+DENOISE_HIGHPASS = "highpass"
+DENOISE_FULL = "full"
+DENOISE_BRANCHES = (DENOISE_SKIP, DENOISE_HIGHPASS, DENOISE_FULL)
+
+
+@dataclass
+class DenoisePolicy:
+    """Thresholds deciding how much noise reduction a recording gets."""
+    enabled: bool = True
+    skip_snr_db: float = 35.0
+    highpass_snr_db: float = 25.0
+    highpass_cutoff_hz: float = 80.0
+
+    @classmethod
+    def from_config(cls) -> "DenoisePolicy":
+        """Policy from core.optimization_config (DENOISE_POLICY* settings)."""
+        from .optimization_config import config
+        return cls(
+            enabled=config.get('denoise_policy_enabled', True),
+            skip_snr_db=config.get('denoise_skip_snr_db', 35.0),
+            highpass_snr_db=config.get('denoise_highpass_snr_db', 25.0),
+            highpass_cutoff_hz=config.get('denoise_highpass_cutoff_hz', 80.0),
+        )
+
+    def decide(self, quality: Union[float, Dict[str, Any]]) -> str:
+        """
+        Branch for a recording.
+
+        Args:
+            quality: SNR in dB, or an AudioQualityAnalyzer.analyze_audio_quality report
+
+        Returns:
+            One of DENOISE_SKIP, DENOISE_HIGHPASS, DENOISE_FULL
+        """
+        if not self.enabled:
+            return DENOISE_FULL
+        snr_db = quality['snr_db'] if isinstance(quality, dict) else quality
+        if snr_db >= self.skip_snr_db:
+            return DENOISE_SKIP
+        if snr_db >= self.highpass_snr_db:
+            return DENOISE_HIGHPASS
+        return DENOISE_FULL
+
+
+def apply_highpass(audio: np.ndarray, sr: int = 16000, cutoff_hz: float = 80.0) -> np.ndarray:
+    """Zero-phase 4th-order Butterworth high-pass (keeps timing of phoneme onsets)."""
+    if len(audio) <= 27:  # sosfiltfilt needs more samples than its padding
+        return audio
+    sos = butter(4, cutoff_hz, btype="highpass", fs=sr, output="sos")
+    return sosfiltfilt(sos, audio).astype(audio.dtype, copy=False)
+
+
+class DenoisePolicyStats:
+    """Thread-safe counters of the branches taken and the time they cost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._branches = {branch: {"requests": 0, "seconds": 0.0, "audio_seconds": 0.0}
+                              for branch in DENOISE_BRANCHES}
+
+    def record(self, branch: str, seconds: float, audio_seconds: float) -> None:
+        with self._lock:
+            entry = self._branches[branch]
+            entry["requests"] += 1
+            entry["seconds"] += seconds
+            entry["audio_seconds"] += audio_seconds
+
+    def drain(self) -> Dict[str, Dict[str, float]]:
+        """Raw per-branch counters since the last drain, then reset (see merge)."""
+        with self._lock:
+            branches = self._branches
+            self._branches = {branch: {"requests": 0, "seconds": 0.0, "audio_seconds": 0.0}
+                              for branch in DENOISE_BRANCHES}
+        return branches
+
+    def merge(self, branches: Dict[str, Dict[str, float]]) -> None:
+        """Add counters drained from another process (an audio process pool worker)."""
+        with self._lock:
+            for branch, counters in branches.items():
+                entry = self._branches[branch]
+                for key, value in counters.items():
+                    entry[key] += value
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Per-branch counts and cost, plus the estimated time saved.
+
+        The saving assumes skipped / high-passed audio would have cost what
+        full reduction costs per second of audio on this instance.
+        """
+        with self._lock:
+            branches = {branch: dict(entry) for branch, entry in self._branches.items()}
+        total = sum(entry["requests"] for entry in branches.values())
+        full = branches[DENOISE_FULL]
+        full_cost = full["seconds"] / full["audio_seconds"] if full["audio_seconds"] else None
+
+        report = {}
+        saved_ms = 0.0
+        for branch, entry in branches.items():
+            report[branch] = {
+                "requests": entry["requests"],
+                "share": round(entry["requests"] / total, 3) if total else 0.0,
+                "mean_ms": round(1000 * entry["seconds"] / entry["requests"], 2) if entry["requests"] else 0.0,
+                "ms_per_audio_second": (round(1000 * entry["seconds"] / entry["audio_seconds"], 2)
+                                        if entry["audio_seconds"] else 0.0),
+            }
+            if branch != DENOISE_FULL and full_cost is not None:
+                saved_ms += 1000 * (full_cost * entry["audio_seconds"] - entry["seconds"])
+        return {
+            "requests": total,
+            "branches": report,
+            "estimated_saved_ms": round(saved_ms, 1) if full_cost is not None else None,
+        }
+
+
+_stats = DenoisePolicyStats()
+
+
+def record_denoise_branch(branch: str, seconds: float, audio_seconds: float) -> None:
+    """Count one request's denoise branch in the process-wide stats."""
+    _stats.record(branch, seconds, audio_seconds)
+
+
+def get_denoise_policy_stats() -> Dict[str, Any]:
+    """Process-wide branch counts and estimated latency saved."""
+    return _stats.summary()
+
+
+def drain_denoise_policy_stats() -> Dict[str, Dict[str, float]]:
+    """This process's raw branch counters, reset (a pool worker returns them to the server)."""
+    return _stats.drain()
+
+
+def merge_denoise_policy_stats(branches: Dict[str, Dict[str, float]]) -> None:
+    """Add branch counters drained in a pool worker to this process's stats."""
+    _stats.merge(branches)
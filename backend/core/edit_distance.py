@@ -0,0 +1,217 @@
+"""
+Shared edit-distance kernels for phoneme and word sequences.
+
+- levenshtein / phoneme_error_rate: bit-parallel Levenshtein distance
+  (Myers 1999, in Hyyrö's formulation for global distance). The expected
+  sequence is packed into one bit-vector per symbol and each predicted symbol
+  advances a whole DP column with a handful of integer operations, so a
+  distance costs O(n) word operations instead of O(m*n) table updates.
+  The `editdistance` package implements the same algorithm in C and is used
+  when installed; the pure-Python kernel is the fallback.
+- align_operations: the same column recurrence, keeping the vertical and
+  horizontal delta bit-vectors of every column (four integers per column)
+  so the match / substitution / deletion / insertion traceback can be read
+  back without materializing the (m+1) x (n+1) table.
+
+Sequences may hold any hashable symbols: phoneme strings, words, or ids
+interned with core.phoneme_inventory. Results are identical to the textbook
+DP, including the traceback tie-breaking (diagonal, then deletion, then
+insertion) that process_audio.align_sequences has always used.
+"""
+
+from typing import Hashable, Sequence
+
+try:
+    import editdistance
+    EDITDISTANCE_AVAILABLE = True
+except ImportError:
+    EDITDISTANCE_AVAILABLE = False
+
+
+def _pattern_masks(pattern: Sequence[Hashable]) -> dict:
+    """Bit-vector of positions for every symbol in `pattern` (bit i = pattern[i])."""
+    masks = {}
+    bit = 1
+    for symbol in pattern:
+        masks[symbol] = masks.get(symbol, 0) | bit
+        bit <<= 1
+    return masks
+
+
+def bit_parallel_levenshtein(a: Sequence[Hashable], b: Sequence[Hashable]) -> int:
+    """
+    Pure-Python bit-parallel Levenshtein distance between two symbol sequences.
+
+    Args:
+        a: First sequence (used as the bit-parallel pattern)
+        b: Second sequence (scanned one symbol at a time)
+
+    Returns:
+        Minimum number of insertions, deletions and substitutions
+    """
+    m, n = len(a), len(b)
+    if m == 0:
+        return n
+    if n == 0:
+        return m
+
+    masks = _pattern_masks(a)
+    get_mask = masks.get
+    full = (1 << m) - 1
+    top = 1 << (m - 1)
+
+    vp = full  # vertical +1 deltas (column 0 is 0..m)
+    vn = 0     # vertical -1 deltas
+    distance = m
+    for symbol in b:
+        eq = get_mask(symbol, 0)
+        d0 = (((eq & vp) + vp) ^ vp) | eq | vn
+        hp = vn | (~(d0 | vp) & full)
+        hn = d0 & vp
+        if hp & top:
+            distance += 1
+        elif hn & top:
+            distance -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(d0 | hp) & full)
+        vn = hp & d0
+    return distance
+
+
+if EDITDISTANCE_AVAILABLE:
+    levenshtein = editdistance.eval
+else:
+    levenshtein = bit_parallel_levenshtein
+
+
+def phoneme_error_rate(gt_phonemes: Sequence[Hashable], pred_phonemes: Sequence[Hashable]) -> float:
+    """
+    Phoneme Error Rate: edit distance normalized by the expected length.
+
+    Empty expected sequences score 1.0 against a non-empty prediction (all
+    insertions), and two empty sequences score 0.0.
+    """
+    if not gt_phonemes:
+        return 0.0 if not pred_phonemes else 1.0
+    if not pred_phonemes:
+        return 1.0  # All deletions
+    if gt_phonemes == pred_phonemes:
+        return 0.0
+    return levenshtein(gt_phonemes, pred_phonemes) / len(gt_phonemes)
+
+
+def align_operations(gt: Sequence[Hashable], pred: Sequence[Hashable]) -> list[tuple]:
+    """
+    Align two sequences and return the edit operations.
+
+    Returns:
+        List of ('match' | 'substitution' | 'deletion' | 'insertion', gt_symbol, pred_symbol)
+        in sequence order. For deletion pred_symbol is None; for insertion gt_symbol is None.
+    """
+    m, n = len(gt), len(pred)
+
+    # A shared suffix is always traced back as matches (the diagonal is tried
+    # first), so only the part before it needs the DP
+    suffix = []
+    while m and n and gt[m - 1] == pred[n - 1]:
+        m -= 1
+        n -= 1
+        suffix.append(('match', gt[m], pred[n]))
+    suffix.reverse()
+
+    if m == 0:
+        return [('insertion', None, p) for p in pred[:n]] + suffix
+    if n == 0:
+        return [('deletion', g, None) for g in gt[:m]] + suffix
+
+    masks = _pattern_masks(gt[:m])
+    get_mask = masks.get
+    full = (1 << m) - 1
+    top = 1 << (m - 1)
+
+    # Per-column delta bit-vectors; bit i-1 describes row i.
+    # vps/vns: D[i][j] - D[i-1][j] is +1 / -1; hps/hns: D[i][j] - D[i][j-1] is +1 / -1
+    vps = [full]
+    vns = [0]
+    hps = [0]
+    hns = [0]
+    add_vp, add_vn, add_hp, add_hn = vps.append, vns.append, hps.append, hns.append
+
+    vp = full
+    vn = 0
+    distance = m
+    for symbol in pred[:n]:
+        eq = get_mask(symbol, 0)
+        d0 = (((eq & vp) + vp) ^ vp) | eq | vn
+        hp = vn | (~(d0 | vp) & full)
+        hn = d0 & vp
+        if hp & top:
+            distance += 1
+        elif hn & top:
+            distance -= 1
+        add_hp(hp)
+        add_hn(hn)
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(d0 | hp) & full)
+        vn = hp & d0
+        add_vp(vp)
+        add_vn(vn)
+
+    # Backtrace from D[m][n], recovering neighbouring cells from the deltas
+    operations = []
+    i, j = m, n
+    d = distance
+    while i > 0 or j > 0:
+        if i > 0:
+            bit = 1 << (i - 1)
+            if vps[j] & bit:
+                up = d - 1
+            elif vns[j] & bit:
+                up = d + 1
+            else:
+                up = d
+
+            if j > 0:
+                # D[i-1][j-1] = D[i-1][j] - (D[i-1][j] - D[i-1][j-1]); row 0 always steps by +1
+                if i == 1:
+                    diag = up - 1
+                else:
+                    prev_bit = bit >> 1
+                    if hps[j] & prev_bit:
+                        diag = up - 1
+                    elif hns[j] & prev_bit:
+                        diag = up + 1
+                    else:
+                        diag = up
+
+                g, p = gt[i - 1], pred[j - 1]
+                if g == p:
+                    if d == diag:
+                        operations.append(('match', g, p))
+                        i -= 1
+                        j -= 1
+                        d = diag
+                        continue
+                elif d == diag + 1:
+                    operations.append(('substitution', g, p))
+                    i -= 1
+                    j -= 1
+                    d = diag
+                    continue
+
+            if d == up + 1:
+                operations.append(('deletion', gt[i - 1], None))
+                i -= 1
+                d = up
+                continue
+
+        # Insertion: came from D[i][j-1] + 1
+        operations.append(('insertion', None, pred[j - 1]))
+        j -= 1
+        d -= 1
+
+    operations.reverse()
+    operations.extend(suffix)
+    return operations
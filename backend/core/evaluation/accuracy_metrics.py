@@ -1,4 +1,4 @@
-import editdistance
+from ..edit_distance import levenshtein
 
 
 def flatten_phoneme_list(phoneme_list):
@@ -27,6 +27,6 @@ def compute_phoneme_error_rate(ground_truth, hypothesis):
     divided by the number of phonemes in the ground truth.
     Both ground_truth and hypothesis should be lists of phoneme tokens.
     """
-    distance = editdistance.eval(ground_truth, hypothesis)
+    distance = levenshtein(ground_truth, hypothesis)
     per = distance / len(ground_truth) if ground_truth else 0
     return per
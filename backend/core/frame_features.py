@@ -0,0 +1,161 @@
+"""
+Frame-level features shared by audio quality analysis, VAD and trimming.
+
+For a single upload the same 2048/512 framing used to be computed several
+times: RMS in AudioQualityAnalyzer.calculate_silence_percentage, again in
+estimate_speech_activity, again (plus zero-crossing rate) in
+PhonemeAwareTrimmer.detect_speech_boundaries, and the SNR twice (quality
+analysis and preprocess_audio). FrameFeatures frames the signal once through
+a strided NumPy view and computes each feature lazily, and
+get_frame_features() hands every consumer the same instance for the same
+array.
+
+Values match librosa.feature.rms / zero_crossing_rate (centered frames,
+zero padding for RMS, edge padding for ZCR) and librosa.amplitude_to_db
+with ref=np.max. Audio arrays are treated as immutable: every preprocessing
+stage returns a new array, so a changed signal gets its own features.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from functools import cached_property
+from typing import Any, Callable, Hashable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_FRAME_LENGTH = 2048
+DEFAULT_HOP_LENGTH = 512
+
+
+class FrameFeatures:
+    """Lazily computed frame features of one audio array."""
+
+    def __init__(self, audio: np.ndarray, sr: int = 16000,
+                 frame_length: int = DEFAULT_FRAME_LENGTH,
+                 hop_length: int = DEFAULT_HOP_LENGTH):
+        """
+        Initialize frame features.
+
+        Args:
+            audio: Mono audio signal
+            sr: Sample rate
+            frame_length: Samples per frame
+            hop_length: Samples between frame starts
+        """
+        self.audio = np.asarray(audio)
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self._memo: dict = {}
+        self._memo_lock = threading.Lock()
+
+    @cached_property
+    def frames(self) -> np.ndarray:
+        """(n_frames, frame_length) strided view over the zero-padded, centered signal."""
+        pad = self.frame_length // 2
+        padded = np.pad(self.audio.astype(np.float64, copy=False), pad, mode="constant")
+        return sliding_window_view(padded, self.frame_length)[::self.hop_length]
+
+    @cached_property
+    def energy(self) -> np.ndarray:
+        """Sum of squared samples per frame."""
+        frames = self.frames
+        return np.einsum("ij,ij->i", frames, frames)
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        """Root-mean-square amplitude per frame (librosa.feature.rms)."""
+        return np.sqrt(self.energy / self.frame_length)
+
+    @cached_property
+    def rms_db(self) -> np.ndarray:
+        """RMS in dB relative to the loudest frame, floored 80 dB below it (librosa.amplitude_to_db, ref=np.max)."""
+        amin = 1e-5
+        rms = self.rms
+        reference = np.max(rms) if rms.size else 0.0
+        db = 20.0 * np.log10(np.maximum(amin, rms)) - 20.0 * np.log10(max(amin, reference))
+        if db.size:
+            db = np.maximum(db, db.max() - 80.0)
+        return db
+
+    @cached_property
+    def zcr(self) -> np.ndarray:
+        """Zero-crossing rate per frame (librosa.feature.zero_crossing_rate)."""
+        pad = self.frame_length // 2
+        padded = np.pad(self.audio, pad, mode="edge")
+        # Samples within +/-1e-10 count as zero (non-negative), as in librosa
+        negative = np.signbit(np.where(np.abs(padded) <= 1e-10, 0.0, padded))
+        crossings = np.concatenate([[0], np.cumsum(negative[1:] != negative[:-1])])
+        # Crossings strictly inside each frame: between samples start..start+frame_length-1
+        starts = np.arange(len(self.frames)) * self.hop_length
+        return (crossings[starts + self.frame_length - 1] - crossings[starts]) / self.frame_length
+
+    def cached(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Memoize a derived metric (e.g. SNR) on this array."""
+        with self._memo_lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = compute()
+        with self._memo_lock:
+            self._memo.setdefault(key, value)
+        return value
+
+
+class _FeatureRegistry:
+    """Small identity-keyed cache so every consumer of an array shares one FrameFeatures."""
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, audio: np.ndarray, sr: int, frame_length: int, hop_length: int) -> FrameFeatures:
+        key = (id(audio), sr, frame_length, hop_length)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is audio:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        features = FrameFeatures(audio, sr, frame_length, hop_length)
+        try:
+            reference = weakref.ref(audio)
+        except TypeError:
+            return features
+        with self._lock:
+            self._entries[key] = (reference, features)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return features
+
+    def forget(self, audio: np.ndarray) -> None:
+        with self._lock:
+            for key in [key for key, (reference, _) in self._entries.items() if reference() is audio]:
+                del self._entries[key]
+
+
+_registry = _FeatureRegistry()
+
+
+def get_frame_features(audio: np.ndarray, sr: int = 16000,
+                       frame_length: int = DEFAULT_FRAME_LENGTH,
+                       hop_length: int = DEFAULT_HOP_LENGTH) -> FrameFeatures:
+    """
+    Frame features for `audio`, shared with every other caller passing the same array.
+
+    Args:
+        audio: Mono audio signal (not modified in place afterwards)
+        sr: Sample rate
+        frame_length: Samples per frame
+        hop_length: Samples between frame starts
+    """
+    if isinstance(audio, np.ndarray):
+        return _registry.get(audio, sr, frame_length, hop_length)
+    return FrameFeatures(audio, sr, frame_length, hop_length)
+
+
+def forget_frame_features(audio: np.ndarray) -> None:
+    """Drop the shared features of `audio` (e.g. before its buffer is unmapped)."""
+    _registry.forget(audio)
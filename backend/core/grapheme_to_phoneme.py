@@ -1,30 +1,51 @@
 # idk why I needed to do this this is gonna be a very simple program
 # from g2p_en import G2p
+from functools import lru_cache
+
 import eng_to_ipa as G2p
 
+from .optimization_config import config
+from .pronunciation_lexicon import Phonemes, get_pronunciation_lexicon, strip_markers
+
+
+@lru_cache(maxsize=config.get('g2p_cache_size', 4096))
+def _convert_word(word: str) -> Phonemes:
+    """eng_to_ipa for a word the lexicon does not hold (out of vocabulary or with punctuation)."""
+    return tuple(strip_markers(G2p.convert(word)))
+
+
+def _word_phonemes(word: str) -> Phonemes:
+    # eng_to_ipa lowercases every word before looking it up
+    word = word.lower()
+    phonemes = get_pronunciation_lexicon().get(word)
+    if phonemes is None:
+        phonemes = _convert_word(word)
+    return phonemes
+
 
 def grapheme_to_phoneme(grapheme) -> list[tuple]:
     """
     Converts a string of graphemes into phonemes by removing stress markers and
     returning a list of (word, list of individual phonemes).
+
+    Words come from the precompiled lexicon (core.pronunciation_lexicon) or,
+    when they are not in it, eng_to_ipa behind an LRU; the result is the same
+    as converting the whole string with eng_to_ipa.
     """
-    unfiltered_phonemes = G2p.convert(grapheme)
-    normalized = unfiltered_phonemes.split(" ")
-    output = []
-    for word, phonemes in zip(grapheme.split(" "), normalized):
-        output.append(
-            (
-                word,
-                list(
-                    phonemes.replace("ˈ", "")
-                    .replace("ˌ", "")
-                    .replace("*", "")
-                    .replace(",", "")
-                    .replace("'", "")
-                ),
-            )
-        )  # remove stress markers
-    return output
+    # eng_to_ipa splits on any whitespace; its output is then split on single spaces
+    transcriptions = [_word_phonemes(word) for word in grapheme.split()] or [()]
+    return [(word, list(phonemes)) for word, phonemes in zip(grapheme.split(" "), transcriptions)]
+
+
+def grapheme_to_phoneme_batch(graphemes: list[str]) -> list[list[tuple]]:
+    """grapheme_to_phoneme for many sentences, converting each distinct word once."""
+    words = {word.lower() for grapheme in graphemes for word in grapheme.split()}
+    cache = {word: _word_phonemes(word) for word in words}
+    results = []
+    for grapheme in graphemes:
+        transcriptions = [cache[word.lower()] for word in grapheme.split()] or [()]
+        results.append([(word, list(phonemes)) for word, phonemes in zip(grapheme.split(" "), transcriptions)])
+    return results
 
 
 if __name__ == "__main__":
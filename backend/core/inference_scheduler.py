@@ -0,0 +1,250 @@
+"""
+Dynamic micro-batching for phoneme inference.
+
+Concurrent requests used to call extract_phoneme one by one through
+asyncio.to_thread, so every user ran a batch-of-1 session and they all
+competed for the same cores. The scheduler queues requests for a few
+milliseconds, runs them together (extract_phoneme_batch on the extractor),
+and hands each caller its own transcription. Utterances of different
+lengths only share a padded forward pass when the model is given an
+attention mask; otherwise the padding would change the shorter ones'
+transcriptions, so each length runs on its own (length_buckets.padding_groups).
+
+Batches run one at a time per extractor; requests that arrive while a batch
+is running form the next one, so under load batches grow on their own and
+an idle server only pays the short collection window.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .optimization_config import config
+
+# wav2vec2 feature encoder defaults (conv_kernel / conv_stride in the model config)
+WAV2VEC2_CONV_KERNEL = (10, 3, 3, 3, 3, 2, 2)
+WAV2VEC2_CONV_STRIDE = (5, 2, 2, 2, 2, 2, 2)
+
+
+def conv_output_frames(num_samples: int,
+                       conv_kernel=WAV2VEC2_CONV_KERNEL,
+                       conv_stride=WAV2VEC2_CONV_STRIDE) -> int:
+    """Number of logit frames the feature encoder produces for `num_samples` samples."""
+    length = int(num_samples)
+    for kernel, stride in zip(conv_kernel, conv_stride):
+        length = (length - kernel) // stride + 1
+    return max(length, 0)
+
+
+@dataclass
+class _PendingRequest:
+    audio: np.ndarray
+    sampling_rate: int
+    use_optimized_preprocessing: bool
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class InferenceScheduler:
+    """Collects concurrent extract_phoneme calls into batches."""
+
+    def __init__(self, extractor, max_batch_size: int = None, max_wait_ms: float = None,
+                 wait_samples: int = 1024):
+        """
+        Initialize the scheduler.
+
+        Args:
+            extractor: Phoneme extractor exposing extract_phoneme_batch(); only
+                       weakly referenced, so the scheduler does not keep it
+                       (or its registry hold on the model) alive
+            max_batch_size: Largest batch handed to the model (default from config)
+            max_wait_ms: How long the first request in a batch waits for company (default from config)
+            wait_samples: Number of recent queue wait times kept for percentiles
+        """
+        if max_batch_size is None:
+            max_batch_size = config.get('inference_max_batch_size', 8)
+        if max_wait_ms is None:
+            max_wait_ms = config.get('inference_max_wait_ms', 5.0)
+
+        self._extractor = weakref.ref(extractor)
+        self.max_batch_size = max(int(max_batch_size), 1)
+        self.max_wait = max(float(max_wait_ms), 0.0) / 1000.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self._batch_sizes: Dict[int, int] = {}
+        self._queue_waits = deque(maxlen=wait_samples)
+        self._requests = 0
+        self._batches = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._total_inference = 0.0
+
+    @property
+    def extractor(self):
+        """The extractor this scheduler batches for (None once it was garbage collected)."""
+        return self._extractor()
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the batching task on the running loop (restarted if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def extract_phoneme(self, audio, sampling_rate: int = 16000, use_optimized_preprocessing: bool = True):
+        """
+        Queue one utterance and wait for its transcription.
+        
+        Args:
+            audio: Audio data as numpy array
+            sampling_rate: Sample rate of the audio
+            use_optimized_preprocessing: Let the extractor trim the audio (False if already trimmed)
+
+        Raises:
+            ValueError: If the extractor rejects this audio (empty, silent, too short)
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        queue.put_nowait(_PendingRequest(audio, sampling_rate, use_optimized_preprocessing, future))
+        return await future
+
+    async def _collect(self) -> list:
+        """Wait for a first request, then gather more until the batch is full or the window closes."""
+        batch = [await self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """Batching loop: collect, run one model call per input format, fan results out."""
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            batch = [request for request in batch if not request.future.cancelled()]
+            if not batch:
+                continue
+
+            by_format: Dict[tuple, list] = {}
+            for request in batch:
+                key = (request.sampling_rate, request.use_optimized_preprocessing)
+                by_format.setdefault(key, []).append(request)
+
+            for (sampling_rate, use_optimized_preprocessing), requests in by_format.items():
+                try:
+                    results = await self._extract_batch(
+                        [request.audio for request in requests], sampling_rate, use_optimized_preprocessing
+                    )
+                except Exception as e:
+                    results = [e] * len(requests)
+
+                for request, result in zip(requests, results):
+                    if request.future.done():
+                        continue
+                    if isinstance(result, BaseException):
+                        request.future.set_exception(result)
+                    else:
+                        request.future.set_result(result)
+
+            self._record(batch, started, time.perf_counter())
+
+    async def _extract_batch(self, audios: list, sampling_rate: int, use_optimized_preprocessing: bool) -> list:
+        """One extract_phoneme_batch call; the extractor is only referenced while it runs."""
+        extractor = self.extractor
+        if extractor is None:
+            raise RuntimeError("❌ Phoneme extractor was unloaded")
+        return await asyncio.to_thread(
+            extractor.extract_phoneme_batch, audios, sampling_rate, use_optimized_preprocessing
+        )
+
+    def _record(self, batch: list, started: float, finished: float):
+        self._batches += 1
+        self._requests += len(batch)
+        self._batch_sizes[len(batch)] = self._batch_sizes.get(len(batch), 0) + 1
+        self._total_inference += finished - started
+        for request in batch:
+            wait = started - request.enqueued_at
+            self._queue_waits.append(wait)
+            self._total_wait += wait
+            self._max_wait_seen = max(self._max_wait_seen, wait)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size distribution and queue wait times (milliseconds)."""
+        waits = np.array(self._queue_waits) * 1000.0
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+            "batch_size_histogram": dict(sorted(self._batch_sizes.items())),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_wait_ms": {
+                "mean": self._total_wait * 1000.0 / self._requests if self._requests else 0.0,
+                "p50": float(np.percentile(waits, 50)) if waits.size else 0.0,
+                "p95": float(np.percentile(waits, 95)) if waits.size else 0.0,
+                "max": self._max_wait_seen * 1000.0,
+            },
+            "mean_batch_inference_ms": self._total_inference * 1000.0 / self._batches if self._batches else 0.0,
+        }
+
+
+# One scheduler per extractor instance (the schedulers only hold their extractor weakly)
+_schedulers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_inference_scheduler(extractor) -> InferenceScheduler:
+    """Return (creating on first use) the scheduler in front of `extractor`."""
+    scheduler = _schedulers.get(extractor)
+    if scheduler is None:
+        scheduler = InferenceScheduler(extractor)
+        _schedulers[extractor] = scheduler
+    return scheduler
+
+
+async def extract_phonemes(extractor, audio, sampling_rate: int = 16000, use_optimized_preprocessing: bool = True):
+    """
+    Extract phonemes through the micro-batching scheduler when possible.
+
+    Falls back to a direct threaded extract_phoneme call when batching is
+    disabled (INFERENCE_BATCHING=false) or the extractor has no batch method.
+    """
+    if config.get('inference_batching_enabled', True) and hasattr(extractor, 'extract_phoneme_batch'):
+        return await get_inference_scheduler(extractor).extract_phoneme(
+            audio, sampling_rate, use_optimized_preprocessing
+        )
+    if not use_optimized_preprocessing:
+        return await asyncio.to_thread(
+            extractor.extract_phoneme, audio=audio, sampling_rate=sampling_rate, use_optimized_preprocessing=False
+        )
+    return await asyncio.to_thread(extractor.extract_phoneme, audio=audio, sampling_rate=sampling_rate)
+
+
+def get_inference_scheduler_stats() -> Dict[str, Any]:
+    """Statistics for every active scheduler, keyed by model name."""
+    return {
+        getattr(extractor, 'model_name', type(extractor).__name__): scheduler.stats()
+        for extractor, scheduler in list(_schedulers.items())
+    }
@@ -0,0 +1,153 @@
+"""
+Length buckets for model inputs.
+
+Every recording has a different length, so a torch.compile'd model
+recompiles (or falls back to dynamic shapes) and ONNX Runtime cannot reuse
+its memory plan from the previous request. With LENGTH_BUCKETING
+(ONNX_LENGTH_BUCKETING for the ONNX extractor) the extractors zero-pad
+each input up to the next bucket length (LENGTH_BUCKET_SECONDS; inputs
+longer than the largest bucket are padded to a multiple of it), pass the
+attention mask, and trim the logits back to the frames of the real audio.
+Warmup runs every bucket once at startup so the shapes are compiled
+before traffic arrives.
+
+Normalization only uses the real samples (as Wav2Vec2FeatureExtractor
+does with an attention mask). Only models that are given an attention
+mask are padded (uses_attention_mask): without one, the group norm of
+the first conv layer and every attention layer see the zero padding, and
+the logits of the real frames change (on a tiny group-norm wav2vec2
+padded from 2.1 s to 4 s, only 61% of the frame argmaxes agreed). Such
+models, e.g. facebook/wav2vec2-base-960h, always run at the exact length.
+
+ShapeStats counts requests per bucket and every input shape a model sees
+for the first time after its warmup (a recompile for torch.compile), and
+/health/models reports them with torch._dynamo's compile counter.
+"""
+
+import math
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+DEFAULT_BUCKET_SECONDS = (2.0, 4.0, 8.0, 16.0, 32.0)
+
+
+def uses_attention_mask(processor, input_names: Optional[Sequence[str]] = None) -> bool:
+    """
+    Whether the model is given an attention mask, so padding leaves its real frames unchanged.
+
+    Args:
+        processor: Wav2Vec2Processor (or its feature extractor); the mask is
+                   only built when return_attention_mask is set (layer-norm models)
+        input_names: Input names of an exported (ONNX) graph, which must include
+                     attention_mask; None for a PyTorch model
+    """
+    feature_extractor = getattr(processor, 'feature_extractor', processor)
+    if not getattr(feature_extractor, 'return_attention_mask', False):
+        return False
+    return input_names is None or 'attention_mask' in input_names
+
+
+def padding_groups(lengths: Sequence[int], masked: bool) -> List[List[int]]:
+    """
+    Indices of the inputs that can share one padded batch.
+
+    With an attention mask every input goes in one batch; without one only
+    inputs of the same length do, since padding changes the logits of the
+    shorter ones (see the module docstring).
+    """
+    if masked:
+        return [list(range(len(lengths)))] if lengths else []
+    groups: Dict[int, List[int]] = {}
+    for index, length in enumerate(lengths):
+        groups.setdefault(length, []).append(index)
+    return list(groups.values())
+
+
+class LengthBuckets:
+    """Maps a sample count to its padded (bucketed) length."""
+
+    def __init__(self, bucket_seconds: Sequence[float] = DEFAULT_BUCKET_SECONDS, sampling_rate: int = 16000):
+        self.sampling_rate = sampling_rate
+        self.lengths = sorted({int(seconds * sampling_rate) for seconds in bucket_seconds})
+
+    @classmethod
+    def from_config(cls, optimization_config=None) -> "LengthBuckets":
+        from .optimization_config import config
+        optimization_config = optimization_config or config
+        return cls(optimization_config.get('length_bucket_seconds', DEFAULT_BUCKET_SECONDS))
+
+    def padded_length(self, num_samples: int) -> int:
+        """Smallest bucket holding num_samples, or the next multiple of the largest bucket."""
+        for length in self.lengths:
+            if length >= num_samples:
+                return length
+        largest = self.lengths[-1]
+        return largest * math.ceil(num_samples / largest)
+
+    def is_bucket(self, length: int) -> bool:
+        return length in self.lengths
+
+    def seconds(self, length: int) -> float:
+        return round(length / self.sampling_rate, 3)
+
+
+class ShapeStats:
+    """Per-model counts of bucketed requests and of shapes seen after warmup."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Hashable, Dict[str, Any]] = {}
+
+    def _model(self, model: Hashable) -> Dict[str, Any]:
+        return self._models.setdefault(model, {
+            "shapes": set(), "warmed": False, "requests": {}, "new_shapes_after_warmup": 0, "padding_samples": 0,
+        })
+
+    def record(self, model: Hashable, shape: tuple, num_samples: Optional[int] = None) -> bool:
+        """Count one forward pass; returns True if the model has not seen `shape` before."""
+        with self._lock:
+            entry = self._model(model)
+            new = shape not in entry["shapes"]
+            if new:
+                entry["shapes"].add(shape)
+                if entry["warmed"]:
+                    entry["new_shapes_after_warmup"] += 1
+            length = shape[-1]
+            entry["requests"][length] = entry["requests"].get(length, 0) + 1
+            if num_samples is not None:
+                entry["padding_samples"] += max(length - num_samples, 0)
+            return new
+
+    def mark_warmed(self, model: Hashable) -> None:
+        """Shapes seen from now on count as recompiles."""
+        with self._lock:
+            self._model(model)["warmed"] = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = [{
+                "model": list(model) if isinstance(model, tuple) else model,
+                "warmed": entry["warmed"],
+                "distinct_shapes": len(entry["shapes"]),
+                "new_shapes_after_warmup": entry["new_shapes_after_warmup"],
+                "requests_per_length": dict(sorted(entry["requests"].items())),
+                "padding_seconds": round(entry["padding_samples"] / 16000, 2),
+            } for model, entry in self._models.items()]
+        return {"models": models, "torch_compiles": torch_compile_count()}
+
+
+def torch_compile_count() -> Optional[int]:
+    """Frames compiled by torch.compile in this process (None if dynamo is unavailable)."""
+    try:
+        from torch._dynamo.utils import counters
+    except Exception:
+        return None
+    return int(counters["frames"]["total"])
+
+
+shape_stats = ShapeStats()
+
+
+def get_length_bucket_stats() -> Dict[str, Any]:
+    """Bucket usage and post-warmup shape changes of every model."""
+    return shape_stats.stats()
@@ -0,0 +1,154 @@
+"""
+Background, parallel model loading with readiness gating.
+
+routers/ai.py used to build PhonemeAssistant at import time, so the
+phoneme model, word extractor, TTS client and OpenAI client loaded one
+after the other before the app could answer a health check. A
+ModelLoader instead loads each component in its own thread once the app
+has started (load_all_models() from the startup hook), then builds the
+object from them.
+
+Requests that need the models await ModelLoader.get(): they wait until
+loading (including warmup) finishes rather than failing, and only give up
+with ModelsNotReady after MODEL_READY_TIMEOUT seconds or when loading
+failed. GET /health/ready reports get_readiness() and answers 503 until
+every loader is ready.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .optimization_config import config
+
+
+class ModelsNotReady(Exception):
+    """Raised when models are still loading after the wait timeout, or failed to load."""
+
+
+class ModelLoader:
+    """Loads named components in parallel, then builds one object from them."""
+
+    def __init__(self, name: str, components: Dict[str, Callable[[], Any]],
+                 build: Callable[[Dict[str, Any]], Any], register: bool = True):
+        """
+        Initialize the loader (nothing is loaded until start() or get()).
+
+        Args:
+            name: Name reported by /health/ready
+            components: Component name -> zero-argument factory, run in parallel threads
+            build: Called with the loaded components; its result is what get() returns
+            register: Include this loader in load_all_models() and get_readiness()
+        """
+        self.name = name
+        self.components = components
+        self.build = build
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self._value = None
+        self._started_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._task: Optional[asyncio.Future] = None
+        if register:
+            _loaders.append(self)
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def _load_component(self, name: str) -> Any:
+        start = time.time()
+        component = self.components[name]()
+        self.timings[name] = round(time.time() - start, 3)
+        print(f"📦 {self.name}: loaded {name} in {self.timings[name]:.2f}s")
+        return component
+
+    def load(self) -> Any:
+        """Load every component in parallel and build the result (blocking, runs once)."""
+        with self._lock:
+            if self._done.is_set():
+                return self._result()
+            self.state = "loading"
+            self._started_at = time.time()
+            try:
+                with ThreadPoolExecutor(max_workers=len(self.components) or 1,
+                                        thread_name_prefix=f"load-{self.name}") as pool:
+                    futures = {name: pool.submit(self._load_component, name) for name in self.components}
+                    components = {name: future.result() for name, future in futures.items()}
+                start = time.time()
+                self._value = self.build(components)
+                self.timings["build"] = round(time.time() - start, 3)
+                self.state = "ready"
+                print(f"✅ {self.name} ready in {time.time() - self._started_at:.2f}s")
+            except Exception as e:
+                self.state = "failed"
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"❌ {self.name} failed to load: {self.error}")
+            finally:
+                self.timings["total"] = round(time.time() - self._started_at, 3)
+                self._done.set()
+            return self._result()
+
+    def _result(self) -> Any:
+        if self.state != "ready":
+            raise ModelsNotReady(f"{self.name} failed to load: {self.error}")
+        return self._value
+
+    def start(self) -> asyncio.Future:
+        """Start loading in the background on the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.get_loop() is not loop:
+            # load() runs once; on another loop this just waits for its result
+            self._task = loop.run_in_executor(None, self.load)
+            # Failures are reported through get() and status(), not the future
+            self._task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        return self._task
+
+    async def get(self, timeout: float = None) -> Any:
+        """
+        Wait for the loaded object, starting the load if nothing has yet.
+
+        Raises:
+            ModelsNotReady: Still loading after `timeout` seconds
+                (MODEL_READY_TIMEOUT by default), or loading failed
+        """
+        if self._done.is_set():
+            return self._result()
+        if timeout is None:
+            timeout = config.get('model_ready_timeout', 300.0)
+        try:
+            await asyncio.wait_for(asyncio.shield(self.start()), timeout)
+        except asyncio.TimeoutError:
+            raise ModelsNotReady(f"{self.name} is still loading") from None
+        return self._result()
+
+    def status(self) -> Dict[str, Any]:
+        loading_seconds = None
+        if self._started_at is not None and not self._done.is_set():
+            loading_seconds = round(time.time() - self._started_at, 1)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "ready": self.ready,
+            "error": self.error,
+            "loading_seconds": loading_seconds,
+            "timings": dict(self.timings),
+        }
+
+
+_loaders: List[ModelLoader] = []
+
+
+def load_all_models() -> List[asyncio.Future]:
+    """Start every registered loader in the background (call from a startup hook)."""
+    return [loader.start() for loader in _loaders]
+
+
+def get_readiness() -> Dict[str, Any]:
+    """Ready once every registered loader has finished loading and warming up."""
+    loaders = [loader.status() for loader in _loaders]
+    return {"ready": all(loader["ready"] for loader in loaders), "loaders": loaders}
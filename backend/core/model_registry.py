@@ -0,0 +1,214 @@
+"""
+Process-wide registry of loaded models.
+
+Every PhonemeExtractor(), PhonemeExtractorONNX() and WordExtractor() used
+to load its model from scratch (the PyTorch cache write was commented out),
+so the fallback extractors in process_audio and /health/performance-test
+reloaded, quantized, compiled and warmed the model on every call. The
+registry keeps one copy of each model per key (model name plus the
+settings that change the loaded object, e.g. quantization and
+compilation), counts the extractors using it, and only drops a model on
+explicit eviction. Load time, warmup time and memory are recorded per
+model and exposed through /health/models.
+"""
+
+import gc
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil is in requirements.txt
+    psutil = None
+
+
+def _rss_bytes() -> Optional[int]:
+    if psutil is None:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def estimate_model_bytes(model: Any) -> Optional[int]:
+    """Size of a PyTorch module's parameters and buffers (None if not a module)."""
+    if not hasattr(model, "parameters"):
+        return None
+    total = 0
+    for tensor in list(model.parameters()) + list(getattr(model, "buffers", lambda: [])()):
+        total += tensor.numel() * tensor.element_size()
+    return total
+
+
+@dataclass
+class ModelEntry:
+    """One loaded model and its bookkeeping."""
+    key: Hashable
+    components: Dict[str, Any]
+    load_seconds: float
+    rss_delta_bytes: Optional[int] = None
+    weights_bytes: Optional[int] = None
+    warmup_seconds: Optional[float] = None
+    refcount: int = 0
+    hits: int = 0
+    loaded_at: float = field(default_factory=time.time)
+    last_acquired: float = field(default_factory=time.time)
+
+    def summary(self) -> Dict[str, Any]:
+        def mb(value):
+            return None if value is None else round(value / (1024 ** 2), 1)
+        return {
+            "key": list(self.key) if isinstance(self.key, tuple) else self.key,
+            "refcount": self.refcount,
+            "hits": self.hits,
+            "load_seconds": round(self.load_seconds, 3),
+            "warmup_seconds": None if self.warmup_seconds is None else round(self.warmup_seconds, 3),
+            "rss_delta_mb": mb(self.rss_delta_bytes),
+            "weights_mb": mb(self.weights_bytes),
+            "loaded_at": self.loaded_at,
+            "last_acquired": self.last_acquired,
+        }
+
+
+class ModelRegistry:
+    """Reference-counted cache of model components, loaded at most once per key."""
+
+    def __init__(self):
+        self._entries: Dict[Hashable, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    def acquire(self, key: Hashable, loader: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Components for `key`, loading them with `loader` if they are not cached.
+
+        Concurrent first requests for the same key wait for a single load.
+        The reference taken here is returned with release(key, components)
+        (see hold() for releasing it when the holder is garbage collected).
+
+        Args:
+            key: Model name plus the settings that affect the loaded model
+            loader: Returns a dict of components (model, processor, session, ...)
+
+        Returns:
+            The shared components dict
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.hits += 1
+            if entry is None:
+                rss_before = _rss_bytes()
+                start = time.perf_counter()
+                components = loader()
+                load_seconds = time.perf_counter() - start
+                rss_after = _rss_bytes()
+                entry = ModelEntry(
+                    key=key,
+                    components=components,
+                    load_seconds=load_seconds,
+                    rss_delta_bytes=None if rss_before is None else max(rss_after - rss_before, 0),
+                    weights_bytes=components.get("weights_bytes", estimate_model_bytes(components.get("model"))),
+                )
+                with self._lock:
+                    self._entries[key] = entry
+                    self.loads += 1
+            with self._lock:
+                entry.refcount += 1
+                entry.last_acquired = time.time()
+        return entry.components
+
+    def hold(self, owner: Any, key: Hashable, loader: Callable[[], Dict[str, Any]]):
+        """
+        acquire() on behalf of `owner`, released when `owner` is garbage collected.
+
+        Returns:
+            (components, release) - calling release() drops the reference early;
+            it runs at most once
+        """
+        components = self.acquire(key, loader)
+        return components, weakref.finalize(owner, self.release, key, components)
+
+    def release(self, key: Hashable, components: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Drop one reference; the model stays cached until evicted.
+
+        Passing the components that were acquired makes a late release after
+        an eviction and reload leave the new entry's count alone.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (components is not None and entry.components is not components):
+                return
+            if entry.refcount > 0:
+                entry.refcount -= 1
+
+    def record_warmup(self, key: Hashable, seconds: float) -> None:
+        """Store how long the first warmup of `key` took."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.warmup_seconds = seconds
+
+    def contains(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def evict(self, key: Hashable, force: bool = False) -> bool:
+        """
+        Remove a cached model.
+
+        Args:
+            key: Registry key
+            force: Evict even if extractors still reference it (they keep
+                   their components; the next new extractor reloads)
+
+        Returns:
+            True if the model was evicted
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry.refcount > 0 and not force):
+                return False
+            del self._entries[key]
+            self.evictions += 1
+        gc.collect()
+        return True
+
+    def evict_unused(self) -> List[Hashable]:
+        """Evict every model no extractor references; returns their keys."""
+        with self._lock:
+            unused = [key for key, entry in self._entries.items() if entry.refcount == 0]
+        return [key for key in unused if self.evict(key)]
+
+    def clear(self) -> None:
+        """Drop every model regardless of references."""
+        with self._lock:
+            keys = list(self._entries)
+        for key in keys:
+            self.evict(key, force=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = [entry.summary() for entry in self._entries.values()]
+            return {
+                "models": entries,
+                "loaded": len(entries),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "total_load_seconds": round(sum(entry["load_seconds"] for entry in entries), 3),
+            }
+
+
+model_registry = ModelRegistry()
+
+
+def get_model_registry_stats() -> Dict[str, Any]:
+    """Loaded models with reference counts and load/memory metrics."""
+    return model_registry.stats()
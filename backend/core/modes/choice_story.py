@@ -30,7 +30,7 @@ class ChoiceStoryPractice(BaseMode):
         Returns {"sentence": {"option_1": {...}, "option_2": {...}}}.
         """
         per_summary = analysis.per_summary
-        pronunciation_data = analysis.pronunciation_dataframe.to_dict("records")
+        pronunciation_data = analysis.pronunciation_records
         problem_summary = analysis.problem_summary
 
         past_sentences = [entry.sentence for entry in session.feedback_entries]
@@ -81,7 +81,7 @@ class StoryPractice(BaseMode):
         Generate the next story sentence, targeting the user's problem phonemes.
         """
         per_summary = analysis.per_summary
-        pronunciation_data = analysis.pronunciation_dataframe.to_dict("records")
+        pronunciation_data = analysis.pronunciation_records
         problem_summary = analysis.problem_summary
 
         past_sentences = [entry.sentence for entry in session.feedback_entries]
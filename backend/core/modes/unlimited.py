@@ -30,7 +30,7 @@ class UnlimitedPractice(BaseMode):
         this method is called, so GPT only needs to produce the sentence.
         """
         per_summary = analysis.per_summary
-        pronunciation_data = analysis.pronunciation_dataframe.to_dict("records")
+        pronunciation_data = analysis.pronunciation_records
         problem_summary = analysis.problem_summary
 
         phoneme_to_error_words = build_phoneme_to_error_words(pronunciation_data)
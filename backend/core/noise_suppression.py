@@ -0,0 +1,304 @@
+"""
+Noise reduction backends for AdaptiveNoiseReducer.
+
+noisereduce.reduce_noise (especially its non-stationary mode, used for
+high-SNR recordings) is one of the largest CPU costs per request, and the
+edge-preserving path in AdaptiveNoiseReducer runs it three times on
+separate segments. This module makes the backend pluggable:
+
+- NoisereduceBackend: the original noisereduce call.
+- SpectralGateBackend: a lightweight spectral gate. One STFT is computed
+  per recording and the noise estimate, the mask and the resynthesis all
+  reuse it; edge preservation is a per-frame strength instead of three
+  separate passes with crossfades. Frames are processed in fixed blocks
+  with all state carried between blocks, so the same gate can run
+  incrementally on streamed audio (SpectralGate.push / flush); in
+  non-stationary mode that gives the same output as a whole-array call.
+
+Backends are chosen per SNR band (see AdaptiveNoiseReducer and the
+NOISE_BACKEND* settings in core.optimization_config).
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.ndimage import uniform_filter1d
+from scipy.signal import get_window, lfilter
+
+logger = logging.getLogger(__name__)
+
+SNR_BANDS = ("high", "medium", "low")
+
+
+class NoisereduceBackend:
+    """noisereduce.reduce_noise (spectral gating with noisereduce's own STFT)."""
+
+    name = "noisereduce"
+
+    def reduce_noise(self, audio: np.ndarray, sr: int, stationary: bool, prop_decrease: float) -> np.ndarray:
+        import noisereduce as nr  # imports torch; only loaded once this backend is used
+        return nr.reduce_noise(y=audio, sr=sr, stationary=stationary, prop_decrease=prop_decrease)
+
+
+class SpectralGate:
+    """
+    Block-wise spectral gate over a single STFT.
+
+    The noise floor per frequency bin is either a fixed profile (stationary)
+    or tracked causally from block minima of the smoothed power spectrum,
+    allowed to rise by at most noise_rise_db_per_s (non-stationary). Bins
+    more than threshold_db above the floor pass; the soft mask is smoothed
+    across frequency and released slowly over time (onsets are not delayed),
+    then scaled by prop_decrease.
+    """
+
+    def __init__(self,
+                 sr: int = 16000,
+                 stationary: bool = False,
+                 prop_decrease: float = 1.0,
+                 n_fft: int = 512,
+                 hop_length: int = 128,
+                 block_frames: int = 32,
+                 threshold_db: float = 6.0,
+                 slope_db: float = 2.0,
+                 noise_rise_db_per_s: float = 3.0,
+                 freq_smooth_hz: float = 100.0,
+                 release_ms: float = 50.0,
+                 power_smooth_ms: float = 30.0,
+                 min_bias_db: float = 3.0,
+                 quiet_fraction: float = 0.2,
+                 noise_profile_db: Optional[np.ndarray] = None,
+                 edge_samples: int = 0,
+                 edge_prop_decrease: Optional[float] = None,
+                 total_samples: Optional[int] = None):
+        """
+        Initialize the gate.
+
+        Args:
+            sr: Sample rate
+            stationary: Use one fixed noise profile instead of tracking the floor
+            prop_decrease: Noise reduction strength (0-1)
+            n_fft: STFT size (multiple of hop_length)
+            hop_length: STFT hop
+            block_frames: STFT frames processed per block
+            threshold_db: Margin above the noise floor at which bins pass
+            slope_db: Softness of the mask around the threshold
+            noise_rise_db_per_s: Maximum rise of the tracked floor (non-stationary)
+            freq_smooth_hz: Width of the mask smoothing across frequency
+            release_ms: Time constant of the mask release
+            power_smooth_ms: Time constant of the power smoothing used for noise tracking
+            min_bias_db: Offset from the tracked minimum to the mean noise power
+            quiet_fraction: Share of quietest frames used to estimate a stationary profile
+            noise_profile_db: Known noise profile in dB per bin (stationary)
+            edge_samples: Samples at the start/end that use edge_prop_decrease
+            edge_prop_decrease: Strength on the edges (defaults to prop_decrease)
+            total_samples: Recording length, needed to locate the end edge
+        """
+        if n_fft % hop_length:
+            raise ValueError("n_fft must be a multiple of hop_length")
+        self.sr = sr
+        self.stationary = stationary
+        self.prop_decrease = prop_decrease
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.threshold_db = threshold_db
+        self.slope_db = slope_db
+        self.noise_rise_db = noise_rise_db_per_s * block_frames * hop_length / sr
+        self.freq_smooth_bins = max(1, int(round(freq_smooth_hz * n_fft / sr)))
+        self.release = np.exp(-hop_length / (sr * release_ms / 1000))
+        self.power_smooth = np.exp(-hop_length / (sr * power_smooth_ms / 1000))
+        self.min_bias_db = min_bias_db
+        self.quiet_fraction = quiet_fraction
+        self.edge_samples = edge_samples
+        self.edge_prop_decrease = prop_decrease if edge_prop_decrease is None else edge_prop_decrease
+        self.total_samples = total_samples
+
+        self.window = get_window("hann", n_fft)
+        # Squared-window overlap at each offset within a hop (constant for hann with hop = n_fft/4)
+        self._ola_norm = (self.window ** 2).reshape(-1, hop_length).sum(axis=0)
+        self._delay = n_fft - hop_length
+
+        self.noise_db = None if noise_profile_db is None else np.asarray(noise_profile_db, dtype=np.float64)
+        self._buffer = np.zeros(self._delay)
+        self._carry = np.zeros(self._delay)
+        self._power_state = None
+        self._mask_state = None
+        self._frames_done = 0
+        self._samples_in = 0
+        self._samples_out = 0
+
+    def reduce(self, audio: np.ndarray) -> np.ndarray:
+        """Denoise a whole recording (same blocks as streaming; stationary mode profiles the whole clip)."""
+        audio = np.asarray(audio)
+        if self.total_samples is None:
+            self.total_samples = len(audio)
+        if self.stationary and self.noise_db is None and len(audio):
+            self.noise_db = self._quiet_profile(self._spectrum(self._frames_of(audio)))
+        output = np.concatenate([self.push(audio), self.flush()])
+        return output.astype(audio.dtype, copy=False)
+
+    def push(self, samples: np.ndarray) -> np.ndarray:
+        """Feed samples; returns the output samples completed so far (delayed by n_fft - hop)."""
+        samples = np.asarray(samples, dtype=np.float64)
+        self._samples_in += len(samples)
+        self._buffer = np.concatenate([self._buffer, samples])
+        ready = self._available_frames() // self.block_frames * self.block_frames
+        return self._emit(self._consume(ready))
+
+    def flush(self) -> np.ndarray:
+        """Process what is left of the stream and return the remaining output."""
+        emitted = max(0, self._samples_out - self._delay)
+        tail = self._delay + (-(len(self._buffer) - self._delay)) % self.hop_length
+        self._buffer = np.concatenate([self._buffer, np.zeros(tail)])
+        output = self._emit(self._consume(self._available_frames()))
+        return output[:self._samples_in - emitted]
+
+    def _available_frames(self) -> int:
+        if len(self._buffer) < self.n_fft:
+            return 0
+        return (len(self._buffer) - self.n_fft) // self.hop_length + 1
+
+    def _frames_of(self, audio: np.ndarray) -> np.ndarray:
+        audio = np.asarray(audio, dtype=np.float64)
+        if len(audio) < self.n_fft:
+            audio = np.pad(audio, (0, self.n_fft - len(audio)))
+        return sliding_window_view(audio, self.n_fft)[::self.hop_length]
+
+    def _spectrum(self, frames: np.ndarray) -> np.ndarray:
+        return np.fft.rfft(frames * self.window, axis=1)
+
+    def _quiet_profile(self, spectrum: np.ndarray) -> np.ndarray:
+        power = np.abs(spectrum) ** 2
+        energy = power.sum(axis=1)
+        quiet = np.argsort(energy)[:max(1, int(len(energy) * self.quiet_fraction))]
+        return 10 * np.log10(power[quiet].mean(axis=0) + 1e-12)
+
+    def _consume(self, num_frames: int) -> np.ndarray:
+        """Run num_frames frames through the gate block by block; returns finished samples."""
+        if num_frames == 0:
+            return np.zeros(0)
+        outputs = []
+        frames = sliding_window_view(self._buffer, self.n_fft)[::self.hop_length]
+        for start in range(0, num_frames, self.block_frames):
+            block = frames[start:min(start + self.block_frames, num_frames)]
+            outputs.append(self._process_block(self._spectrum(block)))
+        self._buffer = self._buffer[num_frames * self.hop_length:]
+        return np.concatenate(outputs)
+
+    def _process_block(self, spectrum: np.ndarray) -> np.ndarray:
+        num_frames = len(spectrum)
+        power = np.abs(spectrum) ** 2
+        db = 10 * np.log10(power + 1e-12)
+        self._update_noise(power[self._full_frames(num_frames)])
+
+        mask = 1 / (1 + np.exp(-(db - (self.noise_db + self.threshold_db)) / self.slope_db))
+        mask = uniform_filter1d(mask, self.freq_smooth_bins, axis=1, mode="nearest")
+        # Fast attack, slow release: a bin opens immediately and closes over release_ms
+        if self._mask_state is None:
+            self._mask_state = np.zeros((1, mask.shape[1]))
+        released, self._mask_state = lfilter([1 - self.release], [1, -self.release], mask, axis=0,
+                                             zi=self._mask_state)
+        mask = np.maximum(mask, released)
+
+        strength = self._frame_strength(num_frames)[:, None]
+        gated = spectrum * (1 - strength * (1 - mask))
+
+        synthesized = np.fft.irfft(gated, n=self.n_fft, axis=1) * self.window
+        overlap = np.zeros((num_frames - 1) * self.hop_length + self.n_fft)
+        for offset in range(0, self.n_fft, self.hop_length):
+            segment = synthesized[:, offset:offset + self.hop_length].reshape(-1)
+            overlap[offset:offset + len(segment)] += segment
+        overlap[:self._delay] += self._carry
+        finished = num_frames * self.hop_length
+        self._carry = overlap[finished:]
+        self._frames_done += num_frames
+        return overlap[:finished] / np.tile(self._ola_norm, num_frames)
+
+    def _full_frames(self, num_frames: int) -> np.ndarray:
+        """Frames of the next block that do not overlap the zero padding around the signal."""
+        starts = np.arange(self._frames_done, self._frames_done + num_frames) * self.hop_length - self._delay
+        return (starts >= 0) & (starts + self.n_fft <= self._samples_in)
+
+    def _update_noise(self, power: np.ndarray) -> None:
+        """Track the noise floor from the block's (unpadded) frames."""
+        if not len(power):
+            if self.noise_db is None:
+                self.noise_db = np.full(self.n_fft // 2 + 1, -120.0)
+            return
+        if self._power_state is None:
+            # Start the smoother at the first frame rather than at zero
+            self._power_state = power[:1] * self.power_smooth
+        smoothed, self._power_state = lfilter([1 - self.power_smooth], [1, -self.power_smooth], power, axis=0,
+                                              zi=self._power_state)
+        # The minimum of the smoothed power sits below the mean noise power; compensate
+        block_floor = 10 * np.log10(smoothed.min(axis=0) + 1e-12) + self.min_bias_db
+        if self.noise_db is None:
+            self.noise_db = block_floor
+        elif not self.stationary:
+            self.noise_db = np.minimum(self.noise_db + self.noise_rise_db, block_floor)
+
+    def _frame_strength(self, num_frames: int) -> np.ndarray:
+        strength = np.full(num_frames, float(self.prop_decrease))
+        if self.edge_samples <= 0:
+            return strength
+        centers = (np.arange(self._frames_done, self._frames_done + num_frames) * self.hop_length
+                   + self.n_fft // 2 - self._delay)
+        edges = centers < self.edge_samples
+        if self.total_samples is not None:
+            edges |= centers >= self.total_samples - self.edge_samples
+        strength[edges] = self.edge_prop_decrease
+        return strength
+
+    def _emit(self, finished: np.ndarray) -> np.ndarray:
+        """Drop the leading padding from the finished samples."""
+        skip = max(0, self._delay - self._samples_out)
+        self._samples_out += len(finished)
+        return finished[skip:]
+
+
+class SpectralGateBackend:
+    """Fast single-STFT spectral gate (see SpectralGate)."""
+
+    name = "spectral_gate"
+
+    def __init__(self, **gate_options):
+        self.gate_options = gate_options
+
+    def reduce_noise(self, audio: np.ndarray, sr: int, stationary: bool, prop_decrease: float) -> np.ndarray:
+        return SpectralGate(sr=sr, stationary=stationary, prop_decrease=prop_decrease,
+                            **self.gate_options).reduce(audio)
+
+    def reduce_noise_with_edges(self, audio: np.ndarray, sr: int, stationary: bool, prop_decrease: float,
+                                edge_samples: int, edge_prop_decrease: float) -> np.ndarray:
+        """One pass with gentler strength on the first/last edge_samples (no segment crossfades)."""
+        return SpectralGate(sr=sr, stationary=stationary, prop_decrease=prop_decrease,
+                            edge_samples=edge_samples, edge_prop_decrease=edge_prop_decrease,
+                            **self.gate_options).reduce(audio)
+
+
+NOISE_BACKENDS = {
+    NoisereduceBackend.name: NoisereduceBackend,
+    SpectralGateBackend.name: SpectralGateBackend,
+}
+
+_backend_instances: Dict[str, object] = {}
+
+
+def get_noise_backend(name: str):
+    """Shared backend instance by name (unknown names fall back to noisereduce)."""
+    if name not in NOISE_BACKENDS:
+        logger.warning(f"Unknown noise reduction backend '{name}' - using {NoisereduceBackend.name}")
+        name = NoisereduceBackend.name
+    if name not in _backend_instances:
+        _backend_instances[name] = NOISE_BACKENDS[name]()
+    return _backend_instances[name]
+
+
+def configured_noise_backends() -> Dict[str, object]:
+    """Backend per SNR band from core.optimization_config."""
+    from .optimization_config import config
+    return {band: get_noise_backend(config.get(f"noise_backend_{band}_snr", NoisereduceBackend.name))
+            for band in SNR_BANDS}
@@ -0,0 +1,166 @@
+"""
+ONNX Runtime inference through IO binding with reusable buffers.
+
+PhonemeExtractorONNX used to build input_values with the processor (a
+float64 -> float32 conversion plus a normalized copy), cast them again with
+astype(np.float32), look up session.get_inputs() and let ONNX Runtime
+allocate a new logits array on every request.
+
+OnnxIOBinder keeps pools of input/output buffers per length bucket
+(core.length_buckets, LENGTH_BUCKET_SECONDS). A request takes a buffer set
+from the smallest bucket that fits, copies the audio in, normalizes it in
+place (the same zero-mean/unit-variance formula as
+Wav2Vec2FeatureExtractor) and has ONNX Runtime write the logits straight
+into the reused output buffer. By default exactly-sized views of both
+buffers are bound, so the model sees the real length; with pad_to_bucket
+(for_session only keeps it for models given an attention mask) the whole
+zero-padded bucket is bound with the mask so every request of a bucket
+has the same shape, and the logits are trimmed to the real frames. New buffers are only allocated
+when every set of a bucket is in use, or for audio longer than the
+largest bucket; allocation counts are kept for the benchmark and the
+extractor's get_model_info().
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from .inference_scheduler import conv_output_frames
+from .length_buckets import DEFAULT_BUCKET_SECONDS, LengthBuckets, uses_attention_mask
+
+
+class IOBuffers:
+    """Input samples (and attention mask) and output logits for one in-flight request."""
+
+    def __init__(self, session, capacity: int, vocab_size: int, with_mask: bool = False):
+        self.capacity = capacity
+        self.input = np.empty(capacity, dtype=np.float32)
+        self.mask = np.empty(capacity, dtype=np.int64) if with_mask else None
+        self.output = np.empty((max(conv_output_frames(capacity), 1), vocab_size), dtype=np.float32)
+        self.binding = session.io_binding()
+
+    @property
+    def nbytes(self) -> int:
+        return self.input.nbytes + self.output.nbytes + (self.mask.nbytes if self.mask is not None else 0)
+
+
+class OnnxIOBinder:
+    """Runs a single-input CTC session on pooled, bucketed IO buffers."""
+
+    def __init__(self, session, input_name: str, output_name: str, vocab_size: int,
+                 normalize: bool = True, sampling_rate: int = 16000,
+                 bucket_seconds: Sequence[float] = DEFAULT_BUCKET_SECONDS,
+                 pad_to_bucket: bool = False, mask_name: Optional[str] = None):
+        self.session = session
+        self.input_name = input_name
+        self.output_name = output_name
+        self.mask_name = mask_name
+        self.vocab_size = vocab_size
+        self.normalize = normalize
+        self.sampling_rate = sampling_rate
+        self.pad_to_bucket = pad_to_bucket
+        self.length_buckets = LengthBuckets(bucket_seconds, sampling_rate)
+        self.buckets = self.length_buckets.lengths
+        self._free: Dict[int, List[IOBuffers]] = {capacity: [] for capacity in self.buckets}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.allocations = 0
+        self.allocated_bytes = 0
+        self.oversize_calls = 0
+
+    @classmethod
+    def for_session(cls, session, processor, **kwargs) -> Optional["OnnxIOBinder"]:
+        """
+        Binder for a wav2vec2-style session, or None if its output width is not fixed.
+
+        Args:
+            session: InferenceSession taking raw samples as its first input
+            processor: Wav2Vec2Processor of the model (for do_normalize and
+                       return_attention_mask: pad_to_bucket is dropped unless the
+                       model is given a mask)
+        """
+        output = session.get_outputs()[0]
+        vocab_size = output.shape[-1] if output.shape else None
+        if not isinstance(vocab_size, int):
+            return None
+        feature_extractor = getattr(processor, 'feature_extractor', processor)
+        input_names = [model_input.name for model_input in session.get_inputs()]
+        kwargs['pad_to_bucket'] = kwargs.get('pad_to_bucket', False) and uses_attention_mask(processor, input_names)
+        return cls(session, input_names[0], output.name, vocab_size,
+                   normalize=getattr(feature_extractor, 'do_normalize', True),
+                   mask_name='attention_mask' if 'attention_mask' in input_names else None, **kwargs)
+
+    def bound_length(self, num_samples: int) -> int:
+        """Input length the model is run with for num_samples samples."""
+        return self.length_buckets.padded_length(num_samples) if self.pad_to_bucket else num_samples
+
+    def _take(self, num_samples: int) -> IOBuffers:
+        capacity = self.length_buckets.padded_length(num_samples)
+        with self._lock:
+            self.calls += 1
+            if not self.length_buckets.is_bucket(capacity):
+                self.oversize_calls += 1
+            elif self._free[capacity]:
+                return self._free[capacity].pop()
+        buffers = IOBuffers(self.session, capacity, self.vocab_size, with_mask=self.mask_name is not None)
+        with self._lock:
+            self.allocations += 1
+            self.allocated_bytes += buffers.nbytes
+        return buffers
+
+    def _give_back(self, buffers: IOBuffers) -> None:
+        with self._lock:
+            if buffers.capacity in self._free:
+                self._free[buffers.capacity].append(buffers)
+
+    @contextmanager
+    def run(self, audio: np.ndarray) -> Iterator[np.ndarray]:
+        """
+        Run the model on `audio`.
+
+        Yields:
+            Logits of shape (1, frames, vocab). They are a view of a pooled
+            buffer and only valid inside the with block
+        """
+        num_samples = len(audio)
+        frames = conv_output_frames(num_samples)
+        length = self.bound_length(num_samples)
+        bound_frames = conv_output_frames(length)
+        buffers = self._take(num_samples)
+        try:
+            samples = buffers.input[:num_samples]
+            np.copyto(samples, audio, casting='unsafe')
+            if self.normalize:
+                mean = samples.mean()
+                std = np.sqrt(samples.var() + 1e-7)
+                samples -= mean
+                samples /= std
+            buffers.input[num_samples:length] = 0.0
+
+            binding = buffers.binding
+            binding.bind_input(self.input_name, 'cpu', 0, np.float32, [1, length], buffers.input.ctypes.data)
+            if self.mask_name is not None:
+                buffers.mask[:num_samples] = 1
+                buffers.mask[num_samples:length] = 0
+                binding.bind_input(self.mask_name, 'cpu', 0, np.int64, [1, length], buffers.mask.ctypes.data)
+            binding.bind_output(self.output_name, 'cpu', 0, np.float32, [1, bound_frames, self.vocab_size],
+                                buffers.output.ctypes.data)
+            self.session.run_with_iobinding(binding)
+            yield buffers.output[np.newaxis, :frames]
+        finally:
+            self._give_back(buffers)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "allocations": self.allocations,
+                "allocated_mb": round(self.allocated_bytes / 1024 ** 2, 2),
+                "reuse_rate": round(1 - self.allocations / self.calls, 3) if self.calls else None,
+                "oversize_calls": self.oversize_calls,
+                "pad_to_bucket": self.pad_to_bucket,
+                "bucket_seconds": [round(capacity / self.sampling_rate, 2) for capacity in self.buckets],
+                "pooled_buffers": {capacity: len(free) for capacity, free in self._free.items()},
+            }
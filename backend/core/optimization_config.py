@@ -33,10 +33,99 @@ class OptimizationConfig:
             'enable_performance_logging': self._get_bool('ENABLE_PERFORMANCE_LOGGING', False),
             'model_cache_enabled': self._get_bool('ENABLE_MODEL_CACHE', True),
             'warmup_runs': int(os.getenv('MODEL_WARMUP_RUNS', '1')),
+            # Seconds a request waits for models still loading at startup before a 503
+            'model_ready_timeout': float(os.getenv('MODEL_READY_TIMEOUT', '300')),
+            
+            # Shared Model Weights (core.shared_weights): memory-map weights from
+            # SHARED_WEIGHTS_DIR so uvicorn/gunicorn workers share one copy
+            'shared_model_weights': self._get_bool('SHARED_MODEL_WEIGHTS', False),
+            'shared_weights_dir': os.getenv('SHARED_WEIGHTS_DIR', '~/.cache/wordwiz/shared_weights'),
+            
+            # Thread Settings (core.runtime_resources): 0 derives the count from the
+            # cgroup CPU quota
+            'torch_intra_op_threads': int(os.getenv('TORCH_INTRA_OP_THREADS', '0')),
+            'torch_inter_op_threads': int(os.getenv('TORCH_INTER_OP_THREADS', '0')),
+            'ort_intra_op_threads': int(os.getenv('ORT_INTRA_OP_THREADS', '0')),
+            'ort_inter_op_threads': int(os.getenv('ORT_INTER_OP_THREADS', '0')),
+            'executor_workers': int(os.getenv('EXECUTOR_WORKERS', '0')),
+            
+            # Audio Process Pool (core.audio_process_pool): run preprocessing and
+            # alignment in worker processes (0 workers = one per available CPU)
+            'audio_process_pool': self._get_bool('AUDIO_PROCESS_POOL', False),
+            'audio_process_workers': int(os.getenv('AUDIO_PROCESS_WORKERS', '0')),
+            
+            # Admission Control (core.admission_control): analyses running at once,
+            # how many may wait beyond those before a 503, and per-stage limits
+            # (0 = one per available CPU; for inference, INFERENCE_MAX_BATCH_SIZE)
+            'analysis_max_active': int(os.getenv('ANALYSIS_MAX_ACTIVE', '8')),
+            'analysis_max_queue': int(os.getenv('ANALYSIS_MAX_QUEUE', '32')),
+            'analysis_retry_after': int(os.getenv('ANALYSIS_RETRY_AFTER', '10')),
+            'preprocess_concurrency': int(os.getenv('PREPROCESS_CONCURRENCY', '0')),
+            'inference_concurrency': int(os.getenv('INFERENCE_CONCURRENCY', '0')),
+            'gpt_concurrency': int(os.getenv('GPT_CONCURRENCY', '8')),
+            'tts_concurrency': int(os.getenv('TTS_CONCURRENCY', '4')),
+            
+            # Deepgram Word Extraction (core.word_extractor.WordExtractorOnline): requests
+            # in flight (also the keep-alive pool size) and the total seconds a call
+            # may take across retries
+            'deepgram_url': os.getenv('DEEPGRAM_URL', 'https://api.deepgram.com/v1/listen'),
+            'deepgram_concurrency': int(os.getenv('DEEPGRAM_CONCURRENCY', '8')),
+            'deepgram_deadline': float(os.getenv('DEEPGRAM_DEADLINE', '20')),
+            
+            # ONNX Model Variant: 'float' (model.onnx) or 'int8' (model_int8.onnx,
+            # built by quantize_model.py)
+            'onnx_model_variant': os.getenv('ONNX_MODEL_VARIANT', 'float').lower(),
+            
+            # ONNX IO Binding (core.onnx_io_binding): reuse input/output buffers
+            # pooled per audio length bucket
+            'onnx_io_binding': self._get_bool('ONNX_IO_BINDING', True),
+            
+            # Length Buckets (core.length_buckets): pad model inputs up to these
+            # lengths (seconds) so compiled graphs see a few fixed shapes. Only
+            # models that take an attention mask are padded. ONNX Runtime does not
+            # recompile per shape, so it pads only with ONNX_LENGTH_BUCKETING=true
+            'length_bucketing': self._get_bool('LENGTH_BUCKETING', True),
+            'onnx_length_bucketing': self._get_bool('ONNX_LENGTH_BUCKETING', False),
+            'length_bucket_seconds': [float(seconds) for seconds in
+                                      os.getenv('LENGTH_BUCKET_SECONDS', '2,4,8,16,32').split(',')],
             
             # Fallback Settings
             'fallback_on_error': self._get_bool('FALLBACK_ON_OPTIMIZATION_ERROR', True),
             
+            # Phoneme Extraction Settings
+            # 'free' decodes phonemes and regroups them into words; 'forced' aligns the
+            # model's frame scores directly to the expected sentence (core.ctc_forced_alignment)
+            'phoneme_extraction_mode': os.getenv('PHONEME_EXTRACTION_MODE', 'free').lower(),
+            
+            # Inference Batching Settings (core.inference_scheduler)
+            'inference_batching_enabled': self._get_bool('INFERENCE_BATCHING', True),
+            'inference_max_batch_size': int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '8')),
+            'inference_max_wait_ms': float(os.getenv('INFERENCE_MAX_WAIT_MS', '5')),
+            'max_parallel_chunks': int(os.getenv('MAX_PARALLEL_CHUNKS', '8')),
+            
+            # Noise Reduction Settings (core.noise_suppression): backend per SNR band,
+            # 'noisereduce' or 'spectral_gate'; NOISE_BACKEND sets all bands at once
+            'noise_backend_high_snr': os.getenv('NOISE_BACKEND_HIGH_SNR', os.getenv('NOISE_BACKEND', 'noisereduce')),
+            'noise_backend_medium_snr': os.getenv('NOISE_BACKEND_MEDIUM_SNR', os.getenv('NOISE_BACKEND', 'noisereduce')),
+            'noise_backend_low_snr': os.getenv('NOISE_BACKEND_LOW_SNR', os.getenv('NOISE_BACKEND', 'noisereduce')),
+            
+            # Denoise Policy (core.denoise_policy): skip noise reduction above
+            # DENOISE_SKIP_SNR_DB, only high-pass above DENOISE_HIGHPASS_SNR_DB
+            'denoise_policy_enabled': self._get_bool('DENOISE_POLICY', True),
+            'denoise_skip_snr_db': float(os.getenv('DENOISE_SKIP_SNR_DB', '35')),
+            'denoise_highpass_snr_db': float(os.getenv('DENOISE_HIGHPASS_SNR_DB', '25')),
+            'denoise_highpass_cutoff_hz': float(os.getenv('DENOISE_HIGHPASS_CUTOFF_HZ', '80')),
+            
+            # Grapheme-to-Phoneme (core.pronunciation_lexicon): precompiled CMU
+            # lexicon file, and the LRU for words it does not hold
+            'pronunciation_lexicon_path': os.getenv('PRONUNCIATION_LEXICON_PATH',
+                                                    '~/.cache/wordwiz/pronunciation_lexicon.tsv'),
+            'g2p_cache_size': int(os.getenv('G2P_CACHE_SIZE', '4096')),
+            
+            # Alignment Settings
+            'use_vectorized_alignment': self._get_bool('USE_VECTORIZED_ALIGNMENT', True),
+            'alignment_cache_size': int(os.getenv('ALIGNMENT_CACHE_SIZE', '4096')),
+            
             # Memory Settings
             'clear_cache_after_init': self._get_bool('CLEAR_CACHE_AFTER_INIT', False),
         }
@@ -6,16 +6,15 @@ import os
 import re
 
 import soundfile as sf
-import torch
 from core.grapheme_to_phoneme import grapheme_to_phoneme
 from core.optimization_config import config
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from .audio_validation import log_audio_characteristics, validate_audio_output
-from .phoneme_extractor import PhonemeExtractor
-from .phoneme_extractor_onnx import PhonemeExtractorONNX
-from .process_audio import analyze_results, process_audio_array
+from .prepared_audio import PreparedAudio
+from .runtime_resources import apply_torch_threads, get_runtime_resources
+from .process_audio import analyze_results, process_audio_array, process_audio_forced_alignment
 from .text_to_audio import GoogleTTSAPIClient
 from .word_extractor import WordExtractorOnline
 
@@ -27,25 +26,48 @@ _prompt_cache: dict[tuple, str] = {}
 
 
 class PhonemeAssistant:
-    def __init__(self, use_optimized_model: bool = None):
+    def __init__(self, use_optimized_model: bool = None, components: dict = None):
+        """
+        Args:
+            use_optimized_model: Use the optimized PyTorch model (default from config)
+            components: Already loaded components (see component_loaders); loaded
+                one after the other here when omitted
+        """
         # Load the API keys and environment variables
         load_dotenv()
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-        # Check if GPU is available and set the device
-        if torch.cuda.is_available():
-            self.device = torch.device("cuda")
-            print("Using GPU for processing.")
-        else:
-            self.device = torch.device("cpu")
-            print("Using CPU for processing.")
+        if components is None:
+            components = {name: load() for name, load in self.component_loaders(use_optimized_model).items()}
+        self.client = components["client"]
+        self.phoneme_extractor = components["phoneme_extractor"]
+        self.word_extractor = components["word_extractor"]
+        self.tts = components["tts"]
+
+    @property
+    def device(self):
+        """Device torch would run on (torch is only imported by the PyTorch backend, so on demand here)."""
+        import torch
+        return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+    @classmethod
+    def component_loaders(cls, use_optimized_model: bool = None) -> dict:
+        """Zero-argument factories for each component, independent so they can load in parallel."""
+        load_dotenv()
+        return {
+            "phoneme_extractor": lambda: cls.load_phoneme_extractor(use_optimized_model),
+            "word_extractor": WordExtractorOnline,
+            "tts": GoogleTTSAPIClient,
+            "client": lambda: OpenAI(api_key=os.getenv("OPENAI_API_KEY")),
+        }
 
-        # Use all available CPU cores for better performance
-        num_cores = os.cpu_count() or 4
-        torch.set_num_threads(num_cores)
-        torch.set_num_interop_threads(num_cores)
-        print(f"Using {num_cores} CPU threads for PyTorch inference")
+    @staticmethod
+    def load_phoneme_extractor(use_optimized_model: bool = None):
+        """
+        Load (and warm up) the configured phoneme extractor.
 
+        Only the active backend's module is imported: the ONNX backend does
+        not load the PyTorch extractor, the PyTorch backend not onnxruntime.
+        """
         # Determine optimization settings from environment or parameter
         if use_optimized_model is None:
             use_optimized_model = config.get('use_optimized_model', True)
@@ -57,32 +79,41 @@ class PhonemeAssistant:
         if use_onnx:
             print("Initializing ONNX-based PhonemeExtractor for faster inference...")
             try:
-                self.phoneme_extractor = PhonemeExtractorONNX()
+                from .phoneme_extractor_onnx import PhonemeExtractorONNX
+                phoneme_extractor = PhonemeExtractorONNX()
                 print("[OK] ONNX Runtime backend loaded successfully")
+                return phoneme_extractor
             except Exception as e:
                 print(f"[WARN] ONNX loading failed ({e}), falling back to PyTorch")
-                self.phoneme_extractor = PhonemeExtractor()
+
+        from .phoneme_extractor import PhonemeExtractor
+
+        # Size torch's thread pools to the container's CPU quota, not the host's cores
+        threads = apply_torch_threads()
+        print(f"Using {threads.torch_intra_op} CPU threads for PyTorch inference "
+              f"({get_runtime_resources().effective_cpus:.2f} CPUs available)")
+
+        if use_onnx:
+            phoneme_extractor = PhonemeExtractor()
         elif use_optimized_model:
             print("Initializing optimized PyTorch PhonemeExtractor...")
             if config.get('enable_performance_logging', False):
                 print(config.summary())
-            self.phoneme_extractor = PhonemeExtractor()
+            phoneme_extractor = PhonemeExtractor()
         else:
             print("Using standard PhonemeExtractor...")
-            self.phoneme_extractor = PhonemeExtractor(
+            phoneme_extractor = PhonemeExtractor(
                 use_quantization=False,
                 use_fast_model=False
             )
-            
-        self.word_extractor = WordExtractorOnline()
-        self.tts = GoogleTTSAPIClient()
+        return phoneme_extractor
     
     def get_performance_info(self) -> dict:
         """Get performance information about the current configuration."""
         model_info = self.phoneme_extractor.get_model_info()
         return {
             'device': str(self.device),
-            'cuda_available': torch.cuda.is_available(),
+            'cuda_available': self.device.type == "cuda",
             'model_info': model_info,
             'config_summary': config.summary()
         }
@@ -263,7 +294,7 @@ class PhonemeAssistant:
             audio_path (str, optional): Path to a specific audio file to process. Defaults to None.
 
         Returns:
-            tuple: Model response, DataFrame, highest_per_word, problem_summary, per_summary.
+            tuple: Model response, PronunciationTable, highest_per_word, problem_summary, per_summary.
         """
 
         # Use the provided audio file
@@ -279,20 +310,33 @@ class PhonemeAssistant:
         )
 
         ground_truth_phonemes = grapheme_to_phoneme(attempted_sentence)
-        pronunciation_data = await process_audio_array(
-            ground_truth_phonemes=ground_truth_phonemes,
-            audio_array=audio_array,
-            sampling_rate=16000,
-            phoneme_extraction_model=self.phoneme_extractor,
-            word_extraction_model=self.word_extractor,
-        )
+        # Carries stage flags and timings when the router already preprocessed the audio
+        audio_array = PreparedAudio.wrap(audio_array, 16000)
+        if (config.get('phoneme_extraction_mode', 'free') == 'forced'
+                and hasattr(self.phoneme_extractor, 'extract_logits')):
+            # Align frame scores to the known sentence - no word extraction or regrouping DP
+            pronunciation_data = await process_audio_forced_alignment(
+                ground_truth_phonemes=ground_truth_phonemes,
+                audio_array=audio_array,
+                sampling_rate=16000,
+                phoneme_extraction_model=self.phoneme_extractor,
+            )
+        else:
+            pronunciation_data = await process_audio_array(
+                ground_truth_phonemes=ground_truth_phonemes,
+                audio_array=audio_array,
+                sampling_rate=16000,
+                phoneme_extraction_model=self.phoneme_extractor,
+                word_extraction_model=self.word_extractor,
+            )
 
         if status_callback:
             status_callback("Analyzing results...")
 
-        pronunciation_dataframe, highest_per_word, problem_summary, per_summary = (
-            analyze_results(pronunciation_data)
-        )
+        with audio_array.timed("analysis"):
+            pronunciation_dataframe, highest_per_word, problem_summary, per_summary = (
+                analyze_results(pronunciation_data)
+            )
 
         if verbose:
             print("Dataframe: ")
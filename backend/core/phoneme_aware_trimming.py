@@ -12,9 +12,11 @@ Created as part of Phase 2: Improved Edge Handling & Silence Trimming
 
 import numpy as np
 import librosa
-from typing import Tuple
+from typing import Optional, Tuple
 import logging
 
+from .frame_features import FrameFeatures, get_frame_features
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,7 +86,8 @@ class PhonemeAwareTrimmer:
     def detect_speech_boundaries(self,
                                  audio: np.ndarray,
                                  use_zcr: bool = True,
-                                 min_silence_duration: float = 0.3) -> Tuple[int, int]:
+                                 min_silence_duration: float = 0.3,
+                                 features: Optional[FrameFeatures] = None) -> Tuple[int, int]:
         """
         Detect speech boundaries using energy + zero-crossing rate.
         
@@ -95,6 +98,7 @@ class PhonemeAwareTrimmer:
             audio: Input audio signal
             use_zcr: Whether to use zero-crossing rate (default True)
             min_silence_duration: Minimum silence duration in seconds (default 0.3s)
+            features: Shared FrameFeatures of `audio` (looked up if None)
             
         Returns:
             Tuple of (start_sample, end_sample) for speech boundaries
@@ -104,21 +108,15 @@ class PhonemeAwareTrimmer:
         
         frame_length = 2048
         hop_length = 512
+        if features is None:
+            features = get_frame_features(audio, self.sr, frame_length, hop_length)
         
-        # Calculate frame-wise energy (RMS)
-        energy = librosa.feature.rms(
-            y=audio,
-            frame_length=frame_length,
-            hop_length=hop_length
-        )[0]
+        # Frame-wise energy (RMS)
+        energy = features.rms
         
         if use_zcr:
             # Zero-crossing rate (detects high-frequency sounds like consonants)
-            zcr = librosa.feature.zero_crossing_rate(
-                audio,
-                frame_length=frame_length,
-                hop_length=hop_length
-            )[0]
+            zcr = features.zcr
             
             # Normalize ZCR to similar range as energy
             zcr_normalized = (zcr - np.min(zcr)) / (np.max(zcr) - np.min(zcr) + 1e-10)
@@ -158,6 +156,31 @@ class PhonemeAwareTrimmer:
         
         return start_sample, end_sample
     
+    def speech_bounds(self,
+                      audio: np.ndarray,
+                      padding_ms: int = 200,
+                      use_zcr: bool = True) -> Tuple[int, int]:
+        """
+        Sample range trim_with_speech_detection keeps.
+        
+        Args:
+            audio: Input audio signal
+            padding_ms: Padding to add on each side (default 200ms)
+            use_zcr: Whether to use zero-crossing rate (default True)
+            
+        Returns:
+            Tuple of (start_sample, end_sample) including the padding
+        """
+        if len(audio) == 0:
+            return 0, 0
+        
+        # Detect speech boundaries
+        start_sample, end_sample = self.detect_speech_boundaries(audio, use_zcr=use_zcr)
+        
+        # Add padding
+        padding_samples = int(padding_ms * self.sr / 1000)
+        return max(0, start_sample - padding_samples), min(len(audio), end_sample + padding_samples)
+    
     def trim_with_speech_detection(self,
                                    audio: np.ndarray,
                                    padding_ms: int = 200,
@@ -179,14 +202,7 @@ class PhonemeAwareTrimmer:
         if len(audio) == 0:
             return audio
         
-        # Detect speech boundaries
-        start_sample, end_sample = self.detect_speech_boundaries(audio, use_zcr=use_zcr)
-        
-        # Add padding
-        padding_samples = int(padding_ms * self.sr / 1000)
-        start_padded = max(0, start_sample - padding_samples)
-        end_padded = min(len(audio), end_sample + padding_samples)
-        
+        start_padded, end_padded = self.speech_bounds(audio, padding_ms=padding_ms, use_zcr=use_zcr)
         result = audio[start_padded:end_padded]
         
         logger.info(f"Trimmed audio from {len(audio)} to {len(result)} samples "
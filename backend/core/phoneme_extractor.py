@@ -8,6 +8,11 @@ import gc
 from typing import Optional
 from .optimization_config import config
 from .audio_optimization import OptimizedAudioPreprocessor
+from .ctc_forced_alignment import CTCVocabulary
+from .length_buckets import LengthBuckets, padding_groups, shape_stats, torch_compile_count, uses_attention_mask
+from .model_registry import model_registry
+from .shared_weights import load_pytorch_model_mmap, shared_weights_enabled
+from .inference_scheduler import WAV2VEC2_CONV_KERNEL, WAV2VEC2_CONV_STRIDE, conv_output_frames
 
 
 def default_model_output_processing(transcription):
@@ -21,9 +26,6 @@ def default_model_output_processing(transcription):
     return filtered_transcription
 
 class PhonemeExtractor:
-    # Class-level cache for models to enable singleton-like behavior
-    _model_cache = {}
-    
     def __init__(self, 
                  model_name: str = "speech31/wav2vec2-large-TIMIT-IPA", 
                  model_output_processing=default_model_output_processing,
@@ -56,6 +58,12 @@ class PhonemeExtractor:
         if use_fast_model:
             model_name = "facebook/wav2vec2-base-960h"  # Smaller, faster model
             
+        # Shared (memory-mapped) weights must stay float: quantizing would give
+        # every worker a private copy again
+        self._shared_weights = shared_weights_enabled()
+        if self._shared_weights:
+            use_quantization = False
+            
         self.model_name = model_name
         self.use_quantization = use_quantization
         self.model_output_processing = model_output_processing
@@ -67,63 +75,92 @@ class PhonemeExtractor:
             enable_logging=self._performance_logging
         )
         
-        # Check if model is already cached
-        cache_key = f"{model_name}_{use_quantization}_{self.config.get('use_compilation', True)}"
+        # Inputs are padded to a few fixed lengths so torch.compile sees fixed
+        # shapes (core.length_buckets), if the model takes an attention mask
+        self.length_buckets = LengthBuckets.from_config(self.config)
+        self._pad_to_bucket = self.config.get('length_bucketing', True)
         
-        if (self.config.get('model_cache_enabled', True) and 
-            cache_key in self._model_cache):
-            if self._performance_logging:
+        # Models are shared process-wide (core.model_registry), keyed by everything
+        # that changes the loaded model
+        self._registry_key = (
+            "pytorch-phoneme", model_name, use_quantization,
+            self.config.get('use_compilation', True), self.config.get('compilation_mode', 'reduce-overhead'),
+            self._shared_weights, tuple(self.length_buckets.lengths) if self._pad_to_bucket else None,
+        )
+        self._registry_release = None
+        if self.config.get('model_cache_enabled', True):
+            if self._performance_logging and model_registry.contains(self._registry_key):
                 print(f"Using cached model: {model_name}")
-            cached = self._model_cache[cache_key]
-            self.processor = cached['processor']
-            self.model = cached['model']
-            self.blank_token_id = cached['blank_token_id']
+            components, self._registry_release = model_registry.hold(
+                self, self._registry_key, self._load_components
+            )
         else:
+            components = self._load_components()
+        
+        self.processor = components['processor']
+        self.model = components['model']
+        self.blank_token_id = components['blank_token_id']
+        self.use_quantization = components['use_quantization']
+        if self._pad_to_bucket and not uses_attention_mask(self.processor):
             if self._performance_logging:
-                print(f"Loading model: {model_name}")
-            start_time = time.time()
+                print(f"{model_name} takes no attention mask, running inputs at their exact length")
+            self._pad_to_bucket = False
+        
+        # Warm up once per loaded model, not once per extractor
+        if not components.get('warmed'):
+            warmup_start = time.time()
+            self._warmup()
+            components['warmed'] = True
+            model_registry.record_warmup(self._registry_key, time.time() - warmup_start)
+    
+    def _load_components(self) -> dict:
+        """Load and optimize the processor and model (the registry loader)."""
+        if self._performance_logging:
+            print(f"Loading model: {self.model_name}")
+        start_time = time.time()
+        
+        try:
+            # Load the processor and model
+            self.processor = Wav2Vec2Processor.from_pretrained(self.model_name)
+            if self._shared_weights:
+                self.model = load_pytorch_model_mmap(Wav2Vec2ForCTC, self.model_name)
+            else:
+                self.model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
             
-            try:
-                # Load the processor and model
+            # Apply optimizations
+            self._optimize_model()
+            
+            load_time = time.time() - start_time
+            if self._performance_logging:
+                print(f"Model loaded and optimized in {load_time:.2f}s")
+            
+            # Clear unnecessary cache if configured
+            if self.config.get('clear_cache_after_init', False):
+                gc.collect()
+            use_quantization = self.use_quantization
+                
+        except Exception as e:
+            if self.config.get('fallback_on_error', True):
+                print(f"Model loading failed ({e}), falling back to basic configuration")
+                # Fallback to basic configuration
+                use_quantization = False
                 self.processor = Wav2Vec2Processor.from_pretrained(self.model_name)
                 self.model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
-                
-                # Apply optimizations
-                self._optimize_model()
-                
-                #Removing it for a second
-                #self.blank_token_id = self.processor.tokenizer.pad_token_id
-                
-                # Cache the model components if caching is enabled
-                # if self.config.get('model_cache_enabled', True):
-                #     self._model_cache[cache_key] = {
-                #         'processor': self.processor,
-                #         'model': self.model,
-                #         'blank_token_id': self.blank_token_id
-                #     }
-                
-                load_time = time.time() - start_time
-                if self._performance_logging:
-                    print(f"Model loaded and optimized in {load_time:.2f}s")
-                
-                # Perform warmup runs if configured
-                self._warmup()
-                
-                # Clear unnecessary cache if configured
-                if self.config.get('clear_cache_after_init', False):
-                    gc.collect()
-                    
-            except Exception as e:
-                if self.config.get('fallback_on_error', True):
-                    print(f"Model loading failed ({e}), falling back to basic configuration")
-                    # Fallback to basic configuration
-                    self.use_quantization = False
-                    self.processor = Wav2Vec2Processor.from_pretrained(self.model_name)
-                    self.model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
-                    self.model.eval()
-                    self.blank_token_id = self.processor.tokenizer.pad_token_id
-                else:
-                    raise
+                self.model.eval()
+            else:
+                raise
+        
+        return {
+            'processor': self.processor,
+            'model': self.model,
+            'blank_token_id': self.processor.tokenizer.pad_token_id,
+            'use_quantization': use_quantization,
+        }
+    
+    def close(self):
+        """Release this extractor's reference to the shared model."""
+        if self._registry_release is not None:
+            self._registry_release()
     
     def _optimize_model(self):
         """Apply various optimizations to the model."""
@@ -162,10 +199,14 @@ class PhonemeExtractor:
                     print(f"Model compilation failed, continuing without: {e}")
     
     def _warmup(self):
-        """Perform warmup runs to optimize the model."""
+        """Perform warmup runs to optimize the model (one per length bucket when bucketing)."""
         warmup_runs = self.config.get('warmup_runs', 1)
         if warmup_runs > 0 and self._performance_logging:
             print(f"Performing {warmup_runs} warmup run(s)...")
+        
+        if self._pad_to_bucket:
+            self._warmup_buckets(warmup_runs)
+            return
             
         # Generate dummy audio for warmup
         dummy_audio = torch.randn(16000).numpy()  # 1 second of dummy audio
@@ -179,6 +220,21 @@ class PhonemeExtractor:
                     print(f"Warmup run {i+1} failed: {e}")
                 break
     
+    def _warmup_buckets(self, warmup_runs):
+        """Run every bucket length once so torch.compile compiles each shape at startup."""
+        for length in self.length_buckets.lengths:
+            dummy_audio = torch.randn(length).numpy()
+            for i in range(warmup_runs):
+                try:
+                    self._run_model(dummy_audio, use_optimized_preprocessing=False)
+                except Exception as e:
+                    print(f"⚠️ Warmup of the {self.length_buckets.seconds(length)}s bucket failed: {e}")
+                    break
+        shape_stats.mark_warmed(self._registry_key)
+        if self._performance_logging:
+            print(f"Warmed {len(self.length_buckets.lengths)} length buckets "
+                  f"(torch.compile frames: {torch_compile_count()})")
+    
     @classmethod
     def get_fast_instance(cls, model_output_processing=default_model_output_processing):
         """Factory method to create a fast, optimized instance for low-resource environments."""
@@ -189,25 +245,18 @@ class PhonemeExtractor:
             use_fast_model=True
         )
 
-    def extract_phoneme(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+    def _prepare_audio(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
         """
-        Extract phonemes from audio with optimized inference and validation.
+        Validate and preprocess audio for the model.
         
-        Args:
-            audio: Audio data as numpy array
-            sampling_rate: Sample rate of the audio (default: 16000)
-            use_optimized_preprocessing: Whether to use optimized audio preprocessing
-            
         Returns:
-            Processed phoneme transcription
+            Tuple of (audio, sampling_rate) ready for the processor
             
         Raises:
             ValueError: If audio is invalid (empty, silent, or too short)
         """
         import numpy as np
         
-        start_time = time.time() if self._performance_logging else None
-        
         # Validate audio input
         if audio is None or len(audio) == 0:
             raise ValueError("❌ Audio is empty - cannot extract phonemes")
@@ -234,20 +283,76 @@ class PhonemeExtractor:
                 audio, sampling_rate
             )
         
-        # Tokenize the audio file
-        processor_outputs = self.processor(audio, sampling_rate=sampling_rate, return_tensors="pt")
-        input_values = processor_outputs.input_values
+        return audio, sampling_rate
+    
+    def _run_model(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Validate and preprocess audio, then run the acoustic model.
+        
+        Returns:
+            Tuple of (logits tensor of shape (1, frames, vocab), seconds of audio fed to the model)
+            
+        Raises:
+            ValueError: If audio is invalid (empty, silent, or too short)
+        """
+        audio, sampling_rate = self._prepare_audio(audio, sampling_rate, use_optimized_preprocessing)
+        num_samples = len(audio)
+        
+        # Tokenize the audio file (zero-padded to its length bucket, normalized over the real samples)
+        if self._pad_to_bucket:
+            processor_outputs = self.processor(
+                audio, sampling_rate=sampling_rate, padding="max_length",
+                max_length=self.length_buckets.padded_length(num_samples),
+                return_attention_mask=True, return_tensors="pt"
+            )
+        else:
+            processor_outputs = self.processor(audio, sampling_rate=sampling_rate, return_tensors="pt")
+        model_inputs = {'input_values': processor_outputs.input_values}
+        if self._pad_to_bucket:
+            model_inputs['attention_mask'] = processor_outputs.attention_mask
+        shape_stats.record(self._registry_key, tuple(model_inputs['input_values'].shape), num_samples)
         
         # Use torch.no_grad() and optimize for inference
         with torch.no_grad():
             # Additional optimization: use torch.inference_mode if available
             if hasattr(torch, 'inference_mode'):
                 with torch.inference_mode():
-                    outputs = self.model(input_values)
+                    outputs = self.model(**model_inputs)
             else:
-                outputs = self.model(input_values)
+                outputs = self.model(**model_inputs)
 
         logits = outputs.logits
+        if self._pad_to_bucket:
+            logits = logits[:, :self._output_frames(num_samples)]
+        return logits, num_samples / sampling_rate
+    
+    def _output_frames(self, num_samples: int) -> int:
+        """Logit frames the model produces for num_samples samples."""
+        model_config = getattr(self.model, 'config', None)
+        return conv_output_frames(
+            num_samples,
+            getattr(model_config, 'conv_kernel', WAV2VEC2_CONV_KERNEL),
+            getattr(model_config, 'conv_stride', WAV2VEC2_CONV_STRIDE),
+        )
+
+    def extract_phoneme(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Extract phonemes from audio with optimized inference and validation.
+        
+        Args:
+            audio: Audio data as numpy array
+            sampling_rate: Sample rate of the audio (default: 16000)
+            use_optimized_preprocessing: Whether to use optimized audio preprocessing
+            
+        Returns:
+            Processed phoneme transcription
+            
+        Raises:
+            ValueError: If audio is invalid (empty, silent, or too short)
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        logits, _ = self._run_model(audio, sampling_rate, use_optimized_preprocessing)
 
         # Optimized argmax computation
         predicted_ids = torch.argmax(logits, dim=-1)
@@ -262,6 +367,100 @@ class PhonemeExtractor:
 
         return transcription
     
+    def extract_phoneme_batch(self, audios, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Extract phonemes for several utterances with as few forward passes as possible.
+        
+        When the model is given an attention mask, all utterances run in one
+        pass, zero-padded to the longest one; otherwise padding would change
+        the logits of the shorter utterances, so only utterances of the same
+        length share a pass. Each result is decoded from its own frames only.
+        Used by core.inference_scheduler.
+        
+        Returns:
+            List with one entry per input: the processed transcription, or the
+            ValueError raised by validation for that utterance
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        results = [None] * len(audios)
+        prepared = []
+        for i, audio in enumerate(audios):
+            try:
+                prepared.append((i, *self._prepare_audio(audio, sampling_rate, use_optimized_preprocessing)))
+            except ValueError as e:
+                results[i] = e
+        
+        masked = uses_attention_mask(self.processor)
+        for group in padding_groups([len(audio) for _, audio, _ in prepared], masked):
+            self._decode_batch([prepared[k] for k in group], masked, results)
+        
+        if self._performance_logging and start_time and prepared:
+            print(f"Batched phoneme extraction ({len(prepared)} utterances) took {time.time() - start_time:.3f}s")
+        
+        return results
+    
+    def _decode_batch(self, prepared, masked, results):
+        """Run one padded forward pass over (index, audio, rate) tuples and store each transcription."""
+        # Preprocessing resamples to the model rate, so all utterances share it
+        longest = max(len(audio) for _, audio, _ in prepared)
+        processor_outputs = self.processor(
+            [audio for _, audio, _ in prepared],
+            sampling_rate=prepared[0][2],
+            padding="max_length" if self._pad_to_bucket else True,
+            max_length=self.length_buckets.padded_length(longest) if self._pad_to_bucket else None,
+            return_attention_mask=True,
+            return_tensors="pt"
+        )
+        model_inputs = {'input_values': processor_outputs.input_values}
+        if masked:
+            model_inputs['attention_mask'] = processor_outputs.attention_mask
+        shape_stats.record(self._registry_key, tuple(model_inputs['input_values'].shape))
+        
+        with torch.inference_mode():
+            logits = self.model(**model_inputs).logits
+        
+        predicted_ids = torch.argmax(logits, dim=-1)
+        for row, (i, audio, _) in enumerate(prepared):
+            frames = min(self._output_frames(len(audio)), predicted_ids.shape[1])
+            transcription = self.processor.batch_decode(predicted_ids[row:row + 1, :frames])
+            results[i] = self.model_output_processing(transcription)
+    
+    def extract_logits(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Run the model and keep the frame-level CTC scores (for forced alignment).
+        
+        Args:
+            audio: Audio data as numpy array
+            sampling_rate: Sample rate of the audio (default: 16000)
+            use_optimized_preprocessing: Whether to use optimized audio preprocessing
+            
+        Returns:
+            Tuple of (log_probs, frame_duration): log-probabilities as a
+            (frames, vocab) numpy array and the seconds covered by each frame
+            (relative to the preprocessed audio)
+            
+        Raises:
+            ValueError: If audio is invalid (empty, silent, or too short)
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        logits, duration = self._run_model(audio, sampling_rate, use_optimized_preprocessing)
+        log_probs = torch.log_softmax(logits[0].float(), dim=-1).numpy()
+        frame_duration = duration / max(log_probs.shape[0], 1)
+
+        if self._performance_logging and start_time:
+            print(f"Logit extraction took {time.time() - start_time:.3f}s")
+
+        return log_probs, frame_duration
+    
+    @property
+    def ctc_vocabulary(self) -> CTCVocabulary:
+        """CTC vocabulary of the loaded model (built on first use)."""
+        if getattr(self, '_ctc_vocabulary', None) is None:
+            self._ctc_vocabulary = CTCVocabulary.from_tokenizer(self.processor.tokenizer)
+        return self._ctc_vocabulary
+    
     def set_performance_logging(self, enabled: bool):
         """Enable or disable performance logging."""
         self._performance_logging = enabled
@@ -271,7 +470,8 @@ class PhonemeExtractor:
         return {
             'model_name': self.model_name,
             'use_quantization': self.use_quantization,
-            'model_cached': f"{self.model_name}_{self.use_quantization}" in self._model_cache,
+            'model_cached': model_registry.contains(self._registry_key),
+            'length_buckets': self.length_buckets.lengths if self._pad_to_bucket else None,
             'performance_logging': self._performance_logging,
             'config_summary': self.config.summary() if hasattr(self, 'config') else 'No config'
         }
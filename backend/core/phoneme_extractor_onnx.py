@@ -1,11 +1,20 @@
 import numpy as np
 import onnxruntime as ort
 from transformers import Wav2Vec2Processor
+import os
 import re
 import time
+from contextlib import contextmanager
 from typing import Optional
 from .optimization_config import config
 from .audio_optimization import OptimizedAudioPreprocessor
+from .ctc_forced_alignment import CTCVocabulary, log_softmax
+from .inference_scheduler import conv_output_frames
+from .model_registry import model_registry
+from .length_buckets import DEFAULT_BUCKET_SECONDS, LengthBuckets, padding_groups, shape_stats, uses_attention_mask
+from .onnx_io_binding import OnnxIOBinder
+from .runtime_resources import get_thread_plan
+from .shared_weights import create_shared_onnx_session, shared_weights_enabled
 
 
 def default_model_output_processing(transcription):
@@ -19,15 +28,22 @@ def default_model_output_processing(transcription):
     return filtered_transcription
 
 
+# ONNX file of each model variant inside the model repo / export directory
+# (model_int8.onnx is built by quantize_model.py at the repository root)
+ONNX_MODEL_FILES = {
+    "float": "model.onnx",
+    "int8": "model_int8.onnx",
+}
+
+
 class PhonemeExtractorONNX:
     """ONNX Runtime-based phoneme extractor for faster inference."""
     
-    _model_cache = {}
-    
     def __init__(self, 
                  model_name: str = "Bobcat9/wav2vec2-timit-ipa-onnx",
                  model_output_processing=default_model_output_processing,
-                 optimization_config=None):
+                 optimization_config=None,
+                 model_variant: Optional[str] = None):
         """
         Initialize ONNX-based PhonemeExtractor.
         
@@ -35,12 +51,18 @@ class PhonemeExtractorONNX:
             model_name: HuggingFace model identifier with ONNX files
             model_output_processing: Function to process model output
             optimization_config: OptimizationConfig instance (uses global config if None)
+            model_variant: 'float' or 'int8' (defaults to ONNX_MODEL_VARIANT)
         """
         if optimization_config is None:
             optimization_config = config
         
         self.config = optimization_config
         self.model_name = model_name
+        if model_variant is None:
+            model_variant = self.config.get('onnx_model_variant', 'float')
+        if model_variant not in ONNX_MODEL_FILES:
+            raise ValueError(f"Unknown ONNX model variant '{model_variant}' (expected one of {list(ONNX_MODEL_FILES)})")
+        self.model_variant = model_variant
         self.model_output_processing = model_output_processing
         self._performance_logging = self.config.get('enable_performance_logging', False)
         
@@ -50,63 +72,148 @@ class PhonemeExtractorONNX:
             enable_logging=self._performance_logging
         )
         
-        # Check if model is already cached
-        if (self.config.get('model_cache_enabled', True) and 
-            model_name in self._model_cache):
-            if self._performance_logging:
+        # Inputs are padded to a few fixed lengths (core.length_buckets), if the
+        # graph takes an attention mask; off by default as ORT has nothing to recompile
+        self.length_buckets = LengthBuckets.from_config(self.config)
+        self._pad_to_bucket = self.config.get('onnx_length_bucketing', False)
+        
+        # Sessions are shared process-wide (core.model_registry)
+        # Thread counts follow the container's CPU quota (core.runtime_resources)
+        threads = get_thread_plan()
+        self.intra_op_threads = threads.ort_intra_op
+        self.inter_op_threads = threads.ort_inter_op
+        self._shared_weights = shared_weights_enabled()
+        self._registry_key = ("onnx-phoneme", model_name, model_variant, self.intra_op_threads, self.inter_op_threads,
+                              self._shared_weights, self.config.get('onnx_io_binding', True),
+                              tuple(self.length_buckets.lengths) if self._pad_to_bucket else None)
+        self._registry_release = None
+        if self.config.get('model_cache_enabled', True):
+            if self._performance_logging and model_registry.contains(self._registry_key):
                 print(f"Using cached ONNX model: {model_name}")
-            cached = self._model_cache[model_name]
-            self.processor = cached['processor']
-            self.session = cached['session']
+            components, self._registry_release = model_registry.hold(
+                self, self._registry_key, self._load_components
+            )
         else:
-            if self._performance_logging:
-                print(f"Loading ONNX model: {model_name}")
-            start_time = time.time()
+            components = self._load_components()
+        
+        self.processor = components['processor']
+        self.session = components['session']
+        self.input_names = components['input_names']
+        self.io_binder = components['io_binder']
+        self.model_variant = components['model_variant']
+        self._pad_to_bucket = components['pad_to_bucket']
+        
+        # Warm up once per session, not once per extractor
+        if not components.get('warmed'):
+            warmup_start = time.time()
+            self._warmup()
+            components['warmed'] = True
+            model_registry.record_warmup(self._registry_key, time.time() - warmup_start)
+    
+    def _load_components(self) -> dict:
+        """Load the processor and create the ONNX Runtime session (the registry loader)."""
+        if self._performance_logging:
+            print(f"Loading ONNX model: {self.model_name}")
+        start_time = time.time()
+        
+        try:
+            # Load processor (for tokenization)
+            processor = Wav2Vec2Processor.from_pretrained(self.model_name)
             
+            # Load ONNX model
+            model_variant = self.model_variant
             try:
-                # Load processor (for tokenization)
-                self.processor = Wav2Vec2Processor.from_pretrained(model_name)
-                
-                # Load ONNX model
-                from huggingface_hub import hf_hub_download
-                onnx_path = hf_hub_download(repo_id=model_name, filename="model.onnx")
-                
-                # Create ONNX Runtime session with optimizations
-                sess_options = ort.SessionOptions()
-                sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-                sess_options.intra_op_num_threads = 2  # Use both CPU cores
-                sess_options.inter_op_num_threads = 2
-                
-                self.session = ort.InferenceSession(
+                onnx_path = self._model_file(ONNX_MODEL_FILES[model_variant])
+            except Exception as e:
+                if model_variant == "float" or not self.config.get('fallback_on_error', True):
+                    raise
+                print(f"⚠️ {model_variant} ONNX model not available ({e}), falling back to float")
+                model_variant = "float"
+                onnx_path = self._model_file(ONNX_MODEL_FILES[model_variant])
+            
+            # Create ONNX Runtime session with optimizations
+            sess_options = ort.SessionOptions()
+            sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            sess_options.intra_op_num_threads = self.intra_op_threads
+            sess_options.inter_op_num_threads = self.inter_op_threads
+            
+            if self._shared_weights:
+                # Weights memory-mapped so all workers share one copy (core.shared_weights)
+                session = create_shared_onnx_session(
+                    onnx_path, sess_options, ['CPUExecutionProvider'],
+                    model_name=f"{self.model_name}-{model_variant}"
+                )
+            else:
+                session = ort.InferenceSession(
                     onnx_path,
                     sess_options=sess_options,
                     providers=['CPUExecutionProvider']
                 )
-                
-                # Cache the model if enabled
-                if self.config.get('model_cache_enabled', True):
-                    self._model_cache[model_name] = {
-                        'processor': self.processor,
-                        'session': self.session
-                    }
-                
-                load_time = time.time() - start_time
-                if self._performance_logging:
-                    print(f"ONNX model loaded in {load_time:.2f}s")
-                
-                # Perform warmup runs
-                self._warmup()
-                
+            
+            load_time = time.time() - start_time
+            if self._performance_logging:
+                print(f"ONNX model loaded in {load_time:.2f}s")
+            
+        except Exception as e:
+            print(f"Failed to load ONNX model: {e}")
+            raise
+        
+        input_names = [model_input.name for model_input in session.get_inputs()]
+        pad_to_bucket = self._pad_to_bucket and uses_attention_mask(processor, input_names)
+        if self._pad_to_bucket and not pad_to_bucket:
+            print(f"⚠️ {self.model_name} takes no attention mask, running inputs at their exact length")
+        
+        io_binder = None
+        if self.config.get('onnx_io_binding', True):
+            io_binder = OnnxIOBinder.for_session(
+                session, processor,
+                bucket_seconds=self.config.get('length_bucket_seconds', DEFAULT_BUCKET_SECONDS),
+                pad_to_bucket=pad_to_bucket,
+            )
+            try:
+                # Output buffers are sized with the wav2vec2 frame formula; check the graph agrees
+                if io_binder is not None:
+                    with io_binder.run(np.random.randn(16000).astype(np.float32)):
+                        pass
             except Exception as e:
-                print(f"Failed to load ONNX model: {e}")
-                raise
+                print(f"⚠️ ONNX IO binding disabled ({e})")
+                io_binder = None
+        
+        return {
+            'processor': processor,
+            'session': session,
+            'input_names': input_names,
+            'io_binder': io_binder,
+            'pad_to_bucket': pad_to_bucket,
+            'model_variant': model_variant,
+            'weights_bytes': os.path.getsize(onnx_path),
+        }
+    
+    def _model_file(self, filename: str) -> str:
+        """Path of `filename` in a local export directory or the HuggingFace repo."""
+        local_path = os.path.join(self.model_name, filename)
+        if os.path.isfile(local_path):
+            return local_path
+        if os.path.isdir(self.model_name):
+            raise FileNotFoundError(local_path)
+        from huggingface_hub import hf_hub_download
+        return hf_hub_download(repo_id=self.model_name, filename=filename)
+    
+    def close(self):
+        """Release this extractor's reference to the shared session."""
+        if self._registry_release is not None:
+            self._registry_release()
     
     def _warmup(self):
-        """Perform warmup runs to optimize the model."""
+        """Perform warmup runs to optimize the model (one per length bucket when bucketing)."""
         warmup_runs = self.config.get('warmup_runs', 1)
         if warmup_runs > 0 and self._performance_logging:
             print(f"Performing {warmup_runs} warmup run(s)...")
         
+        if self._pad_to_bucket:
+            self._warmup_buckets(warmup_runs)
+            return
+        
         # Generate dummy audio for warmup
         dummy_audio = np.random.randn(16000).astype(np.float32)  # 1 second
         
@@ -118,23 +225,29 @@ class PhonemeExtractorONNX:
                     print(f"Warmup run {i+1} failed: {e}")
                 break
     
-    def extract_phoneme(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+    def _warmup_buckets(self, warmup_runs):
+        """Run every bucket length once so each input shape is prepared before traffic."""
+        for length in self.length_buckets.lengths:
+            dummy_audio = np.random.randn(length).astype(np.float32)
+            for i in range(warmup_runs):
+                try:
+                    with self._run_model(dummy_audio, use_optimized_preprocessing=False):
+                        pass
+                except Exception as e:
+                    print(f"⚠️ Warmup of the {self.length_buckets.seconds(length)}s bucket failed: {e}")
+                    break
+        shape_stats.mark_warmed(self._registry_key)
+    
+    def _prepare_audio(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
         """
-        Extract phonemes from audio using ONNX Runtime.
+        Validate and preprocess audio for the model.
         
-        Args:
-            audio: Audio data as numpy array
-            sampling_rate: Sample rate of the audio (default: 16000)
-            use_optimized_preprocessing: Whether to use optimized audio preprocessing
-            
         Returns:
-            Processed phoneme transcription
+            Tuple of (audio, sampling_rate) ready for the processor
             
         Raises:
             ValueError: If audio is invalid
         """
-        start_time = time.time() if self._performance_logging else None
-        
         # Validate audio input
         if audio is None or len(audio) == 0:
             raise ValueError("❌ Audio is empty - cannot extract phonemes")
@@ -157,16 +270,74 @@ class PhonemeExtractorONNX:
                 audio, sampling_rate
             )
         
-        # Tokenize the audio file
-        processor_outputs = self.processor(audio, sampling_rate=sampling_rate, return_tensors="np")
+        return audio, sampling_rate
+    
+    @contextmanager
+    def _run_model(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Validate and preprocess audio, then run the ONNX session.
+        
+        Yields:
+            Tuple of (logits array of shape (1, frames, vocab), seconds of audio fed to the model).
+            With IO binding the logits live in a pooled buffer, so they are
+            only valid inside the with block
+            
+        Raises:
+            ValueError: If audio is invalid
+        """
+        audio, sampling_rate = self._prepare_audio(audio, sampling_rate, use_optimized_preprocessing)
+        num_samples = len(audio)
+        duration = num_samples / sampling_rate
+        
+        if self.io_binder is not None:
+            shape_stats.record(self._registry_key, (1, self.io_binder.bound_length(num_samples)), num_samples)
+            # Normalized in place into a reused buffer; ORT writes the logits into another
+            with self.io_binder.run(audio) as logits:
+                yield logits, duration
+            return
+        
+        # Tokenize the audio file (zero-padded to its length bucket, normalized over the real samples)
+        if self._pad_to_bucket:
+            processor_outputs = self.processor(
+                audio, sampling_rate=sampling_rate, padding="max_length",
+                max_length=self.length_buckets.padded_length(num_samples),
+                return_attention_mask=True, return_tensors="np"
+            )
+        else:
+            processor_outputs = self.processor(audio, sampling_rate=sampling_rate, return_tensors="np")
         input_values = processor_outputs.input_values
+        shape_stats.record(self._registry_key, tuple(input_values.shape), num_samples)
         
         # Run ONNX inference
-        onnx_inputs = {self.session.get_inputs()[0].name: input_values.astype(np.float32)}
+        onnx_inputs = {self.input_names[0]: input_values.astype(np.float32, copy=False)}
+        if self._pad_to_bucket:
+            onnx_inputs['attention_mask'] = processor_outputs.attention_mask.astype(np.int64)
         logits = self.session.run(None, onnx_inputs)[0]
         
-        # Get predicted IDs
-        predicted_ids = np.argmax(logits, axis=-1)
+        if self._pad_to_bucket:
+            logits = logits[:, :conv_output_frames(num_samples)]
+        yield logits, duration
+    
+    def extract_phoneme(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Extract phonemes from audio using ONNX Runtime.
+        
+        Args:
+            audio: Audio data as numpy array
+            sampling_rate: Sample rate of the audio (default: 16000)
+            use_optimized_preprocessing: Whether to use optimized audio preprocessing
+            
+        Returns:
+            Processed phoneme transcription
+            
+        Raises:
+            ValueError: If audio is invalid
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        with self._run_model(audio, sampling_rate, use_optimized_preprocessing) as (logits, _):
+            # Get predicted IDs
+            predicted_ids = np.argmax(logits, axis=-1)
         
         # Decode the token sequences
         transcription = self.processor.batch_decode(predicted_ids)
@@ -178,6 +349,95 @@ class PhonemeExtractorONNX:
         
         return transcription
     
+    def extract_phoneme_batch(self, audios, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Extract phonemes for several utterances with as few session.run calls as possible.
+        
+        When the exported graph is given an attention mask, all utterances
+        run together, zero-padded to the longest one; otherwise padding would
+        change the logits of the shorter utterances, so only utterances of the
+        same length share a run. Each result is decoded from its own frames
+        only. Used by core.inference_scheduler.
+        
+        Returns:
+            List with one entry per input: the processed transcription, or the
+            ValueError raised by validation for that utterance
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        results = [None] * len(audios)
+        prepared = []
+        for i, audio in enumerate(audios):
+            try:
+                prepared.append((i, *self._prepare_audio(audio, sampling_rate, use_optimized_preprocessing)))
+            except ValueError as e:
+                results[i] = e
+        
+        masked = uses_attention_mask(self.processor, self.input_names)
+        for group in padding_groups([len(audio) for _, audio, _ in prepared], masked):
+            self._decode_batch([prepared[k] for k in group], results)
+        
+        if self._performance_logging and start_time and prepared:
+            print(f"ONNX batched phoneme extraction ({len(prepared)} utterances) took {time.time() - start_time:.3f}s")
+        
+        return results
+    
+    def _decode_batch(self, prepared, results):
+        """Run one padded session.run over (index, audio, rate) tuples and store each transcription."""
+        # Preprocessing resamples to the model rate, so all utterances share it
+        longest = max(len(audio) for _, audio, _ in prepared)
+        processor_outputs = self.processor(
+            [audio for _, audio, _ in prepared],
+            sampling_rate=prepared[0][2],
+            padding="max_length" if self._pad_to_bucket else True,
+            max_length=self.length_buckets.padded_length(longest) if self._pad_to_bucket else None,
+            return_attention_mask=True,
+            return_tensors="np"
+        )
+        shape_stats.record(self._registry_key, tuple(processor_outputs.input_values.shape))
+        
+        input_names = self.input_names
+        onnx_inputs = {input_names[0]: processor_outputs.input_values.astype(np.float32, copy=False)}
+        if 'attention_mask' in input_names:
+            onnx_inputs['attention_mask'] = processor_outputs.attention_mask.astype(np.int64)
+        logits = self.session.run(None, onnx_inputs)[0]
+        
+        predicted_ids = np.argmax(logits, axis=-1)
+        for row, (i, audio, _) in enumerate(prepared):
+            frames = min(conv_output_frames(len(audio)), predicted_ids.shape[1])
+            transcription = self.processor.batch_decode(predicted_ids[row:row + 1, :frames])
+            results[i] = self.model_output_processing(transcription)
+    
+    def extract_logits(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        """
+        Run the model and keep the frame-level CTC scores (for forced alignment).
+        
+        Returns:
+            Tuple of (log_probs, frame_duration): log-probabilities as a
+            (frames, vocab) numpy array and the seconds covered by each frame
+            (relative to the preprocessed audio)
+            
+        Raises:
+            ValueError: If audio is invalid
+        """
+        start_time = time.time() if self._performance_logging else None
+        
+        with self._run_model(audio, sampling_rate, use_optimized_preprocessing) as (logits, duration):
+            log_probs = log_softmax(logits[0])
+        frame_duration = duration / max(log_probs.shape[0], 1)
+        
+        if self._performance_logging and start_time:
+            print(f"ONNX logit extraction took {time.time() - start_time:.3f}s")
+        
+        return log_probs, frame_duration
+    
+    @property
+    def ctc_vocabulary(self) -> CTCVocabulary:
+        """CTC vocabulary of the loaded model (built on first use)."""
+        if getattr(self, '_ctc_vocabulary', None) is None:
+            self._ctc_vocabulary = CTCVocabulary.from_tokenizer(self.processor.tokenizer)
+        return self._ctc_vocabulary
+    
     def set_performance_logging(self, enabled: bool):
         """Enable or disable performance logging."""
         self._performance_logging = enabled
@@ -187,6 +447,9 @@ class PhonemeExtractorONNX:
         return {
             'model_name': self.model_name,
             'backend': 'ONNX Runtime',
-            'model_cached': self.model_name in self._model_cache,
+            'model_variant': self.model_variant,
+            'model_cached': model_registry.contains(self._registry_key),
+            'io_binding': self.io_binder.stats() if self.io_binder is not None else None,
+            'length_buckets': self.length_buckets.lengths if self._pad_to_bucket else None,
             'performance_logging': self._performance_logging,
         }
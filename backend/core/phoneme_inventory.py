@@ -0,0 +1,87 @@
+"""
+Phoneme symbol interning.
+
+Maps phoneme symbols (IPA strings, ARPAbet tokens, words) to small, stable
+integer ids. Encoded sequences are cheap to hash and compare, can be packed
+into NumPy arrays for the vectorized alignment engine, and make compact
+cache keys.
+
+Ids are assigned on first use and never change for the lifetime of the
+process, so encodings can be shared across requests. encode_array() packs
+them into a uint16 array (uint32 should the inventory ever pass 65536
+symbols), the storage of core.word_alignment results.
+"""
+
+import threading
+from array import array
+from typing import Hashable, Iterable
+
+
+class PhonemeInventory:
+    """Process-wide symbol table mapping phoneme symbols to integer ids."""
+
+    def __init__(self, symbols: Iterable[Hashable] = ()):
+        """
+        Initialize the inventory.
+
+        Args:
+            symbols: Optional symbols to register up front (ids assigned in order)
+        """
+        self._ids: dict = {}
+        self._symbols: list = []
+        self._lock = threading.Lock()
+        for symbol in symbols:
+            self.intern(symbol)
+
+    def intern(self, symbol: Hashable) -> int:
+        """Return the id for `symbol`, assigning a new one if it is unseen."""
+        symbol_id = self._ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        with self._lock:
+            symbol_id = self._ids.get(symbol)
+            if symbol_id is None:
+                symbol_id = len(self._symbols)
+                self._symbols.append(symbol)
+                self._ids[symbol] = symbol_id
+            return symbol_id
+
+    def encode(self, sequence: Iterable[Hashable]) -> tuple[int, ...]:
+        """Encode a sequence of symbols as a tuple of ids."""
+        if not isinstance(sequence, (list, tuple)):
+            sequence = list(sequence)
+        ids = self._ids
+        try:
+            return tuple([ids[symbol] for symbol in sequence])
+        except KeyError:
+            return tuple([self.intern(symbol) for symbol in sequence])
+
+    def encode_array(self, sequence: Iterable[Hashable]) -> array:
+        """Encode a sequence of symbols as a compact array of ids."""
+        typecode = "H" if len(self._symbols) <= 0x10000 else "I"
+        if not sequence:
+            return array(typecode)
+        try:
+            # Known symbols only, so every id is below the current size
+            return array(typecode, map(self._ids.__getitem__, sequence))
+        except KeyError:
+            ids = self.encode(sequence)
+            return array("H" if len(self._symbols) <= 0x10000 else "I", ids)
+
+    def decode(self, ids: Iterable[int]) -> list:
+        """Decode a sequence of ids back into symbols."""
+        symbols = self._symbols
+        return [symbols[symbol_id] for symbol_id in ids]
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, symbol: Hashable) -> bool:
+        return symbol in self._ids
+
+
+# Empty id arrays shared by results without phonemes of a kind (never mutated)
+EMPTY_IDS = {"H": array("H"), "I": array("I")}
+
+# Global inventory shared by the alignment and scoring code
+phoneme_inventory = PhonemeInventory()
@@ -0,0 +1,79 @@
+"""
+Audio that remembers which preprocessing stages it has been through.
+
+The server path used to denoise and normalize the same recording twice (in
+load_and_preprocess_audio_bytes and again in process_audio_array) and then
+trim it inside the phoneme extractor. PreparedAudio carries the samples
+together with stage flags, so every stage runs exactly once per request no
+matter which entry point receives it, and collects a per-stage timing
+breakdown that is returned with the analysis.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+
+@dataclass
+class PreparedAudio:
+    """Audio samples plus the preprocessing stages already applied to them."""
+    samples: np.ndarray
+    sample_rate: int = 16000
+    denoised: bool = False
+    normalized: bool = False
+    trimmed: bool = False
+    trim_offset: float = 0.0  # seconds trimmed from the start (model frame times start here)
+    denoise_branch: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def wrap(cls, audio: Union["PreparedAudio", np.ndarray], sample_rate: int = 16000) -> "PreparedAudio":
+        """Return `audio` unchanged if it is already PreparedAudio, else wrap the raw samples."""
+        if isinstance(audio, cls):
+            return audio
+        return cls(samples=audio, sample_rate=sample_rate)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def duration(self) -> float:
+        """Length in seconds."""
+        return len(self.samples) / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def preprocessed(self) -> bool:
+        """True once noise reduction and normalization have both been applied."""
+        return self.denoised and self.normalized
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Add `seconds` to the time spent in `stage`."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Context manager that records the wall time of its block under `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def stages(self) -> Dict[str, Union[bool, int, str, None]]:
+        """Which stages have been applied, for logging and response metadata."""
+        return {
+            "denoised": self.denoised,
+            "denoise_branch": self.denoise_branch,
+            "normalized": self.normalized,
+            "trimmed": self.trimmed,
+            "sample_rate": self.sample_rate,
+        }
+
+    def timing_breakdown(self) -> Dict[str, float]:
+        """Per-stage timings in milliseconds, in the order the stages ran, plus their total."""
+        breakdown = {stage: round(seconds * 1000.0, 1) for stage, seconds in self.timings.items()}
+        breakdown["total"] = round(sum(self.timings.values()) * 1000.0, 1)
+        return breakdown
@@ -1,55 +1,34 @@
-import pandas as pd
-from .phoneme_extractor import PhonemeExtractor
-from .word_extractor import WordExtractor
 import numpy as np
-import IPython.display as ipd
 import re
 from .evaluation import accuracy_metrics as am
 from .grapheme_to_phoneme import grapheme_to_phoneme as g2p
 from .evaluation.accuracy_metrics import compute_phoneme_error_rate
 from .speech_problem_classifier import SpeechProblemClassifier
-from .audio_preprocessing import preprocess_audio
+from .audio_preprocessing import prepare_audio, trim_for_model
+from .prepared_audio import PreparedAudio
+from .banded_alignment import banded_word_alignment
+from .edit_distance import align_operations, phoneme_error_rate
+from .pronunciation_table import PronunciationTable
+from .word_alignment import WordAlignment, word_alignment_records
+from .alignment_cache import RequestCostCache
+from .inference_scheduler import extract_phonemes
+from .audio_process_pool import run_cpu_stage
+from .optimization_config import config
 import asyncio
 
+# The torch extractors (PhonemeExtractor, WordExtractor) are imported where
+# they are used and pandas only by PronunciationTable.to_dataframe(), so
+# importing this module does not load torch or pandas: the server passes in
+# the extractors of its active backend.
+
 def compute_per(gt_phonemes, pred_phonemes):
     """
     Compute the Phoneme Error Rate (PER) between two phoneme sequences.
-    Optimized version with fast paths and efficient memory usage.
+    Uses the shared bit-parallel edit distance kernel (core.edit_distance).
     """
-    if not gt_phonemes and not pred_phonemes:
-        return 0.0
-    if not gt_phonemes:
-        return 1.0  # All insertions
-    if not pred_phonemes:
-        return 1.0  # All deletions
-    
-    m, n = len(gt_phonemes), len(pred_phonemes)
-    
-    # Quick check for exact match
-    if gt_phonemes == pred_phonemes:
-        return 0.0
-    
-    # Use more efficient data type
-    dp = np.zeros((m + 1, n + 1), dtype=np.uint16)
-
-    for i in range(m + 1):
-        dp[i, 0] = i
-    for j in range(n + 1):
-        dp[0, j] = j
+    return phoneme_error_rate(gt_phonemes, pred_phonemes)
 
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if gt_phonemes[i - 1] == pred_phonemes[j - 1]:
-                dp[i, j] = dp[i - 1, j - 1]
-            else:
-                dp[i, j] = 1 + min(
-                    dp[i - 1, j],    # Deletion
-                    dp[i, j - 1],    # Insertion
-                    dp[i - 1, j - 1] # Substitution
-                )
-    return dp[m, n] / max(m, 1)
-
-def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[str, list[str]]]):
+def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[str, list[str]]], cost_cache: RequestCostCache = None):
     """
     Align predicted phonemes to ground truth words using robust dynamic programming.
     
@@ -59,6 +38,7 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
     Parameters:
     - pred_phonemes: List of predicted phonemes.
     - gt_words_phonemes: List of tuples (word, [phonemes]) representing ground truth words and their phonemes.
+    - cost_cache: Optional per-request segment cost cache (core.alignment_cache).
     
     Returns:
     - alignment: List of tuples (word, aligned_pred_phonemes, per) representing the alignment.
@@ -69,10 +49,37 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
     - Fallback handling for failed alignments
     - Logs alignment confidence metrics
     - Handles edge cases (length mismatches, empty predictions)
+    - Use align_phonemes_to_words_with_confidence to also get per-word confidence
+    """
+    alignment, _ = align_phonemes_to_words_with_confidence(pred_phonemes, gt_words_phonemes, cost_cache=cost_cache)
+    return alignment
+
+
+def align_phonemes_to_words_with_confidence(
+    pred_phonemes: list,
+    gt_words_phonemes: list[tuple[str, list[str]]],
+    use_vectorized: bool = None,
+    cost_cache: RequestCostCache = None
+) -> tuple[list, list[float]]:
+    """
+    Align predicted phonemes to ground truth words and report per-word confidence.
+    
+    Args:
+        pred_phonemes: List of predicted phonemes
+        gt_words_phonemes: List of tuples (word, [phonemes]) for the expected words
+        use_vectorized: Use the vectorized banded engine (core.banded_alignment).
+                        If None, reads 'use_vectorized_alignment' from the optimization config.
+        cost_cache: Per-request segment cost cache. If None, one is created for this
+                    call and its hit/miss counters are published when it finishes.
+                        
+    Returns:
+        Tuple of (alignment, word_confidences) where alignment is a list of
+        (word, aligned_pred_phonemes, per) tuples and word_confidences holds a
+        0-1 confidence per word (0.2 for fallback alignments).
     """
     if not pred_phonemes or not gt_words_phonemes:
         print("⚠️  Warning: Empty input to align_phonemes_to_words")
-        return []
+        return [], []
     
     # Calculate length ratio as confidence indicator
     expected_phonemes = sum(len(phonemes) for _, phonemes in gt_words_phonemes)
@@ -82,14 +89,78 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
     if length_ratio < 0.5 or length_ratio > 2.0:
         print(f"⚠️  Alignment warning: Predicted phonemes ({len(pred_phonemes)}) vs expected ({expected_phonemes}), ratio={length_ratio:.2f}")
     
+    owns_cache = cost_cache is None
+    if owns_cache:
+        cost_cache = RequestCostCache()
+    
     # Phase 3: Check if we should use fallback alignment strategy
     if length_ratio > 2.5 or length_ratio < 0.4:
         print(f"⚠️  Extreme phoneme variance ({length_ratio:.2f}x) - using fallback alignment")
-        return _fallback_proportional_alignment(pred_phonemes, gt_words_phonemes, length_ratio)
+        alignment = _fallback_proportional_alignment(pred_phonemes, gt_words_phonemes, length_ratio, cost_cache)
+        if owns_cache:
+            cost_cache.publish()
+        return alignment, [0.2] * len(alignment)
     
+    if use_vectorized is None:
+        use_vectorized = config.get('use_vectorized_alignment', True)
+    
+    if use_vectorized:
+        alignment, word_confidences, failed_alignments, low_confidence_alignments = banded_word_alignment(
+            pred_phonemes, gt_words_phonemes, length_ratio
+        )
+    else:
+        alignment, word_confidences, failed_alignments, low_confidence_alignments = _reference_dp_alignment(
+            pred_phonemes, gt_words_phonemes, length_ratio, cost_cache
+        )
+    
+    m = len(gt_words_phonemes)
+    
+    # Phase 3: Enhanced alignment quality metrics
+    if failed_alignments > 0:
+        print(f"⚠️  Alignment completed with {failed_alignments}/{m} failed word alignments")
+    if low_confidence_alignments > 0:
+        print(f"⚠️  {low_confidence_alignments}/{m} alignments have low confidence (<0.3)")
+    
+    # Calculate overall alignment confidence
+    total_per = sum(per for _, _, per in alignment) / max(len(alignment), 1)
+    avg_confidence = sum(word_confidences) / max(len(word_confidences), 1)
+    print(f"📊 Alignment confidence: avg PER={total_per:.2f}, avg_conf={avg_confidence:.2f}, length_ratio={length_ratio:.2f}, failed={failed_alignments}")
+    
+    cache_stats = cost_cache.stats()
+    if cache_stats["request_hits"] or cache_stats["shared_hits"] or cache_stats["misses"]:
+        print(f"📊 Alignment cost cache: request_hits={cache_stats['request_hits']}, "
+              f"shared_hits={cache_stats['shared_hits']}, misses={cache_stats['misses']}")
+    if owns_cache:
+        cost_cache.publish()
+    
+    return alignment, word_confidences
+
+
+def _reference_dp_alignment(
+    pred_phonemes: list,
+    gt_words_phonemes: list[tuple[str, list[str]]],
+    length_ratio: float,
+    cost_cache: RequestCostCache = None
+):
+    """
+    Reference (pure Python) word alignment DP.
+    
+    Kept for comparison against core.banded_alignment, which must produce the
+    same alignment. Evaluates the PER for every (word, end, start) triple,
+    memoized in the per-request cost cache (the fallback search and the
+    backtracking pass revisit the same segments).
+    
+    Returns:
+        Tuple of (alignment, word_confidences, failed_alignments, low_confidence_alignments)
+    """
     n = len(pred_phonemes)
     m = len(gt_words_phonemes)
     
+    if cost_cache is None:
+        cost_cache = RequestCostCache()
+    pred_ids = cost_cache.encode(pred_phonemes)
+    gt_ids = [cost_cache.encode(phonemes) for _, phonemes in gt_words_phonemes]
+    
     # Use more efficient data types and initialization
     dp = np.full((m + 1, n + 1), np.inf, dtype=np.float32)
     backtrack = np.full((m + 1, n + 1), -1, dtype=np.int32)
@@ -132,7 +203,7 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
                     continue
                
                 # Use distance for the cost
-                distance = compute_per(gt_phs, pred_segment) * max(len(gt_phs), 1)
+                distance = cost_cache.per(gt_ids[i - 1], pred_ids[k:j]) * max(len(gt_phs), 1)
                 
                 # Phase 3: Calculate confidence for this segment
                 # Confidence based on: 1) PER, 2) length match, 3) previous confidence
@@ -197,7 +268,7 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
                         
                         segment = pred_phonemes[start:end]
                         if segment:
-                            per = compute_per(gt_phs, segment)
+                            per = cost_cache.per(gt_ids[i - 1], pred_ids[start:end])
                             if per < best_fallback_per:
                                 best_fallback_per = per
                                 best_fallback_segment = segment
@@ -224,7 +295,7 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
         
         # Normal alignment
         pred_segment = pred_phonemes[k:j]
-        distance = compute_per(gt_phs, pred_segment)
+        distance = cost_cache.per(gt_ids[i - 1], pred_ids[k:j], share=True)
         word_conf = confidence[i, j]
         
         alignment.append((gt_word, pred_segment, distance))
@@ -239,25 +310,15 @@ def align_phonemes_to_words(pred_phonemes: list, gt_words_phonemes: list[tuple[s
 
     alignment.reverse()
     word_confidences.reverse()
-    
-    # Phase 3: Enhanced alignment quality metrics
-    if failed_alignments > 0:
-        print(f"⚠️  Alignment completed with {failed_alignments}/{m} failed word alignments")
-    if low_confidence_alignments > 0:
-        print(f"⚠️  {low_confidence_alignments}/{m} alignments have low confidence (<0.3)")
-    
-    # Calculate overall alignment confidence
-    total_per = sum(per for _, _, per in alignment) / max(len(alignment), 1)
-    avg_confidence = sum(word_confidences) / max(len(word_confidences), 1)
-    print(f"📊 Alignment confidence: avg PER={total_per:.2f}, avg_conf={avg_confidence:.2f}, length_ratio={length_ratio:.2f}, failed={failed_alignments}")
-    
-    return alignment
+
+    return alignment, word_confidences, failed_alignments, low_confidence_alignments
 
 
 def _fallback_proportional_alignment(
     pred_phonemes: list,
     gt_words_phonemes: list[tuple[str, list[str]]],
-    length_ratio: float
+    length_ratio: float,
+    cost_cache: RequestCostCache = None
 ) -> list:
     """
     Fallback alignment strategy when standard alignment fails due to extreme phoneme variance.
@@ -268,6 +329,7 @@ def _fallback_proportional_alignment(
         pred_phonemes: Predicted phonemes from model
         gt_words_phonemes: Ground truth words with expected phonemes
         length_ratio: Ratio of predicted to expected phonemes
+        cost_cache: Optional per-request segment cost cache
         
     Returns:
         List of (word, aligned_phonemes, per) tuples
@@ -277,6 +339,8 @@ def _fallback_proportional_alignment(
     expected_phonemes = sum(len(phonemes) for _, phonemes in gt_words_phonemes)
     alignment = []
     start_idx = 0
+    if cost_cache is None:
+        cost_cache = RequestCostCache()
     
     for i, (word, gt_phs) in enumerate(gt_words_phonemes):
         # Allocate phonemes proportionally based on expected length
@@ -299,7 +363,7 @@ def _fallback_proportional_alignment(
         aligned_phonemes = pred_phonemes[start_idx:end_idx]
         
         if aligned_phonemes:
-            per = compute_per(gt_phs, aligned_phonemes)
+            per = cost_cache.per(cost_cache.encode(gt_phs), cost_cache.encode(aligned_phonemes), share=True)
         else:
             per = 1.0
         
@@ -318,57 +382,18 @@ def align_sequences(gt, pred):
     ('match' | 'substitution' | 'deletion' | 'insertion', ground_truth_phoneme, predicted_phoneme)
     For deletion, predicted_phoneme will be None; for insertion, ground_truth_phoneme will be None.
 
-    honestly just don't touch this function it's perfect - its a black box at this point
+    The DP and backtrace live in core.edit_distance.align_operations, which keeps
+    the original tie-breaking (match/substitution, then deletion, then insertion).
     """
-    m, n = len(gt), len(pred)
-    # Initialize DP matrix where dp[i][j] is the edit distance between gt[:i] and pred[:j]
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # Base cases: transforming empty sequence to the other requires inserting/deleting all characters.
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-
-    # Fill the DP table
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if gt[i - 1] == pred[j - 1] else 1
-            dp[i][j] = min(
-                dp[i - 1][j] + 1,      # deletion
-                dp[i][j - 1] + 1,      # insertion
-                dp[i - 1][j - 1] + cost  # substitution or match
-            )
-    
-    # Backtrace to get the alignment operations
-    operations = []
-    i, j = m, n
-    while i > 0 or j > 0:
-        # If both indices are positive and we came from a match/substitution:
-        if i > 0 and j > 0 and dp[i][j] == dp[i - 1][j - 1] + (0 if gt[i - 1] == pred[j - 1] else 1):
-            if gt[i - 1] == pred[j - 1]:
-                operations.append(('match', gt[i - 1], pred[j - 1]))
-            else:
-                operations.append(('substitution', gt[i - 1], pred[j - 1]))
-            i -= 1
-            j -= 1
-        # Deletion: came from dp[i-1][j] + 1
-        elif i > 0 and dp[i][j] == dp[i - 1][j] + 1:
-            operations.append(('deletion', gt[i - 1], None))
-            i -= 1
-        # Insertion: came from dp[i][j-1] + 1
-        elif j > 0 and dp[i][j] == dp[i][j - 1] + 1:
-            operations.append(('insertion', None, pred[j - 1]))
-            j -= 1
-    operations.reverse()
-    return operations
+    return align_operations(gt, pred)
 
 def _process_word_alignment(
     ground_truth_words: list[str],
     ground_truth_phonemes: list[tuple[str, list[str]]],
     predicted_words: list[str],
-    phoneme_predictions: list[list[str]]
-) -> list[dict]:
+    phoneme_predictions: list[list[str]],
+    cost_cache: RequestCostCache = None
+) -> list[WordAlignment]:
     """
     Helper function to process word alignment and calculate PER for each word.
     Shared by both process_audio_array and process_audio_with_client_phonemes.
@@ -378,10 +403,17 @@ def _process_word_alignment(
         ground_truth_phonemes: List of tuples (word, phonemes)
         predicted_words: List of predicted words from audio
         phoneme_predictions: List of predicted phoneme sequences (one per word)
+        cost_cache: Per-request cost cache for the phoneme-level alignments. If None,
+                    one is created and its counters are published when done.
         
     Returns:
-        List of dictionaries containing word-level analysis results
+        List of WordAlignment results (read like the legacy per-word dicts;
+        analyze_results converts them with to_dict())
     """
+    owns_cache = cost_cache is None
+    if owns_cache:
+        cost_cache = RequestCostCache()
+    
     # Align the words
     word_ops = align_sequences(ground_truth_words, predicted_words)
     print("Word operations:", word_ops)
@@ -396,118 +428,138 @@ def _process_word_alignment(
             gt_phonemes = ground_truth_phonemes[gt_idx][1]
             pred_phonemes = phoneme_predictions[pred_idx]
             
-            # Get phoneme-level alignment
-            phoneme_ops = align_sequences(gt_phonemes, pred_phonemes)
-            missed, added, substituted = [], [], []
-            for pop, gph, pph in phoneme_ops:
-                if pop == 'deletion':
-                    missed.append(gph)
-                elif pop == 'insertion':
-                    added.append(pph)
-                elif pop == 'substitution':
-                    substituted.append((gph, pph))
-            
-            per = (len(missed) + len(added) + len(substituted)) / max(len(gt_phonemes), 1)
-            results.append({
-                "type": op,
-                "predicted_word": pred_word,
-                "ground_truth_word": gt_word,
-                "phonemes": pred_phonemes,
-                "ground_truth_phonemes": gt_phonemes,
-                "expected_phonemes": list(gt_phonemes),
-                "actual_phonemes": list(pred_phonemes) if pred_phonemes else [],
-                "per": round(per, 4),
-                "missed": missed,
-                "added": added,
-                "substituted": substituted,
-                "total_phonemes": len(gt_phonemes),
-                "total_errors": len(missed) + len(added) + len(substituted),
-            })
+            # Get phoneme-level alignment (missed / added / substituted ids, cached)
+            gt_ids, pred_ids = cost_cache.encode(gt_phonemes), cost_cache.encode(pred_phonemes)
+            word_errors = cost_cache.word_errors(gt_ids, pred_ids)
+            results.append(WordAlignment.aligned(op, pred_word, gt_word, gt_ids, pred_ids, word_errors))
             gt_idx += 1
             pred_idx += 1
         
         elif op == 'insertion':
             # Extra word predicted (no matching ground truth)
-            pred_word = predicted_words[pred_idx]
-            pred_phonemes = phoneme_predictions[pred_idx]
-            results.append({
-                "type": op,
-                "predicted_word": pred_word,
-                "ground_truth_word": "",
-                "phonemes": pred_phonemes,
-                "ground_truth_phonemes": [],
-                "expected_phonemes": [],
-                "actual_phonemes": pred_phonemes or [],
-                "per": 0.0,   # insertion is not a mispronunciation of an expected word
-                "missed": [],
-                "added": list(pred_phonemes) if pred_phonemes else [],
-                "substituted": [],
-                "total_phonemes": 0,
-                "total_errors": 0,
-                "error": "Extra word predicted."
-            })
+            results.append(WordAlignment.inserted(predicted_words[pred_idx], phoneme_predictions[pred_idx]))
             pred_idx += 1
 
         elif op == 'deletion':
             # A ground truth word is missing in prediction — every phoneme was missed
             gt_word = ground_truth_words[gt_idx]
-            gt_phonemes_del = list(ground_truth_phonemes[gt_idx][1]) if gt_idx < len(ground_truth_phonemes) else []
-            results.append({
-                "type": op,
-                "predicted_word": "",
-                "ground_truth_word": gt_word,
-                "phonemes": [],
-                "ground_truth_phonemes": gt_phonemes_del,
-                "expected_phonemes": gt_phonemes_del,
-                "actual_phonemes": [],
-                "per": 1.0,
-                "missed": gt_phonemes_del,   # every phoneme in the word was missed
-                "added": [],
-                "substituted": [],
-                "total_phonemes": len(gt_phonemes_del),
-                "total_errors": len(gt_phonemes_del),
-                "error": "Word missing in prediction."
-            })
+            gt_phonemes_del = ground_truth_phonemes[gt_idx][1] if gt_idx < len(ground_truth_phonemes) else []
+            results.append(WordAlignment.deleted(gt_word, gt_phonemes_del))
             gt_idx += 1
     
+    if owns_cache:
+        cost_cache.publish()
     return results
 
-async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=16000, phoneme_extraction_model=None, word_extraction_model=None, use_chunking=True) -> list[dict]:
+def _trim_for_extractor(prepared: PreparedAudio, phoneme_extraction_model) -> PreparedAudio:
+    """Trim with the extractor's own preprocessor once; extractors without one trim internally."""
+    audio_preprocessor = getattr(phoneme_extraction_model, 'audio_preprocessor', None)
+    if audio_preprocessor is None:
+        return prepared
+    return trim_for_model(prepared, audio_preprocessor)
+
+async def _timed(prepared: PreparedAudio, stage: str, awaitable):
+    """Await `awaitable`, recording its wall time under `stage`."""
+    with prepared.timed(stage):
+        return await awaitable
+
+def _extract_words(word_extraction_model, audio, sampling_rate):
+    """Word extraction as an awaitable: async extractors (Deepgram) hold no thread while waiting."""
+    extract_async = getattr(word_extraction_model, 'extract_words_async', None)
+    if extract_async is not None:
+        return extract_async(audio=audio, sampling_rate=sampling_rate)
+    return asyncio.to_thread(word_extraction_model.extract_words, audio=audio, sampling_rate=sampling_rate)
+
+async def extract_chunk_predictions(chunks, chunk_metadata, sampling_rate, phoneme_extraction_model, word_extraction_model):
+    """
+    Run phoneme and word extraction on every chunk concurrently.
+    
+    Phoneme requests for all chunks reach the inference scheduler together
+    and each chunk's word extraction overlaps its phoneme extraction. Chunks
+    of different lengths only share a padded forward pass when the phoneme
+    model is given an attention mask, so every chunk gets the phonemes it
+    would get on its own. At most MAX_PARALLEL_CHUNKS chunks are in flight.
+    
+    Args:
+        chunks: Audio chunks from chunk_audio_at_silence
+        chunk_metadata: Metadata dict per chunk
+        sampling_rate: Sample rate of the chunks
+        phoneme_extraction_model: Phoneme extraction model
+        word_extraction_model: Word extraction model
+        
+    Returns:
+        Tuple of (phonemes per chunk, words per chunk) in chunk order; chunks
+        that fail validation contribute empty lists
+    """
+    chunk_slots = asyncio.Semaphore(max(config.get('max_parallel_chunks', 8), 1))
+    
+    async def extract_chunk(i, chunk, metadata):
+        async with chunk_slots:
+            print(f"  Processing chunk {i+1}/{len(chunks)} ({metadata['duration']:.1f}s)...")
+            phoneme_result, words_result = await asyncio.gather(
+                extract_phonemes(phoneme_extraction_model, audio=chunk, sampling_rate=sampling_rate),
+                _extract_words(word_extraction_model, chunk, sampling_rate),
+                return_exceptions=True
+            )
+        for result in (phoneme_result, words_result):
+            if isinstance(result, BaseException) and not isinstance(result, ValueError):
+                raise result
+        for result in (phoneme_result, words_result):
+            if isinstance(result, ValueError):
+                # If chunk still fails validation, skip it
+                print(f"  ⚠️  Skipping chunk {i+1}: {result}")
+                return [], []
+        return phoneme_result, words_result
+    
+    chunk_results = await asyncio.gather(*[
+        extract_chunk(i, chunk, metadata)
+        for i, (chunk, metadata) in enumerate(zip(chunks, chunk_metadata))
+    ])
+    return [phonemes for phonemes, _ in chunk_results], [words for _, words in chunk_results]
+
+async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=16000, phoneme_extraction_model=None, word_extraction_model=None, use_chunking=True) -> list[WordAlignment]:
     """
     Use the phoneme extractor to transcribe an audio array.
     
     Args:
         ground_truth_phonemes: Expected phonemes as list of (word, phonemes) tuples
-        audio_array: Audio signal as numpy array
+        audio_array: Audio signal as numpy array, or PreparedAudio (stages it has
+                     already been through are not repeated; per-stage timings are
+                     recorded on it)
         sampling_rate: Sample rate (default 16000)
         phoneme_extraction_model: Phoneme extraction model (optional)
         word_extraction_model: Word extraction model (optional)
         use_chunking: Whether to chunk long audio (default True)
         
     Returns:
-        List of dictionaries containing pronunciation analysis results
+        List of WordAlignment pronunciation analysis results
     """
     from .audio_chunking import should_use_chunking, chunk_audio_at_silence, merge_chunk_results
     
     if phoneme_extraction_model is None:
+        from .phoneme_extractor import PhonemeExtractor
         phoneme_extraction_model = PhonemeExtractor()
     
     if word_extraction_model is None:
+        from .word_extractor import WordExtractor
         word_extraction_model = WordExtractor() 
     
     if len(ground_truth_phonemes) <= 1:
         raise ValueError("ground_truth_phonemes must have at least 2 elements)")
 
     # Calculate audio duration for logging
-    audio_duration = len(audio_array) / sampling_rate
+    prepared = PreparedAudio.wrap(audio_array, sampling_rate)
+    audio_duration = prepared.duration
     
-    # preprocess the audio
-    audio_array = preprocess_audio(audio=audio_array, sr=sampling_rate, audio_length_seconds=audio_duration)
+    # preprocess the audio (no-op if the caller already did)
+    prepared = prepare_audio(prepared, audio_length_seconds=audio_duration)
+    audio_array, sampling_rate = prepared.samples, prepared.sample_rate
     
     # Check if audio should be chunked
     if use_chunking and should_use_chunking(audio_array, sampling_rate, threshold_seconds=8):
         print(f"🔪 Audio is {audio_duration:.1f}s - using chunking strategy")
-        chunks, chunk_metadata = chunk_audio_at_silence(audio_array, sampling_rate)
+        with prepared.timed("chunking"):
+            chunks, chunk_metadata = chunk_audio_at_silence(audio_array, sampling_rate)
         
         # Filter out chunks that are too short (< 0.3s) and merge with previous chunk
         filtered_chunks = []
@@ -534,34 +586,11 @@ async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=
         chunks = filtered_chunks
         chunk_metadata = filtered_metadata
         
-        # Process each chunk
-        all_chunk_phonemes = []
-        all_chunk_words = []
-        
-        for i, (chunk, metadata) in enumerate(zip(chunks, chunk_metadata)):
-            print(f"  Processing chunk {i+1}/{len(chunks)} ({metadata['duration']:.1f}s)...")
-            
-            try:
-                # Extract phonemes and words for this chunk
-                phoneme_predictions = await asyncio.to_thread(
-                    phoneme_extraction_model.extract_phoneme, 
-                    audio=chunk, 
-                    sampling_rate=sampling_rate
-                )
-                predicted_words = await asyncio.to_thread(
-                    word_extraction_model.extract_words, 
-                    audio=chunk, 
-                    sampling_rate=sampling_rate
-                )
-                
-                all_chunk_phonemes.append(phoneme_predictions)
-                all_chunk_words.append(predicted_words)
-            except ValueError as e:
-                # If chunk still fails validation, skip it
-                print(f"  ⚠️  Skipping chunk {i+1}: {e}")
-                # Add empty results for this chunk
-                all_chunk_phonemes.append([])
-                all_chunk_words.append([])
+        # Extract all chunks concurrently (order is preserved for merging)
+        with prepared.timed("extraction"):
+            all_chunk_phonemes, all_chunk_words = await extract_chunk_predictions(
+                chunks, chunk_metadata, sampling_rate, phoneme_extraction_model, word_extraction_model
+            )
         
         # Merge chunk results
         print(f"✓ All chunks processed - merging results...")
@@ -573,14 +602,19 @@ async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=
     else:
         # Original processing for short audio
         print(f"📝 Audio is {audio_duration:.1f}s - processing without chunking")
+        # Trim once here so the extractor does not trim again (word extraction keeps the full audio)
+        model_audio = _trim_for_extractor(prepared, phoneme_extraction_model)
         async def extract_data():
             print("  Starting concurrent extraction tasks...")
-            phoneme_predictions_task = asyncio.create_task(asyncio.to_thread(
-                phoneme_extraction_model.extract_phoneme, audio=audio_array, sampling_rate=sampling_rate
-            ))
-            predicted_words_task = asyncio.create_task(asyncio.to_thread(
-                word_extraction_model.extract_words, audio=audio_array, sampling_rate=sampling_rate
-            ))
+            phoneme_predictions_task = asyncio.create_task(_timed(prepared, "phoneme_extraction", extract_phonemes(
+                phoneme_extraction_model,
+                audio=model_audio.samples,
+                sampling_rate=model_audio.sample_rate,
+                use_optimized_preprocessing=not model_audio.trimmed
+            )))
+            predicted_words_task = asyncio.create_task(_timed(prepared, "word_extraction", _extract_words(
+                word_extraction_model, audio_array, sampling_rate
+            )))
 
             print("  Waiting for phoneme extraction...")
             phoneme_predictions = await phoneme_predictions_task
@@ -608,13 +642,31 @@ async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=
     if not predicted_words:
         raise ValueError("No valid words extracted from audio")
 
-    # regroup the phonemes to reflect the words that were spoken
+    # Alignment is CPU-bound DP: in the audio process pool when enabled, else a thread
+    results, timings = await run_cpu_stage(
+        align_predictions, phoneme_predictions, predicted_words, ground_truth_phonemes
+    )
+    for stage, seconds in timings.items():
+        prepared.record(stage, seconds)
+
+    return results
+
+def align_predictions(phoneme_predictions, predicted_words, ground_truth_phonemes):
+    """
+    Regroup the predicted phonemes into the predicted words, then align them to the ground truth.
+
+    Returns:
+        (results, timings): per-word results as from _process_word_alignment, and
+        the seconds spent in "phoneme_alignment" and "word_alignment"
+    """
     import time
     alignment_start = time.time()
     flattened_phoneme_predictions = [item for sublist in phoneme_predictions for item in sublist]
     predicted_words_phonemes = g2p(" ".join(predicted_words)) # take the words our model thinks we said and get the phonemes for them
-    alignment = align_phonemes_to_words(flattened_phoneme_predictions, predicted_words_phonemes)
+    cost_cache = RequestCostCache()
+    alignment = align_phonemes_to_words(flattened_phoneme_predictions, predicted_words_phonemes, cost_cache=cost_cache)
     phoneme_predictions = [pred_phonemes for _, pred_phonemes,_ in alignment]
+    timings = {"phoneme_alignment": time.time() - alignment_start}
     print(f"⏱️  Phoneme-to-word alignment took {time.time() - alignment_start:.3f}s")
     print("aligned phoneme predictions: ", phoneme_predictions)
 
@@ -625,10 +677,149 @@ async def process_audio_array(ground_truth_phonemes, audio_array, sampling_rate=
         ground_truth_words=ground_truth_words,
         ground_truth_phonemes=ground_truth_phonemes,
         predicted_words=predicted_words,
-        phoneme_predictions=phoneme_predictions
+        phoneme_predictions=phoneme_predictions,
+        cost_cache=cost_cache
     )
+    cost_cache.publish()
+    timings["word_alignment"] = time.time() - word_alignment_start
     print(f"⏱️  Word alignment processing took {time.time() - word_alignment_start:.3f}s")
 
+    return results, timings
+
+async def process_audio_forced_alignment(
+    ground_truth_phonemes: list[tuple[str, list[str]]],
+    audio_array: np.ndarray,
+    sampling_rate: int = 16000,
+    phoneme_extraction_model=None,
+    use_chunking: bool = True,
+) -> list[WordAlignment]:
+    """
+    Analyze audio by forced-aligning the model's CTC scores to the expected sentence.
+    
+    Instead of free decoding, word extraction, g2p on the predicted words and the
+    align_phonemes_to_words DP, the frame-level log-probabilities are aligned to the
+    expected phonemes with a Viterbi pass that allows substitutions, insertions and
+    deletions (core.ctc_forced_alignment). Each expected word gets its realized
+    phonemes and timestamps directly.
+    
+    Args:
+        ground_truth_phonemes: Expected phonemes as list of (word, phonemes) tuples
+        audio_array: Audio signal as numpy array, or PreparedAudio
+        sampling_rate: Sample rate (default 16000)
+        phoneme_extraction_model: Phoneme extractor with extract_logits (optional)
+        use_chunking: Whether to run the model on silence-separated chunks of long audio
+        
+    Returns:
+        List of WordAlignment pronunciation analysis results, with
+        "start_time"/"end_time" (seconds from the start of the input audio,
+        including any silence trimmed before the model) for every word that
+        was spoken
+    """
+    from .audio_chunking import should_use_chunking, chunk_audio_at_silence, chunk_times_to_audio
+    from .ctc_forced_alignment import forced_align
+    import time
+    
+    if phoneme_extraction_model is None:
+        from .phoneme_extractor import PhonemeExtractor
+        phoneme_extraction_model = PhonemeExtractor()
+    
+    if len(ground_truth_phonemes) <= 1:
+        raise ValueError("ground_truth_phonemes must have at least 2 elements)")
+    
+    prepared = PreparedAudio.wrap(audio_array, sampling_rate)
+    audio_duration = prepared.duration
+    prepared = prepare_audio(prepared, audio_length_seconds=audio_duration)
+    audio_array, sampling_rate = prepared.samples, prepared.sample_rate
+    
+    extraction_start = time.time()
+    if use_chunking and should_use_chunking(audio_array, sampling_rate, threshold_seconds=8):
+        print(f"🔪 Audio is {audio_duration:.1f}s - extracting logits per chunk")
+        chunks, chunk_metadata = chunk_audio_at_silence(audio_array, sampling_rate)
+        
+        chunk_log_probs = []
+        chunk_frame_times = []
+        frame_duration = 0.02
+        for i, (chunk, metadata) in enumerate(zip(chunks, chunk_metadata)):
+            # Trim each chunk here too, so its frames start where the kept audio starts
+            chunk_audio = _trim_for_extractor(
+                PreparedAudio(samples=chunk, sample_rate=sampling_rate, timings=prepared.timings),
+                phoneme_extraction_model
+            )
+            extract_kwargs = {'use_optimized_preprocessing': False} if chunk_audio.trimmed else {}
+            try:
+                log_probs, frame_duration = await asyncio.to_thread(
+                    phoneme_extraction_model.extract_logits,
+                    audio=chunk_audio.samples,
+                    sampling_rate=chunk_audio.sample_rate,
+                    **extract_kwargs
+                )
+            except ValueError as e:
+                print(f"  ⚠️  Skipping chunk {i+1}: {e}")
+                continue
+            chunk_times = chunk_audio.trim_offset + np.arange(len(log_probs)) * frame_duration
+            chunk_log_probs.append(log_probs)
+            chunk_frame_times.append(prepared.trim_offset + chunk_times_to_audio(metadata, chunk_times))
+        
+        if not chunk_log_probs:
+            raise ValueError("The audio provided has no speech inside")
+        log_probs = np.concatenate(chunk_log_probs)
+        frame_times = np.concatenate(chunk_frame_times)
+    else:
+        print(f"📝 Audio is {audio_duration:.1f}s - extracting logits without chunking")
+        model_audio = _trim_for_extractor(prepared, phoneme_extraction_model)
+        extract_kwargs = {'use_optimized_preprocessing': False} if model_audio.trimmed else {}
+        log_probs, frame_duration = await asyncio.to_thread(
+            phoneme_extraction_model.extract_logits,
+            audio=model_audio.samples,
+            sampling_rate=model_audio.sample_rate,
+            **extract_kwargs
+        )
+        # Frames count from the trimmed start; report times in the input audio
+        frame_times = model_audio.trim_offset + np.arange(len(log_probs)) * frame_duration
+    prepared.record("logit_extraction", time.time() - extraction_start)
+    print(f"⏱️  Logit extraction took {time.time() - extraction_start:.3f}s ({len(log_probs)} frames)")
+    
+    alignment_start = time.time()
+    forced = forced_align(
+        log_probs,
+        ground_truth_phonemes,
+        phoneme_extraction_model.ctc_vocabulary,
+        frame_duration=frame_duration,
+        frame_times=frame_times,
+    )
+    prepared.record("forced_alignment", time.time() - alignment_start)
+    print(f"⏱️  Forced alignment took {time.time() - alignment_start:.3f}s (score: {forced.score:.2f})")
+    
+    if all(segment.is_missing for segment in forced.words):
+        raise ValueError("The audio provided has no speech inside")
+    print("forced-aligned phoneme predictions: ", [segment.phonemes for segment in forced.words])
+    
+    with prepared.timed("word_alignment"):
+        results = await run_cpu_stage(_forced_word_results, forced.words)
+    return results
+
+def _forced_word_results(segments) -> list[WordAlignment]:
+    """
+    One WordAlignment per expected word, straight from its forced-alignment segment.
+    
+    The segments already pair every expected word with the phonemes realized
+    for it, so they are not re-aligned at the word level (with a repeated
+    word, that could pair one occurrence's phonemes with the other's).
+    Words whose phonemes were all deleted are deletions without timestamps.
+    """
+    cost_cache = RequestCostCache()
+    results = []
+    for segment in segments:
+        if segment.is_missing:
+            result = WordAlignment.deleted(segment.word, segment.expected_phonemes)
+            result.set_times(None, None)
+        else:
+            gt_ids, pred_ids = cost_cache.encode(segment.expected_phonemes), cost_cache.encode(segment.phonemes)
+            word_errors = cost_cache.word_errors(gt_ids, pred_ids)
+            result = WordAlignment.aligned('match', segment.word, segment.word, gt_ids, pred_ids, word_errors)
+            result.set_times(segment.start_time, segment.end_time)
+        results.append(result)
+    cost_cache.publish()
     return results
 
 async def process_audio_with_client_phonemes(
@@ -638,7 +829,7 @@ async def process_audio_with_client_phonemes(
     sampling_rate: int = 16000,
     word_extraction_model=None,
     client_words: list[str] | None = None,
-) -> list[dict]:
+) -> list[WordAlignment]:
     """
     Process audio using client-provided phonemes (and optionally words).
     
@@ -653,22 +844,24 @@ async def process_audio_with_client_phonemes(
         client_phonemes: List of words, where each word is a list of IPA phoneme strings
                         (already normalized from eSpeak format)
         ground_truth_phonemes: List of tuples (word, phonemes) for the expected sentence
-        audio_array: The audio data as a numpy array
+        audio_array: The audio data as a numpy array, or PreparedAudio
         sampling_rate: The audio sampling rate (default: 16000)
         word_extraction_model: The model to extract words (optional, will create if None)
         client_words: List of word strings extracted on client (optional, NEW in Phase 4)
         
     Returns:
-        List of dictionaries containing word-level analysis results
+        List of WordAlignment word-level analysis results
     """
     if len(ground_truth_phonemes) <= 1:
         raise ValueError("ground_truth_phonemes must have at least 2 elements")
     
     # Only preprocess audio if we need to extract words from it
     # If client provided both phonemes and words, we don't need the audio at all
+    prepared = PreparedAudio.wrap(audio_array, sampling_rate)
     if client_words is None or len(client_words) == 0:
-        # Preprocess the audio (needed for word extraction)
-        audio_array = preprocess_audio(audio=audio_array, sr=sampling_rate)
+        # Preprocess the audio (needed for word extraction; skipped if already done)
+        prepared = prepare_audio(prepared)
+        audio_array, sampling_rate = prepared.samples, prepared.sample_rate
     
     # Determine if we need to extract words
     if client_words is not None and len(client_words) > 0:
@@ -678,14 +871,13 @@ async def process_audio_with_client_phonemes(
     else:
         # Extract words from audio (client didn't provide them)
         if word_extraction_model is None:
+            from .word_extractor import WordExtractor
             word_extraction_model = WordExtractor()
         
         print("→ Extracting words from audio (client phonemes provided, but not words)...")
-        predicted_words = await asyncio.to_thread(
-            word_extraction_model.extract_words, 
-            audio=audio_array, 
-            sampling_rate=sampling_rate
-        )
+        predicted_words = await _timed(prepared, "word_extraction", _extract_words(
+            word_extraction_model, audio_array, sampling_rate
+        ))
         print(f"✓ Word extraction completed: {predicted_words}")
     
     if predicted_words is None or len(predicted_words) <= 1:
@@ -705,29 +897,34 @@ async def process_audio_with_client_phonemes(
     
     # Use helper function to process word alignment
     ground_truth_words = [word for word, _ in ground_truth_phonemes]
-    results = _process_word_alignment(
-        ground_truth_words=ground_truth_words,
-        ground_truth_phonemes=ground_truth_phonemes,
-        predicted_words=predicted_words,
-        phoneme_predictions=phoneme_predictions
-    )
+    with prepared.timed("word_alignment"):
+        results = await run_cpu_stage(
+            _process_word_alignment,
+            ground_truth_words=ground_truth_words,
+            ground_truth_phonemes=ground_truth_phonemes,
+            predicted_words=predicted_words,
+            phoneme_predictions=phoneme_predictions
+        )
     
     return results
 
-def analyze_results(pronunciation_data: list[dict]) -> tuple[pd.DataFrame, dict, dict, dict]:
+def analyze_results(pronunciation_data: list[WordAlignment | dict]) -> tuple[PronunciationTable, dict, dict, dict]:
     """
     Analyzes the results of phoneme and word extraction.
 
     Args:
-        results (list[dict]): List of word-level results containing phoneme-level details.
+        results (list[WordAlignment | dict]): Word-level results containing phoneme-level details.
 
     Returns:
-        tuple[pd.DataFrame, pd.Series, dict, dict]: DataFrame of word-level results, highest phoneme error rate word, problems, and sentence per 
+        tuple[PronunciationTable, dict, dict, dict]: Table of word-level results (to_dict() / to_dict("records")
+        like a DataFrame, to_dataframe() for pandas), highest phoneme error rate word, problems, and sentence per
     """
-    df = pd.DataFrame(pronunciation_data)
+    # Back to the legacy per-word dicts for JSON and the database
+    pronunciation_data = word_alignment_records(pronunciation_data)
+    table = PronunciationTable(pronunciation_data)
 
     # get the highest PER word
-    highest_per = df.sort_values("per", ascending=False).iloc[0].to_dict()
+    highest_per = table.highest("per")
 
     # Get the problem summary
     problem_summary = SpeechProblemClassifier.classify_problems(pronunciation_data)
@@ -750,13 +947,13 @@ def analyze_results(pronunciation_data: list[dict]) -> tuple[pd.DataFrame, dict,
     }
 
     # Return sentence-level PER along with existing results
-    return df, highest_per, problem_summary, per_summary
+    return table, highest_per, problem_summary, per_summary
 
 if __name__ == "__main__":
     import librosa
     from grapheme_to_phoneme import grapheme_to_phoneme
     from audio_recording import run_vad
-
+    from phoneme_extractor import PhonemeExtractor
 
     extractor = PhonemeExtractor()
 
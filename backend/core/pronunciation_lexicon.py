@@ -0,0 +1,193 @@
+"""
+Precompiled, memory-resident pronunciation lexicon for grapheme_to_phoneme.
+
+eng_to_ipa.convert opens its SQLite copy of the CMU dictionary, queries
+the words and rebuilds each IPA transcription (stress placement, symbol
+mapping, punctuation) on every call. The lexicon runs that same
+conversion once for every CMU word and keeps word -> phoneme tuple with
+the stress markers already stripped, so a lookup returns exactly what
+grapheme_to_phoneme produced through eng_to_ipa.
+
+Only words that eng_to_ipa would look up unchanged (lowercase, no
+surrounding punctuation) are stored; anything else goes through
+eng_to_ipa and an LRU in core.grapheme_to_phoneme. Phoneme strings are
+interned and identical transcriptions share one tuple.
+
+The lexicon is loaded from PRONUNCIATION_LEXICON_PATH when that file was
+built from the installed eng_to_ipa, else built in memory (a few seconds,
+in the background at startup) and written there for the next start. To
+build it offline:
+
+    python -m core.pronunciation_lexicon [--output path]
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, Optional, Tuple
+
+from .optimization_config import config
+
+# eng_to_ipa.transcribe.preprocess strips these from both ends of a word
+PUNCTUATION = '!"#$%&\'()*+,-./:;<=>/?@[\\]^_`{|}~«» '
+# Stress markers and the unknown-word marker removed from every transcription
+STRIPPED_MARKERS = ("ˈ", "ˌ", "*", ",", "'")
+
+FORMAT_VERSION = 1
+
+Phonemes = Tuple[str, ...]
+
+
+def strip_markers(transcription: str) -> str:
+    """Remove stress markers, unknown-word asterisks and commas/apostrophes."""
+    for marker in STRIPPED_MARKERS:
+        transcription = transcription.replace(marker, "")
+    return transcription
+
+
+def _source_version() -> str:
+    try:
+        return f"eng_to_ipa {version('eng_to_ipa')}"
+    except PackageNotFoundError:
+        return "eng_to_ipa unknown"
+
+
+def _is_plain_word(word: str) -> bool:
+    """True when eng_to_ipa looks `word` up as-is (no case folding or punctuation handling)."""
+    return (word == word.lower() and word == word.strip(PUNCTUATION) and word != ""
+            and not any(char.isspace() for char in word)
+            and not re.search("^([^A-Za-z0-9]+)[A-Za-z]", word)
+            and not re.search("[A-Za-z]([^A-Za-z0-9]+)$", word))
+
+
+class PronunciationLexicon:
+    """word -> interned phoneme tuple, matching eng_to_ipa's top transcription."""
+
+    def __init__(self, entries: Dict[str, Phonemes], source: str = None):
+        self.entries = entries
+        self.source = source or _source_version()
+
+    def get(self, word: str) -> Optional[Phonemes]:
+        return self.entries.get(word)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _intern(transcriptions: Dict[str, str]) -> Dict[str, Phonemes]:
+        shared: Dict[str, Phonemes] = {}
+        entries = {}
+        for word, transcription in transcriptions.items():
+            phonemes = shared.get(transcription)
+            if phonemes is None:
+                phonemes = shared[transcription] = tuple(sys.intern(char) for char in transcription)
+            entries[sys.intern(word)] = phonemes
+        return entries
+
+    @classmethod
+    def build(cls) -> "PronunciationLexicon":
+        """Transcribe every CMU dictionary word the way eng_to_ipa.convert does."""
+        from eng_to_ipa import transcribe
+
+        database = os.path.join(os.path.dirname(transcribe.__file__), "resources", "CMU_dict.db")
+        connection = sqlite3.connect(database)
+        try:
+            rows = connection.execute("SELECT word, phonemes FROM dictionary").fetchall()
+        finally:
+            connection.close()
+        pronunciations = defaultdict(list)
+        for word, phonemes in rows:
+            if _is_plain_word(word):
+                pronunciations[word].append(phonemes)
+
+        words = list(pronunciations)
+        ipa = transcribe.cmu_to_ipa([pronunciations[word] for word in words], stress_marking='both')
+        # convert() keeps the last of the sorted transcriptions (transcribe.get_top)
+        transcriptions = {word: strip_markers(options[-1]) for word, options in zip(words, ipa)}
+        return cls(cls._intern(transcriptions))
+
+    def save(self, path: str) -> None:
+        """Write a tab-separated word / phonemes file (atomically)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                file.write(f"# pronunciation lexicon v{FORMAT_VERSION}\t{self.source}\n")
+                for word, phonemes in self.entries.items():
+                    file.write(f"{word}\t{''.join(phonemes)}\n")
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["PronunciationLexicon"]:
+        """Read a saved lexicon; None if it is missing or was built from another eng_to_ipa."""
+        try:
+            with open(path, encoding="utf-8") as file:
+                header = file.readline().rstrip("\n")
+                if header != f"# pronunciation lexicon v{FORMAT_VERSION}\t{_source_version()}":
+                    return None
+                transcriptions = dict(line.rstrip("\n").split("\t", 1) for line in file)
+        except (OSError, ValueError):
+            return None
+        return cls(cls._intern(transcriptions))
+
+
+def lexicon_path() -> str:
+    return os.path.expanduser(config.get('pronunciation_lexicon_path',
+                                         '~/.cache/wordwiz/pronunciation_lexicon.tsv'))
+
+
+_lexicon: Optional[PronunciationLexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_pronunciation_lexicon() -> PronunciationLexicon:
+    """The shared lexicon, loaded from disk or built on first use."""
+    global _lexicon
+    if _lexicon is not None:
+        return _lexicon
+    with _lexicon_lock:
+        if _lexicon is None:
+            start = time.time()
+            path = lexicon_path()
+            lexicon = PronunciationLexicon.load(path)
+            if lexicon is not None:
+                print(f"📖 Loaded pronunciation lexicon ({len(lexicon)} words) in {time.time() - start:.2f}s")
+            else:
+                lexicon = PronunciationLexicon.build()
+                print(f"📖 Built pronunciation lexicon ({len(lexicon)} words) in {time.time() - start:.2f}s")
+                try:
+                    lexicon.save(path)
+                except OSError as e:
+                    print(f"⚠️ Could not save pronunciation lexicon to {path}: {e}")
+            _lexicon = lexicon
+    return _lexicon
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the pronunciation lexicon offline")
+    parser.add_argument("--output", default=None, help="Output path (default: PRONUNCIATION_LEXICON_PATH)")
+    args = parser.parse_args()
+
+    start = time.time()
+    lexicon = PronunciationLexicon.build()
+    path = args.output or lexicon_path()
+    lexicon.save(path)
+    print(f"✅ Wrote {len(lexicon)} words to {path} in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Column-oriented word results of analyze_results.
+
+analyze_results used to build a pandas DataFrame to pick the highest-PER
+word, and the handler then converted it back with to_dict() /
+to_dict("records") for the SSE payload, the feedback formatter and each
+mode's get_next_sentence. For 10-30 words, building and converting the
+frame cost more than the analysis itself.
+
+PronunciationTable holds the same table as plain lists per column and
+answers those calls directly, with the values pandas would give (missing
+keys become NaN, numeric columns with gaps become floats). The DataFrame
+is only built, once, for callers that use anything else
+(to_dataframe() or any other DataFrame attribute).
+"""
+
+import math
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class PronunciationTable:
+    """Word-level results, one list per column; a DataFrame on demand."""
+
+    __slots__ = ("_columns", "_length", "_records", "_frame")
+
+    def __init__(self, records: List[dict]):
+        """
+        Args:
+            records: Per-word result dicts (keys become columns, in first-seen order)
+        """
+        length = len(records)
+        columns: Dict[str, list] = {}
+        for index, record in enumerate(records):
+            for key, value in record.items():
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [math.nan] * length
+                column[index] = value
+
+        for key, column in columns.items():
+            # pandas stores numbers as float64 when they mix with floats or have gaps (None / missing -> NaN)
+            numbers = [value for value in column if value is not None]
+            if (numbers and _is_number(numbers[0]) and all(_is_number(value) for value in numbers)
+                    and (len(numbers) < length or any(isinstance(value, float) for value in numbers))):
+                columns[key] = [math.nan if value is None else float(value) for value in column]
+
+        self._columns = columns
+        self._length = length
+        self._records: Optional[List[dict]] = None
+        self._frame = None
+
+    @classmethod
+    def from_dataframe(cls, frame) -> "PronunciationTable":
+        """Wrap an existing DataFrame (kept as the materialized frame)."""
+        table = cls(frame.to_dict("records"))
+        table._frame = frame
+        return table
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def empty(self) -> bool:
+        return self._length == 0 or not self._columns
+
+    @property
+    def records(self) -> List[dict]:
+        """Row dicts with every column (shared between callers, do not modify)."""
+        if self._records is None:
+            names = list(self._columns)
+            self._records = [dict(zip(names, row)) for row in zip(*self._columns.values())]
+        return self._records
+
+    def column(self, name: str) -> list:
+        """The values of one column (shared, do not modify)."""
+        return self._columns[name]
+
+    def row(self, index: int) -> dict:
+        """A copy of one row, like frame.iloc[index].to_dict()."""
+        return {name: column[index] for name, column in self._columns.items()}
+
+    def highest(self, name: str) -> dict:
+        """
+        The row with the largest value in a column, like
+        frame.sort_values(name, ascending=False).iloc[0].to_dict().
+
+        Ties are broken exactly as that (unstable) sort breaks them.
+        """
+        if not self._length:
+            raise IndexError("PronunciationTable is empty")
+        values = np.asarray(self._columns[name], dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        if not len(valid):
+            return self.row(0)
+        # pandas' nargsort for descending order: argsort the reversed values, take the last
+        reversed_valid = valid[::-1]
+        return self.row(int(reversed_valid[values[reversed_valid].argsort(kind="quicksort")[-1]]))
+
+    def to_dict(self, orient: str = "dict") -> Any:
+        """DataFrame.to_dict for the "dict", "list" and "records" orients."""
+        if orient == "dict":
+            return {name: dict(enumerate(column)) for name, column in self._columns.items()}
+        if orient == "list":
+            return {name: list(column) for name, column in self._columns.items()}
+        if orient == "records":
+            return [dict(record) for record in self.records]
+        return self.to_dataframe().to_dict(orient)
+
+    def to_dataframe(self):
+        """The pandas DataFrame of the results (built on first use)."""
+        if self._frame is None:
+            import pandas as pd
+
+            self._frame = pd.DataFrame(self.records, columns=list(self._columns))
+        return self._frame
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything else (iterrows, to_string, sort_values, ...) is the DataFrame's
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.to_dataframe(), name)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.to_dataframe()[key]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._columns)
+
+    def __repr__(self) -> str:
+        # Cheap on purpose: verbose logging prints the table on every request
+        words = ", ".join(
+            f"{record.get('ground_truth_word') or record.get('predicted_word')!s}={record.get('per')}"
+            for record in self.records
+        )
+        return f"PronunciationTable({self._length} words: {words})"
@@ -0,0 +1,274 @@
+"""
+CPU and memory limits of the container, and the thread counts derived from them.
+
+PhonemeAssistant used to call torch.set_num_threads(os.cpu_count()) and
+PhonemeExtractorONNX hard-coded two intra-op threads, but os.cpu_count()
+reports the host's cores, not the container's share (docker-compose gives
+the backend 1.3 CPUs). Oversubscribed thread pools spin and get throttled
+by the CFS quota, which shows up as latency spikes.
+
+detect_runtime_resources() reads the CPU quota, cpuset and memory limit
+from cgroup v2 or v1 (falling back to the host values), and
+get_thread_plan() turns them into thread counts for torch, ONNX Runtime
+and the asyncio default executor. Every setting can be overridden through
+core.optimization_config (0 means automatic).
+"""
+
+import math
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from .optimization_config import config
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+# cgroup v1 reports "no memory limit" as a huge page-rounded number
+_UNLIMITED_MEMORY = 1 << 60
+
+
+@dataclass
+class RuntimeResources:
+    """CPU and memory available to this process."""
+    host_cpus: int
+    affinity_cpus: int
+    cpu_quota: Optional[float]
+    memory_limit_bytes: Optional[int]
+    source: str
+
+    @property
+    def effective_cpus(self) -> float:
+        """CPUs this process can actually use: the quota, capped by the cpuset."""
+        if self.cpu_quota is None:
+            return float(self.affinity_cpus)
+        return min(self.cpu_quota, float(self.affinity_cpus))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **asdict(self),
+            "effective_cpus": round(self.effective_cpus, 2),
+            "memory_limit_mb": (None if self.memory_limit_bytes is None
+                                else round(self.memory_limit_bytes / 1024 ** 2, 1)),
+        }
+
+
+@dataclass
+class ThreadPlan:
+    """Thread counts for every pool in the process."""
+    torch_intra_op: int
+    torch_inter_op: int
+    ort_intra_op: int
+    ort_inter_op: int
+    executor_workers: int
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(proc_cgroup: str) -> Dict[str, str]:
+    """Controller -> cgroup path of this process ("" is the cgroup v2 unified hierarchy)."""
+    paths = {}
+    for line in (_read(proc_cgroup) or "").splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        for controller in parts[1].split(",") if parts[1] else [""]:
+            paths[controller] = parts[2]
+    return paths
+
+
+def _candidates(root: str, relative: str):
+    """The process's own cgroup directory, then the namespace root (inside containers they coincide)."""
+    own = os.path.join(root, relative.lstrip("/"))
+    return [own, root] if own.rstrip("/") != root.rstrip("/") else [root]
+
+
+def _cgroup_v2_limits(root: str, relative: str) -> Tuple[Optional[float], Optional[int], bool]:
+    found = False
+    quota = memory = None
+    for directory in _candidates(root, relative):
+        cpu_max = _read(os.path.join(directory, "cpu.max"))
+        if cpu_max is not None:
+            found = True
+            limit, _, period = cpu_max.partition(" ")
+            if limit != "max" and quota is None:
+                quota = int(limit) / int(period or 100000)
+        memory_max = _read(os.path.join(directory, "memory.max"))
+        if memory_max is not None:
+            found = True
+            if memory_max != "max" and memory is None:
+                memory = int(memory_max)
+    return quota, memory, found
+
+
+def _cgroup_v1_limits(root: str, paths: Dict[str, str]) -> Tuple[Optional[float], Optional[int], bool]:
+    found = False
+    quota = memory = None
+    for controller in ("cpu", "cpu,cpuacct"):
+        base = os.path.join(root, controller)
+        if not os.path.isdir(base):
+            continue
+        for directory in _candidates(base, paths.get("cpu", "/")):
+            quota_us = _read(os.path.join(directory, "cpu.cfs_quota_us"))
+            period_us = _read(os.path.join(directory, "cpu.cfs_period_us"))
+            if quota_us is None or period_us is None:
+                continue
+            found = True
+            if int(quota_us) > 0 and quota is None:
+                quota = int(quota_us) / int(period_us)
+        break
+    base = os.path.join(root, "memory")
+    if os.path.isdir(base):
+        for directory in _candidates(base, paths.get("memory", "/")):
+            limit = _read(os.path.join(directory, "memory.limit_in_bytes"))
+            if limit is None:
+                continue
+            found = True
+            if int(limit) < _UNLIMITED_MEMORY and memory is None:
+                memory = int(limit)
+    return quota, memory, found
+
+
+def detect_runtime_resources(cgroup_root: str = CGROUP_ROOT,
+                             proc_cgroup: str = "/proc/self/cgroup") -> RuntimeResources:
+    """
+    Read this process's CPU quota, usable CPUs and memory limit.
+
+    Args:
+        cgroup_root: Mount point of the cgroup filesystem
+        proc_cgroup: File listing this process's cgroups
+
+    Returns:
+        RuntimeResources (quota / memory limit None when unlimited)
+    """
+    host_cpus = os.cpu_count() or 1
+    try:
+        affinity_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        affinity_cpus = host_cpus
+
+    paths = _cgroup_paths(proc_cgroup)
+    quota, memory, found = _cgroup_v2_limits(cgroup_root, paths.get("", "/"))
+    source = "cgroup2"
+    if not found:
+        quota, memory, found = _cgroup_v1_limits(cgroup_root, paths)
+        source = "cgroup1"
+    if not found:
+        source = "host"
+    return RuntimeResources(
+        host_cpus=host_cpus,
+        affinity_cpus=affinity_cpus,
+        cpu_quota=quota,
+        memory_limit_bytes=memory,
+        source=source,
+    )
+
+
+def plan_threads(resources: RuntimeResources, optimization_config=None) -> ThreadPlan:
+    """
+    Thread counts for the given resources.
+
+    Compute pools get one thread per whole CPU of quota (at least one): a
+    fractional CPU cannot run a second compute thread without throttling.
+    Inference runs one graph at a time, so inter-op pools get one thread.
+    The asyncio default executor mostly waits on OpenAI/TTS calls, so it
+    keeps asyncio's own "CPUs + 4" sizing, computed from the quota.
+    """
+    optimization_config = optimization_config or config
+    compute = max(1, math.floor(resources.effective_cpus))
+
+    def setting(key: str, automatic: int) -> int:
+        value = int(optimization_config.get(key, 0) or 0)
+        return value if value > 0 else automatic
+
+    return ThreadPlan(
+        torch_intra_op=setting('torch_intra_op_threads', compute),
+        torch_inter_op=setting('torch_inter_op_threads', 1),
+        ort_intra_op=setting('ort_intra_op_threads', compute),
+        ort_inter_op=setting('ort_inter_op_threads', 1),
+        executor_workers=setting('executor_workers', min(32, math.ceil(resources.effective_cpus) + 4)),
+    )
+
+
+_lock = threading.Lock()
+_resources: Optional[RuntimeResources] = None
+_plan: Optional[ThreadPlan] = None
+_torch_applied = False
+
+
+def get_runtime_resources() -> RuntimeResources:
+    """Detected resources (read once per process)."""
+    global _resources
+    with _lock:
+        if _resources is None:
+            _resources = detect_runtime_resources()
+        return _resources
+
+
+def get_thread_plan() -> ThreadPlan:
+    """Thread counts for this process (computed once per process)."""
+    global _plan
+    resources = get_runtime_resources()
+    with _lock:
+        if _plan is None:
+            _plan = plan_threads(resources)
+        return _plan
+
+
+def apply_torch_threads() -> ThreadPlan:
+    """
+    Size torch's thread pools from the plan.
+
+    torch only accepts set_num_interop_threads before its first parallel
+    work, so this runs once; later calls return the plan unchanged.
+    """
+    global _torch_applied
+    plan = get_thread_plan()
+    with _lock:
+        if _torch_applied:
+            return plan
+        _torch_applied = True
+    import torch
+    torch.set_num_threads(plan.torch_intra_op)
+    try:
+        torch.set_num_interop_threads(plan.torch_inter_op)
+    except RuntimeError as e:
+        print(f"⚠️ Could not set torch inter-op threads ({e})")
+    return plan
+
+
+def install_default_executor(loop) -> ThreadPoolExecutor:
+    """Replace the event loop's default executor (run_in_executor(None, ...)) with one sized by the plan."""
+    executor = ThreadPoolExecutor(max_workers=get_thread_plan().executor_workers,
+                                  thread_name_prefix="wordwiz-executor")
+    loop.set_default_executor(executor)
+    return executor
+
+
+def get_runtime_resources_report() -> Dict[str, Any]:
+    """
+    Detected limits, the chosen thread counts and what torch actually uses.
+
+    torch's thread counts are only reported when something already imported
+    it, so the health check does not load torch into an ONNX-only server.
+    """
+    report = {
+        "resources": get_runtime_resources().summary(),
+        "threads": asdict(get_thread_plan()),
+        "torch_applied": _torch_applied,
+    }
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        report["torch_threads"] = {
+            "intra_op": torch.get_num_threads(),
+            "inter_op": torch.get_num_interop_threads(),
+        }
+    return report
@@ -0,0 +1,321 @@
+"""
+Model weights memory-mapped from disk so worker processes share them.
+
+Each uvicorn/gunicorn worker used to hold a private copy of the wav2vec2
+weights (hundreds of MB), which within the 1.5 GB container limit allows
+only one worker. With SHARED_MODEL_WEIGHTS enabled the weights are mapped
+read-only from a file under SHARED_WEIGHTS_DIR instead, so every worker's
+tensors point at the same page-cache pages and only the first worker pays
+for them:
+
+- PyTorch: the model's state dict is written once as a torch checkpoint,
+  then every worker builds the model on the meta device and loads the
+  checkpoint with torch.load(mmap=True) + load_state_dict(assign=True).
+  Dynamic quantization is skipped in this mode (it would create private
+  int8 copies of every Linear weight).
+- ONNX Runtime: the graph is optimized once and saved; workers load the
+  optimized graph with optimizations and weight pre-packing disabled and
+  hand ONNX Runtime the large initializers as numpy memmaps of that file
+  (SessionOptions.add_initializer does not copy them).
+
+worker_memory_report() reads /proc/self/smaps to show how much of a
+worker's RSS is shared versus private, and how much of each mapped weights
+file is resident.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .optimization_config import config
+
+# TensorProto.DataType -> numpy dtype, for initializers stored as raw_data
+_ONNX_DTYPES = {
+    1: np.float32, 2: np.uint8, 3: np.int8, 4: np.uint16, 5: np.int16,
+    6: np.int32, 7: np.int64, 9: np.bool_, 10: np.float16, 11: np.float64,
+    12: np.uint32, 13: np.uint64,
+}
+
+_write_lock = threading.Lock()
+
+
+def shared_weights_enabled() -> bool:
+    return config.get('shared_model_weights', False)
+
+
+def shared_weights_dir() -> str:
+    """Directory holding the memory-mapped weight files (created on demand)."""
+    directory = os.path.expanduser(config.get('shared_weights_dir', '~/.cache/wordwiz/shared_weights'))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def _file_stem(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "--", model_name.strip("/"))
+
+
+def _atomic_write(path: str, write) -> None:
+    """Write via a temp file + rename so concurrently starting workers never map a partial file."""
+    with _write_lock:
+        if os.path.exists(path):
+            return
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            write(temporary)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+
+# --- PyTorch ----------------------------------------------------------------
+
+def load_pytorch_model_mmap(model_class, model_name: str, directory: Optional[str] = None):
+    """
+    Load a transformers model with its weights memory-mapped from a shared checkpoint.
+
+    Args:
+        model_class: transformers model class, e.g. Wav2Vec2ForCTC
+        model_name: HuggingFace identifier or local path
+        directory: Where the checkpoint lives (defaults to shared_weights_dir())
+
+    Returns:
+        Model in eval mode whose parameters are views of the mapped file
+    """
+    import torch
+
+    path = os.path.join(directory or shared_weights_dir(), f"{_file_stem(model_name)}.pt")
+    if not os.path.exists(path):
+        print(f"💾 Writing shared weights for {model_name} to {path}")
+        model = model_class.from_pretrained(model_name)
+        _atomic_write(path, lambda target: torch.save(model.state_dict(), target))
+        del model
+
+    model_config = model_class.config_class.from_pretrained(model_name)
+    with torch.device("meta"):
+        model = model_class(model_config)
+    state_dict = torch.load(path, mmap=True, weights_only=True, map_location="cpu")
+    model.load_state_dict(state_dict, assign=True)
+    left_on_meta = [name for name, tensor in list(model.named_parameters()) + list(model.named_buffers())
+                    if tensor.is_meta]
+    if left_on_meta:
+        raise RuntimeError(f"Shared weights are missing tensors: {left_on_meta[:5]}")
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+# --- ONNX Runtime -----------------------------------------------------------
+
+def _read_varint(data, position: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = int(data[position])
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def _fields(data, start: int, end: int) -> Iterator[Tuple[int, int, Any, int]]:
+    """(field number, wire type, value or length, payload offset) for each protobuf field in data[start:end]."""
+    position = start
+    while position < end:
+        key, position = _read_varint(data, position)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, position = _read_varint(data, position)
+            yield number, wire_type, value, position
+        elif wire_type == 2:
+            length, position = _read_varint(data, position)
+            yield number, wire_type, length, position
+            position += length
+        elif wire_type == 1:
+            yield number, wire_type, None, position
+            position += 8
+        elif wire_type == 5:
+            yield number, wire_type, None, position
+            position += 4
+        else:
+            raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+
+
+def onnx_raw_initializers(path: str) -> List[Dict[str, Any]]:
+    """
+    Initializers of an ONNX file stored inline as raw_data, with their byte offsets.
+
+    Reads only the protobuf framing (ModelProto.graph.initializer), so the
+    onnx package is not needed.
+    """
+    with open(path, "rb") as f:
+        data = np.memmap(f, dtype=np.uint8, mode="r")
+        initializers = []
+        for number, wire_type, length, offset in _fields(data, 0, len(data)):
+            if number != 7 or wire_type != 2:  # ModelProto.graph
+                continue
+            for g_number, g_wire, g_length, g_offset in _fields(data, offset, offset + length):
+                if g_number != 5 or g_wire != 2:  # GraphProto.initializer
+                    continue
+                tensor = {"dims": [], "data_type": None, "name": None, "offset": None, "nbytes": 0}
+                for t_number, t_wire, t_value, t_offset in _fields(data, g_offset, g_offset + g_length):
+                    if t_number == 1 and t_wire == 0:
+                        tensor["dims"].append(t_value)
+                    elif t_number == 1 and t_wire == 2:  # packed dims
+                        position = t_offset
+                        while position < t_offset + t_value:
+                            dim, position = _read_varint(data, position)
+                            tensor["dims"].append(dim)
+                    elif t_number == 2 and t_wire == 0:
+                        tensor["data_type"] = t_value
+                    elif t_number == 8 and t_wire == 2:
+                        tensor["name"] = bytes(data[t_offset:t_offset + t_value]).decode("utf-8")
+                    elif t_number == 9 and t_wire == 2:
+                        tensor["offset"], tensor["nbytes"] = t_offset, t_value
+                if tensor["offset"] is not None and tensor["data_type"] in _ONNX_DTYPES:
+                    initializers.append(tensor)
+        del data
+    return initializers
+
+
+def create_shared_onnx_session(onnx_path: str, sess_options, providers: List[str],
+                               model_name: Optional[str] = None, directory: Optional[str] = None,
+                               min_bytes: int = 64 * 1024):
+    """
+    ONNX Runtime session whose large initializers are memory-mapped.
+
+    Args:
+        onnx_path: Original model file
+        sess_options: SessionOptions (its optimization level is used for the one-time optimization)
+        providers: Execution providers
+        model_name: Name for the cached optimized file (defaults to the file name)
+        directory: Where the optimized model lives (defaults to shared_weights_dir())
+        min_bytes: Initializers smaller than this stay private
+
+    Returns:
+        InferenceSession (keeps references to its mapped arrays)
+    """
+    import onnxruntime as ort
+
+    directory = directory or shared_weights_dir()
+    stem = _file_stem(model_name or os.path.splitext(os.path.basename(onnx_path))[0])
+    optimized_path = os.path.join(directory, f"{stem}.ort{ort.__version__}.optimized.onnx")
+
+    if not os.path.exists(optimized_path):
+        print(f"💾 Writing optimized shared ONNX model to {optimized_path}")
+
+        def optimize(target):
+            options = ort.SessionOptions()
+            # ORT_ENABLE_ALL layouts are specific to the CPU they were made on; the file may be reused elsewhere
+            options.graph_optimization_level = min(
+                sess_options.graph_optimization_level, ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+                key=int,
+            )
+            options.optimized_model_filepath = target
+            ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+
+        _atomic_write(optimized_path, optimize)
+
+    # The saved graph is already optimized; re-optimizing or pre-packing would copy the weights
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    sess_options.add_session_config_entry("session.disable_prepacking", "1")
+
+    mapped = []
+    for tensor in onnx_raw_initializers(optimized_path):
+        dtype = np.dtype(_ONNX_DTYPES[tensor["data_type"]])
+        count = int(np.prod(tensor["dims"])) if tensor["dims"] else 1
+        if tensor["nbytes"] < min_bytes or count * dtype.itemsize != tensor["nbytes"]:
+            continue
+        # Copy-on-write mapping: pages stay shared as long as nothing writes to them
+        array = np.memmap(optimized_path, dtype=dtype, mode="c", offset=tensor["offset"],
+                          shape=tuple(tensor["dims"]))
+        value = ort.OrtValue.ortvalue_from_numpy(array)
+        sess_options.add_initializer(tensor["name"], value)
+        mapped.append((array, value))
+
+    session = ort.InferenceSession(optimized_path, sess_options=sess_options, providers=providers)
+    session._shared_initializers = mapped  # must outlive the session
+    return session
+
+
+# --- Memory report ----------------------------------------------------------
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty", "Anonymous", "Swap")
+
+
+def _parse_smaps(path: str, mapping_prefix: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+    """Sum smaps fields (bytes), per mapped file under mapping_prefix or for the whole process."""
+    totals: Dict[str, Dict[str, int]] = {}
+    current = None
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            if not parts[0].endswith(":") or "-" in parts[0]:
+                # Mapping header: "start-end perms offset dev inode [path]"
+                name = parts[5] if len(parts) > 5 else ""
+                if mapping_prefix is None:
+                    current = "process"
+                else:
+                    current = name if name.startswith(mapping_prefix) else None
+                continue
+            field = parts[0].rstrip(":")
+            if current is not None and field in _SMAPS_FIELDS:
+                entry = totals.setdefault(current, dict.fromkeys(_SMAPS_FIELDS, 0))
+                entry[field] += int(parts[1]) * 1024
+    return totals
+
+
+def _summarize(fields: Dict[str, int]) -> Dict[str, float]:
+    mb = 1024 ** 2
+    return {
+        "rss_mb": round(fields["Rss"] / mb, 1),
+        "pss_mb": round(fields["Pss"] / mb, 1),
+        "shared_mb": round((fields["Shared_Clean"] + fields["Shared_Dirty"]) / mb, 1),
+        "private_mb": round((fields["Private_Clean"] + fields["Private_Dirty"]) / mb, 1),
+    }
+
+
+def worker_memory_report(pid: Optional[int] = None) -> Dict[str, Any]:
+    """
+    RSS of this worker split into shared and private memory, plus the
+    resident share of each memory-mapped weights file.
+
+    PSS divides shared pages between the processes mapping them, so the sum
+    of PSS over all workers is the container's real footprint.
+    """
+    pid = pid or os.getpid()
+    report: Dict[str, Any] = {"pid": pid, "shared_weights_enabled": shared_weights_enabled()}
+    smaps = f"/proc/{pid}/smaps"
+    if not os.path.exists(smaps):
+        try:
+            import psutil
+            info = psutil.Process(pid).memory_info()
+            report["process"] = {"rss_mb": round(info.rss / 1024 ** 2, 1)}
+        except Exception:
+            report["process"] = None
+        return report
+
+    report["process"] = _summarize(_parse_smaps(smaps)["process"])
+    directory = os.path.expanduser(config.get('shared_weights_dir', '~/.cache/wordwiz/shared_weights'))
+    report["weights_files"] = {
+        os.path.basename(path): _summarize(fields)
+        for path, fields in _parse_smaps(smaps, mapping_prefix=os.path.realpath(directory)).items()
+    }
+    return report
+
+
+def log_worker_memory_report() -> Dict[str, Any]:
+    """Print the worker memory report (used at startup)."""
+    report = worker_memory_report()
+    process = report.get("process") or {}
+    print(f"🧠 Worker {report['pid']} memory: RSS {process.get('rss_mb', '?')} MB "
+          f"(shared {process.get('shared_mb', '?')} MB, private {process.get('private_mb', '?')} MB, "
+          f"PSS {process.get('pss_mb', '?')} MB)")
+    for name, fields in report.get("weights_files", {}).items():
+        print(f"   - {name}: {fields['rss_mb']} MB resident, {fields['shared_mb']} MB shared")
+    return report
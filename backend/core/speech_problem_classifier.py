@@ -1,4 +1,14 @@
-from collections import Counter, defaultdict
+from collections import Counter
+from typing import Iterable, NamedTuple, Optional
+
+
+class PhonemeInfo(NamedTuple):
+    """Everything the classifier knows about one phoneme (see SpeechProblemClassifier.PHONEME_INDEX)."""
+    group: Optional[str]
+    articulatory: Optional[dict]
+    difficulty: Optional[int]
+    high_frequency: bool
+
 
 class SpeechProblemClassifier:
     """
@@ -86,70 +96,20 @@ class SpeechProblemClassifier:
         Returns:
             dict: A summary of the most common problems.
         """
-        phoneme_errors = Counter()
-        word_errors = Counter()
-        phoneme_group_errors = defaultdict(Counter)
-
-        for result in results:
-            if result["type"] in ("match", "substitution"):
-                # Count missed, added, and substituted phonemes
-                phoneme_errors.update(result.get("missed") or [])
-                phoneme_errors.update(result.get("added") or [])
-                phoneme_errors.update([sub[0] for sub in (result.get("substituted") or [])])  # Incorrect phonemes
-
-                # Classify errors by phoneme group
-                for phoneme in (result.get("missed") or []):
-                    SpeechProblemClassifier._update_group_errors(phoneme_group_errors, phoneme)
-                for phoneme in (result.get("added") or []):
-                    SpeechProblemClassifier._update_group_errors(phoneme_group_errors, phoneme)
-                for sub in (result.get("substituted") or []):
-                    SpeechProblemClassifier._update_group_errors(phoneme_group_errors, sub[0])  # Incorrect phoneme
-
-            elif result["type"] == "deletion":
-                # Count missing words
-                word_errors[result["ground_truth_word"]] += 1
-
-            elif result["type"] == "insertion":
-                # Count extra predicted words
-                word_errors[result["predicted_word"]] += 1
-
-        # Find the most common phoneme and word errors
-        most_common_phoneme = phoneme_errors.most_common(1)
-        most_common_word = word_errors.most_common(1)
-
-        # Summarize phoneme group errors
-        phoneme_group_summary = {
-            group: sum(counts.values()) for group, counts in phoneme_group_errors.items()
-        }
-
-        # Get articulatory information for problematic phonemes
-        phoneme_articulatory_info = {}
-        phoneme_difficulty_levels = {}
-        
-        for phoneme, count in phoneme_errors.items():
-            if phoneme in SpeechProblemClassifier.ARTICULATORY_INFO:
-                phoneme_articulatory_info[phoneme] = SpeechProblemClassifier.ARTICULATORY_INFO[phoneme]
-            if phoneme in SpeechProblemClassifier.PHONEME_DIFFICULTY:
-                phoneme_difficulty_levels[phoneme] = SpeechProblemClassifier.PHONEME_DIFFICULTY[phoneme]
-        
-        # Include ALL phoneme errors sorted by count (most problematic first)
-        # This ensures no phoneme is ignored regardless of whether it's in HIGH_FREQUENCY_PHONEMES
-        high_frequency_errors = [(phoneme, count) for phoneme, count in phoneme_errors.most_common()]
-        
-        # Determine recommended focus phoneme based on frequency, difficulty, and utility
-        recommended_focus = SpeechProblemClassifier._determine_focus_phoneme(phoneme_errors)
+        accumulator = ProblemSummaryAccumulator()
+        accumulator.add_results(results)
+        return accumulator.summary()
 
-        return {
-            "most_common_phoneme": most_common_phoneme[0] if most_common_phoneme else None,
-            "most_common_word": most_common_word[0] if most_common_word else None,
-            "phoneme_error_counts": dict(phoneme_errors),
-            "word_error_counts": dict(word_errors),
-            "phoneme_group_errors": phoneme_group_summary,
-            "phoneme_articulatory_info": phoneme_articulatory_info,
-            "phoneme_difficulty_levels": phoneme_difficulty_levels,
-            "high_frequency_errors": high_frequency_errors,
-            "recommended_focus_phoneme": recommended_focus,
-        }
+    @staticmethod
+    def merge_summaries(summaries: Iterable[dict]) -> dict:
+        """
+        Combines problem summaries of many sentences (e.g. stored feedback entries)
+        into one, as if classify_problems had seen all of their results.
+        """
+        accumulator = ProblemSummaryAccumulator()
+        for summary in summaries:
+            accumulator.add_summary(summary)
+        return accumulator.summary()
 
     @staticmethod
     def _update_group_errors(group_errors, phoneme):
@@ -160,10 +120,9 @@ class SpeechProblemClassifier:
             group_errors (defaultdict): A defaultdict of Counters for phoneme groups.
             phoneme (str): The phoneme to classify and count.
         """
-        for group, phonemes in SpeechProblemClassifier.PHONEME_GROUPS.items():
-            if phoneme in phonemes:
-                group_errors[group][phoneme] += 1
-                break
+        info = SpeechProblemClassifier.PHONEME_INDEX.get(phoneme)
+        if info is not None and info.group is not None:
+            group_errors[info.group][phoneme] += 1
     
     @staticmethod
     def _determine_focus_phoneme(phoneme_errors):
@@ -178,10 +137,11 @@ class SpeechProblemClassifier:
         """
         if not phoneme_errors:
             return None
-        
-        # Get all errors sorted by count (highest first)
-        sorted_errors = phoneme_errors.most_common()
-        
+        return SpeechProblemClassifier._focus_from_sorted(phoneme_errors.most_common())
+
+    @staticmethod
+    def _focus_from_sorted(sorted_errors):
+        """_determine_focus_phoneme for errors already sorted by count (highest first)."""
         if not sorted_errors:
             return None
         
@@ -195,6 +155,117 @@ class SpeechProblemClassifier:
         # Otherwise, it's just the most frequent error
         return (most_errors_phoneme, "most_frequent_error")
 
+    @staticmethod
+    def _build_phoneme_index() -> dict:
+        """
+        Inverted index of the tables above: phoneme -> PhonemeInfo.
+
+        A phoneme belongs to the first group (in PHONEME_GROUPS order) that holds it.
+        """
+        cls = SpeechProblemClassifier
+        groups = {}
+        for group, phonemes in cls.PHONEME_GROUPS.items():
+            for phoneme in phonemes:
+                groups.setdefault(phoneme, group)
+        phonemes = set(groups) | set(cls.ARTICULATORY_INFO) | set(cls.PHONEME_DIFFICULTY) | cls.HIGH_FREQUENCY_PHONEMES
+        return {
+            phoneme: PhonemeInfo(
+                group=groups.get(phoneme),
+                articulatory=cls.ARTICULATORY_INFO.get(phoneme),
+                difficulty=cls.PHONEME_DIFFICULTY.get(phoneme),
+                high_frequency=phoneme in cls.HIGH_FREQUENCY_PHONEMES,
+            )
+            for phoneme in phonemes
+        }
+
+
+# One dict lookup per error phoneme instead of scanning every table
+SpeechProblemClassifier.PHONEME_INDEX = SpeechProblemClassifier._build_phoneme_index()
+
+
+class ProblemSummaryAccumulator:
+    """
+    Incremental classify_problems: phoneme and word error counts of any number
+    of sentences, added from word results or from stored problem summaries.
+
+    The group, articulatory, difficulty and focus fields of the summary are all
+    derived from the counts, so summaries merge without the original results.
+    """
+
+    def __init__(self):
+        self.phoneme_errors = Counter()
+        self.word_errors = Counter()
+        self.sentences = 0
+
+    def add_results(self, results) -> "ProblemSummaryAccumulator":
+        """Count the errors of one sentence's word results in a single pass."""
+        phoneme_errors = self.phoneme_errors
+        word_errors = self.word_errors
+        for result in results:
+            result_type = result["type"]
+            if result_type in ("match", "substitution"):
+                # Missed, added, then the expected phoneme of each substitution
+                for phoneme in (result.get("missed") or ()):
+                    phoneme_errors[phoneme] += 1
+                for phoneme in (result.get("added") or ()):
+                    phoneme_errors[phoneme] += 1
+                for sub in (result.get("substituted") or ()):
+                    phoneme_errors[sub[0]] += 1
+            elif result_type == "deletion":
+                word_errors[result["ground_truth_word"]] += 1
+            elif result_type == "insertion":
+                word_errors[result["predicted_word"]] += 1
+        self.sentences += 1
+        return self
+
+    def add_summary(self, summary: dict) -> "ProblemSummaryAccumulator":
+        """Fold in a summary from classify_problems (e.g. a stored feedback entry's)."""
+        self.phoneme_errors.update(summary.get("phoneme_error_counts") or {})
+        self.word_errors.update(summary.get("word_error_counts") or {})
+        self.sentences += 1
+        return self
+
+    def merge(self, other: "ProblemSummaryAccumulator") -> "ProblemSummaryAccumulator":
+        """Fold in another accumulator (e.g. one per student into a class total)."""
+        self.phoneme_errors.update(other.phoneme_errors)
+        self.word_errors.update(other.word_errors)
+        self.sentences += other.sentences
+        return self
+
+    def summary(self) -> dict:
+        """The classify_problems summary of everything added so far."""
+        index = SpeechProblemClassifier.PHONEME_INDEX
+        phoneme_group_summary = {}
+        phoneme_articulatory_info = {}
+        phoneme_difficulty_levels = {}
+        for phoneme, count in self.phoneme_errors.items():
+            info = index.get(phoneme)
+            if info is None:
+                continue
+            if info.group is not None:
+                phoneme_group_summary[info.group] = phoneme_group_summary.get(info.group, 0) + count
+            if info.articulatory is not None:
+                phoneme_articulatory_info[phoneme] = info.articulatory
+            if info.difficulty is not None:
+                phoneme_difficulty_levels[phoneme] = info.difficulty
+
+        # Include ALL phoneme errors sorted by count (most problematic first)
+        sorted_errors = self.phoneme_errors.most_common()
+        sorted_words = self.word_errors.most_common(1)
+
+        return {
+            "most_common_phoneme": sorted_errors[0] if sorted_errors else None,
+            "most_common_word": sorted_words[0] if sorted_words else None,
+            "phoneme_error_counts": dict(self.phoneme_errors),
+            "word_error_counts": dict(self.word_errors),
+            "phoneme_group_errors": phoneme_group_summary,
+            "phoneme_articulatory_info": phoneme_articulatory_info,
+            "phoneme_difficulty_levels": phoneme_difficulty_levels,
+            "high_frequency_errors": sorted_errors,
+            "recommended_focus_phoneme": SpeechProblemClassifier._focus_from_sorted(sorted_errors),
+        }
+
+
 if __name__ == "__main__":
     from audio_recording import record_and_process_pronunciation
     from process_audio import analyze_results
@@ -3,14 +3,15 @@ import html
 import json
 
 from dotenv import load_dotenv
-from elevenlabs import stream
-from elevenlabs.client import ElevenLabs
 from google.cloud import texttospeech as texttospeech
 from google.oauth2 import service_account
 
 
 class ElevenLabsAPIClient:
     def __init__(self):
+        # Imported here: the server uses GoogleTTSAPIClient
+        from elevenlabs.client import ElevenLabs
+
         load_dotenv()
         self.client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
 
@@ -0,0 +1,180 @@
+"""
+Compact per-word alignment results.
+
+_process_word_alignment used to build a ~14-key dict per word that held
+the same phonemes up to four times (phonemes, ground_truth_phonemes,
+expected_phonemes, actual_phonemes) plus the missed/added/substituted
+lists. A WordAlignment keeps one copy of each sequence as an array of
+phoneme ids (core.phoneme_inventory) in __slots__, and derives the
+counts and the duplicated views on access.
+
+It is a read-only Mapping with exactly the legacy keys, so code that
+reads result["per"] keeps working; to_dict() / word_alignment_records()
+produce the legacy dicts where the results leave the analysis (pandas,
+JSON and the database, see process_audio.analyze_results).
+"""
+
+from array import array
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, List, Optional
+
+from .phoneme_inventory import EMPTY_IDS, phoneme_inventory
+
+_BASE_KEYS = (
+    "type", "predicted_word", "ground_truth_word", "phonemes", "ground_truth_phonemes",
+    "expected_phonemes", "actual_phonemes", "per", "missed", "added", "substituted",
+    "total_phonemes", "total_errors",
+)
+
+# Shared by every result without missed / added / substituted phonemes (never mutated)
+_EMPTY = EMPTY_IDS["H"]
+
+_ERRORS = {
+    "insertion": "Extra word predicted.",
+    "deletion": "Word missing in prediction.",
+}
+
+
+class WordAlignment(Mapping):
+    """Alignment of one expected word with what was said, phonemes stored as id arrays."""
+
+    __slots__ = (
+        "type", "predicted_word", "ground_truth_word", "per",
+        "expected", "actual", "missed", "added", "substituted",
+        "start_time", "end_time", "timed",
+    )
+
+    def __init__(self, type: str, predicted_word: str, ground_truth_word: str, per: float,
+                 expected: array, actual: array, missed: array, added: array, substituted: array):
+        """
+        Args:
+            type: 'match', 'substitution', 'insertion' or 'deletion'
+            per: Phoneme error rate of the word
+            expected / actual: Expected and realized phoneme ids
+            missed / added: Deleted and inserted phoneme ids
+            substituted: (expected, realized) id pairs, flattened
+        """
+        self.type = type
+        self.predicted_word = predicted_word
+        self.ground_truth_word = ground_truth_word
+        self.per = per
+        self.expected = expected
+        self.actual = actual
+        self.missed = missed
+        self.added = added
+        self.substituted = substituted
+        self.start_time = None
+        self.end_time = None
+        self.timed = False
+
+    @classmethod
+    def aligned(cls, type: str, predicted_word: str, ground_truth_word: str,
+                gt_ids: tuple, pred_ids: tuple, word_errors: tuple) -> "WordAlignment":
+        """
+        A matched or substituted word.
+
+        Args:
+            gt_ids / pred_ids: Interned expected and realized phonemes
+            word_errors: (missed, added, substituted) id arrays, as from
+                RequestCostCache.word_errors
+        """
+        missed, added, substituted = word_errors
+        errors = len(missed) + len(added) + len(substituted) // 2
+        typecode = missed.typecode
+        return cls(type, predicted_word, ground_truth_word, round(errors / max(len(gt_ids), 1), 4),
+                   array(typecode, gt_ids), array(typecode, pred_ids) if pred_ids else _EMPTY,
+                   missed, added, substituted)
+
+    @classmethod
+    def inserted(cls, predicted_word: str, pred_phonemes: Optional[List[str]]) -> "WordAlignment":
+        """An extra predicted word (not a mispronunciation of an expected word, so PER 0)."""
+        actual = phoneme_inventory.encode_array(pred_phonemes) if pred_phonemes else _EMPTY
+        return cls("insertion", predicted_word, "", 0.0, _EMPTY, actual, _EMPTY, actual, _EMPTY)
+
+    @classmethod
+    def deleted(cls, ground_truth_word: str, gt_phonemes: List[str]) -> "WordAlignment":
+        """An expected word that was not said: every phoneme was missed."""
+        expected = phoneme_inventory.encode_array(gt_phonemes) if gt_phonemes else _EMPTY
+        return cls("deletion", "", ground_truth_word, 1.0, expected, _EMPTY, expected, _EMPTY, _EMPTY)
+
+    def set_times(self, start_time: Optional[float], end_time: Optional[float]) -> None:
+        """Attach word timestamps (adds the start_time / end_time keys)."""
+        self.start_time = start_time
+        self.end_time = end_time
+        self.timed = True
+
+    @property
+    def total_phonemes(self) -> int:
+        return len(self.expected)
+
+    @property
+    def total_errors(self) -> int:
+        if self.type == "insertion":
+            return 0
+        return len(self.missed) + len(self.added) + len(self.substituted) // 2
+
+    def _substituted_pairs(self) -> list:
+        symbols = phoneme_inventory.decode(self.substituted)
+        return list(zip(symbols[0::2], symbols[1::2]))
+
+    def _keys(self) -> tuple:
+        keys = _BASE_KEYS
+        if self.type in _ERRORS:
+            keys += ("error",)
+        if self.timed:
+            keys += ("start_time", "end_time")
+        return keys
+
+    def __getitem__(self, key: str) -> Any:
+        decode = phoneme_inventory.decode
+        if key in ("phonemes", "actual_phonemes"):
+            return decode(self.actual)
+        if key in ("ground_truth_phonemes", "expected_phonemes"):
+            return decode(self.expected)
+        if key in ("missed", "added"):
+            return decode(getattr(self, key))
+        if key == "substituted":
+            return self._substituted_pairs()
+        if key == "error" and self.type in _ERRORS:
+            return _ERRORS[self.type]
+        if key in ("start_time", "end_time") and not self.timed:
+            raise KeyError(key)
+        if key in _BASE_KEYS or key in ("start_time", "end_time"):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __reduce__(self):
+        # Phoneme ids are per process: pickle the symbols (e.g. results of the
+        # audio process pool) and intern them again where they are loaded
+        decode = phoneme_inventory.decode
+        return (_restore, (self.type, self.predicted_word, self.ground_truth_word, self.per,
+                           decode(self.expected), decode(self.actual), decode(self.missed),
+                           decode(self.added), decode(self.substituted),
+                           self.start_time, self.end_time, self.timed))
+
+    def to_dict(self) -> dict:
+        """The legacy result dict (what _process_word_alignment used to return)."""
+        return {key: self[key] for key in self._keys()}
+
+    def __repr__(self) -> str:
+        return f"WordAlignment({self.to_dict()!r})"
+
+
+def _restore(type, predicted_word, ground_truth_word, per, expected, actual, missed, added, substituted,
+             start_time, end_time, timed) -> WordAlignment:
+    encode = phoneme_inventory.encode_array
+    result = WordAlignment(type, predicted_word, ground_truth_word, per, encode(expected), encode(actual),
+                           encode(missed), encode(added), encode(substituted))
+    result.start_time, result.end_time, result.timed = start_time, end_time, timed
+    return result
+
+
+def word_alignment_records(results: Iterable) -> List[dict]:
+    """Legacy dicts for a list of results (WordAlignment or dicts already)."""
+    return [result.to_dict() if isinstance(result, WordAlignment) else result for result in results]
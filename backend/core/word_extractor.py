@@ -1,10 +1,14 @@
 # %%
-import torch
 import asyncio
-from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
+import random
 import re
 import os
+import threading
+import time
 import numpy as np
+from .model_registry import model_registry
+from .optimization_config import config
+from .shared_weights import load_pytorch_model_mmap, shared_weights_enabled
 
 
 def default_model_output_processing(transcription):
@@ -20,6 +24,8 @@ def default_model_output_processing(transcription):
     return filtered_transcription
 
 
+# torch and transformers are imported inside WordExtractor so the server,
+# which uses WordExtractorOnline, does not load them through this module
 class WordExtractor:
     def __init__(
         self,
@@ -28,18 +34,37 @@ class WordExtractor:
     ):
         # Replace with your pre-trained phoneme model identifier from Hugging Face
         self.model_name = model_name
-        # Load the phoneme tokenizer and model
-        self.processor = Wav2Vec2Processor.from_pretrained(
-            self.model_name,
+        # Load the tokenizer and model once per process (core.model_registry)
+        self._shared_weights = shared_weights_enabled()
+        components, self._registry_release = model_registry.hold(
+            self, ("pytorch-word", self.model_name, self._shared_weights), self._load_components
         )
-
-        self.model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
+        self.processor = components["processor"]
+        self.model = components["model"]
 
         self.blank_token_id = self.processor.tokenizer.pad_token_id  # for CTC loss
 
         self.model_output_processing = model_output_processing
 
+    def _load_components(self):
+        from transformers import Wav2Vec2ForCTC, Wav2Vec2Processor
+
+        processor = Wav2Vec2Processor.from_pretrained(
+            self.model_name,
+        )
+        if self._shared_weights:
+            model = load_pytorch_model_mmap(Wav2Vec2ForCTC, self.model_name)
+        else:
+            model = Wav2Vec2ForCTC.from_pretrained(self.model_name)
+        return {"processor": processor, "model": model}
+
+    def close(self):
+        """Release this extractor's reference to the shared model."""
+        self._registry_release()
+
     async def extract_words(self, audio, sampling_rate=16000):
+        import torch
+
         # Load the audio file
         # Tokenize the audio file
         input_values = self.processor(
@@ -69,11 +94,59 @@ class WordExtractor:
         return transcription
 
 
+def encode_pcm16(audio: np.ndarray) -> bytes:
+    """
+    Float audio as 16-bit PCM bytes, the same samples as
+    ((audio / peak if peak > 1 else audio) * 32767).astype(np.int16).
+
+    The peak comes from max/min (no abs() copy) and the samples are scaled
+    straight into the int16 buffer, so the usual [-1, 1] signal is read
+    once and only the PCM is written.
+    """
+    if audio.size == 0:
+        return b""
+    peak = max(abs(float(audio.max())), abs(float(audio.min())))
+    if peak > 1.0:
+        # Rare (preprocessed audio is already in [-1, 1]): normalize as before
+        audio = audio / audio.dtype.type(peak) if audio.dtype.kind == "f" else audio / peak
+    pcm = np.empty(audio.shape, dtype=np.int16)
+    np.multiply(audio, 32767, out=pcm, casting="unsafe")
+    return pcm.tobytes()
+
+
+def _parse_transcription(result: dict) -> list:
+    """Transcripts of every channel's best alternative in a Deepgram response."""
+    transcriptions = []
+    if result.get("results") and result["results"].get("channels"):
+        for channel in result["results"]["channels"]:
+            if channel.get("alternatives"):
+                transcript = channel["alternatives"][0].get("transcript", "")
+                if transcript:
+                    transcriptions.append(transcript)
+    return transcriptions
+
+
+# Statuses worth another attempt; other 4xx (bad key, bad audio) fail the same way again
+_RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
 class WordExtractorOnline:
-    def __init__(self, model_output_processing=default_model_output_processing):
+    def __init__(self, model_output_processing=default_model_output_processing, base_url=None,
+                 concurrency=None, deadline=None, retry_backoff=1.0):
         """
         Initialize Deepgram Speech-to-Text client.
         Requires DEEPGRAM_KEY environment variable to be set.
+
+        Requests go through one pooled keep-alive HTTP client (httpx) on a
+        dedicated I/O event loop, so every caller - the server's loop,
+        scripts, worker threads - reuses the same connections.
+
+        Args:
+            base_url: Endpoint (default DEEPGRAM_URL, e.g. a local stub server in tests)
+            concurrency: Requests in flight at once, also the connection pool size
+                (default DEEPGRAM_CONCURRENCY)
+            deadline: Total seconds per call across retries (default DEEPGRAM_DEADLINE)
+            retry_backoff: Base of the jittered exponential backoff between attempts
         """
         # Get Deepgram API key from environment
         self.api_key = os.getenv("DEEPGRAM_KEY")
@@ -81,7 +154,47 @@ class WordExtractorOnline:
             raise ValueError("DEEPGRAM_KEY environment variable is not set")
         
         self.model_output_processing = model_output_processing
-        self.deepgram_url = "https://api.deepgram.com/v1/listen"
+        self.deepgram_url = base_url or config.get('deepgram_url', "https://api.deepgram.com/v1/listen")
+        self.concurrency = max(concurrency or config.get('deepgram_concurrency', 8), 1)
+        self.deadline = deadline or config.get('deepgram_deadline', 20.0)
+        self.retry_backoff = retry_backoff
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._slots = None
+
+    def _io_loop(self) -> asyncio.AbstractEventLoop:
+        """The I/O loop thread owning the HTTP client, started on first use."""
+        with self._lock:
+            if self._loop is None:
+                import httpx
+
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="deepgram-io", daemon=True)
+                thread.start()
+                self._client = httpx.AsyncClient(
+                    headers={"Authorization": f"Token {self.api_key}", "Content-Type": "audio/wav"},
+                    limits=httpx.Limits(max_connections=self.concurrency,
+                                        max_keepalive_connections=self.concurrency,
+                                        keepalive_expiry=30.0),
+                )
+                self._slots = asyncio.Semaphore(self.concurrency)
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _submit(self, audio, sampling_rate, timeout, max_retries):
+        """Encode the audio and start the transcription on the I/O loop."""
+        # Convert numpy array to bytes if needed
+        audio_bytes = encode_pcm16(audio) if isinstance(audio, np.ndarray) else audio
+        return asyncio.run_coroutine_threadsafe(
+            self._transcribe(audio_bytes, sampling_rate, timeout, max_retries), self._io_loop()
+        )
+
+    async def extract_words_async(self, audio, sampling_rate=16000, timeout=15, max_retries=2):
+        """extract_words without holding a thread while the request is in flight."""
+        return await asyncio.wrap_future(self._submit(audio, sampling_rate, timeout, max_retries))
 
     def extract_words(self, audio, sampling_rate=16000, timeout=15, max_retries=2):
         """
@@ -90,26 +203,16 @@ class WordExtractorOnline:
         Args:
             audio: numpy array of audio data or bytes
             sampling_rate: sampling rate of the audio (default: 16000)
-            timeout: timeout in seconds for the API call (default: 15)
+            timeout: timeout in seconds for each attempt (default: 15)
             max_retries: maximum number of retry attempts (default: 2)
 
         Returns:
             List of words extracted from the audio
         """
-        import time
-        import requests
-        
-        # Convert numpy array to bytes if needed
-        if isinstance(audio, np.ndarray):
-            # Normalize audio to [-1, 1] range if not already
-            if np.max(np.abs(audio)) > 1.0:
-                audio = audio / np.max(np.abs(audio))
-
-            # Ensure audio is in the correct format (16-bit PCM)
-            audio_int16 = (audio * 32767).astype(np.int16)
-            audio_bytes = audio_int16.tobytes()
-        else:
-            audio_bytes = audio
+        return self._submit(audio, sampling_rate, timeout, max_retries).result()
+
+    async def _transcribe(self, audio_bytes, sampling_rate, timeout, max_retries):
+        import httpx
 
         # Validate audio length
         if len(audio_bytes) == 0:
@@ -120,12 +223,6 @@ class WordExtractorOnline:
         audio_duration = len(audio_bytes) / (sampling_rate * 2)  # 2 bytes per sample (16-bit)
         print(f"📤 Sending {audio_duration:.2f}s audio to Deepgram for transcription...")
 
-        # Prepare headers
-        headers = {
-            "Authorization": f"Token {self.api_key}",
-            "Content-Type": "audio/wav"
-        }
-
         # Prepare query parameters
         params = {
             "model": "nova-2",
@@ -136,23 +233,30 @@ class WordExtractorOnline:
             "sample_rate": sampling_rate
         }
 
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
         # Retry loop
         last_error = None
+        attempts = 0
         for attempt in range(max_retries + 1):
+            if attempt > 0:
+                # Full jitter, so requests that failed together do not retry together
+                delay = random.uniform(0, self.retry_backoff * 2 ** (attempt - 1))
+                if loop.time() + delay >= deadline:
+                    break
+                print(f"🔄 Retry attempt {attempt}/{max_retries} for word extraction...")
+                await asyncio.sleep(delay)
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            attempt_timeout = min(timeout, remaining)
+            attempts += 1
             try:
-                if attempt > 0:
-                    print(f"🔄 Retry attempt {attempt}/{max_retries} for word extraction...")
-                    time.sleep(1 * attempt)  # Exponential backoff
-                
-                # Perform the transcription with timeout
+                # Perform the transcription with timeout (waiting for a slot included)
                 start_time = time.time()
-                response = requests.post(
-                    self.deepgram_url,
-                    headers=headers,
-                    params=params,
-                    data=audio_bytes,
-                    timeout=timeout
-                )
+                response = await asyncio.wait_for(self._post(audio_bytes, params, attempt_timeout), attempt_timeout)
                 elapsed_time = time.time() - start_time
                 
                 # Check if request was successful
@@ -164,13 +268,7 @@ class WordExtractorOnline:
                 print(f"✓ Deepgram transcription completed in {elapsed_time:.2f}s")
 
                 # Extract transcription from response
-                transcriptions = []
-                if result.get("results") and result["results"].get("channels"):
-                    for channel in result["results"]["channels"]:
-                        if channel.get("alternatives"):
-                            transcript = channel["alternatives"][0].get("transcript", "")
-                            if transcript:
-                                transcriptions.append(transcript)
+                transcriptions = _parse_transcription(result)
                 
                 print(f"📝 Transcription results: {transcriptions}")
 
@@ -187,31 +285,39 @@ class WordExtractorOnline:
 
                 return transcription
 
-            except requests.exceptions.Timeout as e:
+            except (asyncio.TimeoutError, httpx.TimeoutException) as e:
                 last_error = e
-                print(f"⏱️  Timeout after {timeout}s - audio may be too long or network is slow")
-                if attempt == max_retries:
-                    print(f"❌ All {max_retries + 1} attempts failed due to timeout")
-                    return []
+                print(f"⏱️  Timeout after {attempt_timeout:.1f}s - audio may be too long or network is slow")
             
-            except requests.exceptions.HTTPError as e:
+            except httpx.HTTPStatusError as e:
                 last_error = e
-                print(f"❌ Deepgram API error: {e} - {response.text if 'response' in locals() else 'No response'}")
-                if attempt == max_retries:
-                    print(f"❌ All {max_retries + 1} attempts failed due to API error")
-                    return []
+                print(f"❌ Deepgram API error: {e} - {e.response.text}")
+                if e.response.status_code not in _RETRY_STATUSES:
+                    break
             
             except Exception as e:
                 last_error = e
                 print(f"❌ Unexpected error during Deepgram transcription: {e}")
-                if attempt == max_retries:
-                    print(f"❌ All {max_retries + 1} attempts failed")
-                    return []
         
-        # Should not reach here, but just in case
-        print(f"❌ Word extraction failed after {max_retries + 1} attempts: {last_error}")
+        print(f"❌ Word extraction failed after {attempts} attempt(s): {last_error}")
         return []
 
+    async def _post(self, audio_bytes, params, timeout):
+        async with self._slots:
+            return await self._client.post(self.deepgram_url, params=params, content=audio_bytes, timeout=timeout)
+
+    def close(self):
+        """Close the pooled connections and stop the I/O loop."""
+        with self._lock:
+            loop, thread, client = self._loop, self._thread, self._client
+            self._loop = self._thread = self._client = self._slots = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
 
 # if __name__ == '__main__':
 #     from grapheme_to_phoneme import grapheme_to_phoneme
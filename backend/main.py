@@ -38,5 +38,55 @@ app.include_router(feedback.router, prefix="/feedback")
 app.include_router(classes.router, prefix="/classes")
 app.include_router(health.router)  # Health check endpoints
 
+
+@app.on_event("startup")
+async def size_default_executor():
+    """Size run_in_executor's default thread pool to the container's CPU quota."""
+    import asyncio
+    from core.runtime_resources import install_default_executor
+    install_default_executor(asyncio.get_running_loop())
+
+
+@app.on_event("startup")
+async def start_audio_process_pool():
+    """Start the preprocessing/alignment worker processes (AUDIO_PROCESS_POOL) before traffic arrives."""
+    import asyncio
+    from core.audio_process_pool import get_audio_process_pool
+    pool = get_audio_process_pool()
+    if pool is not None:
+        await asyncio.to_thread(pool.start)
+
+
+@app.on_event("shutdown")
+async def stop_audio_process_pool():
+    from core.audio_process_pool import shutdown_audio_process_pool
+    shutdown_audio_process_pool()
+
+
+@app.on_event("startup")
+async def load_pronunciation_lexicon():
+    """Load (or build) the grapheme-to-phoneme lexicon in the background."""
+    import asyncio
+    from core.pronunciation_lexicon import get_pronunciation_lexicon
+    app.state.lexicon_loading = asyncio.get_running_loop().run_in_executor(None, get_pronunciation_lexicon)
+
+
+@app.on_event("startup")
+async def load_models():
+    """
+    Load the models in the background so the app answers health checks at once
+    (GET /health/ready turns ready when they are warm), then log how much of this
+    worker's memory is shared with the other workers.
+    """
+    import asyncio
+    from core.model_loader import load_all_models
+    from core.shared_weights import log_worker_memory_report
+
+    async def report_worker_memory(loading):
+        await asyncio.gather(*loading, return_exceptions=True)
+        log_worker_memory_report()
+
+    app.state.model_loading = asyncio.create_task(report_worker_memory(load_all_models()))
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
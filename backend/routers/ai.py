@@ -2,11 +2,14 @@ from auth.auth_handler import get_current_active_user
 from core.modes.story import StoryPractice
 from core.modes.unlimited import UnlimitedPractice
 from core.modes.choice_story import ChoiceStoryPractice
+from core.admission_control import AdmissionRejected, get_admission_controller
+from core.model_loader import ModelLoader, ModelsNotReady
 from core.phoneme_assistant import PhonemeAssistant
 from crud.session import get_session
 from database import get_db
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status, WebSocket, WebSocketDisconnect
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from models import User
 from models.session import Session as UserSession
 from routers.handlers.audio_processing_handler import (
@@ -22,7 +25,27 @@ import base64
 import time
 
 router = APIRouter()
-phoneme_assistant = PhonemeAssistant()
+
+# Models load in parallel in the background once the app starts (main.py),
+# not at import time; requests wait for them through get_phoneme_assistant()
+assistant_loader = ModelLoader(
+    "phoneme_assistant",
+    PhonemeAssistant.component_loaders(),
+    lambda components: PhonemeAssistant(components=components),
+)
+MODEL_LOADING_RETRY_AFTER_SECONDS = 10
+
+
+async def get_phoneme_assistant() -> PhonemeAssistant:
+    """Wait until the models are loaded; 503 if they are not ready within the timeout."""
+    try:
+        return await assistant_loader.get()
+    except ModelsNotReady as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(MODEL_LOADING_RETRY_AFTER_SECONDS)},
+        )
 
 
 # WebSocket Connection Manager
@@ -122,12 +145,26 @@ async def process_audio_analysis(
     # Validate session and get activity object
     activity_object = get_activity_object(session)
 
+    # Queued (not failed) while the models are still loading
+    phoneme_assistant = await get_phoneme_assistant()
+
     # Read audio file bytes before passing to streaming response
     # (UploadFile gets closed after request parsing, so we need to read it now)
     audio_bytes = await audio_file.read()
     audio_filename = audio_file.filename
     audio_content_type = audio_file.content_type
 
+    # Bounded analysis queue: 503 once it is full, else the stream reports
+    # the queue position until the analysis starts
+    try:
+        ticket = get_admission_controller().admit()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
     # Return StreamingResponse immediately - preprocessing will happen inside the stream
     return StreamingResponse(
         analyze_audio_file_event_stream(
@@ -142,6 +179,7 @@ async def process_audio_analysis(
             db=db,
             client_phonemes=client_phonemes,
             client_words=client_words,
+            ticket=ticket,
         ),
         media_type="text/event-stream",
         headers={
@@ -149,6 +187,8 @@ async def process_audio_analysis(
             "X-Accel-Buffering": "no",  # Disable buffering in nginx/proxy
             "Connection": "keep-alive",
         },
+        # The stream releases the ticket; this covers a stream that never started
+        background=BackgroundTask(ticket.release),
     )
 
 
@@ -259,6 +299,9 @@ async def websocket_audio_analysis(websocket: WebSocket):
         "type": "processing_started" | "analysis" | "gpt_response" | "audio_feedback_file" | "error",
         "data": {...}
     }
+    
+    While the analysis waits for a slot, processing_started messages carry
+    "queue_position"; when the queue is full the error carries "retry_after".
     """
     
     # Extract token from query parameters
@@ -385,6 +428,26 @@ async def websocket_audio_analysis(websocket: WebSocket):
                 })
                 continue
             
+            # Wait for the models if they are still loading
+            try:
+                phoneme_assistant = await assistant_loader.get()
+            except ModelsNotReady as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "data": {"message": str(e), "retry_after": MODEL_LOADING_RETRY_AFTER_SECONDS}
+                })
+                continue
+            
+            # Bounded analysis queue, shared with the HTTP route
+            try:
+                ticket = get_admission_controller().admit()
+            except AdmissionRejected as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "data": {"message": str(e), "retry_after": e.retry_after}
+                })
+                continue
+            
             # Process audio through the event stream generator
             print("🔄 Starting event stream generator...")
             generator_start = time.time()
@@ -401,6 +464,7 @@ async def websocket_audio_analysis(websocket: WebSocket):
                     db=db,
                     client_phonemes=client_phonemes,
                     client_words=client_words,
+                    ticket=ticket,
                 ):
                     if 'first_event' not in locals():
                         first_event = True
@@ -418,6 +482,8 @@ async def websocket_audio_analysis(websocket: WebSocket):
                     "type": "error",
                     "data": {"message": f"Processing failed: {str(e)}"}
                 })
+            finally:
+                ticket.release()
     
     except WebSocketDisconnect:
         manager.disconnect(current_user.id)
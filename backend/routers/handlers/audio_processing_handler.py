@@ -6,17 +6,19 @@ import time
 from urllib.parse import quote
 
 import numpy as np
-import pandas as pd
 import soundfile as sf
 import base64 as _base64
 
-from core.audio_preprocessing import preprocess_audio
-from core.audio_quality_analyzer import AudioQualityAnalyzer
+from core.admission_control import AdmissionRejected, AnalysisTicket, get_admission_controller
+from core.audio_preprocessing import preprocess_for_analysis
+from core.audio_process_pool import run_audio_stage
 from core.modes.base_mode import BaseMode
 from core.phoneme_assistant import PhonemeAssistant
 from core.phoneme_feedback_formatter import generate_feedback as generate_phoneme_feedback
+from core.prepared_audio import PreparedAudio
 from core.temp_audio_cache import audio_cache
 from core.process_audio import process_audio_with_client_phonemes, analyze_results
+from core.pronunciation_table import PronunciationTable
 from core.grapheme_to_phoneme import grapheme_to_phoneme as g2p
 from crud.feedback_entry import create_feedback_entry, get_feedback_entries_by_session
 from crud.session import get_session
@@ -38,9 +40,13 @@ async def load_and_preprocess_audio_bytes(
     filename: str,
     content_type: str,
     session_id: str | None = None
-) -> tuple[np.ndarray, str]:
+) -> tuple[PreparedAudio, str]:
     """
     Load and preprocess audio from bytes with caching at key stages.
+    
+    The result records which stages ran (resampled to 16 kHz, denoised,
+    normalized) so process_audio_array and the extractors do not repeat them,
+    and collects the per-stage timing breakdown for the response.
 
     Args:
         audio_bytes (bytes): The audio file bytes.
@@ -49,7 +55,7 @@ async def load_and_preprocess_audio_bytes(
         session_id (str, optional): Session ID for caching. If None, generates one.
 
     Returns:
-        tuple[np.ndarray, str]: The preprocessed audio array and cache session ID.
+        tuple[PreparedAudio, str]: The preprocessed audio and cache session ID.
     """
     # Generate session ID for caching if not provided
     if session_id is None:
@@ -72,7 +78,7 @@ async def load_and_preprocess_audio_bytes(
     if len(audio_bytes) == 0:
         print("📭 Received empty audio - client performed full extraction")
         # Return empty array - won't be used since client provided both phonemes and words
-        return np.array([]), session_id
+        return PreparedAudio(samples=np.array([])), session_id
     
     # CACHE POINT 1: Save original uploaded audio
     cache_start = time.time()
@@ -100,6 +106,8 @@ async def load_and_preprocess_audio_bytes(
         return array, sr
     
     audio_array, sample_rate = await asyncio.to_thread(_decode_audio)
+    prepared = PreparedAudio(samples=audio_array, sample_rate=sample_rate)
+    prepared.record("decode", time.time() - decode_start)
     print(f"⏱️  Audio decode took {time.time() - decode_start:.3f}s")
     
     # Calculate audio duration
@@ -136,62 +144,12 @@ async def load_and_preprocess_audio_bytes(
     )
     print(f"⏱️  Cache save (pre-preprocessing) took {time.time() - cache_start:.3f}s")
     
-    # QUALITY VALIDATION: Analyze audio quality before preprocessing
-    print("🔍 Analyzing audio quality...")
-    quality_start = time.time()
-    analyzer = AudioQualityAnalyzer(sr=sample_rate)
-    quality_info = await asyncio.to_thread(
-        analyzer.analyze_audio_quality, audio_array
-    )
-    print(f"⏱️  Quality analysis took {time.time() - quality_start:.3f}s")
-    
-    # Log quality metrics
-    print(f"📊 Audio Quality Report:")
-    print(f"   - Quality Level: {quality_info['quality_level'].upper()}")
-    print(f"   - Quality Score: {quality_info['quality_score']:.1f}/100")
-    print(f"   - SNR: {quality_info['snr_db']:.1f} dB")
-    print(f"   - Clipping: {quality_info['clipping_percentage']:.2f}%")
-    print(f"   - Silence: {quality_info['silence_percentage']:.1f}%")
-    
-    # Check for critical quality issues
-    if quality_info['snr_db'] < 5.0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Audio quality too low (SNR: {quality_info['snr_db']:.1f} dB). "
-                   "Please record in a quieter environment or use a better microphone."
-        )
-    
-    if quality_info['clipping_percentage'] > 10.0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Audio is severely clipped ({quality_info['clipping_percentage']:.1f}% of samples). "
-                   "Please reduce microphone gain or speak further from the microphone."
-        )
-    
-    if quality_info['silence_percentage'] > 85.0:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Audio is mostly silence ({quality_info['silence_percentage']:.1f}%). "
-                   "Please ensure you are speaking into the microphone."
-        )
-    
-    # Warn about quality issues but continue processing
-    if quality_info['issues']:
-        print(f"⚠️  Quality issues detected:")
-        for issue in quality_info['issues']:
-            print(f"   - {issue}")
-    
-    if quality_info['recommendations']:
-        print(f"💡 Recommendations:")
-        for rec in quality_info['recommendations']:
-            print(f"   - {rec}")
-    
-    # Apply preprocessing with audio length for adaptive noise reduction
-    print("🔊 Starting audio preprocessing...")
-    # Run preprocessing in thread pool to avoid blocking event loop
-    audio_array = await asyncio.to_thread(
-        preprocess_audio, audio_array, sr=sample_rate, audio_length_seconds=audio_duration, use_adaptive=True
-    )
+    # Resample, quality check and preprocessing: CPU-bound, so in the audio
+    # process pool when enabled (core.audio_process_pool), else a thread
+    prepared, quality_info = await run_audio_stage(preprocess_for_analysis, prepared, audio_duration)
+    if quality_info['rejection']:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=quality_info['rejection'])
+    audio_array, sample_rate = prepared.samples, prepared.sample_rate
     
     # CACHE POINT 3: Save preprocessed audio
     cache_start = time.time()
@@ -205,14 +163,14 @@ async def load_and_preprocess_audio_bytes(
         "final",
         metadata={
             "stage": "after_preprocessing",
-            "preprocessing_applied": "noise_reduction_and_normalization",
+            "preprocessing_applied": prepared.stages(),
             "final_shape": str(audio_array.shape),
             "sample_rate": sample_rate
         }
     )
     print(f"⏱️  Cache save (preprocessed) took {time.time() - cache_start:.3f}s")
     
-    return audio_array, session_id
+    return prepared, session_id
 
 
 def sanitize(obj):
@@ -224,7 +182,7 @@ def sanitize(obj):
         return {k: sanitize(v) for k, v in obj.items()}
     elif isinstance(obj, list):
         return [sanitize(v) for v in obj]
-    elif isinstance(obj, pd.DataFrame):
+    elif isinstance(obj, PronunciationTable) or type(obj).__name__ == "DataFrame":  # pandas is not imported here
         return sanitize(obj.to_dict())
     return obj
 
@@ -241,8 +199,28 @@ async def analyze_audio_file_event_stream(
     session: UserSession,
     client_phonemes: list[list[str]] | None = None,
     client_words: list[str] | None = None,
+    ticket: AnalysisTicket | None = None,
 ):
+    """
+    Stream the analysis of one recording as server-sent events.
+
+    `ticket` is the analysis' place in the admission queue
+    (core.admission_control); the routes admit it before responding so a
+    full queue is a 503, and it is admitted here when not given. It is
+    released when the stream ends.
+    """
     try:
+        if ticket is None:
+            try:
+                ticket = get_admission_controller().admit()
+            except AdmissionRejected as e:
+                error_payload = {
+                    "type": "error",
+                    "data": {"message": str(e), "retry_after": e.retry_after},
+                }
+                yield f"data: {json.dumps(error_payload)}\n\n"
+                return
+
         # Send immediate acknowledgment that processing has started
         print("📤 Sending processing started event...")
         processing_started_payload = {
@@ -251,13 +229,23 @@ async def analyze_audio_file_event_stream(
         }
         yield f"data: {json.dumps(processing_started_payload)}\n\n"
         await asyncio.sleep(0.01)  # Ensure the event is flushed
+
+        # Wait for a free analysis slot, telling the client its queue position
+        async for position in ticket.wait():
+            print(f"🚦 Analysis queued at position {position}")
+            queued_payload = {
+                "type": "processing_started",
+                "data": {"message": f"Waiting in line (position {position})...", "queue_position": position},
+            }
+            yield f"data: {json.dumps(queued_payload)}\n\n"
         
         # NOW do the preprocessing after sending the first event
         print("🔄 Starting audio preprocessing...")
         try:
-            audio_array, cache_session_id = await load_and_preprocess_audio_bytes(
-                audio_bytes, audio_filename, audio_content_type, str(session.id)
-            )
+            async with ticket.stage("preprocess"):
+                audio_array, cache_session_id = await load_and_preprocess_audio_bytes(
+                    audio_bytes, audio_filename, audio_content_type, str(session.id)
+                )
             print("✅ Audio preprocessing completed")
         except Exception as e:
             error_payload = {
@@ -295,7 +283,7 @@ async def analyze_audio_file_event_stream(
         else:
             # Validate audio has speech content using VAD
             from core.audio_chunking import estimate_speech_activity
-            speech_percentage = estimate_speech_activity(audio_array, sr=16000)
+            speech_percentage = estimate_speech_activity(audio_array.samples, sr=audio_array.sample_rate)
             print(f"🎤 Speech activity: {speech_percentage:.1f}%")
             
             # Require at least 30% speech activity
@@ -373,28 +361,31 @@ async def analyze_audio_file_event_stream(
             ground_truth_phonemes = g2p(attempted_sentence)
             
             # Process audio with client phonemes (and optionally client words)
-            pronunciation_data = await process_audio_with_client_phonemes(
-                client_phonemes=client_phonemes,
-                ground_truth_phonemes=ground_truth_phonemes,
-                audio_array=audio_array,
-                word_extraction_model=phoneme_assistant.word_extractor,
-                client_words=client_words if use_client_words else None,
-            )
+            async with ticket.stage("inference"):
+                pronunciation_data = await process_audio_with_client_phonemes(
+                    client_phonemes=client_phonemes,
+                    ground_truth_phonemes=ground_truth_phonemes,
+                    audio_array=audio_array,
+                    word_extraction_model=phoneme_assistant.word_extractor,
+                    client_words=client_words if use_client_words else None,
+                )
             
             # Analyze the results to get the same format as server processing
             analysis_start = time.time()
             pronunciation_dataframe, highest_per_word, problem_summary, per_summary = analyze_results(pronunciation_data)
+            audio_array.record("analysis", time.time() - analysis_start)
             print(f"⏱️  analyze_results() took {time.time() - analysis_start:.3f}s")
             
             extraction_mode = "full client" if use_client_words else "client phonemes only"
             print(f"✓ {extraction_mode} processing completed in {time.time() - processing_start:.3f}s (PER: {per_summary.get('sentence_per', 0):.2%})")
         else:
             # Original server-side processing
-            pronunciation_dataframe, highest_per_word, problem_summary, per_summary = (
-                await phoneme_assistant.process_audio(
-                    attempted_sentence, audio_array, verbose=True
+            async with ticket.stage("inference"):
+                pronunciation_dataframe, highest_per_word, problem_summary, per_summary = (
+                    await phoneme_assistant.process_audio(
+                        attempted_sentence, audio_array, verbose=True
+                    )
                 )
-            )
             
             print(f"✓ Server phoneme processing completed in {time.time() - processing_start:.3f}s (PER: {per_summary.get('sentence_per', 0):.2%})")
         
@@ -412,6 +403,10 @@ async def analyze_audio_file_event_stream(
                 "highest_per_word": sanitize(highest_per_word),
                 "problem_summary": sanitize(problem_summary),
                 "per_summary": sanitize(per_summary),
+                "processing_metadata": {
+                    "audio_stages": audio_array.stages(),
+                    "timing_breakdown_ms": audio_array.timing_breakdown(),
+                },
             },
         }
         print("📤 Sending analysis payload...")
@@ -427,7 +422,7 @@ async def analyze_audio_file_event_stream(
         feedback_result = generate_phoneme_feedback(
             problem_summary=problem_summary,
             per_summary=per_summary,
-            pronunciation_data=pronunciation_dataframe.to_dict("records"),
+            pronunciation_data=audio_analysis_object.pronunciation_records,
         )
 
         feedback_payload = {
@@ -445,26 +440,32 @@ async def analyze_audio_file_event_stream(
         #
         # TTS runs in the thread pool (feedback_to_audio is synchronous).
         # GPT runs as an asyncio Task.
+        # Each holds a slot of its stage limit while it runs.
         # asyncio.wait() lets us stream each result the moment it finishes,
         # rather than waiting for both before yielding either.
 
         loop = asyncio.get_event_loop()
 
-        tts_future = loop.run_in_executor(
-            None,
-            phoneme_assistant.feedback_to_audio,
-            feedback_result.text,
-            feedback_result.ssml,
-        )
+        async def run_tts():
+            async with ticket.stage("tts"):
+                return await loop.run_in_executor(
+                    None,
+                    phoneme_assistant.feedback_to_audio,
+                    feedback_result.text,
+                    feedback_result.ssml,
+                )
 
-        gpt_task = asyncio.ensure_future(
-            activity_object.get_next_sentence(
-                attempted_sentence=attempted_sentence,
-                analysis=audio_analysis_object,
-                phoneme_assistant=phoneme_assistant,
-                session=session,
-            )
-        )
+        async def run_gpt():
+            async with ticket.stage("gpt"):
+                return await activity_object.get_next_sentence(
+                    attempted_sentence=attempted_sentence,
+                    analysis=audio_analysis_object,
+                    phoneme_assistant=phoneme_assistant,
+                    session=session,
+                )
+
+        tts_future = asyncio.ensure_future(run_tts())
+        gpt_task = asyncio.ensure_future(run_gpt())
 
         sentence_result = None
         audio_file_result = None
@@ -547,3 +548,6 @@ async def analyze_audio_file_event_stream(
         }
         yield f"data: {json.dumps(error_payload)}\n\n"
         return
+    finally:
+        if ticket is not None:
+            ticket.release()
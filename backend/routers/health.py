@@ -3,6 +3,7 @@ Health check and monitoring endpoints for model optimization.
 """
 
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from typing import Dict, Any
 import time
 import numpy as np
@@ -13,6 +14,16 @@ import os
 try:
     from core.phoneme_assistant import PhonemeAssistant
     from core.optimization_config import config
+    from core.alignment_cache import get_alignment_cache_stats
+    from core.inference_scheduler import get_inference_scheduler_stats
+    from core.denoise_policy import get_denoise_policy_stats
+    from core.model_registry import get_model_registry_stats
+    from core.model_loader import get_readiness
+    from core.audio_process_pool import get_audio_process_pool_stats
+    from core.admission_control import get_admission_stats
+    from core.length_buckets import get_length_bucket_stats
+    from core.shared_weights import worker_memory_report
+    from core.runtime_resources import get_runtime_resources_report
     CORE_AVAILABLE = True
 except ImportError:
     CORE_AVAILABLE = False
@@ -20,6 +31,19 @@ except ImportError:
 router = APIRouter(prefix="/health", tags=["health"])
 
 
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe: 200 once every model has loaded and warmed up, 503
+    (with per-component load timings) while they are still loading.
+    """
+    if not CORE_AVAILABLE:
+        return JSONResponse(status_code=503, content={"ready": False, "error": "Core modules not available"})
+
+    readiness_info = get_readiness()
+    return JSONResponse(status_code=200 if readiness_info["ready"] else 503, content=readiness_info)
+
+
 @router.get("/model-optimization")
 async def model_optimization_health() -> Dict[str, Any]:
     """
@@ -48,6 +72,7 @@ async def model_optimization_health() -> Dict[str, Any]:
             "use_fast_models": config.get('use_fast_models'),
             "use_compilation": config.get('use_compilation'),
             "model_cache_enabled": config.get('model_cache_enabled'),
+            "onnx_model_variant": config.get('onnx_model_variant'),
         }
         
         # Try to initialize assistant for detailed info
@@ -147,6 +172,154 @@ async def performance_test() -> Dict[str, Any]:
         )
 
 
+@router.get("/alignment-cache")
+async def alignment_cache() -> Dict[str, Any]:
+    """
+    Hit-rate counters for the phoneme alignment segment cost cache.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "cache": get_alignment_cache_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/inference-scheduler")
+async def inference_scheduler() -> Dict[str, Any]:
+    """
+    Batch size distribution and queue wait times of the phoneme inference scheduler.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "batching_enabled": config.get('inference_batching_enabled', True),
+        "schedulers": get_inference_scheduler_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/models")
+async def loaded_models() -> Dict[str, Any]:
+    """
+    Models held by the process-wide model registry, with reference counts,
+    load/warmup times and memory, and their input length bucket usage.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "cache_enabled": config.get('model_cache_enabled', True),
+        "registry": get_model_registry_stats(),
+        "length_buckets": get_length_bucket_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/memory")
+async def worker_memory() -> Dict[str, Any]:
+    """
+    This worker's RSS split into shared and private memory, and how much of
+    each memory-mapped weights file is resident (SHARED_MODEL_WEIGHTS).
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        **worker_memory_report(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/audio-process-pool")
+async def audio_process_pool() -> Dict[str, Any]:
+    """
+    Process pool for preprocessing and alignment: workers, per-stage calls
+    and latency, shared memory transferred and thread fallbacks.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "stats": get_audio_process_pool_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/admission")
+async def admission() -> Dict[str, Any]:
+    """
+    Analysis admission queue: analyses running and waiting, rejections, the
+    current Retry-After estimate, and slots in use per stage.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "stats": get_admission_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/denoise-policy")
+async def denoise_policy() -> Dict[str, Any]:
+    """
+    How often noise reduction was skipped, reduced to a high-pass filter or run
+    in full, and the estimated latency saved.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        "enabled": config.get('denoise_policy_enabled', True),
+        "skip_snr_db": config.get('denoise_skip_snr_db'),
+        "highpass_snr_db": config.get('denoise_highpass_snr_db'),
+        "stats": get_denoise_policy_stats(),
+        "timestamp": time.time()
+    }
+
+
+@router.get("/runtime-resources")
+async def runtime_resources() -> Dict[str, Any]:
+    """
+    CPU quota and memory limit detected from cgroups, and the torch, ONNX
+    Runtime and executor thread counts derived from them.
+    """
+    if not CORE_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Core modules not available"
+        )
+    
+    return {
+        **get_runtime_resources_report(),
+        "timestamp": time.time()
+    }
+
+
 @router.get("/system-resources")
 async def system_resources() -> Dict[str, Any]:
     """
@@ -1,8 +1,9 @@
 from datetime import datetime
 from typing import Any, Optional
 
-import pandas as pd
-from pydantic import BaseModel, Json
+from pydantic import BaseModel, Json, field_validator
+
+from core.pronunciation_table import PronunciationTable
 
 
 class FeedbackEntryBase(BaseModel):
@@ -24,13 +25,27 @@ class FeedbackEntryOut(FeedbackEntryBase):
 
 
 class AudioAnalysis(BaseModel):
-    pronunciation_dataframe: pd.DataFrame
+    pronunciation_dataframe: PronunciationTable
     problem_summary: dict
     per_summary: dict
     highest_per_word: dict
 
-    class Config:
-        arbitrary_types_allowed = True
+    model_config = {"arbitrary_types_allowed": True}
+
+    @field_validator("pronunciation_dataframe", mode="before")
+    @classmethod
+    def _wrap_dataframe(cls, value: Any) -> Any:
+        # A pandas DataFrame (older callers) or the per-word records
+        if isinstance(value, list):
+            return PronunciationTable(value)
+        if type(value).__name__ == "DataFrame":
+            return PronunciationTable.from_dataframe(value)
+        return value
+
+    @property
+    def pronunciation_records(self) -> list[dict]:
+        """Per-word result dicts (shared, do not modify)."""
+        return self.pronunciation_dataframe.records
 
 
 class UserStatistics(BaseModel):
@@ -0,0 +1,152 @@
+"""
+Small models for the extractor tests, built in a temporary directory so
+no download is needed.
+
+- tiny_wav2vec2: a tiny random wav2vec2 CTC model + processor (PyTorch)
+- conv_ctc_onnx: an ONNX stand-in for an exported wav2vec2 CTC model
+- mlp_onnx: a small MLP as ONNX (for the shared weights tests)
+
+The ONNX models are written directly as protobuf bytes (the onnx package
+is not a dependency).
+"""
+
+import json
+import os
+
+import numpy as np
+
+from core.optimization_config import OptimizationConfig
+
+
+def tiny_wav2vec2(directory: str, attention_mask: bool = False) -> str:
+    """
+    Save a tiny random wav2vec2 CTC model + processor to `directory`.
+
+    attention_mask=True builds the layer-norm variant whose processor
+    returns (and whose model accepts) an attention mask.
+    """
+    from transformers import (
+        Wav2Vec2Config,
+        Wav2Vec2CTCTokenizer,
+        Wav2Vec2FeatureExtractor,
+        Wav2Vec2ForCTC,
+        Wav2Vec2Processor,
+    )
+    vocab = {"<pad>": 0, "<s>": 1, "</s>": 2, "<unk>": 3, "|": 4, "k": 5, "æ": 6, "t": 7}
+    vocab_file = os.path.join(directory, "vocab.json")
+    with open(vocab_file, "w", encoding="utf-8") as f:
+        json.dump(vocab, f)
+    tokenizer = Wav2Vec2CTCTokenizer(vocab_file, word_delimiter_token="|")
+    processor = Wav2Vec2Processor(
+        feature_extractor=Wav2Vec2FeatureExtractor(return_attention_mask=attention_mask), tokenizer=tokenizer
+    )
+    model_config = Wav2Vec2Config(
+        vocab_size=len(vocab), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, conv_dim=(16,) * 7, num_conv_pos_embeddings=16,
+        num_conv_pos_embedding_groups=2, pad_token_id=0,
+        feat_extract_norm="layer" if attention_mask else "group", do_stable_layer_norm=attention_mask,
+    )
+    processor.save_pretrained(directory)
+    Wav2Vec2ForCTC(model_config).save_pretrained(directory)
+    return directory
+
+
+def extractor_config(cache_enabled: bool = True) -> OptimizationConfig:
+    """Extractor settings for tests: no torch.compile, one warmup run."""
+    optimization_config = OptimizationConfig()
+    optimization_config._config.update({
+        'use_compilation': False,
+        'model_cache_enabled': cache_enabled,
+        'warmup_runs': 1,
+    })
+    return optimization_config
+
+
+def _varint(value: int) -> bytes:
+    out = b""
+    while True:
+        byte, value = value & 0x7F, value >> 7
+        if value:
+            out += bytes([byte | 0x80])
+        else:
+            return out + bytes([byte])
+
+
+def _field(number: int, value) -> bytes:
+    if isinstance(value, int):
+        return _varint(number << 3) + _varint(value)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return _varint((number << 3) | 2) + _varint(len(value)) + value
+
+
+def mlp_onnx(path: str, weights: dict) -> None:
+    """y = relu(x @ W1 + B1) @ W2 as an ONNX model (float32, opset 13)."""
+    def tensor(name, array):
+        return (b"".join(_field(1, d) for d in array.shape) + _field(2, 1)
+                + _field(8, name) + _field(9, array.astype(np.float32).tobytes()))
+
+    def value_info(name, dims):
+        shape = b"".join(_field(1, _field(1, d) if isinstance(d, int) else _field(2, d)) for d in dims)
+        return _field(1, name) + _field(2, _field(1, _field(1, 1) + _field(2, shape)))
+
+    def node(inputs, outputs, op):
+        return (b"".join(_field(1, i) for i in inputs) + b"".join(_field(2, o) for o in outputs)
+                + _field(4, op))
+
+    graph = (_field(1, node(["x", "W1"], ["h"], "MatMul")) + _field(1, node(["h", "B1"], ["hb"], "Add"))
+             + _field(1, node(["hb"], ["r"], "Relu")) + _field(1, node(["r", "W2"], ["y"], "MatMul"))
+             + _field(2, "mlp") + b"".join(_field(5, tensor(name, array)) for name, array in weights.items())
+             + _field(11, value_info("x", ["n", 64])) + _field(12, value_info("y", ["n", 8])))
+    with open(path, "wb") as f:
+        f.write(_field(1, 8) + _field(8, _field(1, "") + _field(2, 13)) + _field(7, graph))
+
+
+def conv_ctc_onnx(path: str, vocab_size: int, seed: int = 0, attention_mask: bool = False) -> None:
+    """
+    Stand-in for an exported wav2vec2 CTC model: samples (batch, n) -> logits
+    (batch, frames, vocab) through the wav2vec2 feature encoder's conv
+    kernels/strides, so the frame count matches conv_output_frames.
+
+    attention_mask=True adds an (unused) int64 attention_mask input, like a
+    layer-norm model's export.
+    """
+    from core.inference_scheduler import WAV2VEC2_CONV_KERNEL, WAV2VEC2_CONV_STRIDE
+
+    rng = np.random.default_rng(seed)
+
+    def tensor(name, array, data_type=1):
+        return (b"".join(_field(1, d) for d in array.shape) + _field(2, data_type)
+                + _field(8, name) + _field(9, array.tobytes()))
+
+    def ints(name, values):
+        return _field(5, _field(1, name) + _field(20, 7) + b"".join(_field(8, v) for v in values))
+
+    def node(inputs, outputs, op, attributes=b""):
+        return (b"".join(_field(1, i) for i in inputs) + b"".join(_field(2, o) for o in outputs)
+                + _field(4, op) + attributes)
+
+    def value_info(name, dims, elem_type=1):
+        shape = b"".join(_field(1, _field(1, d) if isinstance(d, int) else _field(2, d)) for d in dims)
+        return _field(1, name) + _field(2, _field(1, _field(1, elem_type) + _field(2, shape)))
+
+    nodes = [node(["input_values", "axes"], ["h0"], "Unsqueeze")]
+    initializers = [tensor("axes", np.array([1], dtype=np.int64), data_type=7)]
+    for i, (kernel, stride) in enumerate(zip(WAV2VEC2_CONV_KERNEL, WAV2VEC2_CONV_STRIDE)):
+        weight = (rng.standard_normal((1, 1, kernel)) / np.sqrt(kernel)).astype(np.float32)
+        initializers.append(tensor(f"conv{i}", weight))
+        nodes.append(node([f"h{i}", f"conv{i}"], [f"h{i + 1}"], "Conv",
+                          ints("kernel_shape", [kernel]) + ints("strides", [stride])))
+    last = len(WAV2VEC2_CONV_KERNEL)
+    initializers += [tensor("head_w", rng.standard_normal((vocab_size, 1, 1)).astype(np.float32)),
+                     tensor("head_b", rng.standard_normal(vocab_size).astype(np.float32))]
+    nodes += [node([f"h{last}", "head_w", "head_b"], ["scores"], "Conv", ints("kernel_shape", [1])),
+              node(["scores"], ["logits"], "Transpose", ints("perm", [0, 2, 1]))]
+
+    graph = (b"".join(_field(1, n) for n in nodes) + _field(2, "conv_ctc")
+             + b"".join(_field(5, t) for t in initializers)
+             + _field(11, value_info("input_values", ["batch", "samples"]))
+             + (_field(11, value_info("attention_mask", ["batch", "samples"], elem_type=7)) if attention_mask else b"")
+             + _field(12, value_info("logits", ["batch", "frames", vocab_size])))
+    with open(path, "wb") as f:
+        f.write(_field(1, 8) + _field(8, _field(1, "") + _field(2, 13)) + _field(7, graph))
@@ -0,0 +1,173 @@
+"""
+Tests for analysis admission control.
+
+Checks the bounded FIFO queue and its positions, the 503 path once the
+queue is full, the per-stage limits, and that the event stream reports
+the queue position and releases its slot.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from core.admission_control import AdmissionController, AdmissionRejected
+
+
+def _controller(**kwargs) -> AdmissionController:
+    kwargs.setdefault("stage_limits", {"preprocess": 1, "inference": 1, "gpt": 2, "tts": 1})
+    return AdmissionController(**kwargs)
+
+
+class TestAdmissionControl:
+    """Test suite for admission control"""
+
+    def test_queue_positions(self):
+        """Analyses beyond the active limit wait in order and see their position move up"""
+        controller = _controller(max_active=1, max_queue=2)
+
+        async def run():
+            first, second, third = controller.admit(), controller.admit(), controller.admit()
+            assert first.started and not second.started
+            assert (second.position, third.position) == (1, 2)
+
+            positions = []
+
+            async def follow():
+                async for position in third.wait():
+                    positions.append(position)
+
+            follower = asyncio.ensure_future(follow())
+            await asyncio.sleep(0)
+            first.release()
+            await asyncio.sleep(0)
+            second.release()
+            await asyncio.wait_for(follower, 1)
+            assert third.started and third.position == 0
+            third.release()
+            return positions
+
+        assert asyncio.run(run()) == [2, 1]
+        stats = controller.stats()
+        assert (stats["active"], stats["waiting"], stats["completed"]) == (0, 0, 3)
+        print("✓ Queued analyses report their position in FIFO order")
+
+    def test_full_queue_rejects(self):
+        """A full queue raises AdmissionRejected with a Retry-After estimate"""
+        controller = _controller(max_active=1, max_queue=1, retry_after=7)
+
+        async def run():
+            running, waiting = controller.admit(), controller.admit()
+            try:
+                controller.admit()
+                assert False, "Expected AdmissionRejected"
+            except AdmissionRejected as e:
+                assert e.retry_after == 7, "No finished analysis yet, so the configured default"
+
+            # A waiting analysis that gives up leaves the queue, making room again
+            waiting.release()
+            waiting.release()
+            replacement = controller.admit()
+            assert replacement.position == 1
+
+            running.started_at -= 3.9  # pretend it ran for ~4 seconds
+            running.release()
+            assert replacement.started
+            controller.admit()
+            try:
+                controller.admit()
+                assert False, "Expected AdmissionRejected"
+            except AdmissionRejected as e:
+                # One waiting ahead plus this one, at ~4 s per analysis
+                assert e.retry_after == 8
+
+        asyncio.run(run())
+        assert controller.stats()["rejected"] == 2
+        print("✓ Full queue is rejected with Retry-After")
+
+    def test_stage_limits(self):
+        """Each stage runs at most its limit at once"""
+        controller = _controller(max_active=4)
+        running = {"inference": 0, "gpt": 0}
+        peak = {"inference": 0, "gpt": 0}
+
+        async def analysis():
+            ticket = controller.admit()
+            try:
+                # GPT is slower than inference, so unlimited calls would pile up
+                for stage, seconds in (("inference", 0.02), ("gpt", 0.1)):
+                    async with ticket.stage(stage):
+                        running[stage] += 1
+                        peak[stage] = max(peak[stage], running[stage])
+                        await asyncio.sleep(seconds)
+                        running[stage] -= 1
+            finally:
+                ticket.release()
+
+        async def run():
+            await asyncio.gather(*[analysis() for _ in range(4)])
+
+        asyncio.run(run())
+        assert peak == {"inference": 1, "gpt": 2}
+        stages = controller.stats()["stages"]
+        assert stages["inference"]["calls"] == 4 and stages["inference"]["avg_wait_ms"] > 0
+        assert stages["gpt"]["active"] == 0 and stages["gpt"]["waiting"] == 0
+        print("✓ Stage concurrency limits hold")
+
+    def test_event_stream_reports_queue_position(self):
+        """The SSE stream sends the queue position while waiting and releases its slot at the end"""
+        from routers.handlers.audio_processing_handler import analyze_audio_file_event_stream
+
+        controller = _controller(max_active=1, max_queue=4)
+
+        async def run():
+            blocker = controller.admit()
+            stream = analyze_audio_file_event_stream(
+                phoneme_assistant=None, activity_object=None, audio_bytes=b"",
+                audio_filename="recording.wav", audio_content_type="audio/wav",
+                attempted_sentence="the cat sat", db=None, current_user=None,
+                session=SimpleNamespace(id=1), ticket=controller.admit(),
+            )
+            events = [json.loads((await stream.__anext__())[6:]) for _ in range(2)]
+            blocker.release()
+            async for event in stream:
+                events.append(json.loads(event[6:]))
+            return events
+
+        events = asyncio.run(run())
+        assert [event["type"] for event in events] == ["processing_started", "processing_started", "error"]
+        assert events[1]["data"]["queue_position"] == 1
+        assert "Empty audio" in events[2]["data"]["message"]
+        stats = controller.stats()
+        assert stats["active"] == 0 and stats["completed"] == 2
+        print("✓ Event stream reports the queue position")
+
+
+def run_admission_control_tests():
+    """Run all admission control tests"""
+    print("\n" + "="*60)
+    print("ADMISSION CONTROL TESTS")
+    print("="*60 + "\n")
+
+    test_admission = TestAdmissionControl()
+    try:
+        test_admission.test_queue_positions()
+        test_admission.test_full_queue_rejects()
+        test_admission.test_stage_limits()
+        test_admission.test_event_stream_reports_queue_position()
+    except AssertionError as e:
+        print(f"\n❌ Admission control test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All admission control tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_admission_control_tests()
+    exit(0 if success else 1)
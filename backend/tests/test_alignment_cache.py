@@ -0,0 +1,155 @@
+"""
+Tests for the alignment segment cost cache.
+
+Checks the per-request and shared LRU levels, hit-rate accounting, and that
+cached alignment produces the same results as uncached scoring.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.alignment_cache import RequestCostCache, SharedCostCache
+from core.process_audio import (
+    _process_word_alignment,
+    align_phonemes_to_words_with_confidence,
+    align_sequences,
+    compute_per,
+)
+
+
+class TestAlignmentCache:
+    """Test suite for the alignment cost cache"""
+
+    def test_request_and_shared_levels(self):
+        """Repeated pairs hit the request cache; shared pairs survive across requests"""
+        shared = SharedCostCache(maxsize=16)
+        cache = RequestCostCache(shared)
+        the = cache.encode(['ð', 'ə'])
+
+        assert cache.per(the, cache.encode(['d', 'ə'])) == 0.5
+        assert cache.per(the, cache.encode(['d', 'ə'])) == 0.5
+        assert cache.per(the, cache.encode(['ð', 'ə']), share=True) == 0.0
+        assert cache.stats()["request_hits"] == 1 and cache.stats()["misses"] == 2
+        cache.publish()
+
+        next_request = RequestCostCache(shared)
+        assert next_request.per(the, next_request.encode(['ð', 'ə'])) == 0.0
+        assert next_request.per(the, next_request.encode(['d', 'ə'])) == 0.5
+        assert next_request.stats()["shared_hits"] == 1, "Only shared pairs should be promoted"
+        next_request.publish()
+
+        stats = shared.stats()
+        assert stats["requests"] == 2
+        assert stats["lookups"] == 5
+        assert abs(stats["hit_rate"] - 2 / 5) < 1e-9
+        print(f"✓ Request/shared levels (hit rate {stats['hit_rate']:.2f})")
+
+    def test_lru_eviction(self):
+        """Shared cache is bounded and evicts least recently used entries"""
+        shared = SharedCostCache(maxsize=2)
+        shared.put('a', 1)
+        shared.put('b', 2)
+        assert shared.get('a') == 1  # 'a' is now most recent
+        shared.put('c', 3)
+        assert shared.get('b') is None
+        assert shared.get('a') == 1 and shared.get('c') == 3
+        assert shared.stats()["evictions"] == 1
+
+        disabled = SharedCostCache(maxsize=0)
+        disabled.put('a', 1)
+        assert disabled.get('a') is None and not disabled.stats()["enabled"]
+        print("✓ LRU eviction and disabled cache")
+
+    def test_per_matches_compute_per(self):
+        """Cached PER keeps compute_per conventions, including empty inputs"""
+        cache = RequestCostCache(SharedCostCache(maxsize=8))
+        cases = [([], []), ([], ['a']), (['a'], []), (['k', 'æ', 't'], ['k', 'ɑ', 't', 's'])]
+        for gt, pred in cases:
+            assert cache.per(cache.encode(gt), cache.encode(pred)) == compute_per(gt, pred)
+        print("✓ Cached PER matches compute_per")
+
+    def test_cached_operations(self):
+        """Cached phoneme operations equal align_sequences and are safe to mutate"""
+        cache = RequestCostCache(SharedCostCache(maxsize=8))
+        gt, pred = ['θ', 'ɪ', 'ŋ', 'k'], ['s', 'ɪ', 'ŋ']
+        first = cache.operations(gt, pred)
+        first.append(('insertion', None, 'x'))
+        assert cache.operations(gt, pred) == align_sequences(gt, pred)
+        assert cache.stats()["request_hits"] == 1
+        print("✓ Cached operations")
+
+    def test_reference_alignment_with_cache(self):
+        """Reference engine gives the same result with a shared cost cache"""
+        pred_phonemes = ['ð', 'ə', 'k', 'æ', 't', 'ð', 'ə', 'd', 'ɑ', 'g']
+        gt_words_phonemes = [
+            ('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't']),
+            ('the', ['ð', 'ə']), ('dog', ['d', 'ɔ', 'g']),
+        ]
+        shared = SharedCostCache(maxsize=64)
+        cache = RequestCostCache(shared)
+        cached, cached_conf = align_phonemes_to_words_with_confidence(
+            pred_phonemes, gt_words_phonemes, use_vectorized=False, cost_cache=cache
+        )
+        vectorized, vectorized_conf = align_phonemes_to_words_with_confidence(
+            pred_phonemes, gt_words_phonemes, use_vectorized=True
+        )
+
+        assert cached == vectorized
+        assert [round(c, 5) for c in cached_conf] == [round(c, 5) for c in vectorized_conf]
+        assert cache.stats()["request_hits"] > 0, "Repeated word and backtracking should hit the cache"
+        print(f"✓ Reference alignment with cache: {cache.stats()}")
+
+    def test_word_alignment_publishes_stats(self):
+        """_process_word_alignment uses the cache and publishes its counters"""
+        shared = SharedCostCache(maxsize=64)
+        ground_truth = [('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't'])]
+        for _ in range(2):
+            results = _process_word_alignment(
+                ground_truth_words=['the', 'cat'],
+                ground_truth_phonemes=ground_truth,
+                predicted_words=['the', 'cat'],
+                phoneme_predictions=[['ð', 'ə'], ['k', 'ɑ', 't']],
+                cost_cache=RequestCostCache(shared),
+            )
+            assert results[1]["substituted"] == [('æ', 'ɑ')]
+
+        # Callers that pass their own cache publish it themselves
+        assert shared.stats()["requests"] == 0
+        results = _process_word_alignment(
+            ground_truth_words=['the', 'cat'],
+            ground_truth_phonemes=ground_truth,
+            predicted_words=['the', 'cat'],
+            phoneme_predictions=[['ð', 'ə'], ['k', 'ɑ', 't']],
+        )
+        assert results[0]["per"] == 0.0
+        print("✓ Word alignment uses cost cache")
+
+
+def run_alignment_cache_tests():
+    """Run all alignment cache tests"""
+    print("\n" + "="*60)
+    print("ALIGNMENT COST CACHE TESTS")
+    print("="*60 + "\n")
+
+    test_cache = TestAlignmentCache()
+    try:
+        test_cache.test_request_and_shared_levels()
+        test_cache.test_lru_eviction()
+        test_cache.test_per_matches_compute_per()
+        test_cache.test_cached_operations()
+        test_cache.test_reference_alignment_with_cache()
+        test_cache.test_word_alignment_publishes_stats()
+    except AssertionError as e:
+        print(f"\n❌ Alignment cache test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All alignment cache tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_alignment_cache_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,168 @@
+"""
+Tests for the preprocessing / alignment process pool.
+
+Runs the real stage functions in a one-worker spawn pool and checks they
+match the in-thread results, that the shared memory blocks are removed,
+that the workers' stats reach the server process, and that a broken pool
+is rebuilt.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import numpy as np
+from concurrent.futures.process import BrokenProcessPool
+
+from core.audio_preprocessing import preprocess_for_analysis
+from core.audio_process_pool import AudioProcessPool, get_audio_process_pool, run_audio_stage
+from core.prepared_audio import PreparedAudio
+from core.process_audio import align_predictions
+
+
+def _speech_like(seconds: float = 2.0, sr: int = 22050) -> np.ndarray:
+    """A voiced middle with quiet noise at both ends (where the SNR estimate looks for noise)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sr)) / sr
+    voiced = (t > 0.6) & (t < seconds - 0.6)
+    audio = 0.3 * voiced * np.sin(2 * np.pi * 220 * t) + 0.003 * rng.standard_normal(len(t))
+    return audio.astype(np.float32)
+
+
+def _shared_memory_blocks() -> set:
+    return set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+
+
+class TestAudioProcessPool:
+    """Test suite for the audio process pool"""
+
+    def test_preprocessing_matches_thread(self):
+        """Preprocessing in a worker returns the same audio and report as in-process"""
+        pool = AudioProcessPool(max_workers=1)
+        blocks_before = _shared_memory_blocks()
+        try:
+            audio = _speech_like()
+            expected, expected_quality = preprocess_for_analysis(PreparedAudio(samples=audio, sample_rate=22050), 2.0)
+
+            async def run():
+                return await pool.run_audio(preprocess_for_analysis, PreparedAudio(samples=audio, sample_rate=22050), 2.0)
+
+            prepared, quality_info = asyncio.run(run())
+            assert prepared.sample_rate == 16000 and prepared.preprocessed
+            assert prepared.stages() == expected.stages()
+            assert np.allclose(prepared.samples, expected.samples, atol=1e-6)
+            assert quality_info["snr_db"] == expected_quality["snr_db"] and quality_info["rejection"] is None
+            assert {"resample", "quality_analysis", "normalize"} <= set(prepared.timings)
+
+            # Unusable audio comes back with the reason and without preprocessing
+            clipped = np.clip(3 * np.sin(2 * np.pi * 220 * np.arange(32000) / 16000), -1, 1).astype(np.float32)
+            rejected, rejected_quality = asyncio.run(pool.run_audio(preprocess_for_analysis,
+                                                                    PreparedAudio(samples=clipped), 2.0))
+            assert rejected_quality["rejection"] and not rejected.denoised
+
+            stats = pool.stats()
+            assert stats["stages"]["preprocess_for_analysis"]["calls"] == 2
+            assert stats["shared_memory_mb"] > 0
+        finally:
+            pool.shutdown()
+        assert _shared_memory_blocks() <= blocks_before, "Shared memory blocks are unlinked after each call"
+        print("✓ Preprocessing in a worker matches the in-thread result")
+
+    def test_alignment_matches_thread(self):
+        """Alignment in a worker returns the same per-word results"""
+        ground_truth = [("the", ["ð", "ə"]), ("cat", ["k", "æ", "t"]), ("sat", ["s", "æ", "t"])]
+        predictions = [["ð", "ə"], ["k", "æ", "t"], ["s", "ɛ", "t"]]
+        words = ["the", "cat", "set"]
+        expected, _ = align_predictions(predictions, words, ground_truth)
+
+        pool = AudioProcessPool(max_workers=1)
+        try:
+            results, timings = asyncio.run(pool.run(align_predictions, predictions, words, ground_truth))
+        finally:
+            pool.shutdown()
+        assert results == expected
+        assert set(timings) == {"phoneme_alignment", "word_alignment"}
+        print("✓ Alignment in a worker matches the in-thread result")
+
+    def test_worker_stats_reach_server(self):
+        """Denoise branches and alignment cache counters from workers show up in this process's stats"""
+        from core.alignment_cache import get_alignment_cache_stats
+        from core.denoise_policy import get_denoise_policy_stats
+
+        ground_truth = [("the", ["ð", "ə"]), ("cat", ["k", "æ", "t"])]
+        denoise_before = get_denoise_policy_stats()["requests"]
+        cache_before = get_alignment_cache_stats()
+
+        pool = AudioProcessPool(max_workers=1)
+        try:
+            async def run():
+                prepared, _ = await pool.run_audio(preprocess_for_analysis, PreparedAudio(samples=_speech_like()), 2.0)
+                await pool.run(align_predictions, [["ð", "ə"], ["k", "ɑ", "t"]], ["the", "cat"], ground_truth)
+                return prepared
+
+            prepared = asyncio.run(run())
+        finally:
+            pool.shutdown()
+
+        denoise = get_denoise_policy_stats()
+        assert denoise["requests"] == denoise_before + 1
+        assert denoise["branches"][prepared.denoise_branch]["requests"] >= 1
+        cache = get_alignment_cache_stats()
+        assert cache["requests"] == cache_before["requests"] + 1
+        assert cache["lookups"] > cache_before["lookups"]
+        assert any(size > 0 for size in cache["worker_sizes"].values())
+        print("✓ Worker stats are merged into the server's")
+
+    def test_broken_pool_is_rebuilt(self):
+        """A worker that dies breaks the call, and the next call gets a fresh pool"""
+        pool = AudioProcessPool(max_workers=1)
+        try:
+            try:
+                asyncio.run(pool.run(os._exit, 1))
+                assert False, "Expected BrokenProcessPool"
+            except BrokenProcessPool:
+                pass
+            assert pool.stats()["restarts"] == 1
+            assert asyncio.run(pool.run(abs, -3)) == 3
+        finally:
+            pool.shutdown()
+        print("✓ Broken pool is rebuilt")
+
+    def test_disabled_runs_in_thread(self):
+        """Without AUDIO_PROCESS_POOL the stage runs in a thread"""
+        assert get_audio_process_pool() is None
+        prepared, quality_info = asyncio.run(run_audio_stage(
+            preprocess_for_analysis, PreparedAudio(samples=_speech_like(sr=16000)), 2.0
+        ))
+        assert prepared.preprocessed and quality_info["rejection"] is None
+        print("✓ Disabled pool falls back to threads")
+
+
+def run_audio_process_pool_tests():
+    """Run all audio process pool tests"""
+    print("\n" + "="*60)
+    print("AUDIO PROCESS POOL TESTS")
+    print("="*60 + "\n")
+
+    test_pool = TestAudioProcessPool()
+    try:
+        test_pool.test_preprocessing_matches_thread()
+        test_pool.test_alignment_matches_thread()
+        test_pool.test_worker_stats_reach_server()
+        test_pool.test_broken_pool_is_rebuilt()
+        test_pool.test_disabled_runs_in_thread()
+    except AssertionError as e:
+        print(f"\n❌ Audio process pool test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All audio process pool tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_audio_process_pool_tests()
+    exit(0 if success else 1)
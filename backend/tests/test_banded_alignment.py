@@ -0,0 +1,131 @@
+"""
+Tests for the vectorized banded alignment engine.
+
+Checks that core.banded_alignment produces the same alignment and confidence
+as the reference pure-Python DP in process_audio.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+import numpy as np
+from core.banded_alignment import segment_distance_matrix
+from core.process_audio import (
+    align_phonemes_to_words,
+    align_phonemes_to_words_with_confidence,
+    compute_per,
+)
+
+
+def _random_case(rng: random.Random):
+    """Build a random (pred_phonemes, gt_words_phonemes) pair with realistic errors."""
+    inventory = list("bdgkptmnszfvlrwiuaeoə")
+    gt_words_phonemes = [
+        (f"w{i}", [rng.choice(inventory) for _ in range(rng.randint(1, 6))])
+        for i in range(rng.randint(2, 10))
+    ]
+    pred_phonemes = []
+    for _, phonemes in gt_words_phonemes:
+        for phoneme in phonemes:
+            roll = rng.random()
+            if roll < 0.1:
+                continue
+            pred_phonemes.append(rng.choice(inventory) if roll < 0.2 else phoneme)
+            if roll > 0.92:
+                pred_phonemes.append(rng.choice(inventory))
+    return pred_phonemes, gt_words_phonemes
+
+
+class TestBandedAlignment:
+    """Test suite for the vectorized alignment engine"""
+
+    def test_segment_distance_matrix_matches_compute_per(self):
+        """Every (start, length) entry should equal the scalar edit distance"""
+        gt = np.array([0, 1, 2, 3], dtype=np.int32)
+        pred = np.array([0, 2, 2, 3, 1, 0, 3], dtype=np.int32)
+        distances = segment_distance_matrix(gt, pred, 0, len(pred), 5)
+
+        for start in range(len(pred)):
+            for length in range(1, 6):
+                if start + length > len(pred):
+                    continue
+                expected = compute_per(list(gt), list(pred[start:start + length])) * len(gt)
+                assert distances[start, length] == round(expected), \
+                    f"Mismatch at start={start}, length={length}"
+
+        print("✓ Segment distance matrix matches compute_per")
+
+    def test_matches_reference_on_random_sentences(self):
+        """Vectorized and reference engines should produce identical alignments"""
+        rng = random.Random(7)
+        for _ in range(200):
+            pred_phonemes, gt_words_phonemes = _random_case(rng)
+            ref_alignment, ref_conf = align_phonemes_to_words_with_confidence(
+                pred_phonemes, gt_words_phonemes, use_vectorized=False
+            )
+            vec_alignment, vec_conf = align_phonemes_to_words_with_confidence(
+                pred_phonemes, gt_words_phonemes, use_vectorized=True
+            )
+
+            assert [(w, list(s)) for w, s, _ in ref_alignment] == [(w, list(s)) for w, s, _ in vec_alignment]
+            assert np.allclose([p for _, _, p in ref_alignment], [p for _, _, p in vec_alignment])
+            assert np.allclose(ref_conf, vec_conf, atol=1e-6)
+
+        print("✓ Vectorized alignment matches reference on 200 random sentences")
+
+    def test_confidence_reported_per_word(self):
+        """Perfect matches should have high confidence, one value per word"""
+        pred_phonemes = ['b', 'ɪ', 'g', 'k', 'æ', 't']
+        gt_words_phonemes = [('big', ['b', 'ɪ', 'g']), ('cat', ['k', 'æ', 't'])]
+
+        alignment, confidences = align_phonemes_to_words_with_confidence(pred_phonemes, gt_words_phonemes)
+
+        assert alignment == align_phonemes_to_words(pred_phonemes, gt_words_phonemes)
+        assert len(confidences) == 2, "Should report one confidence per word"
+        assert all(c > 0.9 for c in confidences), "Perfect matches should be high confidence"
+        print(f"✓ Confidence per word: {[round(c, 2) for c in confidences]}")
+
+    def test_word_without_phonemes(self):
+        """Words with no expected phonemes should not break the engine"""
+        pred_phonemes = ['b', 'ɪ', 'g', 'k', 'æ', 't']
+        gt_words_phonemes = [('big', ['b', 'ɪ', 'g']), ('-', []), ('cat', ['k', 'æ', 't'])]
+
+        ref_alignment, _ = align_phonemes_to_words_with_confidence(
+            pred_phonemes, gt_words_phonemes, use_vectorized=False
+        )
+        vec_alignment, _ = align_phonemes_to_words_with_confidence(
+            pred_phonemes, gt_words_phonemes, use_vectorized=True
+        )
+
+        assert vec_alignment == ref_alignment
+        print("✓ Empty-phoneme words handled identically")
+
+
+def run_banded_alignment_tests():
+    """Run all banded alignment tests"""
+    print("\n" + "="*60)
+    print("BANDED ALIGNMENT TESTS")
+    print("="*60 + "\n")
+
+    test_alignment = TestBandedAlignment()
+    try:
+        test_alignment.test_segment_distance_matrix_matches_compute_per()
+        test_alignment.test_matches_reference_on_random_sentences()
+        test_alignment.test_confidence_reported_per_word()
+        test_alignment.test_word_without_phonemes()
+    except AssertionError as e:
+        print(f"\n❌ Banded alignment test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All banded alignment tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_banded_alignment_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,219 @@
+"""
+Tests for CTC-constrained forced alignment.
+
+Uses synthetic frame log-probabilities so the Viterbi pass can be checked for
+matches, substitutions, insertions, deletions and missing words without
+loading an acoustic model.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import numpy as np
+from core.audio_optimization import OptimizedAudioPreprocessor
+from core.ctc_forced_alignment import CTCVocabulary, forced_align, log_softmax
+from core.process_audio import process_audio_forced_alignment
+
+TOKENS = ['<pad>', '|', 'ð', 'ə', 'k', 'æ', 't', 'd', 'ɑ', 'g', 's', 'ɔ']
+VOCAB = CTCVocabulary({token: i for i, token in enumerate(TOKENS)}, blank_id=0, ignored_ids=[1])
+THE_CAT_DOG = [('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't']), ('dog', ['d', 'ɔ', 'g'])]
+
+
+def _log_probs(spoken: list[str], hold: int = 3) -> np.ndarray:
+    """Confident frames: each spoken token held for `hold` frames, then a blank."""
+    frames = ['<pad>']
+    for token in spoken:
+        frames += [token] * hold + ['<pad>']
+    logits = np.full((len(frames), len(TOKENS)), -4.0)
+    for t, token in enumerate(frames):
+        logits[t, TOKENS.index(token)] = 4.0
+    return log_softmax(logits)
+
+
+class _ScriptedExtractor:
+    """Stands in for a phoneme extractor, returning scores for a scripted utterance."""
+
+    def __init__(self, spoken):
+        self.spoken = spoken
+        self.ctc_vocabulary = VOCAB
+
+    def extract_logits(self, audio, sampling_rate=16000):
+        return _log_probs(self.spoken), 0.02
+
+
+class _OnsetExtractor:
+    """
+    Trims like the real extractors and emits each call's tokens where the
+    audio it receives gets loud, so timestamps depend on what was trimmed.
+    """
+
+    def __init__(self, utterances):
+        self.utterances = list(utterances)
+        self.ctc_vocabulary = VOCAB
+        self.audio_preprocessor = OptimizedAudioPreprocessor(target_sr=16000)
+
+    def extract_logits(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        frames = ['<pad>'] * (len(audio) // 320)
+        onset = int(np.argmax(np.abs(audio) > 0.05)) // 320
+        for i, token in enumerate(self.utterances.pop(0)):
+            frames[onset + 4 * i:onset + 4 * i + 3] = [token] * 3
+        logits = np.full((len(frames), len(TOKENS)), -4.0)
+        for t, token in enumerate(frames):
+            logits[t, TOKENS.index(token)] = 4.0
+        return log_softmax(logits), 0.02
+
+
+def _tone(seconds, sr=16000):
+    t = np.arange(int(seconds * sr)) / sr
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+class TestCTCForcedAlignment:
+    """Test suite for the forced alignment Viterbi pass"""
+
+    def test_exact_pronunciation(self):
+        """Correct speech maps every word to its expected phonemes"""
+        result = forced_align(_log_probs(['ð', 'ə', 'k', 'æ', 't', 'd', 'ɔ', 'g']), THE_CAT_DOG, VOCAB)
+        assert [w.phonemes for w in result.words] == [['ð', 'ə'], ['k', 'æ', 't'], ['d', 'ɔ', 'g']]
+        assert all(not w.deleted and not w.inserted and not w.substituted for w in result.words)
+
+        starts = [w.start_time for w in result.words]
+        assert starts == sorted(starts) and result.words[0].start_time == 0.02
+        print("✓ Exact pronunciation aligned with timestamps")
+
+    def test_substitution_and_insertion(self):
+        """Mispronounced and extra phonemes stay with their word"""
+        result = forced_align(_log_probs(['ð', 'ə', 'k', 'ɑ', 't', 's', 'd', 'ɔ', 'g']), THE_CAT_DOG, VOCAB)
+        cat = result.words[1]
+        assert cat.phonemes == ['k', 'ɑ', 't', 's']
+        assert cat.substituted == [('æ', 'ɑ')]
+        assert cat.inserted == ['s']
+        assert result.words[2].phonemes == ['d', 'ɔ', 'g']
+        print("✓ Substitution and insertion attributed to the right word")
+
+    def test_deletions(self):
+        """Dropped phonemes and whole words are reported as deleted"""
+        result = forced_align(_log_probs(['ð', 'ə', 'k', 'æ', 't', 'd', 'ɔ']), THE_CAT_DOG, VOCAB)
+        assert result.words[2].phonemes == ['d', 'ɔ'] and result.words[2].deleted == ['g']
+
+        result = forced_align(_log_probs(['ð', 'ə', 'd', 'ɔ', 'g']), THE_CAT_DOG, VOCAB)
+        cat = result.words[1]
+        assert cat.is_missing and cat.deleted == ['k', 'æ', 't'] and cat.start_time is None
+
+        result = forced_align(_log_probs(['k', 'æ', 't', 'd', 'ɔ', 'g']), THE_CAT_DOG, VOCAB)
+        assert result.words[0].is_missing and result.words[1].phonemes == ['k', 'æ', 't']
+        print("✓ Phoneme and word deletions")
+
+    def test_unknown_phoneme_and_frame_times(self):
+        """Phonemes outside the model vocabulary can only be substituted; frame_times offsets timestamps"""
+        words = [('the', ['ð', 'ʌ']), ('dog', ['d', 'ɔ', 'g'])]
+        log_probs = _log_probs(['ð', 'ə', 'd', 'ɔ', 'g'])
+        frame_times = 10.0 + np.arange(len(log_probs)) * 0.02
+        result = forced_align(log_probs, words, VOCAB, frame_times=frame_times)
+
+        assert result.words[0].phonemes == ['ð', 'ə']
+        assert result.words[0].substituted == [('ʌ', 'ə')]
+        assert result.words[0].start_time >= 10.0
+        print("✓ Out-of-vocabulary phonemes and frame times")
+
+    def test_vocabulary_from_tokenizer(self):
+        """Word delimiter, stress and special tokens are treated as blank"""
+        class _Tokenizer:
+            pad_token_id = 0
+            unk_token_id = 12
+            word_delimiter_token_id = 1
+
+            def get_vocab(self):
+                return {**{token: i for i, token in enumerate(TOKENS)}, '<unk>': 12, 'ˈ': 13}
+
+        vocabulary = CTCVocabulary.from_tokenizer(_Tokenizer())
+        assert vocabulary.blank_id == 0
+        assert set(vocabulary.ignored_ids) == {1, 12, 13}
+        assert vocabulary.encode(['k', 'ʌ']) == [4, -1]
+        print("✓ Vocabulary built from tokenizer")
+
+    def test_process_audio_forced_alignment(self):
+        """End-to-end forced mode produces word results with timestamps"""
+        t = np.linspace(0, 2.0, 32000, endpoint=False)
+        audio = (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+        extractor = _ScriptedExtractor(['ð', 'ə', 'k', 'ɑ', 't'])
+
+        results = asyncio.run(process_audio_forced_alignment(
+            THE_CAT_DOG, audio, phoneme_extraction_model=extractor, use_chunking=False
+        ))
+
+        assert [r["type"] for r in results] == ['match', 'match', 'deletion']
+        assert results[1]["substituted"] == [('æ', 'ɑ')]
+        assert results[0]["start_time"] is not None and results[2]["start_time"] is None
+        print("✓ Forced mode pipeline")
+
+    def test_repeated_word_with_one_occurrence_missing(self):
+        """Each result comes from its own segment, so a repeated word is not re-paired"""
+        words = [('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't']), ('the', ['ð', 'ə']), ('dog', ['d', 'ɔ', 'g'])]
+        spoken = ['ð', 'ə', 'd', 'ɔ', 'g']
+        forced = forced_align(_log_probs(spoken), words, VOCAB)
+        assert not forced.words[0].is_missing and forced.words[2].is_missing
+
+        results = asyncio.run(process_audio_forced_alignment(
+            words, _tone(2.0), phoneme_extraction_model=_ScriptedExtractor(spoken), use_chunking=False
+        ))
+        assert [r["type"] for r in results] == ['match', 'deletion', 'deletion', 'match']
+        for result, segment in zip(results, forced.words):
+            assert result["start_time"] == segment.start_time
+            assert result["per"] == (1.0 if segment.is_missing else 0.0)
+        print("✓ Repeated word with one occurrence missing")
+
+    def test_timestamps_after_leading_silence(self):
+        """Word times are measured from the start of the input, not of the trimmed audio"""
+        silence = np.zeros(16000, dtype=np.float32)
+        audio = np.concatenate([silence, _tone(2.0), silence])
+        extractor = _OnsetExtractor([['ð', 'ə', 'k', 'æ', 't', 'd', 'ɔ', 'g']])
+        results = asyncio.run(process_audio_forced_alignment(
+            THE_CAT_DOG, audio, phoneme_extraction_model=extractor, use_chunking=False
+        ))
+        assert abs(results[0]["start_time"] - 1.0) <= 0.04, results[0]["start_time"]
+
+        # Chunked: 1 s of silence, then two 4.5 s phrases with a 1 s pause between them
+        audio = np.concatenate([silence, _tone(4.5), silence, _tone(4.5), silence])
+        extractor = _OnsetExtractor([['ð', 'ə', 'k', 'æ', 't'], ['d', 'ɔ', 'g']])
+        results = asyncio.run(process_audio_forced_alignment(
+            THE_CAT_DOG, audio, phoneme_extraction_model=extractor
+        ))
+        assert not extractor.utterances, "Audio was not chunked"
+        assert abs(results[0]["start_time"] - 1.0) <= 0.04, results[0]["start_time"]
+        assert abs(results[2]["start_time"] - 6.5) <= 0.04, results[2]["start_time"]
+        print("✓ Timestamps include the trimmed leading silence")
+
+
+def run_ctc_forced_alignment_tests():
+    """Run all forced alignment tests"""
+    print("\n" + "="*60)
+    print("CTC FORCED ALIGNMENT TESTS")
+    print("="*60 + "\n")
+
+    test_forced = TestCTCForcedAlignment()
+    try:
+        test_forced.test_exact_pronunciation()
+        test_forced.test_substitution_and_insertion()
+        test_forced.test_deletions()
+        test_forced.test_unknown_phoneme_and_frame_times()
+        test_forced.test_vocabulary_from_tokenizer()
+        test_forced.test_process_audio_forced_alignment()
+        test_forced.test_repeated_word_with_one_occurrence_missing()
+        test_forced.test_timestamps_after_leading_silence()
+    except AssertionError as e:
+        print(f"\n❌ Forced alignment test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All forced alignment tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_ctc_forced_alignment_tests()
+    exit(0 if success else 1)
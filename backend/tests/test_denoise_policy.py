@@ -0,0 +1,115 @@
+"""
+Tests for the SNR-driven denoise policy.
+
+Checks branch selection, the high-pass filter, that prepare_audio follows
+and records the chosen branch, and the per-branch stats.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.audio_preprocessing import prepare_audio
+from core.denoise_policy import (
+    DENOISE_FULL,
+    DENOISE_HIGHPASS,
+    DENOISE_SKIP,
+    DenoisePolicy,
+    DenoisePolicyStats,
+    apply_highpass,
+    get_denoise_policy_stats,
+)
+from core.prepared_audio import PreparedAudio
+
+
+def _tone(seconds: float = 1.5, sr: int = 16000, noise: float = 0.0) -> np.ndarray:
+    t = np.arange(int(seconds * sr)) / sr
+    audio = 0.3 * np.sin(2 * np.pi * 300 * t)
+    return (audio + noise * np.random.default_rng(0).standard_normal(len(t))).astype(np.float32)
+
+
+class TestDenoisePolicy:
+    """Test suite for the denoise policy"""
+
+    def test_decide(self):
+        """Branches follow the SNR thresholds; a disabled policy always reduces"""
+        policy = DenoisePolicy(skip_snr_db=35, highpass_snr_db=25)
+        assert policy.decide(40.0) == DENOISE_SKIP
+        assert policy.decide({"snr_db": 30.0, "quality_level": "good"}) == DENOISE_HIGHPASS
+        assert policy.decide(12.0) == DENOISE_FULL
+        assert DenoisePolicy(enabled=False).decide(60.0) == DENOISE_FULL
+        print("✓ Branch selection")
+
+    def test_highpass(self):
+        """High-pass removes rumble and DC but keeps the speech band"""
+        t = np.arange(16000) / 16000
+        speech = 0.3 * np.sin(2 * np.pi * 300 * t)
+        rumble = 0.3 * np.sin(2 * np.pi * 20 * t) + 0.1
+        filtered = apply_highpass((speech + rumble).astype(np.float32), 16000, 80.0)
+        assert filtered.dtype == np.float32
+        middle = slice(2000, -2000)
+        assert np.sqrt(np.mean((filtered - speech)[middle] ** 2)) < 0.02
+        assert len(apply_highpass(np.zeros(10, dtype=np.float32))) == 10
+        print("✓ High-pass filter")
+
+    def test_prepare_audio_follows_policy(self):
+        """prepare_audio skips, filters or reduces and records the branch"""
+        clean = _tone()
+        skipped = prepare_audio(PreparedAudio(clean), quality_info={"snr_db": 50.0},
+                                denoise_policy=DenoisePolicy())
+        assert skipped.denoise_branch == DENOISE_SKIP and skipped.denoised
+        assert np.allclose(skipped.samples, clean / np.max(np.abs(clean)))
+        assert skipped.stages()["denoise_branch"] == DENOISE_SKIP
+
+        filtered = prepare_audio(PreparedAudio(clean), quality_info={"snr_db": 30.0},
+                                 denoise_policy=DenoisePolicy())
+        assert filtered.denoise_branch == DENOISE_HIGHPASS
+
+        reduced = prepare_audio(PreparedAudio(_tone(noise=0.1)), denoise_policy=DenoisePolicy(enabled=False))
+        assert reduced.denoise_branch == DENOISE_FULL and "denoise" in reduced.timings
+
+        stats = get_denoise_policy_stats()
+        assert all(stats["branches"][branch]["requests"] >= 1
+                   for branch in (DENOISE_SKIP, DENOISE_HIGHPASS, DENOISE_FULL))
+        print(f"✓ prepare_audio follows the policy: {stats}")
+
+    def test_stats_saving_estimate(self):
+        """Saving is the full-reduction cost of the audio that skipped it"""
+        stats = DenoisePolicyStats()
+        stats.record(DENOISE_FULL, seconds=0.2, audio_seconds=2.0)
+        stats.record(DENOISE_SKIP, seconds=0.0, audio_seconds=3.0)
+        stats.record(DENOISE_HIGHPASS, seconds=0.01, audio_seconds=1.0)
+        summary = stats.summary()
+        assert summary["requests"] == 3
+        assert summary["branches"][DENOISE_FULL]["ms_per_audio_second"] == 100.0
+        assert summary["estimated_saved_ms"] == 390.0
+        assert DenoisePolicyStats().summary()["estimated_saved_ms"] is None
+        print(f"✓ Saving estimate: {summary['estimated_saved_ms']} ms")
+
+
+def run_denoise_policy_tests():
+    """Run all denoise policy tests"""
+    print("\n" + "="*60)
+    print("DENOISE POLICY TESTS")
+    print("="*60 + "\n")
+
+    test_policy = TestDenoisePolicy()
+    try:
+        test_policy.test_decide()
+        test_policy.test_highpass()
+        test_policy.test_prepare_audio_follows_policy()
+        test_policy.test_stats_saving_estimate()
+    except AssertionError as e:
+        print(f"\n❌ Denoise policy test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All denoise policy tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_denoise_policy_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,163 @@
+"""
+Tests for the shared edit-distance kernels.
+
+Checks that core.edit_distance matches a plain DP for distances and for the
+align_sequences traceback (including tie-breaking), and that the phoneme
+inventory interns symbols consistently.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+from core.edit_distance import (
+    align_operations,
+    bit_parallel_levenshtein,
+    levenshtein,
+    phoneme_error_rate,
+)
+from core.phoneme_inventory import PhonemeInventory
+from core.process_audio import align_sequences, compute_per
+from core.evaluation.accuracy_metrics import compute_phoneme_error_rate
+
+
+def _dp_distance(a, b):
+    """Textbook Levenshtein DP used as the reference."""
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        previous = current
+    return previous[len(b)]
+
+
+def _dp_operations(gt, pred):
+    """Reference traceback with the original align_sequences tie-breaking."""
+    m, n = len(gt), len(pred)
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        dp[i][0] = i
+    for j in range(n + 1):
+        dp[0][j] = j
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            cost = 0 if gt[i - 1] == pred[j - 1] else 1
+            dp[i][j] = min(dp[i - 1][j] + 1, dp[i][j - 1] + 1, dp[i - 1][j - 1] + cost)
+
+    operations = []
+    i, j = m, n
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dp[i][j] == dp[i - 1][j - 1] + (0 if gt[i - 1] == pred[j - 1] else 1):
+            kind = 'match' if gt[i - 1] == pred[j - 1] else 'substitution'
+            operations.append((kind, gt[i - 1], pred[j - 1]))
+            i -= 1
+            j -= 1
+        elif i > 0 and dp[i][j] == dp[i - 1][j] + 1:
+            operations.append(('deletion', gt[i - 1], None))
+            i -= 1
+        else:
+            operations.append(('insertion', None, pred[j - 1]))
+            j -= 1
+    operations.reverse()
+    return operations
+
+
+def _random_pair(rng: random.Random, max_length: int = 14):
+    alphabet = list("abcdə")
+    gt = [rng.choice(alphabet) for _ in range(rng.randint(0, max_length))]
+    pred = [rng.choice(alphabet) for _ in range(rng.randint(0, max_length))]
+    return gt, pred
+
+
+class TestEditDistance:
+    """Test suite for the bit-parallel edit distance kernels"""
+
+    def test_distance_matches_dp(self):
+        """Bit-parallel and dispatched distances should equal the DP distance"""
+        rng = random.Random(3)
+        for _ in range(2000):
+            gt, pred = _random_pair(rng)
+            expected = _dp_distance(gt, pred)
+            assert bit_parallel_levenshtein(gt, pred) == expected, f"{gt} vs {pred}"
+            assert levenshtein(gt, pred) == expected, f"{gt} vs {pred}"
+
+        # Patterns longer than a machine word still work with Python integers
+        long_gt = [rng.choice("abcd") for _ in range(150)]
+        long_pred = [rng.choice("abcd") for _ in range(140)]
+        assert bit_parallel_levenshtein(long_gt, long_pred) == _dp_distance(long_gt, long_pred)
+        print("✓ Bit-parallel distance matches DP on 2000 random pairs")
+
+    def test_phoneme_error_rate_edge_cases(self):
+        """PER keeps the original compute_per conventions"""
+        assert phoneme_error_rate([], []) == 0.0
+        assert phoneme_error_rate([], ['a']) == 1.0
+        assert phoneme_error_rate(['a'], []) == 1.0
+        assert phoneme_error_rate(['k', 'æ', 't'], ['k', 'æ', 't']) == 0.0
+        assert phoneme_error_rate(['k', 'æ', 't'], ['k', 'ɑ', 't']) == 1 / 3
+        assert compute_per(['k', 'æ', 't'], ['æ', 't', 's']) == 2 / 3
+        assert compute_phoneme_error_rate(['k', 'æ', 't'], ['k', 'æ']) == 1 / 3
+        assert compute_phoneme_error_rate([], ['k']) == 0
+        print("✓ PER edge cases preserved")
+
+    def test_operations_match_reference_traceback(self):
+        """Traceback should reproduce the original operations exactly"""
+        rng = random.Random(11)
+        for _ in range(2000):
+            gt, pred = _random_pair(rng)
+            expected = _dp_operations(gt, pred)
+            assert align_operations(gt, pred) == expected, f"{gt} vs {pred}"
+            assert align_sequences(gt, pred) == expected, f"{gt} vs {pred}"
+        print("✓ Operations match reference traceback on 2000 random pairs")
+
+    def test_operations_on_words(self):
+        """Word-level alignment and shared suffixes"""
+        ops = align_sequences(['the', 'big', 'cat'], ['the', 'cat'])
+        assert ops == [('match', 'the', 'the'), ('deletion', 'big', None), ('match', 'cat', 'cat')]
+
+        ops = align_sequences(['a'], ['a', 'a'])
+        assert ops == [('insertion', None, 'a'), ('match', 'a', 'a')]
+        print("✓ Word-level operations")
+
+    def test_phoneme_inventory(self):
+        """Interned ids are stable and decode back to the symbols"""
+        inventory = PhonemeInventory(['k', 'æ'])
+        assert inventory.encode(['k', 'æ', 't']) == (0, 1, 2)
+        assert inventory.encode(iter(['t', 'k'])) == (2, 0)
+        assert inventory.decode((2, 1, 0)) == ['t', 'æ', 'k']
+        assert len(inventory) == 3 and 'æ' in inventory
+
+        gt, pred = ['θ', 'ɪ', 'ŋ', 'k'], ['s', 'ɪ', 'ŋ']
+        assert levenshtein(inventory.encode(gt), inventory.encode(pred)) == levenshtein(gt, pred)
+        print("✓ Phoneme inventory interning")
+
+
+def run_edit_distance_tests():
+    """Run all edit distance tests"""
+    print("\n" + "="*60)
+    print("EDIT DISTANCE TESTS")
+    print("="*60 + "\n")
+
+    test_edit_distance = TestEditDistance()
+    try:
+        test_edit_distance.test_distance_matches_dp()
+        test_edit_distance.test_phoneme_error_rate_edge_cases()
+        test_edit_distance.test_operations_match_reference_traceback()
+        test_edit_distance.test_operations_on_words()
+        test_edit_distance.test_phoneme_inventory()
+    except AssertionError as e:
+        print(f"\n❌ Edit distance test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All edit distance tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_edit_distance_tests()
+    exit(0 if success else 1)
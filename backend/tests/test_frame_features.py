@@ -0,0 +1,101 @@
+"""
+Tests for shared frame features.
+
+Checks that FrameFeatures reproduces librosa's RMS, dB and zero-crossing
+rate, and that quality analysis, VAD and trimming share one instance (and
+one SNR computation) per audio array.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import librosa
+import numpy as np
+from core.audio_chunking import estimate_speech_activity
+from core.audio_quality_analyzer import AudioQualityAnalyzer
+from core.frame_features import FrameFeatures, get_frame_features
+from core.phoneme_aware_trimming import PhonemeAwareTrimmer
+
+
+def _speech_like(seconds: float = 2.0, sr: int = 16000) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    t = np.arange(int(seconds * sr)) / sr
+    voiced = (t > 0.6) & (t < seconds - 0.6)
+    audio = 0.4 * np.sin(2 * np.pi * 150 * t) * voiced + 0.05 * rng.standard_normal(len(t)) * voiced
+    return (audio + 0.002 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+class TestFrameFeatures:
+    """Test suite for shared frame features"""
+
+    def test_matches_librosa(self):
+        """RMS, dB and ZCR equal the librosa features they replace"""
+        for length in (700, 2048, 16000, 33333):
+            audio = _speech_like()[:length]
+            features = FrameFeatures(audio)
+            rms = librosa.feature.rms(y=audio, frame_length=2048, hop_length=512)[0]
+            zcr = librosa.feature.zero_crossing_rate(audio, frame_length=2048, hop_length=512)[0]
+
+            assert features.rms.shape == rms.shape
+            assert np.allclose(features.rms, rms, atol=1e-6)
+            assert np.allclose(features.rms_db, librosa.amplitude_to_db(rms, ref=np.max), atol=1e-3)
+            assert np.array_equal(features.zcr, zcr)
+        print("✓ Features match librosa")
+
+    def test_shared_per_array(self):
+        """Every consumer of an array gets the same features; a new array gets new ones"""
+        audio = _speech_like()
+        features = get_frame_features(audio, 16000)
+        assert get_frame_features(audio, 16000) is features
+        assert get_frame_features(audio.copy(), 16000) is not features
+        assert get_frame_features(audio, 8000) is not features
+
+        analyzer = AudioQualityAnalyzer(sr=16000)
+        snr = analyzer.calculate_snr(audio)
+        assert features.cached(('snr_db', 0.5), lambda: None) == snr, "SNR is memoized on the shared features"
+        print("✓ Features shared per array")
+
+    def test_consumers_agree_with_original_math(self):
+        """Silence percentage, speech activity and boundaries are unchanged"""
+        audio = _speech_like()
+        rms_db = librosa.amplitude_to_db(
+            librosa.feature.rms(y=audio, frame_length=2048, hop_length=512)[0], ref=np.max
+        )
+
+        silence = AudioQualityAnalyzer(sr=16000).calculate_silence_percentage(audio)
+        assert abs(silence - np.mean(rms_db < -40) * 100) < 1e-9
+
+        speech = estimate_speech_activity(audio, sr=16000)
+        assert abs(speech - np.mean(rms_db > -30) * 100) < 1e-9
+
+        start, end = PhonemeAwareTrimmer(sr=16000).detect_speech_boundaries(audio)
+        assert 0.4 * 16000 <= start <= 0.6 * 16000
+        assert 1.4 * 16000 <= end <= 1.6 * 16000
+        print(f"✓ Consumers agree (silence {silence:.1f}%, speech {speech:.1f}%)")
+
+
+def run_frame_features_tests():
+    """Run all frame feature tests"""
+    print("\n" + "="*60)
+    print("FRAME FEATURE TESTS")
+    print("="*60 + "\n")
+
+    test_features = TestFrameFeatures()
+    try:
+        test_features.test_matches_librosa()
+        test_features.test_shared_per_array()
+        test_features.test_consumers_agree_with_original_math()
+    except AssertionError as e:
+        print(f"\n❌ Frame feature test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All frame feature tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_frame_features_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,187 @@
+"""
+Tests for the phoneme inference micro-batching scheduler.
+
+Uses a small stand-in extractor that records the batches it receives, so
+batching, per-request errors and metrics can be checked without a model,
+and the tiny wav2vec2 model to check that batching leaves each utterance's
+transcription unchanged.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import gc
+import tempfile
+import time
+import weakref
+
+import numpy as np
+from core.inference_scheduler import (
+    InferenceScheduler,
+    conv_output_frames,
+    extract_phonemes,
+    get_inference_scheduler,
+)
+from core.length_buckets import padding_groups
+from tests.helpers.models import extractor_config, tiny_wav2vec2
+
+
+class _RecordingExtractor:
+    """Returns each utterance's length as its 'transcription' and records batch sizes."""
+
+    model_name = "recording-extractor"
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.batches = []
+
+    def extract_phoneme(self, audio, sampling_rate=16000):
+        return self.extract_phoneme_batch([audio], sampling_rate)[0]
+
+    def extract_phoneme_batch(self, audios, sampling_rate=16000, use_optimized_preprocessing=True):
+        self.batches.append(len(audios))
+        time.sleep(self.delay)
+        return [ValueError("❌ Audio is empty") if len(audio) == 0 else [[str(len(audio))]] for audio in audios]
+
+
+class TestInferenceScheduler:
+    """Test suite for the inference scheduler"""
+
+    def test_concurrent_requests_share_a_batch(self):
+        """Requests arriving within the window run as one model call"""
+        extractor = _RecordingExtractor()
+        scheduler = InferenceScheduler(extractor, max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*[
+                scheduler.extract_phoneme(np.zeros(100 + i, dtype=np.float32)) for i in range(5)
+            ])
+
+        results = asyncio.run(run())
+        assert results == [[[str(100 + i)]] for i in range(5)], "Each caller gets its own result"
+        assert extractor.batches == [5]
+
+        stats = scheduler.stats()
+        assert stats["batch_size_histogram"] == {5: 1}
+        assert stats["requests"] == 5 and stats["mean_batch_size"] == 5.0
+        assert 0 <= stats["queue_wait_ms"]["p50"] <= stats["queue_wait_ms"]["max"]
+        print(f"✓ Concurrent requests batched: {stats['batch_size_histogram']}")
+
+    def test_max_batch_size_and_queueing(self):
+        """Batches are capped; requests arriving during inference form the next batch"""
+        extractor = _RecordingExtractor()
+        scheduler = InferenceScheduler(extractor, max_batch_size=3, max_wait_ms=1)
+
+        async def run():
+            return await asyncio.gather(*[
+                scheduler.extract_phoneme(np.zeros(10, dtype=np.float32)) for _ in range(7)
+            ])
+
+        assert len(asyncio.run(run())) == 7
+        assert extractor.batches == [3, 3, 1]
+        print(f"✓ Batch size capped: {extractor.batches}")
+
+    def test_errors_are_per_request(self):
+        """A rejected utterance raises for its caller only"""
+        extractor = _RecordingExtractor()
+        scheduler = InferenceScheduler(extractor, max_batch_size=4, max_wait_ms=20)
+
+        async def run():
+            return await asyncio.gather(
+                scheduler.extract_phoneme(np.zeros(0, dtype=np.float32)),
+                scheduler.extract_phoneme(np.zeros(12, dtype=np.float32)),
+                return_exceptions=True,
+            )
+
+        empty, ok = asyncio.run(run())
+        assert isinstance(empty, ValueError)
+        assert ok == [['12']]
+        print("✓ Errors delivered per request")
+
+    def test_scheduler_does_not_keep_extractor_alive(self):
+        """An idle scheduler lets its extractor (and the model it holds) be garbage collected"""
+        async def run():
+            extractor = _RecordingExtractor(delay=0)
+            scheduler = get_inference_scheduler(extractor)
+            assert await extract_phonemes(extractor, np.zeros(10, dtype=np.float32)) == [['10']]
+            assert scheduler.extractor is extractor
+            collected = weakref.ref(extractor)
+            del extractor
+            gc.collect()
+            return collected() is None, scheduler.extractor
+
+        collected, extractor = asyncio.run(run())
+        assert collected, "Scheduler kept its extractor alive"
+        assert extractor is None
+        print("✓ Schedulers hold their extractor weakly")
+
+    def test_fallback_without_batch_method(self):
+        """Extractors without extract_phoneme_batch are called directly"""
+        class _SingleExtractor:
+            def extract_phoneme(self, audio, sampling_rate=16000):
+                return [['k', 'æ', 't']]
+
+        result = asyncio.run(extract_phonemes(_SingleExtractor(), np.zeros(10), 16000))
+        assert result == [['k', 'æ', 't']]
+        print("✓ Direct fallback for single-utterance extractors")
+
+    def test_conv_output_frames(self):
+        """Frame counts follow the wav2vec2 feature encoder"""
+        assert conv_output_frames(16000) == 49
+        assert conv_output_frames(32000) == 99
+        assert conv_output_frames(100) == 0
+        print("✓ Feature encoder frame counts")
+
+    def test_batch_matches_single_without_mask(self):
+        """Without an attention mask, batching must not pad one utterance to another's length"""
+        from core.phoneme_extractor import PhonemeExtractor
+
+        assert padding_groups([5, 3, 5], masked=True) == [[0, 1, 2]]
+        assert padding_groups([5, 3, 5], masked=False) == [[0, 2], [1]]
+
+        rng = np.random.default_rng(0)
+        t = np.arange(6 * 16000) / 16000
+        long = (0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+        audios = [long[:2 * 16000], long, long[:2 * 16000].copy()]
+        with tempfile.TemporaryDirectory() as directory:
+            tiny_wav2vec2(directory)  # group norm, no mask
+            extractor = PhonemeExtractor(model_name=directory, use_quantization=False, use_fast_model=False,
+                                         optimization_config=extractor_config(cache_enabled=False))
+            batched = extractor.extract_phoneme_batch(audios, use_optimized_preprocessing=False)
+            single = [extractor.extract_phoneme(audio, use_optimized_preprocessing=False) for audio in audios]
+            assert batched == single
+            del extractor
+            gc.collect()
+        print("✓ Batched transcriptions match single runs on a model without an attention mask")
+
+
+def run_inference_scheduler_tests():
+    """Run all inference scheduler tests"""
+    print("\n" + "="*60)
+    print("INFERENCE SCHEDULER TESTS")
+    print("="*60 + "\n")
+
+    test_scheduler = TestInferenceScheduler()
+    try:
+        test_scheduler.test_concurrent_requests_share_a_batch()
+        test_scheduler.test_max_batch_size_and_queueing()
+        test_scheduler.test_errors_are_per_request()
+        test_scheduler.test_scheduler_does_not_keep_extractor_alive()
+        test_scheduler.test_fallback_without_batch_method()
+        test_scheduler.test_conv_output_frames()
+        test_scheduler.test_batch_matches_single_without_mask()
+    except AssertionError as e:
+        print(f"\n❌ Inference scheduler test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All inference scheduler tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_inference_scheduler_tests()
+    exit(0 if success else 1)
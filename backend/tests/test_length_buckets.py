@@ -0,0 +1,183 @@
+"""
+Tests for length-bucketed model inputs.
+
+Checks bucket selection, the shape counters, and that both extractors
+pad to buckets, warm every bucket and trim the logits back to the real
+audio (using the tiny wav2vec2 model and the conv ONNX stand-in), but
+only for models that are given an attention mask.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import tempfile
+
+import numpy as np
+import onnxruntime as ort
+
+from core.length_buckets import LengthBuckets, ShapeStats, get_length_bucket_stats, shape_stats
+from core.model_registry import model_registry
+from core.onnx_io_binding import OnnxIOBinder
+from tests.helpers.models import conv_ctc_onnx, extractor_config, tiny_wav2vec2
+
+
+def _bucket_config(cache_enabled: bool = True, bucketing: bool = True):
+    bucket_config = extractor_config(cache_enabled)
+    bucket_config._config.update({'length_bucketing': bucketing, 'onnx_length_bucketing': bucketing,
+                                  'length_bucket_seconds': [1.0, 2.0]})
+    return bucket_config
+
+
+def _voiced(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * 16000)) / 16000
+    return (0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+
+class TestLengthBuckets:
+    """Test suite for length buckets"""
+
+    def test_padded_length(self):
+        """Smallest fitting bucket; longer inputs round up to multiples of the largest"""
+        buckets = LengthBuckets((4, 1, 2))
+        assert buckets.lengths == [16000, 32000, 64000]
+        assert buckets.padded_length(100) == 16000
+        assert buckets.padded_length(16000) == 16000
+        assert buckets.padded_length(16001) == 32000
+        assert buckets.padded_length(64001) == 128000 and not buckets.is_bucket(128000)
+        print("✓ Bucket selection")
+
+    def test_shape_stats(self):
+        """Shapes first seen after warmup are counted as recompiles"""
+        stats = ShapeStats()
+        assert stats.record("m", (1, 16000), 12000)
+        assert not stats.record("m", (1, 16000), 15000)
+        stats.mark_warmed("m")
+        stats.record("m", (1, 16000))
+        stats.record("m", (1, 48000), 37000)
+        entry, = stats.stats()["models"]
+        assert entry["distinct_shapes"] == 2 and entry["new_shapes_after_warmup"] == 1
+        assert entry["requests_per_length"] == {16000: 3, 48000: 1}
+        assert entry["padding_seconds"] == 1.0
+        print("✓ Shape stats")
+
+    def test_pytorch_buckets(self):
+        """PyTorch inputs are padded to buckets, warmed per bucket and trimmed to the real frames"""
+        from core.phoneme_extractor import PhonemeExtractor
+
+        with tempfile.TemporaryDirectory() as directory:
+            tiny_wav2vec2(directory, attention_mask=True)
+            options = dict(model_name=directory, use_quantization=False, use_fast_model=False)
+            bucketed = PhonemeExtractor(optimization_config=_bucket_config(), **options)
+            plain = PhonemeExtractor(optimization_config=_bucket_config(cache_enabled=False, bucketing=False),
+                                     **options)
+
+            for seconds in (0.6, 0.9, 1.4):
+                audio = _voiced(seconds)
+                log_probs, frame_duration = bucketed.extract_logits(audio, use_optimized_preprocessing=False)
+                expected, expected_duration = plain.extract_logits(audio, use_optimized_preprocessing=False)
+                assert log_probs.shape == expected.shape and frame_duration == expected_duration
+                assert np.allclose(log_probs, expected, atol=1e-3), "Masked padding leaves the real frames unchanged"
+
+            entry, = [m for m in shape_stats.stats()["models"] if m["model"] == list(bucketed._registry_key)]
+            assert entry["warmed"] and entry["new_shapes_after_warmup"] == 0
+            assert entry["distinct_shapes"] == 2
+            assert bucketed.get_model_info()["length_buckets"] == [16000, 32000]
+
+            key = bucketed._registry_key
+            del bucketed, plain
+            gc.collect()
+            model_registry.evict(key)
+        print("✓ PyTorch extractor pads to length buckets")
+
+    def test_no_padding_without_attention_mask(self):
+        """Models that get no attention mask run at the exact length even with bucketing on"""
+        from core.optimization_config import OptimizationConfig
+        from core.phoneme_extractor import PhonemeExtractor
+
+        assert OptimizationConfig().get('onnx_length_bucketing') is False
+        with tempfile.TemporaryDirectory() as directory:
+            tiny_wav2vec2(directory)  # group norm, no mask
+            options = dict(model_name=directory, use_quantization=False, use_fast_model=False)
+            extractor = PhonemeExtractor(optimization_config=_bucket_config(cache_enabled=False), **options)
+            plain = PhonemeExtractor(optimization_config=_bucket_config(cache_enabled=False, bucketing=False),
+                                     **options)
+            assert extractor.get_model_info()["length_buckets"] is None
+
+            audio = _voiced(1.3)
+            log_probs, _ = extractor.extract_logits(audio, use_optimized_preprocessing=False)
+            expected, _ = plain.extract_logits(audio, use_optimized_preprocessing=False)
+            assert np.array_equal(log_probs, expected)
+            entry, = [m for m in shape_stats.stats()["models"] if m["model"] == list(extractor._registry_key)]
+            assert len(audio) in entry["requests_per_length"]
+            assert 32000 not in entry["requests_per_length"], "Input was padded to its bucket"
+            del extractor, plain
+            gc.collect()
+        print("✓ Models without an attention mask are not padded")
+
+    def test_onnx_buckets(self):
+        """IO binding binds whole buckets and trims the logits"""
+        with tempfile.TemporaryDirectory() as directory:
+            model_path = os.path.join(directory, "model.onnx")
+            conv_ctc_onnx(model_path, vocab_size=8)
+            session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+            padded = OnnxIOBinder(session, "input_values", "logits", 8, bucket_seconds=(1, 2), pad_to_bucket=True)
+            exact = OnnxIOBinder(session, "input_values", "logits", 8, bucket_seconds=(1, 2))
+
+            for seconds in (0.5, 1.3):
+                audio = _voiced(seconds)
+                assert padded.bound_length(len(audio)) in (16000, 32000)
+                with padded.run(audio) as logits, exact.run(audio) as expected:
+                    # The conv stack only looks at whole windows of real samples
+                    assert logits.shape == expected.shape
+                    assert np.allclose(logits, expected, atol=1e-5)
+
+            # A graph without an attention_mask input is never padded
+            from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+            tiny_wav2vec2(directory, attention_mask=True)
+            extractor = PhonemeExtractorONNX(model_name=directory, optimization_config=_bucket_config(cache_enabled=False))
+            assert not extractor.io_binder.pad_to_bucket and extractor.get_model_info()["length_buckets"] is None
+            assert OnnxIOBinder.for_session(session, extractor.processor, pad_to_bucket=True).pad_to_bucket is False
+
+        with tempfile.TemporaryDirectory() as directory:
+            # With one, the extractor warms every bucket and sees no new shapes afterwards
+            conv_ctc_onnx(os.path.join(directory, "model.onnx"), vocab_size=8, attention_mask=True)
+            tiny_wav2vec2(directory, attention_mask=True)
+            extractor = PhonemeExtractorONNX(model_name=directory, optimization_config=_bucket_config(cache_enabled=False))
+            assert extractor.io_binder.pad_to_bucket
+            for seconds in (0.7, 1.1, 1.9):
+                extractor.extract_phoneme(_voiced(seconds))
+            entry, = [m for m in get_length_bucket_stats()["models"] if m["model"] == list(extractor._registry_key)]
+            assert entry["warmed"] and entry["new_shapes_after_warmup"] == 0
+            assert set(entry["requests_per_length"]) == {16000, 32000}
+        print("✓ ONNX extractor pads to length buckets")
+
+
+def run_length_bucket_tests():
+    """Run all length bucket tests"""
+    print("\n" + "="*60)
+    print("LENGTH BUCKET TESTS")
+    print("="*60 + "\n")
+
+    test_buckets = TestLengthBuckets()
+    try:
+        test_buckets.test_padded_length()
+        test_buckets.test_shape_stats()
+        test_buckets.test_pytorch_buckets()
+        test_buckets.test_no_padding_without_attention_mask()
+        test_buckets.test_onnx_buckets()
+    except AssertionError as e:
+        print(f"\n❌ Length bucket test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All length bucket tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_length_bucket_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,124 @@
+"""
+Tests for background model loading and readiness gating.
+
+Components are stand-ins that sleep, so the tests check the loading
+order and the waiting behaviour without loading real models.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import time
+
+from core.model_loader import ModelLoader, ModelsNotReady, _loaders, get_readiness, load_all_models
+
+
+def _slow(value, seconds: float = 0.3):
+    def load():
+        time.sleep(seconds)
+        return value
+    return load
+
+
+def _fail():
+    raise RuntimeError("no credentials")
+
+
+class TestModelLoader:
+    """Test suite for the model loader"""
+
+    def test_components_load_in_parallel(self):
+        """Components load concurrently and are handed to build()"""
+        loader = ModelLoader("test", {"a": _slow(1), "b": _slow(2), "c": _slow(3)},
+                             lambda components: sum(components.values()), register=False)
+        start = time.time()
+        assert loader.load() == 6
+        assert time.time() - start < 0.8, "Three 0.3s components should load side by side"
+        status = loader.status()
+        assert status["ready"] and status["state"] == "ready"
+        assert set(status["timings"]) == {"a", "b", "c", "build", "total"}
+        print("✓ Components load in parallel")
+
+    def test_requests_wait_for_loading(self):
+        """Requests arriving during loading wait for it instead of failing"""
+        loader = ModelLoader("test", {"model": _slow("model")}, lambda components: components["model"],
+                             register=False)
+
+        async def run():
+            loader.start()
+            assert not loader.ready
+            return await asyncio.gather(*[loader.get(timeout=5) for _ in range(4)])
+
+        assert asyncio.run(run()) == ["model"] * 4
+        assert asyncio.run(loader.get()) == "model"
+        print("✓ Requests are queued until models are ready")
+
+    def test_timeout_and_failure(self):
+        """Waiting past the timeout or a failed load raises ModelsNotReady"""
+        slow = ModelLoader("slow", {"model": _slow("model", 0.5)}, lambda components: components["model"],
+                           register=False)
+
+        async def wait_briefly():
+            try:
+                await slow.get(timeout=0.05)
+                assert False, "Expected ModelsNotReady"
+            except ModelsNotReady:
+                pass
+            return await slow.get(timeout=5)
+
+        assert asyncio.run(wait_briefly()) == "model"
+
+        failing = ModelLoader("failing", {"tts": _fail, "model": _slow("model", 0)}, lambda components: None,
+                              register=False)
+        try:
+            asyncio.run(failing.get(timeout=5))
+            assert False, "Expected ModelsNotReady"
+        except ModelsNotReady as e:
+            assert "no credentials" in str(e)
+        assert failing.status()["state"] == "failed" and "RuntimeError" in failing.status()["error"]
+        print("✓ Timeouts and load failures raise ModelsNotReady")
+
+    def test_readiness(self):
+        """Readiness flips once every registered loader is ready"""
+        loader = ModelLoader("registered", {"model": _slow("model", 0.2)}, lambda components: components["model"])
+        try:
+            assert not get_readiness()["ready"]
+
+            async def run():
+                await asyncio.gather(*load_all_models())
+
+            asyncio.run(run())
+            readiness = get_readiness()
+            assert readiness["ready"] and [entry["name"] for entry in readiness["loaders"]] == ["registered"]
+        finally:
+            _loaders.remove(loader)
+        print("✓ Readiness reflects the registered loaders")
+
+
+def run_model_loader_tests():
+    """Run all model loader tests"""
+    print("\n" + "="*60)
+    print("MODEL LOADER TESTS")
+    print("="*60 + "\n")
+
+    test_loader = TestModelLoader()
+    try:
+        test_loader.test_components_load_in_parallel()
+        test_loader.test_requests_wait_for_loading()
+        test_loader.test_timeout_and_failure()
+        test_loader.test_readiness()
+    except AssertionError as e:
+        print(f"\n❌ Model loader test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All model loader tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_model_loader_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,129 @@
+"""
+Tests for the process-wide model registry.
+
+The registry itself is tested with plain loader functions; the extractor
+integration uses a tiny randomly initialized wav2vec2 model saved to a
+temporary directory, so no download is needed.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import tempfile
+import threading
+import time
+
+from core.model_registry import ModelRegistry, model_registry
+from tests.helpers.models import extractor_config, tiny_wav2vec2
+
+
+class TestModelRegistry:
+    """Test suite for the model registry"""
+
+    def test_concurrent_acquire_loads_once(self):
+        """Simultaneous first requests share one load"""
+        registry = ModelRegistry()
+        loads = []
+
+        def loader():
+            loads.append(1)
+            time.sleep(0.05)
+            return {"model": object()}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.acquire("m", loader)))
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(loads) == 1 and all(r is results[0] for r in results)
+        stats = registry.stats()
+        assert stats["loads"] == 1 and stats["models"][0]["refcount"] == 4 and stats["models"][0]["hits"] == 3
+        print("✓ Concurrent acquires share one load")
+
+    def test_refcounts_and_eviction(self):
+        """Referenced models survive evict_unused; held references drop on GC"""
+        registry = ModelRegistry()
+
+        class Owner:
+            pass
+
+        owner = Owner()
+        components, release = registry.hold(owner, "held", lambda: {"model": object()})
+        registry.acquire("free", lambda: {"model": object()})
+        registry.release("free")
+
+        assert registry.evict_unused() == ["free"]
+        assert not registry.evict("held"), "Referenced model is not evicted without force"
+
+        del owner
+        gc.collect()
+        assert registry.stats()["models"][0]["refcount"] == 0
+        release()  # already released by the finalizer: no double release
+        assert registry.evict("held") and registry.stats()["loaded"] == 0
+
+        # A late release of evicted components leaves a reloaded entry alone
+        old = registry.acquire("m", lambda: {"v": 1})
+        registry.evict("m", force=True)
+        registry.acquire("m", lambda: {"v": 2})
+        registry.release("m", old)
+        assert registry.stats()["models"][0]["refcount"] == 1
+        print("✓ Reference counting and eviction")
+
+    def test_phoneme_extractor_shares_model(self):
+        """PhonemeExtractor instances share one loaded, warmed model"""
+        from core.phoneme_extractor import PhonemeExtractor
+
+        with tempfile.TemporaryDirectory() as directory:
+            model_dir = tiny_wav2vec2(directory)
+            options = dict(model_name=model_dir, use_quantization=False, use_fast_model=False)
+
+            first = PhonemeExtractor(optimization_config=extractor_config(), **options)
+            second = PhonemeExtractor(optimization_config=extractor_config(), **options)
+            assert first.model is second.model and first.processor is second.processor
+            assert first.get_model_info()["model_cached"]
+
+            entry, = [m for m in model_registry.stats()["models"] if m["key"][1] == model_dir]
+            assert entry["refcount"] == 2 and entry["hits"] == 1
+            assert entry["load_seconds"] > 0 and entry["warmup_seconds"] is not None
+            assert entry["weights_mb"] is not None
+
+            uncached = PhonemeExtractor(optimization_config=extractor_config(cache_enabled=False), **options)
+            assert uncached.model is not first.model
+
+            first.close()
+            first.close()
+            del second
+            gc.collect()
+            assert model_registry.evict(tuple(entry["key"]))
+        print("✓ PhonemeExtractor shares its model through the registry")
+
+
+def run_model_registry_tests():
+    """Run all model registry tests"""
+    print("\n" + "="*60)
+    print("MODEL REGISTRY TESTS")
+    print("="*60 + "\n")
+
+    test_registry = TestModelRegistry()
+    try:
+        test_registry.test_concurrent_acquire_loads_once()
+        test_registry.test_refcounts_and_eviction()
+        test_registry.test_phoneme_extractor_shares_model()
+    except AssertionError as e:
+        print(f"\n❌ Model registry test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All model registry tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_model_registry_tests()
+    exit(0 if success else 1)
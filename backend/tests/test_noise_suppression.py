@@ -0,0 +1,149 @@
+"""
+Tests for the pluggable noise reduction backends.
+
+Covers the spectral gate (length preservation, noise suppression without
+attenuating speech-band tones, streaming/whole-array equivalence) and the
+per-SNR-band backend selection in AdaptiveNoiseReducer.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from core.adaptive_noise_reduction import AdaptiveNoiseReducer
+from core.noise_suppression import (
+    NoisereduceBackend,
+    SpectralGate,
+    SpectralGateBackend,
+    configured_noise_backends,
+    get_noise_backend,
+)
+
+
+def _tone_in_noise(sr: int = 16000, seconds: float = 3.0, noise: float = 0.02):
+    rng = np.random.default_rng(3)
+    t = np.arange(int(seconds * sr)) / sr
+    voiced = (t > 0.8) & (t < seconds - 0.8)
+    clean = (0.3 * np.sin(2 * np.pi * 200 * t) * voiced).astype(np.float32)
+    return clean, (clean + noise * rng.standard_normal(len(t))).astype(np.float32), voiced
+
+
+class _RecordingBackend:
+    """Stand-in backend that records how it was called."""
+
+    name = "recording"
+
+    def __init__(self):
+        self.calls = []
+
+    def reduce_noise(self, audio, sr, stationary, prop_decrease):
+        self.calls.append((len(audio), stationary, round(prop_decrease, 3)))
+        return audio
+
+
+class TestSpectralGate:
+    """Test suite for the spectral gate"""
+
+    def test_length_and_identity(self):
+        """Output keeps the input length; zero strength leaves audio unchanged"""
+        for length in (0, 1, 511, 512, 513, 4097, 16000):
+            audio = np.random.default_rng(length).standard_normal(length).astype(np.float32) * 0.1
+            assert len(SpectralGate(16000).reduce(audio)) == length
+        _, noisy, _ = _tone_in_noise()
+        untouched = SpectralGate(16000, prop_decrease=0.0).reduce(noisy)
+        assert np.allclose(untouched, noisy, atol=1e-6), "Perfect reconstruction at zero strength"
+        print("✓ Length preserved and zero strength is identity")
+
+    def test_suppresses_noise_and_keeps_speech(self):
+        """Noise in pauses drops while the voiced tone is kept"""
+        clean, noisy, voiced = _tone_in_noise()
+        for stationary in (False, True):
+            denoised = SpectralGate(16000, stationary=stationary).reduce(noisy)
+            pause_rms = np.sqrt(np.mean(denoised[~voiced] ** 2))
+            assert pause_rms < 0.5 * np.sqrt(np.mean(noisy[~voiced] ** 2)), "Noise should be reduced"
+            error = np.sqrt(np.mean((denoised - clean)[voiced] ** 2))
+            assert error < 0.02, f"Tone should be preserved (error {error:.4f})"
+        print("✓ Noise suppressed, tone preserved")
+
+    def test_streaming_matches_whole_array(self):
+        """Pushing arbitrary block sizes gives the whole-array result"""
+        _, noisy, _ = _tone_in_noise()
+        whole = SpectralGate(16000, edge_samples=4800).reduce(noisy)
+        stream = SpectralGate(16000, edge_samples=4800, total_samples=len(noisy))
+        parts = [stream.push(noisy[i:i + 777]) for i in range(0, len(noisy), 777)]
+        streamed = np.concatenate(parts + [stream.flush()])
+        assert len(streamed) == len(whole)
+        assert np.allclose(streamed, whole, atol=1e-6)
+        print("✓ Streaming output matches whole-array output")
+
+
+class TestNoiseBackendSelection:
+    """Test suite for per-SNR-band backend selection"""
+
+    def test_backend_per_band(self):
+        """Each SNR band runs on its own backend"""
+        high, medium, low = _RecordingBackend(), _RecordingBackend(), _RecordingBackend()
+        reducer = AdaptiveNoiseReducer(16000, backends={"high": high, "medium": medium, "low": low})
+        audio = np.zeros(8000, dtype=np.float32)
+        for snr in (30, 15, 5):
+            reducer.reduce_noise_adaptive(audio, snr_db=snr, preserve_edges=False)
+        assert high.calls == [(8000, False, 0.3)]
+        assert medium.calls == [(8000, True, 0.6)]
+        assert low.calls == [(8000, True, 0.8)]
+        print("✓ Backends selected per SNR band")
+
+    def test_edge_preservation_paths(self):
+        """Segment backends get three passes; the spectral gate a single one"""
+        recording = _RecordingBackend()
+        audio = np.zeros(32000, dtype=np.float32)
+        AdaptiveNoiseReducer(16000, backends={"medium": recording}).reduce_noise_adaptive(audio, snr_db=15)
+        assert [call[2] for call in recording.calls] == [0.3, 0.3, 0.6]
+
+        _, noisy, _ = _tone_in_noise()
+        reducer = AdaptiveNoiseReducer(16000, backends={"medium": "spectral_gate"})
+        assert isinstance(reducer.backends["medium"], SpectralGateBackend)
+        assert len(reducer.reduce_noise_adaptive(noisy, snr_db=15)) == len(noisy)
+        print("✓ Edge preservation on both backend kinds")
+
+    def test_configuration(self):
+        """Default configuration keeps noisereduce; unknown names fall back to it"""
+        assert all(isinstance(backend, NoisereduceBackend) for backend in configured_noise_backends().values())
+        assert get_noise_backend("spectral_gate") is get_noise_backend("spectral_gate")
+        assert isinstance(get_noise_backend("no-such-backend"), NoisereduceBackend)
+        try:
+            AdaptiveNoiseReducer(16000, backends={"ultra": "spectral_gate"})
+            assert False, "Unknown band should be rejected"
+        except ValueError:
+            pass
+        print("✓ Backend configuration")
+
+
+def run_noise_suppression_tests():
+    """Run all noise suppression tests"""
+    print("\n" + "="*60)
+    print("NOISE SUPPRESSION TESTS")
+    print("="*60 + "\n")
+
+    test_gate = TestSpectralGate()
+    test_selection = TestNoiseBackendSelection()
+    try:
+        test_gate.test_length_and_identity()
+        test_gate.test_suppresses_noise_and_keeps_speech()
+        test_gate.test_streaming_matches_whole_array()
+        test_selection.test_backend_per_band()
+        test_selection.test_edge_preservation_paths()
+        test_selection.test_configuration()
+    except AssertionError as e:
+        print(f"\n❌ Noise suppression test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All noise suppression tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_noise_suppression_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,142 @@
+"""
+Tests for ONNX Runtime IO binding with pooled buffers.
+
+Uses a conv-only stand-in for the exported wav2vec2 model (same frame
+count per sample) and the tiny wav2vec2 processor, so no download is
+needed.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+import threading
+
+import numpy as np
+import onnxruntime as ort
+
+from core.onnx_io_binding import OnnxIOBinder
+from tests.helpers.models import conv_ctc_onnx, extractor_config, tiny_wav2vec2
+
+
+def _model_dir(directory: str) -> str:
+    tiny_wav2vec2(directory)
+    conv_ctc_onnx(os.path.join(directory, "model.onnx"), vocab_size=8)
+    return directory
+
+
+def _speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * 16000)) / 16000
+    return (0.2 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float64)
+
+
+class TestOnnxIOBinding:
+    """Test suite for IO-bound ONNX inference"""
+
+    def test_matches_processor_path(self):
+        """In-place normalization + IO binding give the processor path's logits"""
+        from transformers import Wav2Vec2Processor
+
+        with tempfile.TemporaryDirectory() as directory:
+            _model_dir(directory)
+            processor = Wav2Vec2Processor.from_pretrained(directory)
+            session = ort.InferenceSession(os.path.join(directory, "model.onnx"),
+                                           providers=["CPUExecutionProvider"])
+            binder = OnnxIOBinder.for_session(session, processor, bucket_seconds=(2, 4))
+
+            for seconds in (0.5, 1.7, 3.2, 5.0):
+                audio = _speech_like(seconds)
+                inputs = processor(audio, sampling_rate=16000, return_tensors="np").input_values
+                expected = session.run(None, {"input_values": inputs.astype(np.float32)})[0]
+                with binder.run(audio) as logits:
+                    assert logits.shape == expected.shape
+                    assert np.allclose(logits, expected, atol=1e-4)
+        print("✓ IO binding matches the processor path")
+
+    def test_buffer_reuse(self):
+        """Buffers are allocated once per bucket and reused; oversize audio is counted"""
+        with tempfile.TemporaryDirectory() as directory:
+            _model_dir(directory)
+            session = ort.InferenceSession(os.path.join(directory, "model.onnx"),
+                                           providers=["CPUExecutionProvider"])
+            binder = OnnxIOBinder(session, "input_values", "logits", vocab_size=8, bucket_seconds=(1, 2))
+
+            for seconds in (0.6, 0.9, 0.8, 1.5, 1.9):
+                with binder.run(_speech_like(seconds)):
+                    pass
+            stats = binder.stats()
+            assert stats["calls"] == 5 and stats["allocations"] == 2
+            assert stats["pooled_buffers"] == {16000: 1, 32000: 1}
+
+            with binder.run(_speech_like(3.0)):
+                pass
+            assert binder.stats()["oversize_calls"] == 1
+            assert binder.stats()["pooled_buffers"] == {16000: 1, 32000: 1}, "Oversize buffers are not pooled"
+
+            # Concurrent requests in one bucket each get their own buffers
+            results = []
+            start = threading.Barrier(3)
+
+            def worker(seed):
+                audio = _speech_like(0.7, seed)
+                start.wait()
+                with binder.run(audio) as logits:
+                    results.append(logits.copy())
+
+            threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(results) == 3 and binder.stats()["pooled_buffers"][16000] >= 1
+        print(f"✓ Buffer reuse: {binder.stats()}")
+
+    def test_extractor_uses_io_binding(self):
+        """PhonemeExtractorONNX decodes the same phonemes with and without IO binding"""
+        from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+
+        with tempfile.TemporaryDirectory() as directory:
+            _model_dir(directory)
+            bound_config = extractor_config(cache_enabled=False)
+            plain_config = extractor_config(cache_enabled=False)
+            plain_config._config['onnx_io_binding'] = False
+
+            bound = PhonemeExtractorONNX(model_name=directory, optimization_config=bound_config)
+            plain = PhonemeExtractorONNX(model_name=directory, optimization_config=plain_config)
+            assert bound.io_binder is not None and plain.io_binder is None
+
+            audio = _speech_like(1.2)
+            assert bound.extract_phoneme(audio) == plain.extract_phoneme(audio)
+            bound_log_probs, bound_frame = bound.extract_logits(audio)
+            plain_log_probs, plain_frame = plain.extract_logits(audio)
+            assert np.allclose(bound_log_probs, plain_log_probs, atol=1e-4) and bound_frame == plain_frame
+            assert bound.get_model_info()["io_binding"]["calls"] >= 3
+        print("✓ PhonemeExtractorONNX uses IO binding")
+
+
+def run_onnx_io_binding_tests():
+    """Run all ONNX IO binding tests"""
+    print("\n" + "="*60)
+    print("ONNX IO BINDING TESTS")
+    print("="*60 + "\n")
+
+    test_binding = TestOnnxIOBinding()
+    try:
+        test_binding.test_matches_processor_path()
+        test_binding.test_buffer_reuse()
+        test_binding.test_extractor_uses_io_binding()
+    except AssertionError as e:
+        print(f"\n❌ ONNX IO binding test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All ONNX IO binding tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_onnx_io_binding_tests()
+    exit(0 if success else 1)
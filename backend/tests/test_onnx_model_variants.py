@@ -0,0 +1,134 @@
+"""
+Tests for float / int8 ONNX model selection and the calibration reader of
+quantize_model.py.
+
+The model directory holds two conv stand-ins for the exported model
+(different weights play the float and int8 variants).
+"""
+
+import sys
+import os
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import gc
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from core.model_registry import model_registry
+from tests.helpers.models import conv_ctc_onnx, extractor_config, tiny_wav2vec2
+
+
+def _variant_dir(directory: str, with_int8: bool = True) -> str:
+    tiny_wav2vec2(directory)
+    conv_ctc_onnx(os.path.join(directory, "model.onnx"), vocab_size=8, seed=0)
+    if with_int8:
+        conv_ctc_onnx(os.path.join(directory, "model_int8.onnx"), vocab_size=8, seed=1)
+    return directory
+
+
+class TestOnnxModelVariants:
+    """Test suite for ONNX model variant selection"""
+
+    def test_variant_selection(self):
+        """The configured variant's file is loaded and cached under its own key"""
+        from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+
+        with tempfile.TemporaryDirectory() as directory:
+            _variant_dir(directory)
+            int8_config = extractor_config()
+            int8_config._config['onnx_model_variant'] = 'int8'
+
+            float_extractor = PhonemeExtractorONNX(model_name=directory, optimization_config=extractor_config())
+            int8_extractor = PhonemeExtractorONNX(model_name=directory, optimization_config=int8_config)
+            assert float_extractor.model_variant == "float" and int8_extractor.model_variant == "int8"
+            assert float_extractor.session is not int8_extractor.session
+            assert int8_extractor.get_model_info()["model_variant"] == "int8"
+
+            audio = np.sin(2 * np.pi * 200 * np.arange(16000) / 16000).astype(np.float32)
+            float_log_probs, _ = float_extractor.extract_logits(audio)
+            int8_log_probs, _ = int8_extractor.extract_logits(audio)
+            assert not np.allclose(float_log_probs, int8_log_probs), "Each variant runs its own file"
+
+            keys = [float_extractor._registry_key, int8_extractor._registry_key]
+            del float_extractor, int8_extractor
+            gc.collect()
+            for key in keys:
+                model_registry.evict(key)
+        print("✓ Float and int8 variants are selected by configuration")
+
+    def test_missing_int8_falls_back(self):
+        """A missing int8 file falls back to float, or raises without fallback_on_error"""
+        from core.phoneme_extractor_onnx import PhonemeExtractorONNX
+
+        with tempfile.TemporaryDirectory() as directory:
+            _variant_dir(directory, with_int8=False)
+            fallback = PhonemeExtractorONNX(model_name=directory, model_variant="int8",
+                                            optimization_config=extractor_config(cache_enabled=False))
+            assert fallback.model_variant == "float"
+
+            strict_config = extractor_config(cache_enabled=False)
+            strict_config._config['fallback_on_error'] = False
+            try:
+                PhonemeExtractorONNX(model_name=directory, model_variant="int8", optimization_config=strict_config)
+                assert False, "Expected FileNotFoundError"
+            except FileNotFoundError:
+                pass
+
+            try:
+                PhonemeExtractorONNX(model_name=directory, model_variant="fp16")
+                assert False, "Expected ValueError"
+            except ValueError:
+                pass
+        print("✓ Missing int8 model falls back to float")
+
+    def test_calibration_reader(self):
+        """Calibration inputs are the normalized, cropped dataset recordings"""
+        from transformers import Wav2Vec2Processor
+        sys.path.insert(0, os.path.dirname(BACKEND_DIR))
+        from quantize_model import DatasetCalibrationReader
+
+        with tempfile.TemporaryDirectory() as directory:
+            processor = Wav2Vec2Processor.from_pretrained(tiny_wav2vec2(directory))
+            audio_dir = os.path.join(directory, "audio")
+            os.makedirs(audio_dir)
+            rng = np.random.default_rng(0)
+            for name, seconds in (("1", 2.0), ("2", 3.0), ("10", 1.0)):
+                sf.write(os.path.join(audio_dir, f"{name}.wav"), 0.1 * rng.standard_normal(int(seconds * 16000)), 16000)
+
+            reader = DatasetCalibrationReader(processor, audio_dir, "input_values", max_clips=2, max_seconds=2.5)
+            batches = list(iter(reader.get_next, None))
+            assert len(reader) == 2 and len(batches) == 2
+            assert [batch["input_values"].shape for batch in batches] == [(1, 32000), (1, 40000)]
+            assert all(abs(float(batch["input_values"].mean())) < 1e-3 for batch in batches)
+            reader.rewind()
+            assert reader.get_next() is batches[0]
+        print("✓ Calibration reader")
+
+
+def run_onnx_model_variant_tests():
+    """Run all ONNX model variant tests"""
+    print("\n" + "="*60)
+    print("ONNX MODEL VARIANT TESTS")
+    print("="*60 + "\n")
+
+    test_variants = TestOnnxModelVariants()
+    try:
+        test_variants.test_variant_selection()
+        test_variants.test_missing_int8_falls_back()
+        test_variants.test_calibration_reader()
+    except AssertionError as e:
+        print(f"\n❌ ONNX model variant test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All ONNX model variant tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_onnx_model_variant_tests()
+    exit(0 if success else 1)
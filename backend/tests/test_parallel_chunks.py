@@ -0,0 +1,118 @@
+"""
+Tests for concurrent chunk extraction in process_audio.
+
+Checks that extract_chunk_predictions keeps chunk order, overlaps the
+extractors, still skips chunks that fail validation, and gives each chunk
+the phonemes it gets on its own (tiny wav2vec2 model without a mask).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import gc
+import tempfile
+import time
+
+import numpy as np
+from core.process_audio import extract_chunk_predictions
+from tests.helpers.models import extractor_config, tiny_wav2vec2
+
+
+class _SlowPhonemeExtractor:
+    """Answers with the chunk's marker value after a delay; rejects silent chunks."""
+
+    def extract_phoneme(self, audio, sampling_rate=16000):
+        time.sleep(0.05)
+        if not np.any(audio):
+            raise ValueError("❌ Audio appears to be silent")
+        return [[f"p{int(audio[0])}"]]
+
+
+class _SlowWordExtractor:
+    def extract_words(self, audio, sampling_rate=16000):
+        time.sleep(0.05)
+        return [f"w{int(audio[0])}"]
+
+
+class TestParallelChunks:
+    """Test suite for concurrent chunk extraction"""
+
+    def _chunks(self, markers):
+        chunks = [np.full(1600, marker, dtype=np.float32) for marker in markers]
+        metadata = [{"start_time": i, "end_time": i + 0.1, "duration": 0.1} for i in range(len(markers))]
+        return chunks, metadata
+
+    def test_order_preserved_and_overlapped(self):
+        """Results come back in chunk order and chunks run concurrently"""
+        chunks, metadata = self._chunks([3, 1, 2, 5])
+
+        start = time.perf_counter()
+        phonemes, words = asyncio.run(extract_chunk_predictions(
+            chunks, metadata, 16000, _SlowPhonemeExtractor(), _SlowWordExtractor()
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert phonemes == [[["p3"]], [["p1"]], [["p2"]], [["p5"]]]
+        assert words == [["w3"], ["w1"], ["w2"], ["w5"]]
+        # Sequential extraction would take 4 chunks x 2 calls x 50 ms
+        assert elapsed < 0.3, f"Chunks should overlap (took {elapsed:.2f}s)"
+        print(f"✓ Chunk order preserved, {elapsed:.2f}s for 4 chunks")
+
+    def test_invalid_chunk_skipped(self):
+        """A chunk that fails validation contributes empty results in its slot"""
+        chunks, metadata = self._chunks([1, 0, 2])
+        phonemes, words = asyncio.run(extract_chunk_predictions(
+            chunks, metadata, 16000, _SlowPhonemeExtractor(), _SlowWordExtractor()
+        ))
+        assert phonemes == [[["p1"]], [], [["p2"]]]
+        assert words == [["w1"], [], ["w2"]]
+        print("✓ Invalid chunk skipped in place")
+
+    def test_concurrent_phonemes_match_sequential(self):
+        """Concurrent chunks of different lengths get the same phonemes as one by one"""
+        from core.phoneme_extractor import PhonemeExtractor
+
+        rng = np.random.default_rng(1)
+        t = np.arange(3 * 16000) / 16000
+        voiced = (0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+        chunks = [voiced[:int(seconds * 16000)].copy() for seconds in (1.2, 3.0, 0.8, 2.1)]
+        metadata = [{"start_time": 0, "end_time": len(c) / 16000, "duration": len(c) / 16000} for c in chunks]
+        with tempfile.TemporaryDirectory() as directory:
+            tiny_wav2vec2(directory)  # group norm, no mask
+            extractor = PhonemeExtractor(model_name=directory, use_quantization=False, use_fast_model=False,
+                                         optimization_config=extractor_config(cache_enabled=False))
+            phonemes, _ = asyncio.run(extract_chunk_predictions(
+                chunks, metadata, 16000, extractor, _SlowWordExtractor()
+            ))
+            assert phonemes == [extractor.extract_phoneme(chunk, sampling_rate=16000) for chunk in chunks]
+            del extractor
+            gc.collect()
+        print("✓ Concurrent chunk phonemes match sequential extraction")
+
+
+def run_parallel_chunks_tests():
+    """Run all parallel chunk tests"""
+    print("\n" + "="*60)
+    print("PARALLEL CHUNK EXTRACTION TESTS")
+    print("="*60 + "\n")
+
+    test_chunks = TestParallelChunks()
+    try:
+        test_chunks.test_order_preserved_and_overlapped()
+        test_chunks.test_invalid_chunk_skipped()
+        test_chunks.test_concurrent_phonemes_match_sequential()
+    except AssertionError as e:
+        print(f"\n❌ Parallel chunk test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All parallel chunk tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_parallel_chunks_tests()
+    exit(0 if success else 1)
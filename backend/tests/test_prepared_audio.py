@@ -0,0 +1,129 @@
+"""
+Tests for PreparedAudio stage tracking.
+
+Checks that preprocessing stages run once per request (a recording that was
+already denoised and normalized is passed through untouched), that the
+phoneme extractor is told not to trim again, and that per-stage timings are
+collected.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+
+import numpy as np
+from core.audio_optimization import OptimizedAudioPreprocessor
+from core.audio_preprocessing import prepare_audio, preprocess_audio, resample_audio, trim_for_model
+from core.prepared_audio import PreparedAudio
+from core.process_audio import process_audio_array
+
+
+def _speech_like(seconds: float = 1.5, sr: int = 16000, amplitude: float = 0.3) -> np.ndarray:
+    """Voiced burst surrounded by silence."""
+    t = np.arange(int(seconds * sr)) / sr
+    voiced = (t > 0.4) & (t < seconds - 0.4)
+    audio = amplitude * np.sin(2 * np.pi * 180 * t) * voiced
+    return (audio + 0.001 * np.random.default_rng(0).standard_normal(len(t))).astype(np.float32)
+
+
+class _RecordingPhonemeExtractor:
+    """Records what process_audio_array hands to the phoneme model."""
+
+    def __init__(self):
+        self.audio_preprocessor = OptimizedAudioPreprocessor(target_sr=16000)
+        self.calls = []
+
+    def extract_phoneme(self, audio, sampling_rate=16000, use_optimized_preprocessing=True):
+        self.calls.append((len(audio), use_optimized_preprocessing))
+        return [['ð', 'ə'], ['k', 'æ', 't']]
+
+
+class _RecordingWordExtractor:
+    def __init__(self):
+        self.audio = None
+
+    def extract_words(self, audio, sampling_rate=16000):
+        self.audio = audio
+        return ['the', 'cat']
+
+
+class TestPreparedAudio:
+    """Test suite for prepared audio and stage tracking"""
+
+    def test_prepare_audio_runs_stages_once(self):
+        """Raw audio is denoised and normalized; prepared audio is left alone"""
+        prepared = prepare_audio(_speech_like(), sr=16000)
+        assert prepared.denoised and prepared.normalized and not prepared.trimmed
+        assert abs(np.max(np.abs(prepared.samples)) - 1.0) < 1e-6
+        assert {"snr_estimate", "denoise", "normalize"} <= set(prepared.timings)
+
+        samples = prepared.samples
+        again = prepare_audio(prepared)
+        assert again is prepared and again.samples is samples
+        assert isinstance(preprocess_audio(_speech_like(), sr=16000), np.ndarray)
+        print(f"✓ Stages run once: {prepared.timing_breakdown()}")
+
+    def test_trim_and_resample(self):
+        """Trimming produces a separate trimmed view; resampling updates the rate"""
+        prepared = PreparedAudio(_speech_like(), denoised=True, normalized=True)
+        trimmed = trim_for_model(prepared, OptimizedAudioPreprocessor(target_sr=16000))
+        assert trimmed.trimmed and not prepared.trimmed
+        assert len(trimmed) < len(prepared)
+        assert trimmed.timings is prepared.timings and "trim" in prepared.timings
+        assert trim_for_model(trimmed, None) is trimmed
+
+        wide = resample_audio(PreparedAudio(np.zeros(8000, dtype=np.float32), sample_rate=8000), 16000)
+        assert wide.sample_rate == 16000 and len(wide) == 16000
+        print("✓ Trim and resample stages")
+
+    def test_pipeline_skips_repeated_stages(self):
+        """process_audio_array neither re-normalizes nor lets the extractor trim again"""
+        audio = _speech_like(amplitude=0.3)
+        prepared = PreparedAudio(audio, denoised=True, normalized=True)
+        phoneme_model, word_model = _RecordingPhonemeExtractor(), _RecordingWordExtractor()
+
+        results = asyncio.run(process_audio_array(
+            [('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't'])],
+            prepared,
+            phoneme_extraction_model=phoneme_model,
+            word_extraction_model=word_model,
+        ))
+
+        assert [r["per"] for r in results] == [0.0, 0.0]
+        assert word_model.audio is audio, "Word extraction gets the prepared samples unchanged"
+        (trimmed_length, extractor_trims), = phoneme_model.calls
+        assert not extractor_trims and trimmed_length < len(audio)
+
+        breakdown = prepared.timing_breakdown()
+        for stage in ("trim", "phoneme_extraction", "word_extraction", "phoneme_alignment", "word_alignment"):
+            assert stage in breakdown, f"Missing {stage} timing"
+        assert "denoise" not in breakdown
+        print(f"✓ Pipeline timings: {breakdown}")
+
+
+def run_prepared_audio_tests():
+    """Run all prepared audio tests"""
+    print("\n" + "="*60)
+    print("PREPARED AUDIO TESTS")
+    print("="*60 + "\n")
+
+    test_prepared = TestPreparedAudio()
+    try:
+        test_prepared.test_prepare_audio_runs_stages_once()
+        test_prepared.test_trim_and_resample()
+        test_prepared.test_pipeline_skips_repeated_stages()
+    except AssertionError as e:
+        print(f"\n❌ Prepared audio test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All prepared audio tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_prepared_audio_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,109 @@
+"""
+Tests for the precompiled pronunciation lexicon.
+
+grapheme_to_phoneme must return exactly what converting the whole
+sentence with eng_to_ipa returned, for lexicon words, capitals,
+punctuation, unknown words and odd whitespace alike.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+import eng_to_ipa
+
+from core.grapheme_to_phoneme import _convert_word, grapheme_to_phoneme, grapheme_to_phoneme_batch
+from core.pronunciation_lexicon import PronunciationLexicon, get_pronunciation_lexicon, strip_markers
+
+SENTENCES = [
+    "the quick brown fox jumped over the lazy dog",
+    "Hello,  world!",
+    'don\'t "stop" -- now',
+    "xyzzyq 123 3rd",
+    "the. «a»",
+    "  Read and lead  ",
+    "",
+]
+
+
+def _eng_to_ipa(sentence: str) -> list[tuple]:
+    """The conversion grapheme_to_phoneme used to do on every call."""
+    transcriptions = strip_markers(eng_to_ipa.convert(sentence)).split(" ")
+    return [(word, list(phonemes)) for word, phonemes in zip(sentence.split(" "), transcriptions)]
+
+
+class TestPronunciationLexicon:
+    """Test suite for the pronunciation lexicon"""
+
+    def test_matches_eng_to_ipa(self):
+        """Sentences convert exactly as eng_to_ipa converts them"""
+        for sentence in SENTENCES:
+            assert grapheme_to_phoneme(sentence) == _eng_to_ipa(sentence), sentence
+        assert grapheme_to_phoneme("hello world") == [("hello", list("hɛloʊ")), ("world", list("wərld"))]
+        print("✓ Output matches eng_to_ipa")
+
+    def test_lexicon_words_match(self):
+        """A sample of lexicon entries equals eng_to_ipa's transcription of the word"""
+        lexicon = get_pronunciation_lexicon()
+        words = sorted(lexicon.entries)[::500]
+        sentence = " ".join(words)
+        assert [tuple(phonemes) for _, phonemes in _eng_to_ipa(sentence)] == [lexicon.get(word) for word in words]
+        # Homophones share one tuple
+        assert lexicon.get("read") is not None and lexicon.get("red") is lexicon.get("read")
+        print("✓ Lexicon entries match eng_to_ipa")
+
+    def test_out_of_vocabulary_cache(self):
+        """Words outside the lexicon go through eng_to_ipa once and are cached"""
+        assert "zorblax" not in get_pronunciation_lexicon() and "dog," not in get_pronunciation_lexicon()
+        hits = _convert_word.cache_info().hits
+        for _ in range(3):
+            assert grapheme_to_phoneme("Zorblax, dog, zorblax") == _eng_to_ipa("Zorblax, dog, zorblax")
+        assert _convert_word.cache_info().hits >= hits + 6
+        print("✓ Out-of-vocabulary words are cached")
+
+    def test_batch_and_saved_lexicon(self):
+        """The batch API matches single calls, and a saved lexicon loads back identically"""
+        assert grapheme_to_phoneme_batch(SENTENCES) == [grapheme_to_phoneme(sentence) for sentence in SENTENCES]
+
+        lexicon = PronunciationLexicon({"cat": ("k", "æ", "t"), "don't": tuple("doʊnt")})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "lexicon.tsv")
+            lexicon.save(path)
+            assert PronunciationLexicon.load(path).entries == lexicon.entries
+
+            # A file built from another eng_to_ipa version is ignored
+            with open(path, encoding="utf-8") as file:
+                lines = file.read().splitlines()
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("\n".join(["# pronunciation lexicon v1\teng_to_ipa 0.0.0"] + lines[1:]) + "\n")
+            assert PronunciationLexicon.load(path) is None
+        print("✓ Batch conversion and saved lexicon")
+
+
+def run_pronunciation_lexicon_tests():
+    """Run all pronunciation lexicon tests"""
+    print("\n" + "="*60)
+    print("PRONUNCIATION LEXICON TESTS")
+    print("="*60 + "\n")
+
+    test_lexicon = TestPronunciationLexicon()
+    try:
+        test_lexicon.test_matches_eng_to_ipa()
+        test_lexicon.test_lexicon_words_match()
+        test_lexicon.test_out_of_vocabulary_cache()
+        test_lexicon.test_batch_and_saved_lexicon()
+    except AssertionError as e:
+        print(f"\n❌ Pronunciation lexicon test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All pronunciation lexicon tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_pronunciation_lexicon_tests()
+    exit(0 if success else 1)
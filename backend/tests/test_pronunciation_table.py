@@ -0,0 +1,126 @@
+"""
+Tests for the pandas-free analyze_results.
+
+PronunciationTable must answer to_dict() / to_dict("records") and the
+highest-PER word exactly as the DataFrame it replaces did, and the request
+path (analyze_results + AudioAnalysis) must not import pandas.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import math
+import random
+import subprocess
+
+import pandas as pd
+
+from core.pronunciation_table import PronunciationTable
+from schemas.feedback_entry import AudioAnalysis
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORDS = [
+    {"type": "match", "ground_truth_word": "the", "per": 0.0, "missed": [], "total_errors": 0, "start_time": 0.1},
+    {"type": "substitution", "ground_truth_word": "cat", "per": 0.3333, "missed": ["t"], "total_errors": 1,
+     "start_time": None},
+    {"type": "deletion", "ground_truth_word": "sat", "per": 1.0, "missed": ["s", "æ", "t"], "total_errors": 3,
+     "error": "Word missing in prediction."},
+]
+
+
+def _nan_safe(value):
+    """NaN != NaN, so compare NaN as a marker."""
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if isinstance(value, dict):
+        return {key: _nan_safe(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_nan_safe(item) for item in value]
+    return value
+
+
+class TestPronunciationTable:
+    """Test suite for PronunciationTable"""
+
+    def test_matches_dataframe(self):
+        """to_dict in every orient the handler uses equals the DataFrame's (gaps become NaN)"""
+        table, frame = PronunciationTable(RECORDS), pd.DataFrame(RECORDS)
+        assert table.columns == list(frame.columns)
+        for orient in ("dict", "list", "records"):
+            assert _nan_safe(table.to_dict(orient)) == _nan_safe(frame.to_dict(orient)), orient
+        assert math.isnan(table.records[1]["start_time"]) and math.isnan(table.records[0]["error"])
+        assert len(table) == 3 and not table.empty and PronunciationTable([]).empty
+        print("✓ Conversions match the DataFrame")
+
+    def test_highest_matches_sort(self):
+        """highest() picks the row sort_values(ascending=False).iloc[0] picked, ties included"""
+        rng = random.Random(0)
+        for _ in range(500):
+            records = [{"index": index, "per": rng.choice([0.0, 0.25, 0.5, 1.0])} for index in range(rng.randint(1, 40))]
+            expected = pd.DataFrame(records).sort_values("per", ascending=False).iloc[0]["index"]
+            assert PronunciationTable(records).highest("per")["index"] == expected
+        assert PronunciationTable(RECORDS).highest("per")["ground_truth_word"] == "sat"
+        print("✓ Highest PER word matches the DataFrame sort")
+
+    def test_audio_analysis(self):
+        """AudioAnalysis takes a table, a DataFrame or records, and exposes the records"""
+        for value in (PronunciationTable(RECORDS), pd.DataFrame(RECORDS), RECORDS):
+            analysis = AudioAnalysis(pronunciation_dataframe=value, problem_summary={}, per_summary={},
+                                     highest_per_word={})
+            assert isinstance(analysis.pronunciation_dataframe, PronunciationTable)
+            assert [record["ground_truth_word"] for record in analysis.pronunciation_records] == ["the", "cat", "sat"]
+
+        # Other DataFrame uses still work, on a frame built once
+        table = PronunciationTable(RECORDS)
+        assert [row["per"] for _, row in table.iterrows()] == [0.0, 0.3333, 1.0]
+        assert table["total_errors"].sum() == 4 and table.to_dataframe() is table.to_dataframe()
+        assert "sat=1.0" in repr(PronunciationTable(RECORDS))
+        print("✓ AudioAnalysis accepts tables, DataFrames and records")
+
+    def test_request_path_without_pandas(self):
+        """analyze_results and AudioAnalysis never import pandas"""
+        code = (
+            "import sys\n"
+            "from core.process_audio import _process_word_alignment, analyze_results\n"
+            "from schemas.feedback_entry import AudioAnalysis\n"
+            "gt = [('the', ['ð', 'ə']), ('cat', ['k', 'æ', 't'])]\n"
+            "results = _process_word_alignment(['the', 'cat'], gt, ['the', 'cat'], [['ð', 'ə'], ['k', 'ɑ', 't']])\n"
+            "table, highest, problems, per = analyze_results(results)\n"
+            "analysis = AudioAnalysis(pronunciation_dataframe=table, problem_summary=problems,\n"
+            "                         per_summary=per, highest_per_word=highest)\n"
+            "table.to_dict(); analysis.pronunciation_records\n"
+            "print('PANDAS', 'pandas' in sys.modules, highest['ground_truth_word'])\n"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+        assert completed.returncode == 0, completed.stderr
+        assert "PANDAS False cat" in completed.stdout, completed.stdout
+        print("✓ Request path does not import pandas")
+
+
+def run_pronunciation_table_tests():
+    """Run all pronunciation table tests"""
+    print("\n" + "="*60)
+    print("PRONUNCIATION TABLE TESTS")
+    print("="*60 + "\n")
+
+    test_table = TestPronunciationTable()
+    try:
+        test_table.test_matches_dataframe()
+        test_table.test_highest_matches_sort()
+        test_table.test_audio_analysis()
+        test_table.test_request_path_without_pandas()
+    except AssertionError as e:
+        print(f"\n❌ Pronunciation table test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All pronunciation table tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_pronunciation_table_tests()
+    exit(0 if success else 1)
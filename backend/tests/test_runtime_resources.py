@@ -0,0 +1,151 @@
+"""
+Tests for cgroup-aware resource detection and thread sizing.
+
+Fake cgroup v1 / v2 trees are written to a temporary directory, so the
+tests do not depend on the machine they run on.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import subprocess
+import tempfile
+
+from core.optimization_config import OptimizationConfig
+from core.runtime_resources import (
+    RuntimeResources,
+    apply_torch_threads,
+    detect_runtime_resources,
+    get_runtime_resources_report,
+    install_default_executor,
+    plan_threads,
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class TestRuntimeResources:
+    """Test suite for runtime resource detection"""
+
+    def test_cgroup_v2(self):
+        """cpu.max and memory.max of the process's cgroup are read"""
+        with tempfile.TemporaryDirectory() as root:
+            _write(os.path.join(root, "proc_cgroup"), "0::/docker/backend\n")
+            _write(os.path.join(root, "fs", "docker", "backend", "cpu.max"), "130000 100000\n")
+            _write(os.path.join(root, "fs", "docker", "backend", "memory.max"), f"{3 * 512 * 1024 ** 2}\n")
+            resources = detect_runtime_resources(os.path.join(root, "fs"), os.path.join(root, "proc_cgroup"))
+        assert resources.source == "cgroup2"
+        assert resources.cpu_quota == 1.3
+        assert resources.memory_limit_bytes == 1536 * 1024 ** 2
+        print(f"✓ cgroup v2: {resources.summary()}")
+
+    def test_cgroup_v1_and_unlimited(self):
+        """CFS quota and memory limit are read from v1; unlimited values become None"""
+        with tempfile.TemporaryDirectory() as root:
+            proc = os.path.join(root, "proc_cgroup")
+            _write(proc, "4:memory:/\n3:cpu,cpuacct:/\n")
+            _write(os.path.join(root, "fs", "cpu", "cpu.cfs_quota_us"), "50000\n")
+            _write(os.path.join(root, "fs", "cpu", "cpu.cfs_period_us"), "100000\n")
+            _write(os.path.join(root, "fs", "memory", "memory.limit_in_bytes"), "536870912\n")
+            limited = detect_runtime_resources(os.path.join(root, "fs"), proc)
+
+            _write(os.path.join(root, "fs", "cpu", "cpu.cfs_quota_us"), "-1\n")
+            _write(os.path.join(root, "fs", "memory", "memory.limit_in_bytes"), "9223372036854771712\n")
+            unlimited = detect_runtime_resources(os.path.join(root, "fs"), proc)
+
+            host = detect_runtime_resources(os.path.join(root, "missing"), proc)
+        assert limited.source == "cgroup1" and limited.cpu_quota == 0.5
+        assert limited.memory_limit_bytes == 512 * 1024 ** 2
+        assert unlimited.cpu_quota is None and unlimited.memory_limit_bytes is None
+        assert host.source == "host" and host.effective_cpus == host.affinity_cpus
+        print("✓ cgroup v1 and unlimited limits")
+
+    def test_thread_plan(self):
+        """Compute threads follow whole CPUs of quota; settings override"""
+        resources = RuntimeResources(host_cpus=16, affinity_cpus=16, cpu_quota=1.3,
+                                     memory_limit_bytes=None, source="cgroup2")
+        plan = plan_threads(resources, OptimizationConfig())
+        assert (plan.torch_intra_op, plan.torch_inter_op) == (1, 1)
+        assert (plan.ort_intra_op, plan.ort_inter_op) == (1, 1)
+        assert plan.executor_workers == 6
+
+        pinned = RuntimeResources(host_cpus=16, affinity_cpus=2, cpu_quota=4.0,
+                                  memory_limit_bytes=None, source="cgroup2")
+        assert plan_threads(pinned, OptimizationConfig()).ort_intra_op == 2
+
+        overrides = OptimizationConfig()
+        overrides._config.update({'ort_intra_op_threads': 3, 'executor_workers': 10})
+        plan = plan_threads(resources, overrides)
+        assert plan.ort_intra_op == 3 and plan.executor_workers == 10 and plan.torch_intra_op == 1
+        print("✓ Thread plan")
+
+    def test_apply_and_report(self):
+        """torch and the default executor are sized from the plan"""
+        import torch
+
+        plan = apply_torch_threads()
+        assert torch.get_num_threads() == plan.torch_intra_op
+        assert apply_torch_threads() == plan
+
+        loop = asyncio.new_event_loop()
+        try:
+            executor = install_default_executor(loop)
+            assert executor._max_workers == plan.executor_workers
+            assert loop.run_until_complete(loop.run_in_executor(None, lambda: 42)) == 42
+        finally:
+            loop.close()
+            executor.shutdown()
+
+        report = get_runtime_resources_report()
+        assert report["torch_applied"] and report["threads"]["executor_workers"] == plan.executor_workers
+        assert report["torch_threads"]["intra_op"] == plan.torch_intra_op
+        print(f"✓ Applied thread plan: {report['threads']}")
+
+    def test_report_does_not_import_torch(self):
+        """The report leaves torch unloaded in a server that never imported it"""
+        code = (
+            "import sys\n"
+            "from core.runtime_resources import get_runtime_resources_report\n"
+            "report = get_runtime_resources_report()\n"
+            "print('TORCH', 'torch' in sys.modules, 'torch_threads' in report)\n"
+        )
+        completed = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True)
+        assert completed.returncode == 0, completed.stderr
+        assert "TORCH False False" in completed.stdout, completed.stdout
+        print("✓ Runtime resources report does not import torch")
+
+
+def run_runtime_resources_tests():
+    """Run all runtime resource tests"""
+    print("\n" + "="*60)
+    print("RUNTIME RESOURCES TESTS")
+    print("="*60 + "\n")
+
+    test_resources = TestRuntimeResources()
+    try:
+        test_resources.test_cgroup_v2()
+        test_resources.test_cgroup_v1_and_unlimited()
+        test_resources.test_thread_plan()
+        test_resources.test_apply_and_report()
+        test_resources.test_report_does_not_import_torch()
+    except AssertionError as e:
+        print(f"\n❌ Runtime resources test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All runtime resources tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_runtime_resources_tests()
+    exit(0 if success else 1)
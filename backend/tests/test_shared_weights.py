@@ -0,0 +1,149 @@
+"""
+Tests for memory-mapped shared model weights.
+
+The PyTorch path uses the tiny random wav2vec2 model and the ONNX path a
+small MLP written directly as ONNX protobuf bytes (both from
+tests/helpers/models.py; the onnx package is not a dependency).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import tempfile
+
+import numpy as np
+import onnxruntime as ort
+import torch
+
+from core.optimization_config import config
+from core.shared_weights import (
+    create_shared_onnx_session,
+    load_pytorch_model_mmap,
+    onnx_raw_initializers,
+    worker_memory_report,
+)
+from tests.helpers.models import extractor_config, mlp_onnx, tiny_wav2vec2
+
+
+class TestSharedWeights:
+    """Test suite for shared model weights"""
+
+    def test_pytorch_mmap_load(self):
+        """Memory-mapped wav2vec2 gives the same logits as from_pretrained"""
+        from transformers import Wav2Vec2ForCTC
+
+        with tempfile.TemporaryDirectory() as model_dir, tempfile.TemporaryDirectory() as weights_dir:
+            tiny_wav2vec2(model_dir)
+            reference = Wav2Vec2ForCTC.from_pretrained(model_dir).eval()
+            shared = load_pytorch_model_mmap(Wav2Vec2ForCTC, model_dir, directory=weights_dir)
+            again = load_pytorch_model_mmap(Wav2Vec2ForCTC, model_dir, directory=weights_dir)
+            assert len(os.listdir(weights_dir)) == 1, "Checkpoint is written once"
+
+            audio = torch.randn(1, 8000)
+            with torch.no_grad():
+                expected = reference(audio).logits
+                assert torch.allclose(shared(audio).logits, expected, atol=1e-5)
+                assert torch.allclose(again(audio).logits, expected, atol=1e-5)
+
+            if os.path.exists("/proc/self/smaps"):
+                previous = config.get('shared_weights_dir')
+                config._config['shared_weights_dir'] = weights_dir
+                try:
+                    assert worker_memory_report()["weights_files"], "Checkpoint shows up as a mapped file"
+                finally:
+                    config._config['shared_weights_dir'] = previous
+            del shared, again
+            gc.collect()
+        print("✓ PyTorch weights load memory-mapped")
+
+    def test_phoneme_extractor_uses_shared_weights(self):
+        """SHARED_MODEL_WEIGHTS loads the extractor's model mapped and unquantized"""
+        from core.phoneme_extractor import PhonemeExtractor
+
+        previous = {key: config.get(key) for key in ('shared_model_weights', 'shared_weights_dir')}
+        with tempfile.TemporaryDirectory() as model_dir, tempfile.TemporaryDirectory() as weights_dir:
+            tiny_wav2vec2(model_dir)
+            config._config.update({'shared_model_weights': True, 'shared_weights_dir': weights_dir})
+            try:
+                extractor = PhonemeExtractor(model_name=model_dir, use_quantization=True, use_fast_model=False,
+                                             optimization_config=extractor_config(cache_enabled=False))
+            finally:
+                config._config.update(previous)
+            assert not extractor.use_quantization
+            assert extractor._registry_key[-2] is True  # shared weights (the buckets come last)
+            assert os.listdir(weights_dir)
+            del extractor
+            gc.collect()
+        print("✓ PhonemeExtractor loads shared weights")
+
+    def test_onnx_shared_session(self):
+        """Initializers are found in the protobuf and served from a memory map"""
+        rng = np.random.default_rng(0)
+        weights = {
+            "W1": rng.standard_normal((64, 256)).astype(np.float32),
+            "B1": rng.standard_normal(256).astype(np.float32),
+            "W2": rng.standard_normal((256, 8)).astype(np.float32),
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            model_path = os.path.join(directory, "mlp.onnx")
+            mlp_onnx(model_path, weights)
+
+            initializers = onnx_raw_initializers(model_path)
+            assert [t["name"] for t in initializers] == ["W1", "B1", "W2"]
+            raw = np.fromfile(model_path, dtype=np.uint8)
+            for tensor in initializers:
+                stored = raw[tensor["offset"]:tensor["offset"] + tensor["nbytes"]].view(np.float32)
+                assert np.array_equal(stored.reshape(tensor["dims"]), weights[tensor["name"]])
+
+            weights_dir = os.path.join(directory, "shared")
+            os.makedirs(weights_dir)
+            session = create_shared_onnx_session(model_path, ort.SessionOptions(), ["CPUExecutionProvider"],
+                                                 directory=weights_dir, min_bytes=4096)
+            assert [array.shape for array, _ in session._shared_initializers] == [(64, 256), (256, 8)]
+
+            x = rng.standard_normal((3, 64)).astype(np.float32)
+            expected = np.maximum(x @ weights["W1"] + weights["B1"], 0) @ weights["W2"]
+            assert np.allclose(session.run(None, {"x": x})[0], expected, atol=1e-4)
+            del session
+            gc.collect()
+        print("✓ ONNX session runs on memory-mapped initializers")
+
+    def test_memory_report(self):
+        """The report splits RSS into shared and private memory"""
+        report = worker_memory_report()
+        assert report["pid"] == os.getpid()
+        process = report["process"]
+        assert process["rss_mb"] > 0
+        if "shared_mb" in process:
+            assert abs(process["shared_mb"] + process["private_mb"] - process["rss_mb"]) < 1.0
+            assert process["pss_mb"] <= process["rss_mb"] + 0.1
+        print(f"✓ Memory report: {process}")
+
+
+def run_shared_weights_tests():
+    """Run all shared weights tests"""
+    print("\n" + "="*60)
+    print("SHARED WEIGHTS TESTS")
+    print("="*60 + "\n")
+
+    test_shared = TestSharedWeights()
+    try:
+        test_shared.test_pytorch_mmap_load()
+        test_shared.test_phoneme_extractor_uses_shared_weights()
+        test_shared.test_onnx_shared_session()
+        test_shared.test_memory_report()
+    except AssertionError as e:
+        print(f"\n❌ Shared weights test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All shared weights tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_shared_weights_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,108 @@
+"""
+Tests for the single-pass SpeechProblemClassifier.
+
+classify_problems must return the summary it always did (same counts, same
+key and tie order), and merged summaries must equal classifying all of the
+sentences' results at once.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+
+from core.speech_problem_classifier import ProblemSummaryAccumulator, SpeechProblemClassifier
+
+FIRST_SENTENCE = [
+    {"type": "match", "ground_truth_word": "the", "predicted_word": "the", "missed": [], "added": [], "substituted": []},
+    {"type": "substitution", "ground_truth_word": "thin", "predicted_word": "fin",
+     "missed": ["n"], "added": ["ə"], "substituted": [("θ", "f")]},
+    {"type": "match", "ground_truth_word": "ship", "predicted_word": "ship",
+     "missed": None, "added": [], "substituted": [("ʃ", "s"), ("ɪ", "i")]},
+    {"type": "deletion", "ground_truth_word": "sat", "predicted_word": ""},
+    {"type": "insertion", "ground_truth_word": "", "predicted_word": "um"},
+]
+
+SECOND_SENTENCE = [
+    {"type": "match", "ground_truth_word": "this", "predicted_word": "dis",
+     "missed": [], "added": ["ʔ"], "substituted": [("ð", "d"), ("θ", "t")]},
+    {"type": "deletion", "ground_truth_word": "sat", "predicted_word": ""},
+]
+
+
+class TestSpeechProblemClassifier:
+    """Test suite for SpeechProblemClassifier"""
+
+    def test_summary(self):
+        """One sentence gives the expected counts, groups, info and focus"""
+        summary = SpeechProblemClassifier.classify_problems(FIRST_SENTENCE)
+        assert summary["phoneme_error_counts"] == {"n": 1, "ə": 1, "θ": 1, "ʃ": 1, "ɪ": 1}
+        assert list(summary["phoneme_error_counts"]) == ["n", "ə", "θ", "ʃ", "ɪ"]
+        assert summary["word_error_counts"] == {"sat": 1, "um": 1}
+        assert summary["most_common_phoneme"] == ("n", 1) and summary["most_common_word"] == ("sat", 1)
+        assert summary["phoneme_group_errors"] == {"nasals": 1, "vowels": 2, "fricatives": 2}
+        assert list(summary["phoneme_group_errors"]) == ["nasals", "vowels", "fricatives"]
+        assert list(summary["phoneme_articulatory_info"]) == ["n", "θ", "ʃ"]
+        assert summary["phoneme_difficulty_levels"] == {"n": 1, "ə": 4, "θ": 3, "ʃ": 2, "ɪ": 3}
+        assert summary["high_frequency_errors"][0] == ("n", 1)
+        assert summary["recommended_focus_phoneme"] == ("n", "high_frequency_phoneme")
+
+        empty = SpeechProblemClassifier.classify_problems([])
+        assert empty["most_common_phoneme"] is None and empty["recommended_focus_phoneme"] is None
+        print("✓ classify_problems summary")
+
+    def test_phoneme_index(self):
+        """The index agrees with the tables it is built from"""
+        cls = SpeechProblemClassifier
+        for phoneme, info in cls.PHONEME_INDEX.items():
+            groups = [group for group, phonemes in cls.PHONEME_GROUPS.items() if phoneme in phonemes]
+            assert info.group == (groups[0] if groups else None)
+            assert info.articulatory is cls.ARTICULATORY_INFO.get(phoneme)
+            assert info.difficulty == cls.PHONEME_DIFFICULTY.get(phoneme)
+            assert info.high_frequency == (phoneme in cls.HIGH_FREQUENCY_PHONEMES)
+        assert "ʔ" in cls.PHONEME_INDEX and "qu" in cls.PHONEME_INDEX and "q" not in cls.PHONEME_INDEX
+        print("✓ Phoneme index matches the tables")
+
+    def test_merge(self):
+        """Merged summaries equal classifying every result together"""
+        expected = SpeechProblemClassifier.classify_problems(FIRST_SENTENCE + SECOND_SENTENCE)
+        assert expected["most_common_phoneme"] == ("θ", 2) and expected["word_error_counts"]["sat"] == 2
+
+        # Summaries as stored with a feedback entry (JSON)
+        stored = [json.loads(json.dumps(SpeechProblemClassifier.classify_problems(results)))
+                  for results in (FIRST_SENTENCE, SECOND_SENTENCE)]
+        assert SpeechProblemClassifier.merge_summaries(stored) == expected
+
+        first = ProblemSummaryAccumulator().add_results(FIRST_SENTENCE)
+        second = ProblemSummaryAccumulator().add_results(SECOND_SENTENCE)
+        merged = ProblemSummaryAccumulator().merge(first).merge(second)
+        assert merged.summary() == expected and merged.sentences == 2
+        assert first.summary() == SpeechProblemClassifier.classify_problems(FIRST_SENTENCE)
+        print("✓ Summaries merge without the original results")
+
+
+def run_speech_problem_classifier_tests():
+    """Run all speech problem classifier tests"""
+    print("\n" + "="*60)
+    print("SPEECH PROBLEM CLASSIFIER TESTS")
+    print("="*60 + "\n")
+
+    test_classifier = TestSpeechProblemClassifier()
+    try:
+        test_classifier.test_summary()
+        test_classifier.test_phoneme_index()
+        test_classifier.test_merge()
+    except AssertionError as e:
+        print(f"\n❌ Speech problem classifier test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All speech problem classifier tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_speech_problem_classifier_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,137 @@
+"""
+Tests for the compact word alignment results.
+
+WordAlignment must read exactly like the per-word dicts
+_process_word_alignment used to return, convert back to them at the API
+boundary, and survive the trip to and from an audio process pool worker
+(whose phoneme ids differ from the parent's).
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import pickle
+
+from core.alignment_cache import RequestCostCache
+from core.audio_process_pool import AudioProcessPool
+from core.phoneme_inventory import phoneme_inventory
+from core.process_audio import _process_word_alignment, analyze_results
+from core.word_alignment import WordAlignment, word_alignment_records
+
+GROUND_TRUTH = [("the", ["ð", "ə"]), ("cat", ["k", "æ", "t"]), ("sat", ["s", "æ", "t"]), ("down", ["d", "aʊ", "n"])]
+
+
+def _align(predicted_words, phoneme_predictions, ground_truth=GROUND_TRUTH, cost_cache=None):
+    return _process_word_alignment(
+        ground_truth_words=[word for word, _ in ground_truth],
+        ground_truth_phonemes=ground_truth,
+        predicted_words=predicted_words,
+        phoneme_predictions=phoneme_predictions,
+        cost_cache=cost_cache,
+    )
+
+
+class TestWordAlignment:
+    """Test suite for WordAlignment results"""
+
+    def test_legacy_shape(self):
+        """Each result reads and converts exactly like the legacy dict"""
+        results = _align(["the", "cat", "sit", "now"], [["ð", "ə"], ["k", "æ"], ["s", "ɪ", "t"], ["n", "aʊ"]])[:3]
+        results += _align(["the", "cat", "sat"], [["ð", "ə"], ["k", "æ", "t"], ["s", "æ", "t"]])[3:]
+        results += _align(["the", "cat", "sat", "dog", "down"],
+                          [["ð", "ə"], ["k", "æ", "t"], ["s", "æ", "t"], ["n", "aʊ"], ["d", "aʊ", "n"]])[3:4]
+        assert all(isinstance(result, WordAlignment) and not hasattr(result, "__dict__") for result in results)
+        assert [result["type"] for result in results] == ["match", "match", "substitution", "deletion", "insertion"]
+
+        assert results[1].to_dict() == {
+            "type": "match", "predicted_word": "cat", "ground_truth_word": "cat",
+            "phonemes": ["k", "æ"], "ground_truth_phonemes": ["k", "æ", "t"],
+            "expected_phonemes": ["k", "æ", "t"], "actual_phonemes": ["k", "æ"],
+            "per": 0.3333, "missed": ["t"], "added": [], "substituted": [],
+            "total_phonemes": 3, "total_errors": 1,
+        }
+        assert results[2]["substituted"] == [("æ", "ɪ")]
+        assert results[3].to_dict() == {
+            "type": "deletion", "predicted_word": "", "ground_truth_word": "down",
+            "phonemes": [], "ground_truth_phonemes": ["d", "aʊ", "n"], "expected_phonemes": ["d", "aʊ", "n"],
+            "actual_phonemes": [], "per": 1.0, "missed": ["d", "aʊ", "n"], "added": [], "substituted": [],
+            "total_phonemes": 3, "total_errors": 3, "error": "Word missing in prediction.",
+        }
+        inserted = results[4]
+        assert list(inserted)[-1] == "error" and inserted["added"] == ["n", "aʊ"] and inserted["total_errors"] == 0
+        assert inserted.get("start_time") is None and "start_time" not in inserted
+
+        inserted.set_times(1.5, 1.9)
+        assert (inserted["start_time"], inserted["end_time"]) == (1.5, 1.9)
+        print("✓ WordAlignment matches the legacy dict")
+
+    def test_shared_error_arrays(self):
+        """Repeated words reuse the cached error arrays instead of allocating new lists"""
+        cache = RequestCostCache()
+        first = _align(["the", "cat", "sat", "down"], [["ð", "ə"], ["k", "ɑ", "t"], ["s", "æ", "t"], ["d", "aʊ", "n"]],
+                       cost_cache=cache)
+        second = _align(["the", "cat", "sat", "down"], [["ð", "ə"], ["k", "ɑ", "t"], ["s", "æ", "t"], ["d", "aʊ", "n"]],
+                        cost_cache=cache)
+        assert first[1].substituted is second[1].substituted
+        assert phoneme_inventory.decode(first[1].substituted) == ["æ", "ɑ"]
+        assert first[0].missed is first[2].missed, "Words without errors share one empty array"
+        print("✓ Error arrays are shared")
+
+    def test_analyze_results_boundary(self):
+        """analyze_results converts to legacy records for pandas and the problem summary"""
+        results = _align(["the", "cat", "sit", "down"], [["ð", "ə"], ["k", "æ", "t"], ["s", "ɪ", "t"], ["d", "aʊ", "n"]])
+        df, highest, problem_summary, per_summary = analyze_results(results)
+        legacy_df, _, legacy_summary, legacy_per = analyze_results(word_alignment_records(results))
+        assert df.to_dict() == legacy_df.to_dict()
+        assert problem_summary == legacy_summary and per_summary == legacy_per
+        assert highest["ground_truth_word"] == "sat" and per_summary["total_errors"] == 1
+        assert isinstance(df.iloc[0]["ground_truth_phonemes"], list)
+        print("✓ analyze_results converts at the boundary")
+
+    def test_pickles_across_processes(self):
+        """Results computed in a pool worker decode with the parent's phoneme ids"""
+        # Intern symbols in an order the fresh worker will not see
+        phoneme_inventory.encode(["ʁ2", "ʁ1"])
+        ground_truth = [("uno", ["ʁ1", "ʁ2"]), ("dos", ["ʁ2", "ʁ1"])]
+        predictions = [["ʁ1", "ʁ1"], ["ʁ2", "ʁ1"]]
+        expected = _align(["uno", "dos"], predictions, ground_truth)
+        assert pickle.loads(pickle.dumps(expected)) == expected
+
+        pool = AudioProcessPool(max_workers=1)
+        try:
+            results = asyncio.run(pool.run(_process_word_alignment, [word for word, _ in ground_truth],
+                                           ground_truth, ["uno", "dos"], predictions))
+        finally:
+            pool.shutdown()
+        assert [result.to_dict() for result in results] == [result.to_dict() for result in expected]
+        assert results[0]["substituted"] == [("ʁ2", "ʁ1")]
+        print("✓ Results survive a process pool round trip")
+
+
+def run_word_alignment_tests():
+    """Run all word alignment tests"""
+    print("\n" + "="*60)
+    print("WORD ALIGNMENT TESTS")
+    print("="*60 + "\n")
+
+    test_alignment = TestWordAlignment()
+    try:
+        test_alignment.test_legacy_shape()
+        test_alignment.test_shared_error_arrays()
+        test_alignment.test_analyze_results_boundary()
+        test_alignment.test_pickles_across_processes()
+    except AssertionError as e:
+        print(f"\n❌ Word alignment test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All word alignment tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_word_alignment_tests()
+    exit(0 if success else 1)
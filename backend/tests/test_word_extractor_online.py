@@ -0,0 +1,202 @@
+"""
+Tests for the pooled Deepgram word extraction client.
+
+WordExtractorOnline runs against a local stub of the Deepgram endpoint:
+calls must reuse keep-alive connections, respect the concurrency bound,
+retry transient errors with backoff, give up at the total deadline, and
+send the same PCM as the original int16 conversion.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from core.word_extractor import WordExtractorOnline, encode_pcm16
+
+RESPONSE = {"results": {"channels": [{"alternatives": [{"transcript": "The cat, sat."}]}]}}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.requests.append({"port": self.client_address[1], "path": self.path,
+                                    "authorization": self.headers["Authorization"], "body": body})
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            status = server.statuses.pop(0) if server.statuses else 200
+        time.sleep(server.delay)
+        payload = json.dumps(RESPONSE if status == 200 else {"error": "stub"}).encode()
+        with server.lock:
+            server.in_flight -= 1
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # the client gave up (deadline test)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubDeepgram:
+    """Local HTTP/1.1 server answering like Deepgram's /v1/listen."""
+
+    def __init__(self, statuses=(), delay=0.0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.statuses = list(statuses)
+        self.server.delay = delay
+        self.server.in_flight = self.server.max_in_flight = 0
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/listen"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def __enter__(self):
+        return self.server
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _extractor(url, **kwargs):
+    previous = os.environ.get("DEEPGRAM_KEY")
+    os.environ["DEEPGRAM_KEY"] = "test-key"
+    try:
+        return WordExtractorOnline(base_url=url, **kwargs)
+    finally:
+        if previous is None:
+            del os.environ["DEEPGRAM_KEY"]
+        else:
+            os.environ["DEEPGRAM_KEY"] = previous
+
+
+def _audio(seconds=0.5, sr=16000):
+    return (0.5 * np.sin(np.linspace(0, 200 * np.pi, int(seconds * sr)))).astype(np.float32)
+
+
+class TestWordExtractorOnline:
+    """Test suite for WordExtractorOnline against a stub server"""
+
+    def test_keep_alive(self):
+        """Sequential calls reuse one connection and send the original PCM"""
+        stub = _StubDeepgram()
+        with stub as server:
+            extractor = _extractor(stub.url)
+            try:
+                audio = _audio()
+                for _ in range(4):
+                    assert extractor.extract_words(audio) == ["the", "cat", "sat"]
+            finally:
+                extractor.close()
+        assert len({request["port"] for request in server.requests}) == 1, "Connection was not reused"
+        request = server.requests[0]
+        assert request["authorization"] == "Token test-key" and "sample_rate=16000" in request["path"]
+        assert request["body"] == (audio * 32767).astype(np.int16).tobytes()
+        print("✓ Calls reuse a keep-alive connection")
+
+    def test_bounded_concurrency(self):
+        """Concurrent async calls never exceed the limit, from any event loop"""
+        stub = _StubDeepgram(delay=0.1)
+        with stub as server:
+            extractor = _extractor(stub.url, concurrency=2)
+            try:
+                async def burst():
+                    return await asyncio.gather(*[extractor.extract_words_async(_audio()) for _ in range(6)])
+
+                for _ in range(2):  # a fresh event loop each time shares the same pool
+                    assert asyncio.run(burst()) == [["the", "cat", "sat"]] * 6
+            finally:
+                extractor.close()
+        assert server.max_in_flight == 2
+        assert len({request["port"] for request in server.requests}) <= 2
+        print("✓ Concurrency is bounded")
+
+    def test_retries(self):
+        """Transient errors are retried, client errors are not"""
+        stub = _StubDeepgram(statuses=[503, 502])
+        with stub as server:
+            extractor = _extractor(stub.url, retry_backoff=0.01)
+            try:
+                assert extractor.extract_words(_audio()) == ["the", "cat", "sat"]
+                assert len(server.requests) == 3
+
+                server.statuses = [400]
+                assert extractor.extract_words(_audio()) == []
+                assert len(server.requests) == 4
+            finally:
+                extractor.close()
+        print("✓ Transient errors are retried")
+
+    def test_deadline(self):
+        """A slow endpoint fails the call at the total deadline, not timeout x attempts"""
+        stub = _StubDeepgram(delay=1.0)
+        with stub:
+            extractor = _extractor(stub.url, deadline=0.3, retry_backoff=0.01)
+            try:
+                start = time.perf_counter()
+                assert extractor.extract_words(_audio(), timeout=15, max_retries=2) == []
+                assert time.perf_counter() - start < 0.8
+            finally:
+                extractor.close()
+        print("✓ Calls stop at the deadline")
+
+    def test_encode_pcm16(self):
+        """PCM encoding equals the original two-pass conversion"""
+        def original(audio):
+            if np.max(np.abs(audio)) > 1.0:
+                audio = audio / np.max(np.abs(audio))
+            return (audio * 32767).astype(np.int16).tobytes()
+
+        rng = np.random.default_rng(0)
+        for dtype in (np.float32, np.float64):
+            for scale in (0.3, 1.0, 2.5):
+                audio = (rng.uniform(-1, 1, 4001) * scale).astype(dtype)
+                assert encode_pcm16(audio) == original(audio), (dtype, scale)
+        assert encode_pcm16(np.zeros(0, dtype=np.float32)) == b""
+        print("✓ PCM encoding matches")
+
+
+def run_word_extractor_online_tests():
+    """Run all word extractor online tests"""
+    print("\n" + "="*60)
+    print("WORD EXTRACTOR ONLINE TESTS")
+    print("="*60 + "\n")
+
+    test_extractor = TestWordExtractorOnline()
+    try:
+        test_extractor.test_keep_alive()
+        test_extractor.test_bounded_concurrency()
+        test_extractor.test_retries()
+        test_extractor.test_deadline()
+        test_extractor.test_encode_pcm16()
+    except AssertionError as e:
+        print(f"\n❌ Word extractor online test failed: {e}\n")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    print("\n✅ All word extractor online tests passed!\n")
+    return True
+
+
+if __name__ == "__main__":
+    success = run_word_extractor_online_tests()
+    exit(0 if success else 1)
@@ -0,0 +1,141 @@
+"""
+Build the INT8 variant of the ONNX wav2vec2-TIMIT-IPA phoneme model.
+
+Reads the float export (model.onnx + processor files) from LOCAL_DIR and
+writes model_int8.onnx next to it, so upload_model.py publishes both
+variants and the backend can pick one with ONNX_MODEL_VARIANT=float|int8.
+
+Two modes:
+- dynamic (default): weights quantized to int8 ahead of time, activations
+  quantized per batch at run time. No calibration needed.
+- static: weights and activations quantized ahead of time (QDQ format),
+  with activation ranges calibrated on the recordings in
+  backend/ai/dataset/audio, normalized exactly as the backend feeds them.
+
+Instructions:
+1. Export or download the float model into LOCAL_DIR (see upload_model.py)
+2. pip install onnx   (needed by onnxruntime.quantization, not by the backend)
+3. Run: python quantize_model.py [--mode dynamic|static]
+4. Compare against the float model (from backend/):
+   python -m benchmarks.onnx_quantization_benchmark --model ../wav2vec2-timit-ipa-onnx
+5. Run: python upload_model.py
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+LOCAL_DIR = "./wav2vec2-timit-ipa-onnx"
+DATASET_AUDIO_DIR = "./backend/ai/dataset/audio"
+FLOAT_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_int8.onnx"
+
+
+class DatasetCalibrationReader:
+    """
+    Feeds dataset recordings to onnxruntime's static calibration.
+
+    Implements the CalibrationDataReader protocol (get_next / rewind).
+    """
+
+    def __init__(self, processor, audio_dir: str, input_name: str,
+                 max_clips: int = 32, max_seconds: float = 10.0, sr: int = 16000):
+        import librosa
+
+        files = sorted((f for f in os.listdir(audio_dir) if f.endswith(".wav")),
+                       key=lambda f: (len(f), f))[:max_clips]
+        self.inputs = []
+        for filename in files:
+            audio, _ = librosa.load(os.path.join(audio_dir, filename), sr=sr)
+            audio = audio[:int(max_seconds * sr)]
+            input_values = processor(audio, sampling_rate=sr, return_tensors="np").input_values
+            self.inputs.append({input_name: input_values.astype(np.float32)})
+        self._index = 0
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def get_next(self):
+        if self._index >= len(self.inputs):
+            return None
+        self._index += 1
+        return self.inputs[self._index - 1]
+
+    def rewind(self):
+        self._index = 0
+
+
+def quantize(model_dir: str, mode: str, audio_dir: str, max_clips: int, per_channel: bool) -> str:
+    """Write model_int8.onnx into model_dir; returns its path."""
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    float_path = os.path.join(model_dir, FLOAT_MODEL_FILE)
+    int8_path = os.path.join(model_dir, INT8_MODEL_FILE)
+    if not os.path.exists(float_path):
+        raise FileNotFoundError(f"{float_path} not found - export the float model first")
+
+    # Shape inference + graph cleanup makes more nodes quantizable
+    prepared_path = os.path.join(model_dir, "model_prepared.onnx")
+    print("🔧 Preparing the float model for quantization...")
+    quant_pre_process(float_path, prepared_path, skip_symbolic_shape=False)
+
+    start = time.time()
+    try:
+        if mode == "dynamic":
+            print("⚙️ Quantizing weights (dynamic)...")
+            # Only MatMul/Gemm: ConvInteger has no fast CPU kernels, the conv
+            # feature encoder stays float
+            quantize_dynamic(prepared_path, int8_path, weight_type=QuantType.QInt8,
+                             op_types_to_quantize=["MatMul", "Gemm"], per_channel=per_channel)
+            calibration_clips = 0
+        else:
+            from transformers import Wav2Vec2Processor
+
+            processor = Wav2Vec2Processor.from_pretrained(model_dir)
+            input_name = ort.InferenceSession(float_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+            reader = DatasetCalibrationReader(processor, audio_dir, input_name, max_clips=max_clips)
+            calibration_clips = len(reader)
+            print(f"⚙️ Quantizing weights and activations (static, {calibration_clips} calibration clips)...")
+            quantize_static(prepared_path, int8_path, reader, quant_format=QuantFormat.QDQ,
+                            activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8,
+                            op_types_to_quantize=["MatMul", "Gemm"], per_channel=per_channel)
+    finally:
+        if os.path.exists(prepared_path):
+            os.remove(prepared_path)
+
+    with open(os.path.join(model_dir, "quantization.json"), "w") as f:
+        json.dump({
+            "source": FLOAT_MODEL_FILE,
+            "mode": mode,
+            "per_channel": per_channel,
+            "calibration_clips": calibration_clips,
+            "onnxruntime": ort.__version__,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }, f, indent=2)
+
+    float_mb = os.path.getsize(float_path) / 1024 ** 2
+    int8_mb = os.path.getsize(int8_path) / 1024 ** 2
+    print(f"✅ Wrote {int8_path} in {time.time() - start:.1f}s ({float_mb:.0f} MB -> {int8_mb:.0f} MB)")
+    return int8_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", default=LOCAL_DIR)
+    parser.add_argument("--mode", choices=["dynamic", "static"], default="dynamic")
+    parser.add_argument("--audio-dir", default=DATASET_AUDIO_DIR, help="Calibration recordings (static mode)")
+    parser.add_argument("--max-clips", type=int, default=32)
+    parser.add_argument("--per-channel", action="store_true")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.model_dir):
+        print(f"❌ Directory {args.model_dir} not found!")
+        print("Make sure you ran the ONNX export first.")
+    else:
+        print(f"📂 Found model files in {args.model_dir}")
+        quantize(args.model_dir, args.mode, args.audio_dir, args.max_clips, args.per_channel)